@@ -122,6 +122,39 @@ class CBCClient:
         except Exception as e:
             raise CBCError(f"error downloading file: {e}") from e
 
+    @contextmanager
+    def stream(
+        self,
+        ep: str,
+        *,
+        params: QueryParams | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> Generator[httpx.Response]:
+        """Stream the response to a GET request to the given CBS endpoint."""
+        try:
+            # the server may take its time between events, don't time out on reads.
+            with self._client.stream(
+                "GET",
+                ep,
+                params=params,
+                headers=headers,
+                timeout=httpx.Timeout(5.0, read=None),
+            ) as response:
+                self.maybe_handle_error(response)
+                yield response
+        except httpx.ConnectError as e:
+            msg = f"error connecting to '{self._client.base_url}': {e}"
+            self._logger.error(msg)
+            raise CBCConnectionError(msg) from e
+        except CBCError as e:
+            msg = f"error streaming '{ep}': {e}"
+            self._logger.error(msg)
+            raise CBCError(msg) from e
+        except Exception as e:
+            msg = f"error streaming '{ep}': {e}"
+            self._logger.error(msg)
+            raise CBCConnectionError(msg) from e
+
     def get(self, ep: str, *, params: QueryParams | None = None) -> httpx.Response:
         """Send a GET request to the given CBS endpoint."""
         try:
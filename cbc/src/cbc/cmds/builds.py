@@ -11,21 +11,23 @@
 # MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
 # GNU General Public License for more details.
 
+import datetime
 import errno
 import logging
 import sys
+from datetime import datetime as dt
 
 import click
 import pydantic
 from cbsdcore.api.responses import AvailableComponent, NewBuildResponse
 from cbsdcore.auth.user import UserConfig
-from cbsdcore.builds.types import BuildEntry, BuildID
+from cbsdcore.builds.types import BuildEntry, BuildID, EntryState
 from cbsdcore.versions import (
     BuildDescriptor,
 )
 
 from cbc import CBCError
-from cbc.client import CBCClient
+from cbc.client import CBCClient, QueryParams
 from cbc.cmds import endpoint, logs, pass_config, pass_logger, periodic, update_ctx
 from cbc.cmds._shared import build_descriptor_options, new_build_descriptor_helper
 
@@ -76,10 +78,35 @@ def _build_new(
 
 @endpoint("/builds/status")
 def _build_list(
-    logger: logging.Logger, client: CBCClient, ep: str, all: bool
+    logger: logging.Logger,
+    client: CBCClient,
+    ep: str,
+    all: bool,
+    *,
+    states: list[str] | None = None,
+    version: str | None = None,
+    since: dt | None = None,
+    until: dt | None = None,
+    after: BuildID | None = None,
+    limit: int | None = None,
+    newest_first: bool = False,
 ) -> list[tuple[int, BuildEntry]]:
+    params: QueryParams = {"all": all, "newest_first": newest_first}
+    if states:
+        params["state"] = states
+    if version:
+        params["version"] = version
+    if since:
+        params["since"] = since.isoformat()
+    if until:
+        params["until"] = until.isoformat()
+    if after:
+        params["after"] = after
+    if limit:
+        params["limit"] = limit
+
     try:
-        r = client.get(ep, params={"all": all})
+        r = client.get(ep, params=params)
         res = r.json()  # pyright: ignore[reportAny]
     except CBCError as e:
         logger.error(f"unable to list builds: {e}")
@@ -192,12 +219,82 @@ build id: {res.build_id}
 
 @cmd_build.command("list", help="List builds from the build service")
 @click.option("--all", is_flag=True, default=False, help="List all known builds")
+@click.option(
+    "-s",
+    "--state",
+    "states",
+    type=click.Choice([s.value for s in EntryState], case_sensitive=False),
+    multiple=True,
+    help="Only list builds in the given state (can be specified multiple times)",
+)
+@click.option(
+    "--version",
+    "version",
+    type=str,
+    required=False,
+    metavar="GLOB",
+    help="Only list builds whose version matches the glob pattern",
+)
+@click.option(
+    "--since",
+    type=click.DateTime(),
+    required=False,
+    help="Only list builds submitted from this time (UTC)",
+)
+@click.option(
+    "--until",
+    type=click.DateTime(),
+    required=False,
+    help="Only list builds submitted before this time (UTC)",
+)
+@click.option(
+    "--after",
+    type=BuildID,
+    required=False,
+    metavar="ID",
+    help="List builds following the given build ID",
+)
+@click.option(
+    "-n",
+    "--limit",
+    type=int,
+    required=False,
+    help="Maximum number of builds to list",
+)
+@click.option(
+    "--newest-first",
+    is_flag=True,
+    default=False,
+    help="List the most recent builds first",
+)
 @update_ctx
 @pass_logger
 @pass_config
-def cmd_build_list(config: UserConfig, logger: logging.Logger, all: bool) -> None:
+def cmd_build_list(
+    config: UserConfig,
+    logger: logging.Logger,
+    all: bool,
+    states: tuple[str, ...],
+    version: str | None,
+    since: dt | None,
+    until: dt | None,
+    after: BuildID | None,
+    limit: int | None,
+    newest_first: bool,
+) -> None:
     try:
-        lst = _build_list(logger, config, all)
+        lst = _build_list(
+            logger,
+            config,
+            all,
+            states=[s.upper() for s in states],
+            version=version,
+            since=since.replace(tzinfo=datetime.UTC) if since else None,
+            until=until.replace(tzinfo=datetime.UTC) if until else None,
+            after=after,
+            limit=limit,
+            newest_first=newest_first,
+        )
     except CBCError as e:
         click.echo(f"error obtaining build list: {e}", err=True)
         sys.exit(errno.ENOTRECOVERABLE)
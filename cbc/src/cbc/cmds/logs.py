@@ -16,15 +16,16 @@ import errno
 import logging
 import sys
 import time
+from collections.abc import Callable
 from pathlib import Path
 
 import click
 import pydantic
-from cbsdcore.api.responses import BuildLogsFollowResponse
+from cbsdcore.api.responses import BuildLogSearchResponse, BuildLogsFollowResponse
 from cbsdcore.auth.user import UserConfig
 
 from cbc import CBCError
-from cbc.client import CBCClient, QueryParams
+from cbc.client import CBCClient, CBCConnectionError, QueryParams
 from cbc.cmds import endpoint, pass_config, pass_logger, update_ctx
 
 
@@ -78,6 +79,78 @@ def _follow_builds_log(
     )
 
 
+@endpoint("/builds/logs/{build_id}/stream")
+def _stream_builds_log(
+    logger: logging.Logger,
+    client: CBCClient,
+    ep: str,
+    build_id: int,
+    out_fn: Callable[[str], None],
+    *,
+    max_msgs: int | None = None,
+    max_retries: int = 5,
+) -> None:
+    """
+    Stream build log messages from the server, as they become available.
+
+    Messages are pushed by the server as server-sent events, identified by their
+    stream ID. Should the connection drop, or the server give up on us for being too
+    slow, we resume from the last message seen.
+    """
+    real_ep = ep.format(build_id=build_id)
+    last_id: str | None = None
+    retries = 0
+
+    while True:
+        headers = {"Accept": "text/event-stream"}
+        if last_id:
+            headers["Last-Event-ID"] = last_id
+        params: QueryParams | None = {"n": max_msgs} if max_msgs else None
+
+        try:
+            with client.stream(real_ep, params=params, headers=headers) as response:
+                event_id: str | None = None
+                event_type: str | None = None
+                data: list[str] = []
+                for line in response.iter_lines():
+                    if line.startswith(":"):
+                        # keepalive.
+                        continue
+                    if line:
+                        field, _, value = line.partition(":")
+                        value = value.removeprefix(" ")
+                        match field:
+                            case "id":
+                                event_id = value
+                            case "event":
+                                event_type = value
+                            case "data":
+                                data.append(value)
+                            case _:
+                                pass
+                        continue
+
+                    # empty line, dispatch event.
+                    if event_type == "end":
+                        return
+                    if data:
+                        out_fn("\n".join(data))
+                    if event_id:
+                        last_id = event_id
+                    retries = 0
+                    event_id, event_type, data = None, None, []
+
+        except CBCConnectionError as e:
+            retries += 1
+            if retries > max_retries:
+                raise e from None
+            logger.warning(f"lost build log stream, retry {retries}: {e}")
+            time.sleep(min(2**retries, 30))
+            continue
+
+        logger.debug(f"build log stream closed, resume from '{last_id}'")
+
+
 @endpoint("/builds/logs/{build_id}/tail")
 def _tail_builds_log(
     logger: logging.Logger,
@@ -122,6 +195,45 @@ def _download_log_file(
         raise e from None
 
 
+@endpoint("/builds/logs/{build_id}/search")
+def _search_builds_log(
+    logger: logging.Logger,
+    client: CBCClient,
+    ep: str,
+    build_id: int,
+    pattern: str,
+    *,
+    regex: bool = False,
+    ignore_case: bool = False,
+    context: int = 0,
+    max_matches: int | None = None,
+) -> BuildLogSearchResponse:
+    """Search a build's log on the server."""
+    real_ep = ep.format(build_id=build_id)
+    params: QueryParams = {
+        "q": pattern,
+        "regex": regex,
+        "ignore_case": ignore_case,
+        "context": context,
+    }
+    if max_matches:
+        params["max_matches"] = max_matches
+
+    try:
+        r = client.get(real_ep, params=params)
+        res = r.json()  # pyright: ignore[reportAny]
+    except CBCError as e:
+        logger.error(f"error searching build log: {e}")
+        raise e from None
+
+    try:
+        return BuildLogSearchResponse.model_validate(res)
+    except pydantic.ValidationError as e:
+        msg = f"error parsing server result: {res}\n{e}"
+        logger.error(msg)
+        raise CBCError(msg) from None
+
+
 @click.group("logs", help="build logs related commands")
 def cmd_build_logs_grp() -> None:
     pass
@@ -155,6 +267,13 @@ def cmd_build_logs_grp() -> None:
     default=False,
     help="Follow a running build's log",
 )
+@click.option(
+    "--stream/--poll",
+    "stream",
+    default=True,
+    show_default=True,
+    help="When following, have messages pushed by the server, or poll for them",
+)
 @update_ctx
 @pass_logger
 @pass_config
@@ -165,9 +284,12 @@ def cmd_build_logs_tail(
     num_msgs: int | None,
     probe_frequency: float,
     follow: bool,
+    stream: bool,
 ) -> None:
     last_id: str | None = None
-    if follow:
+    if follow and stream:
+        click.echo(f"--- follow build {build_id}, streaming, n: {num_msgs}")
+    elif follow:
         click.echo(
             f"--- follow build {build_id}, freq: {probe_frequency}, n: {num_msgs}"
         )
@@ -178,6 +300,22 @@ def cmd_build_logs_tail(
         for msg in msgs:
             click.echo(f"{msg.strip()}")
 
+    if follow and stream:
+        try:
+            _stream_builds_log(
+                logger,
+                config,
+                build_id,
+                lambda msg: _out_msgs([msg]),
+                max_msgs=num_msgs,
+            )
+        except CBCError as e:
+            click.echo(f"error following build '{build_id}' log: {e}", err=True)
+            sys.exit(errno.ENOTRECOVERABLE)
+
+        click.echo("--- log stream ended ---")
+        return
+
     if not follow:
         try:
             res = _tail_builds_log(logger, config, build_id, max_msgs=num_msgs)
@@ -234,3 +372,90 @@ def cmd_build_logs_get(
         sys.exit(errno.ENOTRECOVERABLE)
 
     click.echo(f"log file written to '{dpath}'")
+
+
+@cmd_build_logs_grp.command("search", help="Search a build's log")
+@click.argument("build_id", type=int, metavar="ID", required=True)
+@click.argument("pattern", type=str, metavar="PATTERN", required=True)
+@click.option(
+    "-E",
+    "--regex",
+    "regex",
+    is_flag=True,
+    default=False,
+    help="Treat PATTERN as a regular expression",
+)
+@click.option(
+    "-i",
+    "--ignore-case",
+    "ignore_case",
+    is_flag=True,
+    default=False,
+    help="Ignore case when matching",
+)
+@click.option(
+    "-C",
+    "--context",
+    "context",
+    type=click.IntRange(0, 50),
+    required=False,
+    default=0,
+    show_default=True,
+    help="Number of context lines around each match",
+)
+@click.option(
+    "-m",
+    "--max-matches",
+    "max_matches",
+    type=click.IntRange(1, 1000),
+    required=False,
+    help="Maximum number of matches",
+)
+@update_ctx
+@pass_logger
+@pass_config
+def cmd_build_logs_search(
+    config: UserConfig,
+    logger: logging.Logger,
+    build_id: int,
+    pattern: str,
+    regex: bool,
+    ignore_case: bool,
+    context: int,
+    max_matches: int | None,
+) -> None:
+    try:
+        res = _search_builds_log(
+            logger,
+            config,
+            build_id,
+            pattern,
+            regex=regex,
+            ignore_case=ignore_case,
+            context=context,
+            max_matches=max_matches,
+        )
+    except CBCError as e:
+        click.echo(f"error searching build '{build_id}' log: {e}", err=True)
+        sys.exit(errno.ENOTRECOVERABLE)
+
+    # merge matches and their context, which may overlap, and output them like grep
+    # does, with 1-based line numbers.
+    lines: dict[int, tuple[str, bool]] = {}
+    for match in res.matches:
+        first_line_no = match.line_no - len(match.before)
+        for i, msg in enumerate(match.before):
+            _ = lines.setdefault(first_line_no + i, (msg, False))
+        lines[match.line_no] = (match.msg, True)
+        for i, msg in enumerate(match.after):
+            _ = lines.setdefault(match.line_no + i + 1, (msg, False))
+
+    last_line_no: int | None = None
+    for line_no, (msg, is_match) in sorted(lines.items()):
+        if context > 0 and last_line_no is not None and line_no > last_line_no + 1:
+            click.echo("--")
+        click.echo(f"{line_no + 1}{':' if is_match else '-'}{msg}")
+        last_line_no = line_no
+
+    if res.truncated:
+        click.echo("--- more matches available, stopped at maximum ---", err=True)
@@ -64,6 +64,7 @@ def cmd_main(ctx: Ctx, debug: bool, config_path: Path) -> None:
 
 cmd_main.add_command(builds.cmd_build)
 cmd_main.add_command(builds.cmd_runner_grp)
+cmd_main.add_command(builds.cmd_builder_image_grp)
 cmd_main.add_command(versions.cmd_versions_grp)
 cmd_main.add_command(config.cmd_config)
 cmd_main.add_command(advanced.cmd_advanced)
@@ -0,0 +1,409 @@
+# CES library - components build cache
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""
+Cache of components' built RPMs, keyed on the inputs of their builds.
+
+A component's build is a function of its source, as checked out at a given SHA1 and
+patched, of its build scripts, and of what it's being built for. We key the RPMs a
+build produces on a hash of all of these, so building the same component from the
+same inputs, e.g. for a new release, reuses the RPMs instead of building them again.
+
+The version a component is built at is part of the key, as the build scripts embed
+it in the RPMs they produce. It's derived from the component's SHA1, so it only
+changes if the component's source is tagged differently.
+
+RPMs are cached unsigned, before being signed for the build that produced them, and
+restored into the build's RPMs directory, to be signed and uploaded as if they had
+just been built.
+
+The cache is kept locally, bounded in size, evicting the least recently used
+builds. If an S3 location is provided, cached builds are shared through it: builds
+missing locally are obtained from S3, and builds are uploaded once cached locally.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import pydantic
+
+from cbscore.builder import logger as parent_logger
+from cbscore.builder.prepare import BuildComponentInfo, get_patch_list
+from cbscore.core.component import CoreComponentLoc
+from cbscore.utils.s3 import (
+    S3Error,
+    S3FileLocator,
+    s3_download_files,
+    s3_get_str_obj,
+    s3_upload_files,
+    s3_upload_json,
+)
+from cbscore.utils.secrets.mgr import SecretsMgr
+
+logger = parent_logger.getChild("build-cache")
+
+
+# the rpmbuild topdir directories holding a build's RPMs.
+_RPM_DIRS = ["RPMS", "SRPMS"]
+# a cached build's entry, written once all its RPMs have been cached.
+_ENTRY_NAME = "entry.json"
+
+
+class _BuildCacheEntry(pydantic.BaseModel):
+    """A cached component build."""
+
+    name: str
+    version: str
+    sha1: str
+    rpms: list[str]
+    """The build's RPMs, relative to the rpmbuild topdir."""
+
+
+def _get_dir_size(path: Path) -> int:
+    size = 0
+    for root, _, files in path.walk():
+        for f in files:
+            with contextlib.suppress(OSError):
+                size += root.joinpath(f).lstat().st_size
+    return size
+
+
+def _get_rpms(topdir: Path) -> list[str]:
+    """Obtain the RPMs built into 'topdir', relative to it."""
+    rpms: list[str] = []
+    for d in _RPM_DIRS:
+        for root, _, files in topdir.joinpath(d).walk():
+            rpms.extend(
+                root.joinpath(f).relative_to(topdir).as_posix()
+                for f in files
+                if f.endswith(".rpm")
+            )
+    return sorted(rpms)
+
+
+class BuildCache:
+    """Cached component builds, under 'path', bounded to 'max_size' bytes."""
+
+    path: Path
+    max_size: int
+    secrets: SecretsMgr | None
+    url: str | None
+    bucket: str | None
+    bucket_loc: str | None
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_size: int,
+        secrets: SecretsMgr | None = None,
+        url: str | None = None,
+        bucket: str | None = None,
+        bucket_loc: str | None = None,
+    ) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.secrets = secrets
+        self.url = url
+        self.bucket = bucket
+        self.bucket_loc = bucket_loc
+
+    def _entry_path(self, comp_name: str, key: str) -> Path:
+        return self.path / comp_name / key
+
+    def _remote_key(self, comp_name: str, key: str, rel_path: str) -> str:
+        return f"{self.bucket_loc}/{comp_name}/{key}/{rel_path}"
+
+    def _has_remote(self) -> bool:
+        return bool(self.secrets and self.url and self.bucket and self.bucket_loc)
+
+    def key(
+        self,
+        comp_loc: CoreComponentLoc,
+        comp: BuildComponentInfo,
+        *,
+        version: str,
+        distro: str,
+        el_version: int,
+        arch: str,
+    ) -> str | None:
+        """
+        Obtain the key for a component's build, for the release 'version'.
+
+        The key covers the component's SHA1 and version, the patches applied to it for
+        the release 'version', its build scripts, and the distro, el version, and
+        architecture it's built for.
+
+        Returns `None` if the component has no RPM build section.
+        """
+        if not comp_loc.comp.build.rpm:
+            return None
+
+        h = hashlib.sha256()
+        h.update(f"{comp.name}\0{comp.sha1}\0{comp.long_version}\0".encode())
+        h.update(f"{distro}\0el{el_version}\0{arch}\0".encode())
+
+        patches_path = comp_loc.path / "patches"
+        if patches_path.exists():
+            for patch_path in get_patch_list(patches_path, version):
+                h.update(b"\0patch\0")
+                h.update(patch_path.read_bytes())
+
+        # build scripts may rely on other scripts alongside them.
+        scripts_path = (comp_loc.path / comp_loc.comp.build.rpm.build).parent
+        for script_path in sorted(p for p in scripts_path.rglob("*") if p.is_file()):
+            h.update(f"\0script\0{script_path.relative_to(scripts_path)}\0".encode())
+            h.update(script_path.read_bytes())
+
+        return h.hexdigest()
+
+    def _read_entry(self, comp_name: str, key: str) -> _BuildCacheEntry | None:
+        entry_path = self._entry_path(comp_name, key) / _ENTRY_NAME
+        if not entry_path.exists():
+            return None
+
+        try:
+            return _BuildCacheEntry.model_validate_json(entry_path.read_text())
+        except (pydantic.ValidationError, OSError) as e:
+            logger.warning(f"invalid cached build at '{entry_path}': {e}")
+            return None
+
+    def _commit(self, tmp_path: Path, comp_name: str, key: str) -> None:
+        """Move a build cached at 'tmp_path' into place, unless already there."""
+        entry_path = self._entry_path(comp_name, key)
+        if entry_path.exists() and not self._read_entry(comp_name, key):
+            # left behind by an interrupted eviction.
+            shutil.rmtree(entry_path, ignore_errors=True)
+        try:
+            _ = tmp_path.rename(entry_path)
+        except OSError:
+            # cached concurrently by another build on this host.
+            logger.debug(f"build for '{comp_name}' key '{key}' already cached")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def _tmp_path(self, comp_name: str, key: str) -> Path:
+        tmp_path = self.path / comp_name / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+        return tmp_path
+
+    async def _fetch_remote(self, comp_name: str, key: str) -> bool:
+        """Obtain a cached build from S3, caching it locally. Returns if found."""
+        if not self._has_remote():
+            return False
+        assert self.secrets and self.url and self.bucket
+
+        try:
+            obj = await s3_get_str_obj(
+                self.secrets,
+                self.url,
+                self.bucket,
+                self._remote_key(comp_name, key, _ENTRY_NAME),
+            )
+        except S3Error as e:
+            logger.warning(f"unable to check S3 for '{comp_name}' key '{key}': {e}")
+            return False
+
+        if not obj or not obj.contents:
+            logger.debug(f"no build for '{comp_name}' key '{key}' in S3")
+            return False
+
+        try:
+            entry = _BuildCacheEntry.model_validate_json(obj.contents)
+        except pydantic.ValidationError as e:
+            logger.warning(f"invalid build for '{comp_name}' key '{key}' in S3: {e}")
+            return False
+
+        logger.info(
+            f"obtaining build for '{comp_name}' key '{key}' from S3, "
+            + f"{len(entry.rpms)} RPMs"
+        )
+        tmp_path = await asyncio.to_thread(self._tmp_path, comp_name, key)
+        try:
+            await s3_download_files(
+                self.secrets,
+                self.url,
+                self.bucket,
+                {
+                    self._remote_key(comp_name, key, rpm): tmp_path / rpm
+                    for rpm in entry.rpms
+                },
+            )
+            _ = tmp_path.joinpath(_ENTRY_NAME).write_text(obj.contents)
+        except (S3Error, OSError) as e:
+            logger.warning(f"unable to obtain build for '{comp_name}' from S3: {e}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return False
+
+        await asyncio.to_thread(self._commit, tmp_path, comp_name, key)
+        return True
+
+    def _restore(self, entry: _BuildCacheEntry, key: str, topdir: Path) -> None:
+        entry_path = self._entry_path(entry.name, key)
+        for rpm in entry.rpms:
+            dst = topdir / rpm
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            # copied, not linked, as RPMs are signed in place.
+            _ = shutil.copyfile(entry_path / rpm, dst)
+
+        # mark the build as recently used.
+        entry_path.joinpath(_ENTRY_NAME).touch()
+
+    async def restore(self, comp_name: str, key: str, topdir: Path) -> bool:
+        """
+        Restore a component's cached build into the rpmbuild 'topdir', if possible.
+
+        Returns whether the build was restored.
+        """
+        entry = self._read_entry(comp_name, key)
+        if not entry and await self._fetch_remote(comp_name, key):
+            entry = self._read_entry(comp_name, key)
+
+        if not entry:
+            logger.debug(f"no cached build for '{comp_name}', key '{key}'")
+            return False
+
+        try:
+            await asyncio.to_thread(self._restore, entry, key, topdir)
+        except OSError as e:
+            logger.warning(f"unable to restore cached build for '{comp_name}': {e}")
+            for rpm in entry.rpms:
+                topdir.joinpath(rpm).unlink(missing_ok=True)
+            return False
+
+        logger.info(
+            f"restored {len(entry.rpms)} RPMs for '{comp_name}' from cached build "
+            + f"at version '{entry.version}', key '{key}'"
+        )
+        return True
+
+    def _store(
+        self, comp: BuildComponentInfo, key: str, topdir: Path
+    ) -> _BuildCacheEntry | None:
+        if self._read_entry(comp.name, key):
+            logger.debug(f"build for '{comp.name}' key '{key}' already cached")
+            return None
+
+        entry = _BuildCacheEntry(
+            name=comp.name,
+            version=comp.long_version,
+            sha1=comp.sha1,
+            rpms=_get_rpms(topdir),
+        )
+        if not entry.rpms:
+            logger.warning(f"no RPMs built for '{comp.name}', not caching")
+            return None
+
+        tmp_path = self._tmp_path(comp.name, key)
+        try:
+            for rpm in entry.rpms:
+                dst = tmp_path / rpm
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                _ = shutil.copyfile(topdir / rpm, dst)
+            _ = tmp_path.joinpath(_ENTRY_NAME).write_text(entry.model_dump_json())
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        self._commit(tmp_path, comp.name, key)
+        return entry
+
+    async def _upload_remote(self, entry: _BuildCacheEntry, key: str) -> None:
+        """Upload a cached build to S3, its entry last, once all RPMs are there."""
+        if not self._has_remote():
+            return
+        assert self.secrets and self.url and self.bucket
+
+        entry_path = self._entry_path(entry.name, key)
+        try:
+            await s3_upload_files(
+                self.secrets,
+                self.url,
+                self.bucket,
+                [
+                    S3FileLocator(
+                        entry_path / rpm,
+                        self._remote_key(entry.name, key, rpm),
+                        Path(rpm).name,
+                    )
+                    for rpm in entry.rpms
+                ],
+                dedup=True,
+            )
+            _ = await s3_upload_json(
+                self.secrets,
+                self.url,
+                self.bucket,
+                self._remote_key(entry.name, key, _ENTRY_NAME),
+                entry.model_dump_json(),
+            )
+        except S3Error as e:
+            logger.warning(f"unable to upload build for '{entry.name}' to S3: {e}")
+            return
+
+        logger.info(f"uploaded build for '{entry.name}' key '{key}' to S3")
+
+    async def store(self, comp: BuildComponentInfo, key: str, topdir: Path) -> None:
+        """Cache a component's build, from its rpmbuild 'topdir'."""
+        try:
+            entry = await asyncio.to_thread(self._store, comp, key, topdir)
+        except OSError as e:
+            logger.warning(f"unable to cache build for '{comp.name}': {e}")
+            return
+
+        if not entry:
+            return
+
+        logger.info(
+            f"cached {len(entry.rpms)} RPMs for '{comp.name}' "
+            + f"version '{comp.long_version}', key '{key}'"
+        )
+        await self._upload_remote(entry, key)
+
+    def _evict(self) -> None:
+        """Evict least recently used builds, until within bounds."""
+        builds: list[tuple[float, Path, int]] = []
+        for entry_path in self.path.glob(f"*/*/{_ENTRY_NAME}"):
+            try:
+                last_used = entry_path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            build_path = entry_path.parent
+            builds.append((last_used, build_path, _get_dir_size(build_path)))
+
+        total_size = sum(size for _, _, size in builds)
+        logger.debug(f"build cache at '{self.path}' size: {total_size} bytes")
+
+        for _, build_path, size in sorted(builds):
+            if total_size <= self.max_size:
+                break
+
+            logger.info(f"evicting cached build '{build_path}', size: {size} bytes")
+            # remove the entry first, so the build is no longer found.
+            build_path.joinpath(_ENTRY_NAME).unlink(missing_ok=True)
+            shutil.rmtree(build_path, ignore_errors=True)
+            total_size -= size
+
+    async def evict(self) -> None:
+        """Evict builds until the cache is within its maximum size."""
+        if not self.path.exists():
+            return
+
+        try:
+            await asyncio.to_thread(self._evict)
+        except Exception as e:
+            logger.warning(f"error evicting from build cache at '{self.path}': {e}")
@@ -15,6 +15,10 @@ from pathlib import Path
 
 from cbscore.builder import BuilderError
 from cbscore.builder import logger as parent_logger
+from cbscore.builder.build_cache import BuildCache
+from cbscore.builder.ccache import Ccache
+from cbscore.builder.deps import DepsCache
+from cbscore.builder.image import builder_image_is_current
 from cbscore.builder.prepare import (
     BuildComponentInfo,
     prepare_builder,
@@ -22,6 +26,7 @@ from cbscore.builder.prepare import (
 )
 from cbscore.builder.report import (
     BuildArtifactReport,
+    CcacheReport,
     ComponentReport,
     ContainerImageReport,
     ReleaseDescriptorReport,
@@ -44,6 +49,7 @@ from cbscore.releases.desc import (
     ReleaseDesc,
     ReleaseRPMArtifacts,
 )
+from cbscore.releases.index import ReleasesIndex
 from cbscore.releases.s3 import (
     check_release_exists,
     check_released_components,
@@ -51,9 +57,13 @@ from cbscore.releases.s3 import (
     release_upload_components,
 )
 from cbscore.releases.utils import get_component_release_rpm
+from cbscore.utils import timing
 from cbscore.utils.containers import get_container_canonical_uri
+from cbscore.utils.git_cache import GitCache
+from cbscore.utils.s3 import s3_close_clients
 from cbscore.utils.secrets import SecretsMgrError
 from cbscore.utils.secrets.mgr import SecretsMgr
+from cbscore.utils.timing import TimingReport, format_timings
 from cbscore.versions.desc import VersionDescriptor
 
 logger = parent_logger.getChild("builder")
@@ -67,7 +77,11 @@ class Builder:
     storage_config: StorageConfig | None
     signing_config: SigningConfig | None
     secrets: SecretsMgr
-    ccache_path: Path | None
+    ccache: Ccache | None
+    ccache_report: CcacheReport | None
+    git_cache: GitCache
+    build_cache: BuildCache | None
+    releases_index: ReleasesIndex | None
     skip_build: bool
     force: bool
     tls_verify: bool
@@ -87,7 +101,16 @@ class Builder:
 
         self.storage_config = config.storage
         self.signing_config = config.signing
-        self.ccache_path = config.paths.ccache
+        self.ccache = (
+            Ccache(config.paths.ccache, desc.distro, desc.el_version, config.ccache)
+            if config.paths.ccache
+            else None
+        )
+        self.ccache_report = None
+        self.git_cache = GitCache(
+            self.scratch_path / "git" / "cache",
+            max_size=int(config.git_cache.max_size_gb * 1024**3),
+        )
         self.skip_build = skip_build
         self.force = force
         self.tls_verify = tls_verify
@@ -102,25 +125,95 @@ class Builder:
             logger.error(msg)
             raise BuilderError(msg) from e
 
+        self.releases_index = None
+        if self.storage_config and self.storage_config.s3:
+            self.releases_index = ReleasesIndex(
+                self.secrets,
+                self.storage_config.s3.url,
+                self.storage_config.s3.releases.bucket,
+                self.storage_config.s3.releases.loc,
+                cache_path=self.scratch_path / "releases-cache",
+            )
+
+        self.build_cache = self._get_build_cache()
+
         self.components = load_components(self.config.paths.components)
         if not self.components:
             msg = f"no components found in '{self.config.paths.components}'"
             logger.error(msg)
             raise BuilderError(msg)
 
+    def _get_build_cache(self) -> BuildCache | None:
+        """Obtain the components build cache, if enabled, shared through S3 if set."""
+        cache_config = self.config.build_cache
+        if not cache_config.enabled:
+            return None
+
+        build_cache = BuildCache(
+            self.scratch_path / "build-cache",
+            max_size=int(cache_config.max_size_gb * 1024**3),
+        )
+        if not cache_config.s3:
+            return build_cache
+
+        if not self.storage_config or not self.storage_config.s3:
+            logger.warning("no S3 storage configured, build cache not shared via S3")
+            return build_cache
+
+        build_cache.secrets = self.secrets
+        build_cache.url = self.storage_config.s3.url
+        build_cache.bucket = cache_config.s3.bucket
+        build_cache.bucket_loc = cache_config.s3.loc
+        return build_cache
+
     async def run(self) -> BuildArtifactReport | None:
-        logger.info("preparing builder")
+        """
+        Run the build, tracing where its time goes.
+
+        Timings are written next to the build report whether the build succeeds or
+        not, and are included in the report itself.
+        """
+        timings: TimingReport | None = None
         try:
-            await prepare_builder()
-        except BuilderError as e:
-            msg = f"error preparing builder: {e}"
-            logger.error(msg)
-            raise BuilderError(msg=msg) from e
+            with timing.trace("build") as timings:
+                report = await self._run()
+        finally:
+            await s3_close_clients()
+            if vault_stats := self.secrets.vault_cache_stats():
+                logger.info(
+                    f"vault: {vault_stats.hits} cached secrets hits, "
+                    + f"{vault_stats.misses} misses, {vault_stats.logins} logins, "
+                    + f"{vault_stats.renewals} token renewals"
+                )
+            if timings:
+                self._write_timings(timings)
+
+        if report:
+            report.timings = timings
+            self._write_report(report)
+        return report
+
+    async def _run(self) -> BuildArtifactReport | None:
+        if builder_image_is_current(self.desc.distro):
+            logger.info("running on current builder image, skip preparing builder")
+        else:
+            logger.info("preparing builder")
+            try:
+                with timing.span("prepare-builder"):
+                    await prepare_builder()
+            except BuilderError as e:
+                msg = f"error preparing builder: {e}"
+                logger.error(msg)
+                raise BuilderError(msg=msg) from e
 
         container_img_uri = get_container_canonical_uri(self.desc)
-        if skopeo_image_exists(container_img_uri, self.secrets, tls_verify=self.tls_verify):
+        with timing.span("check-image"):
+            image_exists = skopeo_image_exists(
+                container_img_uri, self.secrets, tls_verify=self.tls_verify
+            )
+        if image_exists:
             logger.info(f"image '{container_img_uri}' already exists -- do not build!")
-            report = BuildArtifactReport(
+            return BuildArtifactReport(
                 version=self.desc.version,
                 skipped=True,
                 container_image=ContainerImageReport(
@@ -131,20 +224,21 @@ class Builder:
                 release_descriptor=None,
                 components=[],
             )
-            self._write_report(report)
-            return report
 
         logger.info(f"image '{container_img_uri}' not found in registry, build")
 
         release_desc: ReleaseDesc | None = None
         if self.storage_config and self.storage_config.s3:
-            release_desc = await check_release_exists(
-                self.secrets,
-                self.storage_config.s3.url,
-                self.storage_config.s3.releases.bucket,
-                self.storage_config.s3.releases.loc,
-                self.desc.version,
-            )
+            with timing.span("check-release"):
+                await self._load_releases_index()
+                release_desc = await check_release_exists(
+                    self.secrets,
+                    self.storage_config.s3.url,
+                    self.storage_config.s3.releases.bucket,
+                    self.storage_config.s3.releases.loc,
+                    self.desc.version,
+                    index=self.releases_index,
+                )
 
             # FIXME: checking for arch must be done agaisnt the version descriptor,
             # instead of hardcoded.
@@ -167,7 +261,8 @@ class Builder:
 
         if not release_desc:
             try:
-                release_desc = await self._build_release()
+                with timing.span("build-release"):
+                    release_desc = await self._build_release()
             except (BuilderError, Exception) as e:
                 msg = f"error building components: {e}"
                 logger.error(msg)
@@ -185,21 +280,32 @@ class Builder:
 
         try:
             ctr_builder = ContainerBuilder(self.desc, release_desc, self.components)
-            await ctr_builder.build()
-            await ctr_builder.finish(
-                self.secrets,
-                sign_with_transit=self.signing_config.transit
-                if self.signing_config
-                else None,
-            )
+            with timing.span("container-build"):
+                await ctr_builder.build()
+            with timing.span("container-push"):
+                await ctr_builder.finish(
+                    self.secrets,
+                    sign_with_transit=self.signing_config.transit
+                    if self.signing_config
+                    else None,
+                )
         except (ContainerError, Exception) as e:
             msg = f"error creating container: {e}"
             logger.error(msg)
             raise BuilderError(msg) from e
 
-        report = self._build_report(release_desc)
-        self._write_report(report)
-        return report
+        return self._build_report(release_desc)
+
+    async def _load_releases_index(self) -> None:
+        """Load the releases index, if any, so lookups are mostly served from it."""
+        if not self.releases_index:
+            return
+
+        try:
+            await self.releases_index.load()
+        except ReleaseError as e:
+            # not fatal, lookups go to S3 instead.
+            logger.warning(f"unable to load releases index: {e}")
 
     def _build_report(self, release_desc: ReleaseDesc) -> BuildArtifactReport:
         """Construct a ``BuildArtifactReport`` from a completed build."""
@@ -242,6 +348,7 @@ class Builder:
             container_image=container_image,
             release_descriptor=release_descriptor,
             components=components,
+            ccache=self.ccache_report,
         )
 
     def _write_report(self, report: BuildArtifactReport) -> None:
@@ -257,6 +364,23 @@ class Builder:
                 e,
             )
 
+    def _write_timings(self, timings: TimingReport) -> None:
+        """Log the build's timings, and write them to the scratch volume."""
+        logger.info("build timings:")
+        for line in format_timings(timings):
+            logger.info(f"  {line}")
+
+        timings_path = self.scratch_path / "build-timings.json"
+        try:
+            _ = timings_path.write_text(timings.model_dump_json())
+            logger.info("build timings written to '%s'", timings_path)
+        except OSError as e:
+            logger.warning(
+                "failed to write build timings to '%s': %s",
+                timings_path,
+                e,
+            )
+
     async def _build_release(self) -> ReleaseDesc | None:
         """
         Build a release, returning a `ReleaseDesc`.
@@ -277,6 +401,7 @@ class Builder:
             async with prepare_components(
                 self.secrets,
                 self.scratch_path,
+                self.git_cache,
                 self.components,
                 self.desc.components,
                 self.desc.version,
@@ -316,13 +441,15 @@ class Builder:
                 to_check = {
                     comp.name: comp.long_version for comp in components.values()
                 }
-                found = await check_released_components(
-                    self.secrets,
-                    self.storage_config.s3.url,
-                    self.storage_config.s3.releases.bucket,
-                    self.storage_config.s3.releases.loc,
-                    to_check,
-                )
+                with timing.span("check-components"):
+                    found = await check_released_components(
+                        self.secrets,
+                        self.storage_config.s3.url,
+                        self.storage_config.s3.releases.bucket,
+                        self.storage_config.s3.releases.loc,
+                        to_check,
+                        index=self.releases_index,
+                    )
             except (BuilderError, Exception) as e:
                 msg = f"error checking released components: {e}"
                 logger.error(msg)
@@ -380,14 +507,16 @@ class Builder:
         release: ReleaseDesc | None = None
         if self.storage_config and self.storage_config.s3:
             try:
-                release = await release_desc_upload(
-                    self.secrets,
-                    self.storage_config.s3.url,
-                    self.storage_config.s3.releases.bucket,
-                    self.storage_config.s3.releases.loc,
-                    self.desc.version,
-                    release_build,
-                )
+                with timing.span("upload-release-desc"):
+                    release = await release_desc_upload(
+                        self.secrets,
+                        self.storage_config.s3.url,
+                        self.storage_config.s3.releases.bucket,
+                        self.storage_config.s3.releases.loc,
+                        self.desc.version,
+                        release_build,
+                        index=self.releases_index,
+                    )
             except (BuilderError, Exception) as e:
                 msg = f"error uploading release desc to S3: {e}"
                 logger.error(msg)
@@ -448,25 +577,38 @@ class Builder:
         rpms_path.mkdir(exist_ok=True)
 
         try:
-            comp_builds = await build_rpms(
-                rpms_path,
-                self.desc.el_version,
-                self.components,
-                components,
-                ccache_path=self.ccache_path,
-                skip_build=self.skip_build,
-            )
+            with timing.span("build-rpms"):
+                comp_builds = await build_rpms(
+                    rpms_path,
+                    self.desc.el_version,
+                    self.components,
+                    components,
+                    ccache=self.ccache,
+                    deps_cache=DepsCache(self.scratch_path / "deps-cache"),
+                    build_cache=self.build_cache,
+                    build_cache_keys=self._build_cache_keys(components),
+                    skip_build=self.skip_build,
+                )
         except (BuilderError, Exception) as e:
             msg = f"error building components ({components.keys()}): {e}"
             logger.error(msg)
             raise BuilderError(msg) from e
 
+        if self.ccache:
+            self.ccache_report = await self.ccache.report()
+
         if not self.signing_config or not self.signing_config.gpg:
             logger.warning("no signing method provided, skip signing RPMs")
         else:
             logger.info(f"signing RPMs with gpg key '{self.signing_config.gpg}'")
             try:
-                await sign_rpms(self.secrets, self.signing_config.gpg, comp_builds)
+                with timing.span("sign-rpms"):
+                    await sign_rpms(
+                        self.secrets,
+                        self.signing_config.gpg,
+                        comp_builds,
+                        jobs=self.signing_config.rpm_sign_jobs,
+                    )
             except BuilderError as e:
                 msg = f"error signing component RPMs: {e}"
                 logger.error(msg)
@@ -478,6 +620,36 @@ class Builder:
 
         return comp_builds
 
+    def _build_cache_keys(
+        self, components: dict[str, BuildComponentInfo]
+    ) -> dict[str, str]:
+        """
+        Obtain the build cache keys for the components to build.
+
+        If the 'force' flag has been set, no keys are provided, so all components are
+        built, bypassing the build cache.
+        """
+        if not self.build_cache or self.force:
+            return {}
+
+        keys: dict[str, str] = {}
+        for name, info in components.items():
+            try:
+                key = self.build_cache.key(
+                    self.components[name],
+                    info,
+                    version=self.desc.version,
+                    distro=self.desc.distro,
+                    el_version=self.desc.el_version,
+                    arch=ArchType.x86_64,
+                )
+            except OSError as e:
+                logger.warning(f"unable to obtain build cache key for '{name}': {e}")
+                continue
+            if key:
+                keys[name] = key
+        return keys
+
     async def _upload(
         self,
         comp_infos: dict[str, BuildComponentInfo],
@@ -512,20 +684,23 @@ class Builder:
             raise BuilderError(msg)
 
         try:
-            s3_comp_loc = await s3_upload_rpms(
-                self.secrets,
-                self.storage_config.s3.url,
-                self.storage_config.s3.artifacts.bucket,
-                self.storage_config.s3.artifacts.loc,
-                comp_builds,
-                self.desc.el_version,
-            )
+            with timing.span("upload-rpms"):
+                s3_comp_loc = await s3_upload_rpms(
+                    self.secrets,
+                    self.storage_config.s3.url,
+                    self.storage_config.s3.artifacts.bucket,
+                    self.storage_config.s3.artifacts.loc,
+                    comp_builds,
+                    self.desc.el_version,
+                    createrepo_cache_path=self.scratch_path / "createrepo-cache",
+                )
         except (BuilderError, Exception) as e:
             msg = f"error uploading RPMs to S3: {e}"
             logger.error(msg)
             raise BuilderError(msg) from e
 
-        # obtain existing released components at their versions.
+        # obtain existing released components at their versions, from S3 rather
+        # than the index, as other builders may have updated them since it was loaded.
         #
         comp_versions = {name: info.long_version for name, info in comp_infos.items()}
         try:
@@ -535,6 +710,8 @@ class Builder:
                 self.storage_config.s3.releases.bucket,
                 self.storage_config.s3.releases.loc,
                 comp_versions,
+                index=self.releases_index,
+                fresh=True,
             )
         except ReleaseError as e:
             msg = f"error checking existing released components: {e}"
@@ -610,6 +787,7 @@ class Builder:
                 self.storage_config.s3.releases.bucket,
                 self.storage_config.s3.releases.loc,
                 comp_releases,
+                index=self.releases_index,
             )
         except (BuilderError, Exception) as e:
             msg = f"error uploading release descriptors for components: {e}"
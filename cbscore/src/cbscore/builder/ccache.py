@@ -0,0 +1,197 @@
+# CES library - ccache for RPM builds
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""
+ccache for components' RPM builds.
+
+Builds use a ccache cache per distro and toolchain, under the configured ccache
+path, so builds for different distros or compilers don't evict each other's
+objects. Each cache is configured through its 'ccache.conf', bounding its size and,
+if configured, adding a remote storage backend, shared by builders.
+
+The statistics of the cache are obtained before and after the build, and their
+difference reported, so the cache's effectiveness is known per build. Builds
+running concurrently against the same cache are accounted for in each other's
+statistics.
+"""
+
+import re
+from pathlib import Path
+
+from cbscore.builder import logger as parent_logger
+from cbscore.builder.report import CcacheReport
+from cbscore.config import CcacheConfig
+from cbscore.utils import CmdArgs, CommandError, async_run_cmd
+
+logger = parent_logger.getChild("ccache")
+
+
+# ccache renamed 'secondary_storage' to 'remote_storage' in 4.6.
+_REMOTE_STORAGE_VERSION = (4, 6)
+
+
+def _parse_stats(out: str) -> dict[str, int]:
+    """Parse the output of 'ccache --print-stats' into its counters."""
+    counters: dict[str, int] = {}
+    for ln in out.splitlines():
+        name, _, value = ln.partition("\t")
+        if value.strip().isdigit():
+            counters[name.strip()] = int(value)
+    return counters
+
+
+def _parse_version(out: str) -> tuple[int, ...] | None:
+    """Parse the output of 'ccache --version' into its version."""
+    m = re.match(r"ccache version (\d+)\.(\d+)", out)
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def split_file_storage(remote_storage: str) -> tuple[Path, str] | None:
+    """
+    Split a single 'file:' remote storage backend into its path and attributes.
+
+    Returns `None` if `remote_storage` is not a single 'file:' backend.
+    """
+    url, sep, attrs = remote_storage.strip().partition("|")
+    if " " in url or not url.startswith("file:"):
+        return None
+    path = url.removeprefix("file://") if url.startswith("file://") else url[5:]
+    return Path(path), sep + attrs
+
+
+class Ccache:
+    """ccache for the builds of a distro, under 'base_path'."""
+
+    base_path: Path
+    distro: str
+    el_version: int
+    config: CcacheConfig
+    key: str | None
+
+    _version: tuple[int, ...] | None
+    _start: dict[str, int] | None
+
+    def __init__(
+        self, base_path: Path, distro: str, el_version: int, config: CcacheConfig
+    ) -> None:
+        self.base_path = base_path
+        self.distro = distro
+        self.el_version = el_version
+        self.config = config
+        self.key = None
+        self._version = None
+        self._start = None
+
+    @property
+    def path(self) -> Path:
+        """The path to the cache in use, once set up."""
+        if not self.key:
+            return self.base_path
+        return self.base_path / self.key
+
+    async def _run(self, args: CmdArgs) -> str | None:
+        cmd: CmdArgs = ["ccache", *args]
+        try:
+            rc, stdout, stderr = await async_run_cmd(
+                cmd, extra_env={"CCACHE_DIR": self.path.resolve().as_posix()}
+            )
+        except (CommandError, OSError) as e:
+            logger.warning(f"unable to run ccache: {e}")
+            return None
+
+        if rc != 0:
+            logger.warning(f"error running 'ccache {' '.join(args)}': {stderr}")
+            return None
+        return stdout
+
+    async def _get_toolchain(self) -> str:
+        """Obtain the toolchain the cache is keyed on, the default compiler's."""
+        try:
+            rc, stdout, _ = await async_run_cmd(["gcc", "-dumpfullversion"])
+        except (CommandError, OSError) as e:
+            logger.warning(f"unable to obtain compiler version: {e}")
+            return "unknown"
+
+        version = stdout.strip()
+        return f"gcc-{version}" if rc == 0 and version else "unknown"
+
+    def _write_conf(self) -> None:
+        """Write the cache's config, which ccache reads from the cache directory."""
+        lines = [f"max_size = {int(self.config.max_size_gb * 1024)}Mi"]
+        if self.config.remote_storage:
+            option = "remote_storage"
+            if self._version and self._version < _REMOTE_STORAGE_VERSION:
+                option = "secondary_storage"
+            lines.append(f"{option} = {self.config.remote_storage}")
+            if self.config.remote_only:
+                lines.append("remote_only = true")
+
+        _ = self.path.joinpath("ccache.conf").write_text("\n".join(lines) + "\n")
+
+    async def setup(self) -> None:
+        """
+        Set up the cache for the toolchain in use, and snapshot its statistics.
+
+        Should be called once the components' dependencies have been installed, so
+        the toolchain they're built with is in place.
+        """
+        distro = re.sub(r"[^\w.-]+", "-", self.distro)
+        self.key = f"{distro}-el{self.el_version}-{await self._get_toolchain()}"
+        logger.info(f"using ccache at '{self.path}', key '{self.key}'")
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        version_out = await self._run(["--version"])
+        self._version = _parse_version(version_out) if version_out else None
+
+        try:
+            self._write_conf()
+        except OSError as e:
+            logger.warning(f"unable to write ccache config at '{self.path}': {e}")
+
+        stats_out = await self._run(["--print-stats"])
+        self._start = _parse_stats(stats_out) if stats_out else None
+
+    async def report(self) -> CcacheReport | None:
+        """Report the cache's statistics since it was set up, if available."""
+        if not self.key or self._start is None:
+            return None
+
+        stats_out = await self._run(["--print-stats"])
+        if not stats_out:
+            return None
+        end = _parse_stats(stats_out)
+
+        start = self._start
+
+        def _delta(*names: str) -> int:
+            # counters may have been zeroed concurrently.
+            return sum(max(end.get(n, 0) - start.get(n, 0), 0) for n in names)
+
+        hits = _delta("direct_cache_hit", "preprocessed_cache_hit")
+        misses = _delta("cache_miss")
+        report = CcacheReport(
+            key=self.key,
+            hits=hits,
+            misses=misses,
+            hit_rate=hits / (hits + misses) if hits + misses else None,
+            remote_hits=_delta("remote_storage_hit", "secondary_storage_hit"),
+            remote_misses=_delta("remote_storage_miss", "secondary_storage_miss"),
+            cache_size=end.get("cache_size_kibibyte", 0) * 1024,
+            max_size=int(self.config.max_size_gb * 1024**3),
+        )
+        hit_rate = f"{report.hit_rate:.1%}" if report.hit_rate is not None else "n/a"
+        logger.info(
+            f"ccache '{self.key}': {hits} hits, {misses} misses, hit rate {hit_rate}, "
+            + f"{report.remote_hits} remote hits, {report.cache_size} bytes cached"
+        )
+        return report
@@ -0,0 +1,199 @@
+# CES library - build dependencies cache
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""
+Cache of the dependency sets installed by components' install deps scripts.
+
+Running a component's install deps script resolves and downloads its build
+dependencies every time. Instead, we record the packages installed on top of the
+builder by the script, keyed by a hash of the script and of the inputs it reads from
+the component's worktree, as declared by the component's 'deps-inputs'.
+
+When a build's key matches a recorded set, the set is installed straight from the
+local dnf package cache, which persists across builds, without running the script
+or touching any repository. If any package is missing from the package cache, or the
+install fails, we fall back to running the script.
+"""
+
+import hashlib
+from pathlib import Path
+
+import pydantic
+
+from cbscore.builder import BuilderError
+from cbscore.builder import logger as parent_logger
+from cbscore.core.component import CoreComponentLoc
+from cbscore.utils import CommandError, async_run_cmd
+
+logger = parent_logger.getChild("deps")
+
+
+# where dnf keeps downloaded packages, persisted across builds by the runner.
+DNF_CACHE_PATH = Path("/var/cache/dnf")
+
+
+class _DepsSet(pydantic.BaseModel):
+    """A recorded set of installed dependency packages."""
+
+    packages: list[str]
+
+
+async def _rpm_query(args: list[str]) -> set[str]:
+    try:
+        rc, stdout, stderr = await async_run_cmd(
+            ["rpm", *args, "--queryformat", "%{NAME}-%{VERSION}-%{RELEASE}.%{ARCH}\n"]
+        )
+    except CommandError as e:
+        msg = f"error querying installed packages: {e}"
+        logger.error(msg)
+        raise BuilderError(msg) from e
+
+    if rc != 0:
+        msg = f"error querying installed packages: {stderr}"
+        logger.error(msg)
+        raise BuilderError(msg)
+
+    return {ln.strip() for ln in stdout.splitlines() if ln.strip()}
+
+
+async def get_installed_packages() -> set[str]:
+    """Obtain the installed packages, by their NEVRA, sans epoch."""
+    pkgs = await _rpm_query(["--query", "--all"])
+    # gpg keys are not actual packages.
+    return {p for p in pkgs if not p.startswith("gpg-pubkey-")}
+
+
+async def enable_dnf_keepcache() -> None:
+    """Have dnf keep the packages it downloads, so they can be reused."""
+    try:
+        rc, _, stderr = await async_run_cmd(
+            ["dnf", "config-manager", "--save", "--setopt=keepcache=True"]
+        )
+    except CommandError as e:
+        logger.warning(f"unable to enable dnf keepcache: {e}")
+        return
+
+    if rc != 0:
+        logger.warning(f"unable to enable dnf keepcache: {stderr}")
+
+
+class DepsCache:
+    """Recorded dependency sets, per component, under 'path'."""
+
+    path: Path
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def _entry_path(self, comp_name: str, key: str) -> Path:
+        return self.path / comp_name / f"{key}.json"
+
+    def key(
+        self, comp_loc: CoreComponentLoc, worktree_path: Path, el_version: int
+    ) -> str | None:
+        """
+        Obtain the key for a component's dependency set.
+
+        Returns `None` if the component declares no 'deps-inputs', as we can't tell
+        when its dependencies change.
+        """
+        if not comp_loc.comp.build.deps_inputs:
+            return None
+
+        h = hashlib.sha256()
+        h.update(f"el{el_version}\0".encode())
+        h.update((comp_loc.path / comp_loc.comp.build.deps).read_bytes())
+        for input_name in sorted(comp_loc.comp.build.deps_inputs):
+            input_path = worktree_path / input_name
+            h.update(f"\0{input_name}\0".encode())
+            if input_path.is_file():
+                h.update(input_path.read_bytes())
+
+        return h.hexdigest()
+
+    async def restore(self, comp_name: str, key: str) -> bool:
+        """
+        Install a recorded dependency set from the package cache, if possible.
+
+        Returns whether the set was installed.
+        """
+        entry_path = self._entry_path(comp_name, key)
+        if not entry_path.exists():
+            logger.debug(f"no recorded dependencies for '{comp_name}', key '{key}'")
+            return False
+
+        try:
+            deps_set = _DepsSet.model_validate_json(entry_path.read_text())
+        except (pydantic.ValidationError, OSError) as e:
+            logger.warning(f"invalid recorded dependencies at '{entry_path}': {e}")
+            return False
+
+        to_install = set(deps_set.packages) - await get_installed_packages()
+        if not to_install:
+            logger.info(f"dependencies for '{comp_name}' already installed")
+            return True
+
+        cached_pkgs = {
+            p.name.removesuffix(".rpm"): p
+            for p in DNF_CACHE_PATH.glob("*/packages/*.rpm")
+        }
+        missing = to_install - cached_pkgs.keys()
+        if missing:
+            logger.info(
+                f"{len(missing)} recorded dependencies for '{comp_name}' "
+                + "not in package cache"
+            )
+            return False
+
+        logger.info(
+            f"installing {len(to_install)} recorded dependencies for '{comp_name}'"
+        )
+        try:
+            rc, _, stderr = await async_run_cmd(
+                [
+                    "dnf",
+                    "install",
+                    "-y",
+                    "--disablerepo=*",
+                    *[cached_pkgs[p].as_posix() for p in sorted(to_install)],
+                ]
+            )
+        except CommandError as e:
+            logger.warning(f"error installing dependencies for '{comp_name}': {e}")
+            return False
+
+        if rc != 0:
+            logger.warning(
+                f"error installing recorded dependencies for '{comp_name}': {stderr}"
+            )
+            return False
+
+        return True
+
+    def store(self, comp_name: str, key: str, packages: set[str]) -> None:
+        """Record the dependency set installed for a component."""
+        entry_path = self._entry_path(comp_name, key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = entry_path.with_suffix(".tmp")
+            _ = tmp_path.write_text(
+                _DepsSet(packages=sorted(packages)).model_dump_json()
+            )
+            _ = tmp_path.replace(entry_path)
+        except OSError as e:
+            logger.warning(f"unable to record dependencies at '{entry_path}': {e}")
+            return
+
+        logger.info(
+            f"recorded {len(packages)} dependencies for '{comp_name}', key '{key}'"
+        )
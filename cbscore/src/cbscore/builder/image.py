@@ -0,0 +1,182 @@
+# CES library - cached builder image
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""
+Pre-baked builder images.
+
+Preparing the builder, updating the distro and installing the packages the build
+needs, takes minutes and is the same for every build on a given distro. Instead, we
+bake a builder image per distro, tagged by a key derived from the distro and what is
+installed on top of it, and start builds from it.
+
+The image carries its key, so the builder can tell it is running on a current
+builder image, and skip preparing itself.
+"""
+
+import datetime
+import hashlib
+import json
+import tempfile
+from datetime import datetime as dt
+from datetime import timedelta as td
+from pathlib import Path
+
+from cbscore.builder import BuilderError
+from cbscore.builder import logger as parent_logger
+from cbscore.builder.prepare import BUILDER_PACKAGES, COSIGN_RPM_URL
+from cbscore.utils import CommandError, async_run_cmd
+
+logger = parent_logger.getChild("image")
+
+
+# bump when the way the image is built changes, to invalidate existing images.
+_BUILDER_IMAGE_VERSION = 1
+_BUILDER_IMAGE_REPO = "localhost/cbs-builder"
+_BUILDER_IMAGE_CREATED_LABEL = "io.clyso.cbs.builder.created"
+
+# where the image's key is kept, inside the image.
+BUILDER_IMAGE_KEY_PATH = Path("/etc/cbs-builder-image")
+
+
+def builder_image_key(distro: str) -> str:
+    """Obtain the key identifying the builder image for a given distro."""
+    key_desc = {
+        "version": _BUILDER_IMAGE_VERSION,
+        "distro": distro,
+        "packages": sorted(BUILDER_PACKAGES),
+        "cosign": COSIGN_RPM_URL,
+    }
+    raw = json.dumps(key_desc, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def builder_image_uri(distro: str) -> str:
+    """Obtain the local image URI of the builder image for a given distro."""
+    return f"{_BUILDER_IMAGE_REPO}:{builder_image_key(distro)}"
+
+
+def builder_image_is_current(distro: str) -> bool:
+    """Check whether we are running on the current builder image for 'distro'."""
+    try:
+        return BUILDER_IMAGE_KEY_PATH.read_text().strip() == builder_image_key(distro)
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        logger.warning(f"unable to read builder image key: {e}")
+        return False
+
+
+def _get_containerfile(distro: str, key: str) -> str:
+    packages = " ".join(BUILDER_PACKAGES)
+    return f"""FROM {distro}
+RUN dnf update -y && \\
+    dnf install -y epel-release && \\
+    dnf config-manager --enable crb && \\
+    dnf update -y && \\
+    dnf install -y {packages} && \\
+    (rpm -q cosign || rpm -Uvh {COSIGN_RPM_URL}) && \\
+    dnf clean all && \\
+    echo "{key}" > {BUILDER_IMAGE_KEY_PATH.as_posix()}
+"""
+
+
+async def _get_image_created(uri: str) -> dt | None:
+    """Obtain when a local builder image was created, if it exists."""
+    try:
+        rc, stdout, _ = await async_run_cmd(
+            [
+                "podman",
+                "image",
+                "inspect",
+                "--format",
+                f'{{{{ index .Labels "{_BUILDER_IMAGE_CREATED_LABEL}" }}}}',
+                uri,
+            ]
+        )
+    except CommandError as e:
+        msg = f"error inspecting builder image '{uri}': {e}"
+        logger.error(msg)
+        raise BuilderError(msg) from e
+
+    if rc != 0:
+        return None
+
+    try:
+        return dt.fromisoformat(stdout.strip())
+    except ValueError:
+        logger.warning(f"builder image '{uri}' has no valid creation label")
+        return None
+
+
+async def _build_builder_image(distro: str, uri: str) -> None:
+    """Build the builder image for 'distro', tagged as 'uri'."""
+    logger.info(f"building builder image '{uri}' from '{distro}'")
+
+    async def _cb(s: str) -> None:
+        logger.debug(s)
+
+    created = dt.now(tz=datetime.UTC).isoformat()
+    with tempfile.TemporaryDirectory(prefix="cbs-builder-image-") as tmpdir:
+        containerfile_path = Path(tmpdir) / "Containerfile"
+        _ = containerfile_path.write_text(
+            _get_containerfile(distro, builder_image_key(distro))
+        )
+
+        try:
+            rc, _, stderr = await async_run_cmd(
+                [
+                    "podman",
+                    "build",
+                    "--pull=newer",
+                    "--label",
+                    f"{_BUILDER_IMAGE_CREATED_LABEL}={created}",
+                    "--tag",
+                    uri,
+                    "--file",
+                    containerfile_path.as_posix(),
+                    tmpdir,
+                ],
+                outcb=_cb,
+            )
+        except CommandError as e:
+            msg = f"error building builder image '{uri}': {e}"
+            logger.error(msg)
+            raise BuilderError(msg) from e
+
+    if rc != 0:
+        msg = f"error building builder image '{uri}': {stderr}"
+        logger.error(msg)
+        raise BuilderError(msg)
+
+    logger.info(f"built builder image '{uri}'")
+
+
+async def get_builder_image(distro: str, *, ttl: td, refresh: bool = False) -> str:
+    """
+    Obtain the builder image for 'distro', building it if needed.
+
+    The image is rebuilt if it doesn't exist, if it is older than 'ttl', so it picks
+    up distro updates, or if a 'refresh' is requested.
+    """
+    uri = builder_image_uri(distro)
+
+    created = await _get_image_created(uri)
+    if created and not refresh:
+        age = dt.now(tz=datetime.UTC) - created
+        if age < ttl:
+            logger.debug(f"using builder image '{uri}', age {age}")
+            return uri
+        logger.info(f"builder image '{uri}' expired, age {age}")
+
+    await _build_builder_image(distro, uri)
+    return uri
@@ -25,7 +25,8 @@ from cbscore.builder import BuilderError
 from cbscore.builder import logger as parent_logger
 from cbscore.builder.utils import get_component_version
 from cbscore.core.component import CoreComponentLoc
-from cbscore.utils import CommandError, async_run_cmd, git
+from cbscore.utils import CommandError, async_run_cmd, git, timing
+from cbscore.utils.git_cache import GitCache
 from cbscore.utils.secrets.mgr import SecretsMgr
 from cbscore.versions.desc import VersionComponent
 from cbscore.versions.utils import get_major_version, get_minor_version
@@ -45,6 +46,29 @@ class BuildComponentInfo(pydantic.BaseModel):
     long_version: str
 
 
+# packages required by the builder, on top of the distro's base image.
+BUILDER_PACKAGES = [
+    "git",
+    "wget",
+    "rpm-build",
+    "rpmdevtools",
+    "gcc-c++",
+    "createrepo_c",
+    "rpm-sign",
+    "pinentry",
+    "s3cmd",
+    "jq",
+    "ccache",
+    "buildah",
+    "skopeo",
+]
+
+COSIGN_RPM_URL = (
+    "https://github.com/sigstore/cosign/releases/download/v2.4.3/"
+    + "cosign-2.4.3-1.x86_64.rpm"
+)
+
+
 async def prepare_builder() -> None:
     async def _cb(s: str) -> None:
         logger.debug(s)
@@ -80,24 +104,7 @@ async def prepare_builder() -> None:
             raise BuilderError(msg="error running 'dnf update'")
 
         rc, _, stderr = await async_run_cmd(
-            [
-                "dnf",
-                "install",
-                "-y",
-                "git",
-                "wget",
-                "rpm-build",
-                "rpmdevtools",
-                "gcc-c++",
-                "createrepo",
-                "rpm-sign",
-                "pinentry",
-                "s3cmd",
-                "jq",
-                "ccache",
-                "buildah",
-                "skopeo",
-            ],
+            ["dnf", "install", "-y", *BUILDER_PACKAGES],
             outcb=_cb,
         )
         if rc != 0:
@@ -106,12 +113,7 @@ async def prepare_builder() -> None:
 
         # install cosign rpm
         rc, stdout, stderr = await async_run_cmd(
-            [
-                "rpm",
-                "-Uvh",
-                "https://github.com/sigstore/cosign/releases/download/v2.4.3/"
-                + "cosign-2.4.3-1.x86_64.rpm",
-            ],
+            ["rpm", "-Uvh", COSIGN_RPM_URL],
         )
         logger.debug(stdout)
         if rc == 2 and re.match(".*already installed.*", stderr):
@@ -126,7 +128,8 @@ async def prepare_builder() -> None:
         raise BuilderError(msg=f"error running 'dnf': {e}") from e
 
 
-def _get_patch_list(patches_path: Path, version: str) -> list[Path]:
+def get_patch_list(patches_path: Path, version: str) -> list[Path]:
+    """Obtain the patches under `patches_path` for `version`, in application order."""
     patches_pattern = re.compile(r"(\d+)-.*\.patch")
     patches_dict: dict[int, list[tuple[int, Path]]] = {}
 
@@ -179,6 +182,7 @@ def _get_patch_list(patches_path: Path, version: str) -> list[Path]:
 async def prepare_components(
     secrets: SecretsMgr,
     scratch_path: Path,
+    git_cache: GitCache,
     components_loc: dict[str, CoreComponentLoc],
     components: list[VersionComponent],
     version: str,
@@ -186,7 +190,8 @@ async def prepare_components(
     """
     Prepare all components by cloning them and applying required patches.
 
-    This function parallelizes on a per-component basis.
+    This function parallelizes on a per-component basis. Components' repositories
+    are obtained through `git_cache`, and are kept in use until we're done with them.
 
     The `components_path` argument refers to the directory under which we can find the
     components supported.
@@ -197,34 +202,31 @@ async def prepare_components(
 
     Before exiting, this function will cleanup all prepared components.
     """
-    git_repos_path = scratch_path / "git" / "repos"
     git_worktrees_path = scratch_path / "git" / "worktrees"
-
-    git_repos_path.mkdir(parents=True, exist_ok=True)
     git_worktrees_path.mkdir(parents=True, exist_ok=True)
 
-    async def _clone_repo(comp: VersionComponent) -> Path:
+    async def _checkout_repo(comp: VersionComponent) -> tuple[Path, Path]:
         """
-        Clone component repository.
+        Check out the component's ref from its cached repository.
 
-        Returns a `BuildComponentInfo` containing its
-        original repository `URL`, the `Path` to which it has been cloned, alongside
-        the `version` being cloned, and the `SHA1` of said version.
+        Returns the `Path` to the cached repository, and the `Path` to the worktree
+        the ref has been checked out into.
         """
         logger.debug(
-            f"clone repo '{comp.repo}' to '{git_repos_path}', "
+            f"checkout repo '{comp.repo}' from cache at '{git_cache.path}', "
             + f"name: '{comp.name}', ref: '{comp.ref}'"
         )
         start = dt.now(tz=datetime.UTC)
         try:
-            with secrets.git_url_for(comp.repo) as comp_url:
-                cloned_path = await git.git_clone(
-                    comp_url,
-                    git_repos_path,
+            with timing.span("clone"), secrets.git_url_for(comp.repo) as comp_url:
+                repo_path, worktree_path = await git_cache.checkout(
                     comp.name,
+                    comp_url,
+                    comp.ref,
+                    git_worktrees_path / comp.name,
                 )
         except git.GitError as e:
-            msg = f"error cloning '{comp.repo}' to '{git_repos_path}': {e}"
+            msg = f"error checking out '{comp.ref}' from '{comp.repo}': {e}"
             logger.error(msg)
             raise BuilderError(msg) from e
         except Exception as e:
@@ -232,25 +234,9 @@ async def prepare_components(
             raise BuilderError(msg=f"error cloning '{comp.repo}': {e}") from e
 
         delta = dt.now(tz=datetime.UTC) - start
-        logger.info(f"component '{comp.name}' cloned in {delta.seconds} seconds")
+        logger.info(f"component '{comp.name}' checked out in {delta.seconds} seconds")
 
-        return cloned_path
-
-    async def _checkout_ref(repo: Path, ref: str) -> Path:
-        """Checkout given ref in repository located at `repo`."""
-        logger.info(f"checkout ref '{ref}' in repository at '{repo}'")
-        try:
-            worktree_path = await git.git_checkout(
-                repo,
-                ref,
-                git_worktrees_path / comp.name,
-            )
-        except git.GitError as e:
-            msg = f"unable to checkout ref '{ref}' in repository at '{repo}': {e}"
-            logger.exception(msg)
-            raise BuilderError(msg) from e
-
-        return worktree_path
+        return repo_path, worktree_path
 
     async def _apply_patches(comp: VersionComponent, repo: Path) -> None:
         """Apply required patches to component's repository."""
@@ -266,7 +252,7 @@ async def prepare_components(
             logger.info(f"no patches to apply to '{comp.name}'")
             return
 
-        patches_to_apply = _get_patch_list(comp_patches_path, version)
+        patches_to_apply = get_patch_list(comp_patches_path, version)
         for patch_path in patches_to_apply:
             logger.info(f"applying patch from '{patch_path}'")
             try:
@@ -337,14 +323,7 @@ async def prepare_components(
         repository.
         """
         try:
-            repo_path = await _clone_repo(comp)
-        except BuilderError as e:
-            msg = f"error cloning component '{comp.name}': {e}"
-            logger.error(msg)
-            raise BuilderError(msg) from e
-
-        try:
-            worktree_path = await _checkout_ref(repo_path, comp.ref)
+            repo_path, worktree_path = await _checkout_repo(comp)
         except BuilderError as e:
             msg = (
                 f"unable to checkout ref '{comp.ref}' for component '{comp.name}': {e}"
@@ -374,13 +353,18 @@ async def prepare_components(
             return info
 
         try:
-            return await _finalize()
+            with timing.span("finalize"):
+                return await _finalize()
         except BuilderError as e:
             # remove worktree
-            await git.git_remove_worktree(repo_path, worktree_path)
+            await git_cache.remove_worktree(comp.name, worktree_path)
             # propagate exception
             raise e from None
 
+    async def _timed_component(comp: VersionComponent) -> BuildComponentInfo:
+        with timing.span(f"prepare:{comp.name}"):
+            return await _do_component(comp)
+
     async def _run_component_tasks() -> dict[str, BuildComponentInfo]:
         """
         Run `_do_component()` for all components in parallel.
@@ -390,7 +374,7 @@ async def prepare_components(
         try:
             async with asyncio.TaskGroup() as tg:
                 task_dict = {
-                    comp.name: tg.create_task(_do_component(comp))
+                    comp.name: tg.create_task(_timed_component(comp))
                     for comp in components
                 }
         except ExceptionGroup as e:
@@ -411,23 +395,32 @@ async def prepare_components(
             raise BuilderError(msg=msg)
 
     comp_infos: dict[str, BuildComponentInfo] | None = None
-    try:
-        comp_infos = await _run_component_tasks()
-        yield comp_infos
-    except BuilderError as e:
-        # propagate exception
-        raise e from None
-    finally:
-        if comp_infos:
-            await cleanup_components(comp_infos)
-
-
-async def cleanup_components(components: dict[str, BuildComponentInfo]) -> None:
-    """Cleanup all component repositories."""
+    async with contextlib.AsyncExitStack() as in_use:
+        for comp in components:
+            await in_use.enter_async_context(git_cache.use(comp.name))
+
+        try:
+            with timing.span("prepare-components"):
+                comp_infos = await _run_component_tasks()
+            # evict other repositories, if needed, now we know how big ours are.
+            await git_cache.evict()
+            yield comp_infos
+        except BuilderError as e:
+            # propagate exception
+            raise e from None
+        finally:
+            if comp_infos:
+                await cleanup_components(git_cache, comp_infos)
+
+
+async def cleanup_components(
+    git_cache: GitCache, components: dict[str, BuildComponentInfo]
+) -> None:
+    """Cleanup all component worktrees."""
     for comp_name, comp in components.items():
         logger.info(f"cleanup component '{comp_name}'")
         try:
-            await git.git_remove_worktree(comp.repo_path, comp.worktree_path)
+            await git_cache.remove_worktree(comp_name, comp.worktree_path)
         except git.GitError as e:
             logger.warning(
                 f"unable to cleanup component '{comp_name}' at "
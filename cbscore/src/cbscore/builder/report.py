@@ -16,7 +16,8 @@ Pydantic models for build artifact reports.
 
 A `BuildArtifactReport` summarises the artifacts produced by a build:
 which container image was pushed, where the release descriptor landed
-in S3, and which components (with RPM locations) were included.
+in S3, which components (with RPM locations) were included, and where
+the build's time went.
 
 The report is written to a JSON file inside the build container by
 `Builder.run()` and read from the host side by `runner()`, then
@@ -29,6 +30,7 @@ check this field to handle old/new report formats.
 import pydantic
 
 from cbscore.builder import logger as parent_logger
+from cbscore.utils.timing import TimingReport
 
 logger = parent_logger.getChild("report")
 
@@ -75,6 +77,34 @@ class ComponentReport(pydantic.BaseModel):
     """S3 path to the RPM artifacts (``None`` if not uploaded)."""
 
 
+class CcacheReport(pydantic.BaseModel):
+    """ccache's effectiveness during the build's RPM builds."""
+
+    key: str
+    """Cache in use, per distro and toolchain, e.g. ``rockylinux-9-el9-gcc-11.5.0``."""
+
+    hits: int
+    """Compilations served from the cache, local or remote."""
+
+    misses: int
+    """Cacheable compilations not found in the cache."""
+
+    hit_rate: float | None
+    """Ratio of hits to cacheable compilations (``None`` if there were none)."""
+
+    remote_hits: int = 0
+    """Compilations served from the remote storage backend, if any."""
+
+    remote_misses: int = 0
+    """Compilations not found in the remote storage backend, if any."""
+
+    cache_size: int
+    """Size of the local cache in bytes, once built."""
+
+    max_size: int
+    """Maximum size of the local cache in bytes."""
+
+
 class BuildArtifactReport(pydantic.BaseModel):
     """Summary of artifacts produced by a build."""
 
@@ -94,3 +124,9 @@ class BuildArtifactReport(pydantic.BaseModel):
 
     components: list[ComponentReport] = []
     """Components included in the build (empty when skipped)."""
+
+    timings: TimingReport | None = None
+    """Timing trace of the build's phases (``None`` for reports predating them)."""
+
+    ccache: CcacheReport | None = None
+    """ccache statistics for the build (``None`` if nothing was compiled with it)."""
@@ -19,9 +19,12 @@ from pathlib import Path
 
 from cbscore.builder import BuilderError
 from cbscore.builder import logger as parent_logger
+from cbscore.builder.build_cache import BuildCache
+from cbscore.builder.ccache import Ccache
+from cbscore.builder.deps import DepsCache, enable_dnf_keepcache, get_installed_packages
 from cbscore.builder.prepare import BuildComponentInfo
 from cbscore.core.component import CoreComponentLoc
-from cbscore.utils import CmdArgs, CommandError, async_run_cmd
+from cbscore.utils import CmdArgs, CommandError, async_run_cmd, timing
 
 logger = parent_logger.getChild("rpmbuild")
 
@@ -97,9 +100,14 @@ async def _build_component(
 
     start = dt.now(tz=datetime.UTC)
     try:
-        rc, _, _ = await async_run_cmd(
-            cmd, outcb=_outcb, cwd=repo_path, reset_python_env=True, extra_env=extra_env
-        )
+        with timing.span(f"rpmbuild:{comp_name}"):
+            rc, _, _ = await async_run_cmd(
+                cmd,
+                outcb=_outcb,
+                cwd=repo_path,
+                reset_python_env=True,
+                extra_env=extra_env,
+            )
     except CommandError as e:
         msg = (
             f"error running build script for '{comp_name}' "
@@ -123,50 +131,121 @@ async def _build_component(
     return delta, comp_rpms_path
 
 
+async def _install_comp_deps(
+    comp_loc: CoreComponentLoc,
+    comp: BuildComponentInfo,
+    el_version: int,
+    base_pkgs: set[str],
+    deps_cache: DepsCache | None,
+) -> None:
+    """
+    Install dependencies for a component.
+
+    If the component's dependency set has been recorded before, install it from the
+    package cache instead of running its install deps script. Otherwise, run the
+    script and record what it installed on top of 'base_pkgs'.
+    """
+    install_deps_script = comp_loc.path / comp_loc.comp.build.deps
+    if not install_deps_script.exists():
+        msg = f"install_deps script not found for component '{comp.name}'"
+        logger.error(msg)
+        raise BuilderError(msg)
+
+    clog = logger.getChild(f"comp[{comp.name}]")
+
+    async def _comp_out(s: str) -> None:
+        clog.debug(s)
+
+    repo_path = comp.worktree_path.resolve()
+
+    key = deps_cache.key(comp_loc, repo_path, el_version) if deps_cache else None
+    if deps_cache and key and await deps_cache.restore(comp.name, key):
+        clog.info("installed dependencies from cache")
+        return
+
+    cmd: CmdArgs = [
+        install_deps_script.resolve().as_posix(),
+        repo_path.as_posix(),
+    ]
+
+    try:
+        rc, _, stderr = await async_run_cmd(
+            cmd,
+            outcb=_comp_out,
+            cwd=repo_path,
+            reset_python_env=True,
+        )
+    except CommandError as e:
+        msg = f"error installing dependencies for '{comp.name}': {e}"
+        clog.exception(msg)
+        raise BuilderError(msg) from e
+    except Exception as e:
+        msg = f"unknown error installing dependencies for '{comp.name}': {e}"
+        clog.exception(msg)
+        raise BuilderError(msg) from e
+
+    if rc != 0:
+        msg = f"error installing dependencies for '{comp.name}': {stderr}"
+        clog.error(msg)
+        raise BuilderError(msg)
+
+    if deps_cache and key:
+        # may include packages installed concurrently for other components, which
+        # is harmless, as long as it includes all of this component's.
+        deps_cache.store(comp.name, key, await get_installed_packages() - base_pkgs)
+
+
 async def _install_deps(
     components_locs: dict[str, CoreComponentLoc],
     components: dict[str, BuildComponentInfo],
+    el_version: int,
+    deps_cache: DepsCache | None,
 ) -> None:
-    """Install dependencies for all components, sequentially."""
-    for name, comp in components.items():
-        comp_loc = components_locs[comp.name]
-        install_deps_script = comp_loc.path / comp_loc.comp.build.deps
-        if not install_deps_script.exists():
-            msg = f"install_deps script not found for component '{comp.name}'"
-            logger.error(msg)
-            raise BuilderError(msg)
+    """Install dependencies for all components, concurrently."""
+    base_pkgs: set[str] = set()
+    if deps_cache:
+        await enable_dnf_keepcache()
+        base_pkgs = await get_installed_packages()
+
+    async def _timed_comp_deps(name: str, comp: BuildComponentInfo) -> None:
+        with timing.span(f"install-deps:{name}"):
+            await _install_comp_deps(
+                components_locs[comp.name], comp, el_version, base_pkgs, deps_cache
+            )
 
-        clog = logger.getChild(f"comp[{name}]")
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for name, comp in components.items():
+                _ = tg.create_task(_timed_comp_deps(name, comp))
+    except ExceptionGroup as e:
+        logger.error("error installing components' dependencies:")
+        for exc in e.exceptions:
+            logger.error(f"- {exc}")
+        raise BuilderError(msg="error installing components' dependencies") from e
 
-        async def _comp_out(s: str) -> None:
-            clog.debug(s)  # noqa: B023
 
-        repo_path = comp.worktree_path.resolve()
-        cmd: CmdArgs = [
-            install_deps_script.resolve().as_posix(),
-            repo_path.as_posix(),
-        ]
+async def _restore_cached_builds(
+    rpms_path: Path,
+    build_cache: BuildCache,
+    keys: dict[str, str],
+    versions: dict[str, str],
+) -> dict[str, ComponentBuild]:
+    """
+    Restore components' cached builds, by their keys, concurrently.
 
-        try:
-            rc, _, stderr = await async_run_cmd(
-                cmd,
-                outcb=_comp_out,
-                cwd=repo_path,
-                reset_python_env=True,
-            )
-        except CommandError as e:
-            msg = f"error installing dependencies for '{comp.name}': {e}"
-            clog.exception(msg)
-            raise BuilderError(msg) from e
-        except Exception as e:
-            msg = f"unknown error installing dependencies for '{comp.name}': {e}"
-            clog.exception(msg)
-            raise BuilderError(msg) from e
-
-        if rc != 0:
-            msg = f"error installing dependencies for '{comp.name}': {stderr}"
-            clog.error(msg)
-            raise BuilderError(msg)
+    Returns a `ComponentBuild` for each component restored.
+    """
+
+    async def _restore(name: str) -> ComponentBuild | None:
+        comp_rpms_path = _setup_rpm_topdir(rpms_path, name, versions[name])
+        if not await build_cache.restore(name, keys[name], comp_rpms_path):
+            return None
+        return ComponentBuild(versions[name], comp_rpms_path)
+
+    names = list(keys)
+    results = await asyncio.gather(*[_restore(name) for name in names])
+
+    return {name: build for name, build in zip(names, results, strict=True) if build}
 
 
 async def build_rpms(
@@ -175,14 +254,25 @@ async def build_rpms(
     components_locs: dict[str, CoreComponentLoc],
     components: dict[str, BuildComponentInfo],
     *,
-    ccache_path: Path | None = None,
+    ccache: Ccache | None = None,
+    deps_cache: DepsCache | None = None,
+    build_cache: BuildCache | None = None,
+    build_cache_keys: dict[str, str] | None = None,
     skip_build: bool = False,
 ) -> dict[str, ComponentBuild]:
     """
     Build RPMs for the various components provided in `components`.
 
     Relies on a `build_rpms.sh` script that must be found in the `components_path`
-    directory, for each specific component.
+    directory, for each specific component. Components' dependencies are installed
+    concurrently, from `deps_cache` if provided and their dependency set is known.
+    If `ccache` is provided, it's set up once dependencies are installed, and used
+    by the builds.
+
+    If `build_cache` is provided, components with a key in `build_cache_keys` whose
+    build is cached are restored from the cache instead of being built, and those
+    built are cached once built. Restored RPMs are unsigned, just like built ones.
+
     Returns a `ComponentBuild`, containing the component's built version and a
     `Path` to where its RPMs can be found.
     """
@@ -193,13 +283,6 @@ async def build_rpms(
             logger.error(msg)
             raise BuilderError(msg=msg)
 
-    try:
-        await _install_deps(components_locs, components)
-    except BuilderError as e:
-        msg = f"error installing components' dependencies: {e}"
-        logger.exception(msg)
-        raise BuilderError(msg) from e
-
     class _ToBuildComponent:
         build_script: Path
         version: str
@@ -232,6 +315,32 @@ async def build_rpms(
             build_script_path, comp_info.long_version
         )
 
+    cached: dict[str, ComponentBuild] = {}
+    keys = build_cache_keys if build_cache and not skip_build else None
+    if build_cache and keys:
+        with timing.span("restore-cached-builds"):
+            cached = await _restore_cached_builds(
+                rpms_path,
+                build_cache,
+                {name: keys[name] for name in to_build if name in keys},
+                {name: to_build[name].version for name in to_build},
+            )
+
+    to_install = {name: comp for name, comp in components.items() if name not in cached}
+    try:
+        if to_install:
+            with timing.span("install-deps"):
+                await _install_deps(components_locs, to_install, el_version, deps_cache)
+    except BuilderError as e:
+        msg = f"error installing components' dependencies: {e}"
+        logger.exception(msg)
+        raise BuilderError(msg) from e
+
+    ccache_path: Path | None = None
+    if ccache and not skip_build and any(name not in cached for name in to_build):
+        await ccache.setup()
+        ccache_path = ccache.path
+
     try:
         async with asyncio.TaskGroup() as tg:
             tasks = {
@@ -248,6 +357,7 @@ async def build_rpms(
                     )
                 )
                 for name in to_build
+                if name not in cached
             }
     except ExceptionGroup as e:
         excs = e.subgroup(BuilderError)
@@ -262,10 +372,23 @@ async def build_rpms(
 
         raise BuilderError(msg="error building component RPMs") from e
 
-    comps_rpms_paths: dict[str, ComponentBuild] = {}
+    comps_rpms_paths: dict[str, ComponentBuild] = cached.copy()
     for name, task in tasks.items():
         time_spent, comp_rpms_path = task.result()
         logger.info(f"built component '{name}' in {time_spent} seconds")
         comps_rpms_paths[name] = ComponentBuild(to_build[name].version, comp_rpms_path)
 
+    if build_cache and keys:
+        with timing.span("store-cached-builds"):
+            await asyncio.gather(
+                *[
+                    build_cache.store(
+                        components[name], keys[name], comps_rpms_paths[name].rpms_path
+                    )
+                    for name in tasks
+                    if name in keys
+                ]
+            )
+            await build_cache.evict()
+
     return comps_rpms_paths
@@ -14,6 +14,7 @@
 
 import asyncio
 import datetime
+import os
 from datetime import datetime as dt
 from pathlib import Path
 
@@ -75,7 +76,14 @@ async def _sign_component_rpms(
     keyring: Path,
     passphrase: str | None,
     email: str,
+    jobs: asyncio.Semaphore,
 ) -> tuple[int, int]:
+    """
+    Sign all RPMs found under `path`, concurrently, as many at a time as `jobs` allows.
+
+    All RPMs are attempted, even if some fail to be signed, so each failure can be
+    reported.
+    """
     logger.info(f"sign component RPMs at '{path}'")
 
     rpms_to_sign: list[Path] = []
@@ -87,18 +95,24 @@ async def _sign_component_rpms(
             if f.endswith(".rpm"):
                 rpms_to_sign.append(parent.joinpath(f))
 
-    # NOTE: this can be parallelized, but we'll leave that as a future exercise.
-    for rpm_path in rpms_to_sign:
-        try:
+    async def _sign_one(rpm_path: Path) -> None:
+        async with jobs:
             await _sign_rpm(rpm_path, keyring, passphrase, email)
-        except BuilderError as e:
-            msg = f"unable to sign rpms in '{path}': {e}"
-            logger.exception(msg)
-            raise BuilderError(msg) from e
-        except Exception as e:
-            msg = f"unknown error signing rpms in '{path}': {e}"
-            logger.exception(msg)
-            raise BuilderError(msg) from e
+
+    results = await asyncio.gather(
+        *[_sign_one(rpm_path) for rpm_path in rpms_to_sign], return_exceptions=True
+    )
+    failed = [
+        (rpm_path, res)
+        for rpm_path, res in zip(rpms_to_sign, results, strict=True)
+        if isinstance(res, BaseException)
+    ]
+    if failed:
+        msg = f"unable to sign {len(failed)} of {len(rpms_to_sign)} rpms in '{path}'"
+        logger.error(msg + ":")
+        for rpm_path, res in failed:
+            logger.error(f"- '{rpm_path}': {res}")
+        raise BuilderError(msg)
 
     time_spent = (dt.now(tz=datetime.UTC) - start).seconds
     return time_spent, len(rpms_to_sign)
@@ -108,8 +122,17 @@ async def sign_rpms(
     secrets: SecretsMgr,
     sign_with_gpg: str,
     components_rpms_paths: dict[str, ComponentBuild],
+    *,
+    jobs: int | None = None,
 ) -> None:
-    logger.info(f"sign rpms for {components_rpms_paths.keys()}")
+    """
+    Sign all components' RPMs, with up to `jobs` being signed at any given time.
+
+    If `jobs` is not specified, sign as many RPMs at a time as there are CPUs.
+    """
+    num_jobs = jobs if jobs else (os.cpu_count() or 1)
+    logger.info(f"sign rpms for {components_rpms_paths.keys()}, {num_jobs} jobs")
+    jobs_sem = asyncio.Semaphore(num_jobs)
     try:
         with secrets.gpg_signing_key(sign_with_gpg) as keyring:
             keyring_path = keyring[0]
@@ -122,7 +145,7 @@ async def sign_rpms(
                 tasks = {
                     name: tg.create_task(
                         _sign_component_rpms(
-                            p.rpms_path, keyring_path, passphrase, email
+                            p.rpms_path, keyring_path, passphrase, email, jobs_sem
                         )
                     )
                     for name, p in components_rpms_paths.items()
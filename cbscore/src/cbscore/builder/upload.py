@@ -12,6 +12,7 @@
 # GNU General Public License for more details.
 
 import asyncio
+import os
 import shutil
 from pathlib import Path
 
@@ -54,18 +55,25 @@ def _get_rpms(
     return rpms
 
 
-async def _get_repo(
-    target_path: Path, s3_base_dst: str, relative_to: Path
-) -> list[S3FileLocator]:
-    # create a repository at 'p', and return the corresponding
-    # 'repodata' directory path.
-    async def _create_repo(p: Path) -> Path:
-        repodata_path = p.joinpath("repodata")
-        if repodata_path.exists():
-            shutil.rmtree(repodata_path)
+async def _create_repo(p: Path, *, workers: int, cache_path: Path | None) -> Path:
+    """
+    Create or update the repository at 'p', returning its 'repodata' path.
+
+    Existing repository metadata is updated, so only new or changed RPMs are read.
+    If 'cache_path' is specified, RPMs' checksums are cached there across builds.
+    """
+    repodata_path = p.joinpath("repodata")
 
+    cmd = ["createrepo_c", "--quiet", f"--workers={workers}"]
+    if cache_path:
+        cache_path.mkdir(parents=True, exist_ok=True)
+        cmd.append(f"--cachedir={cache_path.resolve().as_posix()}")
+
+    async def _run(update: bool) -> tuple[int, str]:
         try:
-            _ = await async_run_cmd(["createrepo", p.resolve().as_posix()])
+            rc, _, stderr = await async_run_cmd(
+                [*cmd, *(["--update"] if update else []), p.resolve().as_posix()]
+            )
         except CommandError as e:
             msg = f"error creating repodata at '{repodata_path}': {e}"
             logger.exception(msg)
@@ -74,33 +82,57 @@ async def _get_repo(
             msg = f"unknown error creating repodata at '{repodata_path}': {e}"
             logger.exception(msg)
             raise BuilderError(msg) from e
+        return rc, stderr
 
-        if not repodata_path.exists() or not repodata_path.is_dir():
-            msg = f"unexpected missing repodata dir at '{repodata_path}'"
-            logger.error(msg)
-            raise BuilderError(msg)
-
-        return repodata_path
+    update = repodata_path.exists()
+    rc, stderr = await _run(update)
+    if rc != 0 and update:
+        logger.warning(
+            f"error updating repodata at '{repodata_path}', recreate: {stderr}"
+        )
+        shutil.rmtree(repodata_path, ignore_errors=True)
+        rc, stderr = await _run(False)
 
-    # get all the 'repodata' directories for this path. A repository will
-    # be created under 'p' if at least one RPM exists. Will still descend
-    # into all child directories, doing the same.
-    async def _get_repo_r(p: Path) -> list[Path]:
-        repo_paths: list[Path] = []
+    if rc != 0:
+        msg = f"error creating repodata at '{repodata_path}': {stderr}"
+        logger.error(msg)
+        raise BuilderError(msg)
 
-        has_repo = False
-        for entry in p.iterdir():
-            if entry.is_dir():
-                repo_paths.extend(await _get_repo_r(entry))
-                continue
+    if not repodata_path.exists() or not repodata_path.is_dir():
+        msg = f"unexpected missing repodata dir at '{repodata_path}'"
+        logger.error(msg)
+        raise BuilderError(msg)
 
-            if entry.suffix == ".rpm" and not has_repo:
-                repo_paths.append(await _create_repo(entry.parent))
-                continue
+    return repodata_path
 
-        return repo_paths
 
-    repo_paths = await _get_repo_r(target_path)
+async def _get_repo(
+    target_path: Path,
+    s3_base_dst: str,
+    relative_to: Path,
+    *,
+    cache_path: Path | None = None,
+) -> list[S3FileLocator]:
+    # a repository is created under each directory directly containing at least
+    # one RPM. Repositories are independent, so they are created concurrently.
+    repo_dirs: list[Path] = []
+    for parent, dirs, files in target_path.walk():
+        dirs[:] = [d for d in dirs if d != "repodata"]
+        if any(f.endswith(".rpm") for f in files):
+            repo_dirs.append(parent)
+
+    workers = max(1, (os.cpu_count() or 1) // max(1, len(repo_dirs)))
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(_create_repo(p, workers=workers, cache_path=cache_path))
+                for p in repo_dirs
+            ]
+    except ExceptionGroup as e:
+        msg = f"error creating repositories under '{target_path}': {e.exceptions[0]}"
+        logger.error(msg)
+        raise BuilderError(msg) from e
+    repo_paths = [t.result() for t in tasks]
 
     tgt_locs: list[S3FileLocator] = []
     for path in repo_paths:
@@ -122,6 +154,7 @@ async def _upload_component_rpms(
     version: str,
     el_version: int,
     rpms_path: Path,
+    createrepo_cache_path: Path | None,
 ) -> str:
     s3_base_dst = f"{bucket_loc}/{name}/rpm-{version}/el{el_version}.clyso"
 
@@ -132,14 +165,31 @@ async def _upload_component_rpms(
     to_upload: list[S3FileLocator] = []
     to_upload.extend(_get_rpms(path_to_rpms, s3_base_dst, path_to_rpms))
     to_upload.extend(_get_rpms(path_to_srpms, s3_base_dst, path_to_srpms.parent))
-    to_upload.extend(await _get_repo(path_to_rpms, s3_base_dst, path_to_rpms))
-    to_upload.extend(await _get_repo(path_to_srpms, s3_base_dst, path_to_srpms.parent))
+
+    rpms_repo, srpms_repo = await asyncio.gather(
+        _get_repo(
+            path_to_rpms,
+            s3_base_dst,
+            path_to_rpms,
+            cache_path=createrepo_cache_path,
+        ),
+        _get_repo(
+            path_to_srpms,
+            s3_base_dst,
+            path_to_srpms.parent,
+            cache_path=createrepo_cache_path,
+        ),
+    )
+    to_upload.extend(rpms_repo)
+    to_upload.extend(srpms_repo)
 
     for rpm in to_upload:
         logger.debug(f"{rpm.name}\n-> SRC: {rpm.src}\n=> DST: {rpm.dst}")
 
     try:
-        await s3_upload_files(secrets, upload_to_url, bucket, to_upload, public=True)
+        await s3_upload_files(
+            secrets, upload_to_url, bucket, to_upload, public=True, dedup=True
+        )
     except S3Error as e:
         msg = f"error uploading rpms: {e}"
         logger.exception(msg)
@@ -155,7 +205,15 @@ async def s3_upload_rpms(
     bucket_loc: str,
     components: dict[str, ComponentBuild],
     el_version: int,
+    *,
+    createrepo_cache_path: Path | None = None,
 ) -> dict[str, S3ComponentLocation]:
+    """
+    Create repositories for the components' RPMs, and upload them to S3.
+
+    If 'createrepo_cache_path' is specified, RPMs' checksums are cached under it
+    across builds, per component.
+    """
     try:
         async with asyncio.TaskGroup() as tg:
             tasks = {
@@ -169,6 +227,7 @@ async def s3_upload_rpms(
                         e.version,
                         el_version,
                         e.rpms_path,
+                        createrepo_cache_path / name if createrepo_cache_path else None,
                     )
                 )
                 for name, e in components.items()
@@ -12,9 +12,12 @@
 # GNU General Public License for more details.
 
 
+from pathlib import Path
+
 import click
 
 from cbscore.cmds import logger as parent_logger
+from cbscore.utils.ccache_storage import CcacheStorageServer
 
 logger = parent_logger.getChild("advanced")
 
@@ -22,3 +25,29 @@ logger = parent_logger.getChild("advanced")
 @click.group(hidden=True)
 def cmd_advanced() -> None:
     pass
+
+
+@cmd_advanced.command(
+    "ccache-storage",
+    help="""Serve a stand-in ccache HTTP remote storage, for testing.
+
+Cache entries are kept in PATH. Point 'ccache.remote-storage' at the URL printed.
+""",
+)
+@click.argument(
+    "path",
+    metavar="PATH",
+    type=click.Path(file_okay=False, path_type=Path),
+    required=True,
+)
+@click.option("--host", type=str, default="127.0.0.1", help="Address to listen on.")
+@click.option("--port", type=int, default=8080, help="Port to listen on.")
+def cmd_advanced_ccache_storage(path: Path, host: str, port: int) -> None:
+    server = CcacheStorageServer(path, host, port)
+    click.echo(f"serving ccache storage from '{path}' at '{server.url}'")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
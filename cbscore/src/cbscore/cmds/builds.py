@@ -16,12 +16,14 @@ import asyncio
 import errno
 import sys
 import tempfile
+from datetime import timedelta as td
 from pathlib import Path
 
 import click
 
 from cbscore.builder import BuilderError
 from cbscore.builder.builder import Builder
+from cbscore.builder.image import get_builder_image
 from cbscore.cmds import Ctx, pass_ctx, with_config
 from cbscore.cmds import logger as parent_logger
 from cbscore.config import Config, ConfigError, SigningConfig
@@ -220,6 +222,36 @@ def cmd_build(
         secrets_path.unlink()
 
 
+@click.group("builder-image", help="Cached builder image operations.")
+def cmd_builder_image_grp() -> None:
+    pass
+
+
+@cmd_builder_image_grp.command(
+    "refresh",
+    help="""Rebuild the builder image for a distro.
+
+Builder images are otherwise rebuilt once they are older than the configured TTL.
+""",
+)
+@click.argument("distro", metavar="DISTRO", type=str, required=True)
+@with_config
+def cmd_builder_image_refresh(config: Config, distro: str) -> None:
+    try:
+        uri = asyncio.run(
+            get_builder_image(
+                distro,
+                ttl=td(hours=config.builder_image.ttl_hours),
+                refresh=True,
+            )
+        )
+    except BuilderError as e:
+        click.echo(f"unable to refresh builder image for '{distro}': {e}", err=True)
+        sys.exit(errno.ENOTRECOVERABLE)
+
+    click.echo(f"refreshed builder image '{uri}'")
+
+
 @click.group("runner", help="Build Runner related operations.", hidden=True)
 def cmd_runner_grp() -> None:
     pass
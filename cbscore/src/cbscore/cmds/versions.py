@@ -26,6 +26,7 @@ from cbscore.images.desc import get_image_desc
 from cbscore.releases import ReleaseError
 from cbscore.releases.s3 import list_releases
 from cbscore.utils.git import GitError, get_git_repo_root, get_git_user
+from cbscore.utils.s3 import s3_close_clients
 from cbscore.utils.secrets import SecretsMgrError
 from cbscore.utils.secrets.mgr import SecretsMgr
 from cbscore.versions.create import version_create_helper
@@ -120,16 +121,23 @@ async def version_create(
 async def versions_list(
     secrets: SecretsMgr,
     s3_address_url: str,
+    bucket: str,
+    bucket_loc: str,
+    cache_path: Path | None,
     verbose: bool,
 ) -> None:
     """List releases from S3."""
     logger.info("listing s3 objects")
 
     try:
-        releases = await list_releases(secrets, s3_address_url)
+        releases = await list_releases(
+            secrets, s3_address_url, bucket, bucket_loc, cache_path=cache_path
+        )
     except ReleaseError as e:
         click.echo(f"error obtaining releases: {e}")
         sys.exit(1)
+    finally:
+        await s3_close_clients()
 
     for version, entry in releases.items():
         click.echo(f"> release: {version}")
@@ -308,12 +316,25 @@ def cmd_versions_create(
     required=True,
     metavar="ADDRESS",
 )
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    required=False,
+    help="Don't cache release descriptors under the scratch path.",
+)
 @with_config
 def cmd_versions_list(
     config: Config,
     verbose: bool,
     s3_address_url: str,
+    no_cache: bool,
 ) -> None:
+    if not config.storage or not config.storage.s3:
+        click.echo("no S3 storage configured, can't find releases", err=True)
+        sys.exit(errno.ENOTRECOVERABLE)
+    releases_loc = config.storage.s3.releases
+
     try:
         vault_config = config.get_vault_config()
     except Exception as e:
@@ -329,6 +350,16 @@ def cmd_versions_list(
         logger.error(f"error logging in to vault: {e}")
         sys.exit(errno.EACCES)
 
-    asyncio.run(versions_list(secrets, s3_address_url, verbose))
+    cache_path = None if no_cache else config.paths.scratch / "releases-cache"
+    asyncio.run(
+        versions_list(
+            secrets,
+            s3_address_url,
+            releases_loc.bucket,
+            releases_loc.loc,
+            cache_path,
+            verbose,
+        )
+    )
 
     pass
@@ -149,8 +149,18 @@ class StorageConfig(pydantic.BaseModel):
 class SigningConfig(pydantic.BaseModel):
     """Describes artifacts signing configuration."""
 
+    model_config: ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(
+        populate_by_name=True,
+        validate_by_alias=True,
+        serialize_by_alias=True,
+    )
+
     gpg: str | None = pydantic.Field(default=None)
     transit: str | None = pydantic.Field(default=None)
+    # how many RPMs to sign concurrently; defaults to the number of CPUs.
+    rpm_sign_jobs: Annotated[
+        int | None, pydantic.Field(alias="rpm-sign-jobs", gt=0, default=None)
+    ]
 
 
 class LoggingConfig(pydantic.BaseModel):
@@ -165,6 +175,78 @@ class LoggingConfig(pydantic.BaseModel):
     log_file: Annotated[Path, pydantic.Field(alias="log-file")]
 
 
+class BuilderImageConfig(pydantic.BaseModel):
+    """
+    Describes how the cached builder image is to be used.
+
+    The builder image is derived from a version's distro, with all the packages the
+    builder needs already installed, so builds don't have to install them every time.
+    """
+
+    model_config: ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(
+        populate_by_name=True,
+        validate_by_alias=True,
+        serialize_by_alias=True,
+    )
+
+    enabled: bool = pydantic.Field(default=True)
+    ttl_hours: Annotated[float, pydantic.Field(alias="ttl-hours", gt=0)] = 24 * 7
+
+
+class GitCacheConfig(pydantic.BaseModel):
+    """Describes the git object cache shared by builds, under the scratch path."""
+
+    model_config: ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(
+        populate_by_name=True,
+        validate_by_alias=True,
+        serialize_by_alias=True,
+    )
+
+    max_size_gb: Annotated[float, pydantic.Field(alias="max-size-gb", gt=0)] = 50
+
+
+class CcacheConfig(pydantic.BaseModel):
+    """
+    Describes how ccache is used by RPM builds, if a ccache path is specified.
+
+    A cache is kept per distro and toolchain under the ccache path, each bounded to
+    `max_size_gb`. If `remote_storage` is specified, it's used as ccache's remote
+    storage backend, e.g. 'http://ccache.foo.tld/cache' or 'file:/path/to/dir'.
+    """
+
+    model_config: ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(
+        populate_by_name=True,
+        validate_by_alias=True,
+        serialize_by_alias=True,
+    )
+
+    max_size_gb: Annotated[float, pydantic.Field(alias="max-size-gb", gt=0)] = 20
+    remote_storage: Annotated[
+        str | None, pydantic.Field(alias="remote-storage", default=None)
+    ]
+    # only use the remote storage, keeping nothing locally.
+    remote_only: Annotated[bool, pydantic.Field(alias="remote-only")] = False
+
+
+class BuildCacheConfig(pydantic.BaseModel):
+    """
+    Describes the cache of components' built RPMs, keyed on their build inputs.
+
+    The cache is kept under the scratch path and, if `s3` is specified, shared with
+    other builders through said location, at the S3 storage's endpoint.
+    """
+
+    model_config: ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(
+        populate_by_name=True,
+        validate_by_alias=True,
+        serialize_by_alias=True,
+    )
+
+    enabled: bool = pydantic.Field(default=True)
+    max_size_gb: Annotated[float, pydantic.Field(alias="max-size-gb", gt=0)] = 100
+    s3: S3LocationConfig | None = pydantic.Field(default=None)
+
+
 class Config(pydantic.BaseModel):
     model_config: ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(
         populate_by_name=True,
@@ -178,6 +260,22 @@ class Config(pydantic.BaseModel):
     logging: LoggingConfig | None = pydantic.Field(default=None)
     secrets: list[Path] = pydantic.Field(default=[])
     vault: Path | None = pydantic.Field(default=None)
+    builder_image: Annotated[
+        BuilderImageConfig,
+        pydantic.Field(alias="builder-image", default_factory=BuilderImageConfig),
+    ]
+    git_cache: Annotated[
+        GitCacheConfig,
+        pydantic.Field(alias="git-cache", default_factory=GitCacheConfig),
+    ]
+    build_cache: Annotated[
+        BuildCacheConfig,
+        pydantic.Field(alias="build-cache", default_factory=BuildCacheConfig),
+    ]
+    ccache: Annotated[
+        CcacheConfig,
+        pydantic.Field(default_factory=CcacheConfig),
+    ]
 
     @classmethod
     def load(cls, path: Path) -> Config:
@@ -37,6 +37,8 @@ class CoreComponentBuildSection(pydantic.BaseModel):
     rpm: CoreComponentBuildRPMSection | None
     get_version: str = pydantic.Field(alias="get-version")
     deps: str
+    # files in the component's worktree the deps script reads from, for caching.
+    deps_inputs: list[str] = pydantic.Field(alias="deps-inputs", default=[])
 
 
 class CoreComponent(pydantic.BaseModel):
@@ -0,0 +1,374 @@
+# CES library - CES releases index
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""
+Index of the release and component release descriptors in S3.
+
+The index caches descriptors in memory, and optionally on disk, keyed by their S3
+object key and validated by their ETag. Descriptors uploaded through the index are
+cached as they're uploaded.
+
+Once loaded, with a single listing of the releases location, the index knows which
+descriptors exist and their ETags: looking up a missing descriptor, or one cached
+with a matching ETag, costs no requests. Without a listing, or when the cached
+ETag doesn't match, a descriptor is obtained with a conditional GET, so a cached
+descriptor that's still current isn't downloaded again.
+
+The in-memory cache is authoritative for the index's lifetime, which should be no
+longer than a build's, except for fresh lookups: those always make a conditional
+GET, and must be used for descriptors about to be updated and uploaded again, as
+other builders may have uploaded them since the index was loaded. The on-disk cache
+persists across builds.
+"""
+
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+
+import pydantic
+
+from cbscore.releases import ReleaseError
+from cbscore.releases import logger as parent_logger
+from cbscore.releases.desc import ReleaseComponent, ReleaseDesc
+from cbscore.utils.s3 import S3Error, s3_get_str_obj, s3_list, s3_upload_json
+from cbscore.utils.secrets.mgr import SecretsMgr
+
+logger = parent_logger.getChild("index")
+
+
+# how many descriptors we fetch concurrently, when fetching many.
+_FETCH_JOBS = 16
+
+
+class _CachedObject(pydantic.BaseModel):
+    """A descriptor cached on disk, as found in S3."""
+
+    etag: str
+    contents: str
+
+
+class ReleasesIndex:
+    """Release and component release descriptors at an S3 releases location."""
+
+    secrets: SecretsMgr
+    url: str
+    bucket: str
+    bucket_loc: str
+    cache_path: Path | None
+
+    # object keys to ETags, from the last listing, if any.
+    _listing: dict[str, str | None] | None
+    # object keys to contents, 'None' if known not to exist.
+    _objects: dict[str, str | None]
+    # object keys to the ETags of their contents in '_objects', if known.
+    _etags: dict[str, str]
+
+    def __init__(
+        self,
+        secrets: SecretsMgr,
+        url: str,
+        bucket: str,
+        bucket_loc: str,
+        *,
+        cache_path: Path | None = None,
+    ) -> None:
+        self.secrets = secrets
+        self.url = url
+        self.bucket = bucket
+        self.bucket_loc = bucket_loc
+        self._listing = None
+        self._objects = {}
+        self._etags = {}
+
+        self.cache_path = None
+        if cache_path:
+            # keep different endpoints' and buckets' objects apart.
+            loc_hash = hashlib.sha256(f"{url}\0{bucket}".encode()).hexdigest()
+            self.cache_path = cache_path / loc_hash[:16]
+
+    def _release_key(self, version: str) -> str:
+        return f"{self.bucket_loc}/{version}.json"
+
+    def _component_key(self, name: str, version: str) -> str:
+        return f"{self.bucket_loc}/{name}/{version}.json"
+
+    def _cache_entry_path(self, key: str) -> Path | None:
+        return self.cache_path / key if self.cache_path else None
+
+    def _read_cached(self, key: str) -> _CachedObject | None:
+        entry_path = self._cache_entry_path(key)
+        if not entry_path or not entry_path.exists():
+            return None
+
+        try:
+            return _CachedObject.model_validate_json(entry_path.read_text())
+        except (pydantic.ValidationError, OSError) as e:
+            logger.warning(f"invalid cached descriptor at '{entry_path}': {e}")
+            return None
+
+    def _write_cached(self, key: str, etag: str, contents: str) -> None:
+        entry_path = self._cache_entry_path(key)
+        if not entry_path:
+            return
+
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            # other builds on this host may be caching the same descriptor.
+            tmp_path = entry_path.with_name(f".{entry_path.name}.{os.getpid()}.tmp")
+            _ = tmp_path.write_text(
+                _CachedObject(etag=etag, contents=contents).model_dump_json()
+            )
+            _ = tmp_path.replace(entry_path)
+        except OSError as e:
+            logger.warning(f"unable to cache descriptor at '{entry_path}': {e}")
+
+    def _prune_cached(self) -> None:
+        """Remove cached descriptors no longer in S3, per the last listing."""
+        if not self.cache_path or self._listing is None:
+            return
+
+        for entry_path in self.cache_path.rglob("*.json"):
+            key = entry_path.relative_to(self.cache_path).as_posix()
+            if key in self._listing:
+                continue
+            logger.debug(f"pruning cached descriptor '{key}', no longer in S3")
+            try:
+                entry_path.unlink()
+            except OSError as e:
+                logger.warning(f"unable to prune cached descriptor '{key}': {e}")
+
+    async def load(self) -> None:
+        """
+        List the releases location, learning which descriptors exist.
+
+        Lookups after loading only make requests for descriptors that exist and
+        aren't cached at their current ETag.
+        """
+        logger.debug(
+            f"loading releases index from '{self.url}' bucket '{self.bucket}' "
+            + f"loc '{self.bucket_loc}'"
+        )
+        try:
+            res = await s3_list(
+                self.secrets, self.url, self.bucket, prefix=f"{self.bucket_loc}/"
+            )
+        except S3Error as e:
+            msg = f"error listing releases index: {e}"
+            logger.error(msg)
+            raise ReleaseError(msg) from e
+
+        self._listing = {
+            entry.key: entry.etag
+            for entry in res.objects
+            if entry.key.endswith(".json")
+        }
+        # anything we previously obtained may have changed since.
+        self._objects.clear()
+        self._etags.clear()
+        logger.debug(f"releases index loaded, {len(self._listing)} descriptors")
+
+        self._prune_cached()
+
+    def versions(self) -> list[str]:
+        """List the versions of the releases found by the last listing."""
+        if self._listing is None:
+            msg = "releases index not loaded"
+            logger.error(msg)
+            raise ReleaseError(msg)
+
+        prefix = f"{self.bucket_loc}/"
+        return [
+            key.removeprefix(prefix).removesuffix(".json")
+            for key in self._listing
+            if "/" not in key.removeprefix(prefix)
+        ]
+
+    def _cached_object(self, key: str) -> _CachedObject | None:
+        """Obtain the descriptor at 'key' as last seen, in memory or on disk."""
+        contents = self._objects.get(key)
+        etag = self._etags.get(key)
+        if contents is not None and etag:
+            return _CachedObject(etag=etag, contents=contents)
+        return self._read_cached(key)
+
+    async def _get(
+        self,
+        key: str,
+        *,
+        content_type: str | None = "application/json",
+        fresh: bool = False,
+    ) -> str | None:
+        """
+        Obtain the contents of the descriptor at 'key', if it exists.
+
+        If `content_type` is specified, a descriptor fetched from S3 must be of said
+        content type. If `fresh`, neither the objects obtained so far nor the listing
+        are trusted, and the descriptor is obtained with a conditional GET.
+        """
+        if not fresh and key in self._objects:
+            return self._objects[key]
+
+        cached = self._cached_object(key)
+        if not fresh and self._listing is not None:
+            if key not in self._listing:
+                logger.debug(f"descriptor '{key}' not in index")
+                self._objects[key] = None
+                return None
+
+            etag = self._listing[key]
+            if cached and etag and cached.etag == etag:
+                logger.debug(f"descriptor '{key}' cached at current etag")
+                self._objects[key] = cached.contents
+                self._etags[key] = cached.etag
+                return cached.contents
+
+        try:
+            obj = await s3_get_str_obj(
+                self.secrets,
+                self.url,
+                self.bucket,
+                key,
+                content_type=content_type,
+                if_none_match=cached.etag if cached else None,
+            )
+        except S3Error as e:
+            msg = f"error obtaining descriptor '{key}': {e}"
+            logger.error(msg)
+            raise ReleaseError(msg) from e
+
+        contents: str | None = None
+        if obj and obj.contents is None:
+            assert cached
+            logger.debug(f"descriptor '{key}' not modified since cached")
+            contents = cached.contents
+        elif obj:
+            contents = obj.contents
+            if obj.etag and contents is not None:
+                self._write_cached(key, obj.etag, contents)
+
+        self._objects[key] = contents
+        _ = self._etags.pop(key, None)
+        if obj and obj.etag:
+            self._etags[key] = obj.etag
+        if self._listing is not None:
+            if obj:
+                self._listing[key] = obj.etag
+            else:
+                _ = self._listing.pop(key, None)
+        return contents
+
+    async def _put(self, key: str, contents: str) -> None:
+        """Upload the descriptor at 'key', caching it."""
+        try:
+            etag = await s3_upload_json(
+                self.secrets, self.url, self.bucket, key, contents
+            )
+        except S3Error as e:
+            msg = f"error uploading descriptor '{key}': {e}"
+            logger.error(msg)
+            raise ReleaseError(msg) from e
+
+        self._objects[key] = contents
+        _ = self._etags.pop(key, None)
+        if self._listing is not None:
+            self._listing[key] = etag
+        if etag:
+            self._etags[key] = etag
+            self._write_cached(key, etag, contents)
+
+    async def get_release(
+        self, version: str, *, fresh: bool = False
+    ) -> ReleaseDesc | None:
+        """
+        Obtain the release descriptor for 'version', if it exists.
+
+        If `fresh`, the descriptor is always checked against S3, as it must be before
+        updating it.
+        """
+        key = self._release_key(version)
+        data = await self._get(key, fresh=fresh)
+        if not data:
+            return None
+
+        try:
+            return ReleaseDesc.model_validate_json(data)
+        except pydantic.ValidationError:
+            msg = f"invalid release data from '{key}'"
+            logger.exception(msg)
+            raise ReleaseError(msg) from None
+
+    async def get_component(
+        self, name: str, version: str, *, fresh: bool = False
+    ) -> ReleaseComponent | None:
+        """
+        Obtain the release descriptor for component 'name' at 'version'.
+
+        If `fresh`, the descriptor is always checked against S3, as it must be before
+        updating it.
+        """
+        key = self._component_key(name, version)
+        data = await self._get(key, fresh=fresh)
+        if not data:
+            return None
+
+        try:
+            return ReleaseComponent.model_validate_json(data)
+        except pydantic.ValidationError:
+            msg = f"invalid component release data from '{key}'"
+            logger.error(msg)
+            raise ReleaseError(msg) from None
+
+    async def releases(self, *, jobs: int = _FETCH_JOBS) -> dict[str, ReleaseDesc]:
+        """
+        Obtain all release descriptors found by the last listing, by version.
+
+        Descriptors are fetched concurrently, at most 'jobs' at a time. Malformed
+        descriptors, e.g. in an old format, are skipped.
+        """
+        sem = asyncio.Semaphore(jobs)
+
+        async def _fetch(version: str) -> str | None:
+            async with sem:
+                # older releases may not have been uploaded as JSON.
+                return await self._get(self._release_key(version), content_type=None)
+
+        versions = self.versions()
+        results = await asyncio.gather(*[_fetch(v) for v in versions])
+
+        releases: dict[str, ReleaseDesc] = {}
+        for version, data in zip(versions, results, strict=True):
+            if not data:
+                continue
+            try:
+                desc = ReleaseDesc.model_validate_json(data)
+            except pydantic.ValidationError:
+                logger.error(
+                    f"malformed or old JSON format for release descriptor '{version}'"
+                )
+                continue
+            releases[desc.version] = desc
+
+        return releases
+
+    async def put_release(self, desc: ReleaseDesc) -> str:
+        """Upload a release descriptor, returning its location."""
+        key = self._release_key(desc.version)
+        await self._put(key, desc.model_dump_json(indent=2))
+        return key
+
+    async def put_component(self, comp_rel: ReleaseComponent) -> str:
+        """Upload a component release descriptor, returning its location."""
+        key = self._component_key(comp_rel.name, comp_rel.version)
+        await self._put(key, comp_rel.model_dump_json(indent=2))
+        return key
@@ -12,52 +12,61 @@
 # GNU General Public License for more details.
 
 import asyncio
-
-import pydantic
+from pathlib import Path
 
 from cbscore.releases import ReleaseError
 from cbscore.releases import logger as parent_logger
 from cbscore.releases.desc import ReleaseBuildEntry, ReleaseComponent, ReleaseDesc
-from cbscore.utils.s3 import (
-    S3Error,
-    s3_download_json,
-    s3_download_str_obj,
-    s3_list,
-    s3_upload_json,
-)
+from cbscore.releases.index import ReleasesIndex
 from cbscore.utils.secrets.mgr import SecretsMgr
 
 logger = parent_logger.getChild("s3")
 
 
+def _index_for(
+    secrets: SecretsMgr,
+    url: str,
+    bucket: str,
+    bucket_loc: str,
+    index: ReleasesIndex | None,
+) -> ReleasesIndex:
+    """Use 'index' if provided, otherwise an uncached, unlisted index."""
+    if index:
+        return index
+    return ReleasesIndex(secrets, url, bucket, bucket_loc)
+
+
 async def check_release_exists(
-    secrets: SecretsMgr, url: str, bucket: str, bucket_loc: str, version: str
+    secrets: SecretsMgr,
+    url: str,
+    bucket: str,
+    bucket_loc: str,
+    version: str,
+    *,
+    index: ReleasesIndex | None = None,
+    fresh: bool = False,
 ) -> ReleaseDesc | None:
-    """Check whether a given release version exists in S3."""
+    """
+    Check whether a given release version exists in S3.
+
+    If `index` is provided, the release descriptor is obtained through it. If
+    `fresh`, the descriptor is checked against S3 regardless of what the index knows,
+    as it must be if it's going to be updated.
+    """
     logger.debug(
         f"check if release '{version}' already exists at '{url}' "
         + f"bucket '{bucket}' loc '{bucket_loc}'"
     )
 
-    location = f"{bucket_loc}/{version}.json"
+    index = _index_for(secrets, url, bucket, bucket_loc, index)
     try:
-        data = await s3_download_json(secrets, url, bucket, location)
+        return await index.get_release(version, fresh=fresh)
     except ReleaseError as e:
         msg = f"error checking if release '{version}' exists: {e}"
         logger.exception(msg)
         raise ReleaseError(msg) from e
-
-    if not data:
-        return None
-
-    try:
-        return ReleaseDesc.model_validate_json(data)
-    except pydantic.ValidationError:
-        msg = f"invalid release data from '{location}'"
-        logger.exception(msg)
-        raise ReleaseError(msg) from None
     except Exception as e:
-        msg = f"unknown exception validating release data: {e}"
+        msg = f"unknown exception obtaining release data: {e}"
         logger.exception(msg)
         raise ReleaseError(msg) from e
 
@@ -69,16 +78,25 @@ async def release_desc_upload(
     bucket_loc: str,
     version: str,
     release_build: ReleaseBuildEntry,
+    *,
+    index: ReleasesIndex | None = None,
 ) -> ReleaseDesc:
-    """Upload a release descriptor to S3."""
+    """
+    Upload a release descriptor to S3.
+
+    If `index` is provided, the existing release descriptor, if any, is obtained
+    through it, always checked against S3 so other builders' updates aren't lost, and
+    the uploaded descriptor is cached by it.
+    """
     logger.debug(
         f"upload release desc for version '{version}' to '{url}' "
         + f"bucket '{bucket}' loc '{bucket_loc}'"
     )
 
+    index = _index_for(secrets, url, bucket, bucket_loc, index)
     try:
         existing_desc = await check_release_exists(
-            secrets, url, bucket, bucket_loc, version
+            secrets, url, bucket, bucket_loc, version, index=index, fresh=True
         )
     except ReleaseError as e:
         logger.error(f"error checking for existing release '{version}': {e}")
@@ -91,21 +109,19 @@ async def release_desc_upload(
     desc = existing_desc or ReleaseDesc(version=version, builds={})
     desc.builds[release_build.arch] = release_build
 
-    desc_json = desc.model_dump_json(indent=2)
-    location = f"{bucket_loc}/{version}.json"
     try:
-        await s3_upload_json(secrets, url, bucket, location, desc_json)
+        _ = await index.put_release(desc)
     except ReleaseError as e:
         msg = (
             f"error uploading release desc for version '{version}' "
-            + f"to bucket '{bucket}' loc '{location}': {e}"
+            + f"to bucket '{bucket}' loc '{bucket_loc}': {e}"
         )
         logger.error(msg)
         raise ReleaseError(msg) from e
     except Exception as e:
         msg = (
             f"unknown error uploading release desc for version '{version}'"
-            + f"to bucket '{bucket}' loc '{location}': {e}"
+            + f"to bucket '{bucket}' loc '{bucket_loc}': {e}"
         )
         logger.error(msg)
         raise ReleaseError(msg) from e
@@ -119,28 +135,32 @@ async def release_upload_components(
     bucket: str,
     bucket_loc: str,
     component_releases: dict[str, ReleaseComponent],
+    *,
+    index: ReleasesIndex | None = None,
 ) -> None:
-    """Upload component release descriptors to S3, in parallel."""
+    """
+    Upload component release descriptors to S3, in parallel.
+
+    If `index` is provided, the uploaded descriptors are cached by it.
+    """
     logger.info(
         f"upload release for components '{component_releases.keys()}' to '{url}' "
         + f"bucket '{bucket}' loc '{bucket_loc}'"
     )
 
+    index = _index_for(secrets, url, bucket, bucket_loc, index)
+
     async def _put_component(comp_rel: ReleaseComponent) -> str:
         """Write a component's release descriptor to the provided S3 url."""
-        location = f"{bucket_loc}/{comp_rel.name}/{comp_rel.version}.json"
-        data = comp_rel.model_dump_json(indent=2)
-
         try:
-            await s3_upload_json(secrets, url, bucket, location, data)
+            return await index.put_component(comp_rel)
         except ReleaseError as e:
             msg = (
                 f"error uploading component release desc for '{comp_rel.name}' "
-                + f"bucket '{bucket}' to '{location}': {e}"
+                + f"bucket '{bucket}': {e}"
             )
             logger.error(msg)
             raise ReleaseError(msg) from e
-        return location
 
     try:
         async with asyncio.TaskGroup() as tg:
@@ -166,11 +186,17 @@ async def check_released_components(
     bucket: str,
     bucket_loc: str,
     components: dict[str, str],
+    *,
+    index: ReleasesIndex | None = None,
+    fresh: bool = False,
 ) -> dict[str, ReleaseComponent]:
     """
     Check whether the components for a release exist in S3.
 
     Receives a `components` dictionary, mapping the component's name to its version.
+    If `index` is provided, the component release descriptors are obtained through
+    it. If `fresh`, the descriptors are checked against S3 regardless of what the
+    index knows, as they must be if they're going to be updated.
 
     Returns a `dict` mapping names of components existing in S3, to their
     `ReleaseComponent` entry (obtained from S3).
@@ -182,11 +208,12 @@ async def check_released_components(
         f"check if components exist in '{url}' bucket '{bucket}' loc '{bucket_loc}'"
     )
 
+    index = _index_for(secrets, url, bucket, bucket_loc, index)
+
     async def _get_component(name: str, long_version: str) -> ReleaseComponent | None:
         """Obtain `ReleaseComponent` from S3, if available."""
-        location = f"{bucket_loc}/{name}/{long_version}.json"
         try:
-            data = await s3_download_json(secrets, url, bucket, location)
+            return await index.get_component(name, long_version, fresh=fresh)
         except ReleaseError as e:
             msg = (
                 f"error checking if component '{name}' "
@@ -195,20 +222,6 @@ async def check_released_components(
             logger.error(msg)
             raise ReleaseError(msg) from e
 
-        if not data:
-            return None
-
-        try:
-            return ReleaseComponent.model_validate_json(data)
-        except pydantic.ValidationError:
-            msg = f"invalid component release data from '{location}'"
-            logger.error(msg)
-            raise ReleaseError(msg) from None
-        except Exception as e:
-            msg = f"unknown error validating component release data: {e}"
-            logger.error(msg)
-            raise ReleaseError(msg) from e
-
     try:
         async with asyncio.TaskGroup() as tg:
             task_dict = {
@@ -235,49 +248,29 @@ async def check_released_components(
 
 
 async def list_releases(
-    secrets: SecretsMgr, url: str, bucket: str, bucket_loc: str
+    secrets: SecretsMgr,
+    url: str,
+    bucket: str,
+    bucket_loc: str,
+    *,
+    cache_path: Path | None = None,
 ) -> dict[str, ReleaseDesc]:
-    """List releases from S3."""
+    """
+    List releases from S3.
+
+    Release descriptors are fetched concurrently, over a shared client. If
+    `cache_path` is specified, descriptors are cached there, and only fetched again
+    if their ETag changed.
+    """
+    index = ReleasesIndex(secrets, url, bucket, bucket_loc, cache_path=cache_path)
     try:
-        res = await s3_list(
-            secrets, url, bucket, prefix=f"{bucket_loc}/", prefix_as_directory=True
-        )
-    except S3Error as e:
-        msg = "error obtaining release objects"
+        await index.load()
+        return await index.releases()
+    except ReleaseError as e:
+        msg = f"error obtaining releases: {e}"
         logger.error(msg)
-        raise ReleaseError(msg=f"{msg}: {e}") from e
-
-    releases: dict[str, ReleaseDesc] = {}
-    for entry in res.objects:
-        if not entry.name.endswith(".json"):
-            logger.debug(f"skipping '{entry.key}', not JSON")
-            continue
-
-        try:
-            # FIXME: this is highly inefficient because the 's3_download_str_obj'
-            # function will obtain S3 credentials from vault each time.
-            raw_json = await s3_download_str_obj(
-                secrets, url, bucket, entry.key, content_type=None
-            )
-        except S3Error as e:
-            msg = f"s3 error obtaining JSON object: {e}"
-            logger.error(msg)
-            raise ReleaseError(msg) from e
-        except Exception as e:
-            msg = f"unknown error obtaining JSON object: {e}"
-            logger.error(msg)
-            raise ReleaseError(msg) from e
-
-        if not raw_json:
-            continue
-
-        try:
-            release_desc = ReleaseDesc.model_validate_json(raw_json)
-        except pydantic.ValidationError:
-            msg = "malformed or old JSON format for release descriptor"
-            logger.error(msg)
-            continue
-
-        releases[release_desc.version] = release_desc
-
-    return releases
+        raise ReleaseError(msg) from e
+    except Exception as e:
+        msg = f"unknown error obtaining releases: {e}"
+        logger.error(msg)
+        raise ReleaseError(msg) from e
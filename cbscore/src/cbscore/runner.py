@@ -19,13 +19,18 @@ import string
 import tempfile
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from datetime import timedelta as td
 from pathlib import Path
 from typing import override
 
 import aiofiles
 
+from cbscore.builder import BuilderError
+from cbscore.builder.ccache import split_file_storage
+from cbscore.builder.image import get_builder_image
 from cbscore.builder.report import BuildArtifactReport
 from cbscore.config import Config, ConfigError, LoggingConfig
+from cbscore.core.component import load_components
 from cbscore.errors import CESError
 from cbscore.logger import logger as root_logger
 from cbscore.utils import AsyncRunCmdOutCallback
@@ -47,23 +52,90 @@ def gen_run_name(prefix: str = "ces_") -> str:
     return prefix + "".join(random.choices(string.ascii_lowercase, k=10))  # noqa: S311
 
 
-def _setup_components_dir(components_paths: list[Path]) -> Path:
-    # build a temporary directory for an aggregated components dir
-    dst_path = Path(tempfile.mkdtemp(suffix=".cbs", prefix="components-"))
-    for comp_dir in components_paths:
-        for d in comp_dir.iterdir():
-            if not d.is_dir():
-                continue
-            dest = dst_path / d.name
-            try:
-                _ = shutil.copytree(d, dest, dirs_exist_ok=True)
-            except Exception as e:
-                msg = f"unable to copy component '{d}' to '{dest}': {e}"
-                logger.error(msg)
-                raise RunnerError(msg) from e
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hardlink 'src' at 'dst', replacing it, or copy it if it can't be linked."""
+    dst_path = Path(dst)
+    dst_path.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        # e.g., crossing filesystems.
+        _ = shutil.copy2(src, dst)
+
+
+def _setup_components_dir(
+    components_paths: list[Path], desc: VersionDescriptor
+) -> tuple[dict[str, str], Path | None]:
+    """
+    Set up the components referenced by 'desc' to be mounted on the runner.
+
+    Each component's directory is bind mounted read-only under the runner's
+    components directory, with no copying. Directories of the same name in more
+    than one components path are merged, later paths taking precedence, into a
+    temporary directory of hardlinks to the original files.
+
+    Returns the volumes to mount, and the temporary directory to remove after the
+    run, if any.
+    """
+    wanted = {comp.name for comp in desc.components}
+    available = load_components(components_paths)
+
+    dir_names: set[str] = set()
+    for name in wanted:
+        if name not in available:
+            logger.warning(f"component '{name}' not found in components paths")
+            continue
+        dir_names.add(available[name].path.name)
+
+    volumes: dict[str, str] = {}
+    merged_path: Path | None = None
+    for dir_name in sorted(dir_names):
+        srcs = [p / dir_name for p in components_paths if (p / dir_name).is_dir()]
+        dst = f"/runner/components/{dir_name}:ro"
+        if len(srcs) == 1:
+            volumes[srcs[0].resolve().as_posix()] = dst
+            continue
+
+        if not merged_path:
+            merged_path = Path(tempfile.mkdtemp(suffix=".cbs", prefix="components-"))
+        merged_comp_path = merged_path / dir_name
+        try:
+            for src in srcs:
+                _ = shutil.copytree(
+                    src,
+                    merged_comp_path,
+                    copy_function=_link_or_copy,
+                    dirs_exist_ok=True,
+                )
+        except Exception as e:
+            _cleanup_components_dir(merged_path)
+            msg = f"unable to merge component '{dir_name}' from '{srcs}': {e}"
+            logger.error(msg)
+            raise RunnerError(msg) from e
+        volumes[merged_comp_path.resolve().as_posix()] = dst
+
+    logger.debug(f"components volumes: {volumes}")
+    return volumes, merged_path
+
+
+async def _get_runner_image(desc: VersionDescriptor, config: Config) -> str:
+    """
+    Obtain the image to run the build on.
+
+    That's the cached builder image for the version's distro, if enabled, falling
+    back to the distro's image if the builder image can't be obtained. In which case
+    the builder will prepare itself, as it always did.
+    """
+    if not config.builder_image.enabled:
+        return desc.distro
 
-    logger.debug(f"Using temporary components dir at '{dst_path}'")
-    return dst_path
+    try:
+        return await get_builder_image(
+            desc.distro, ttl=td(hours=config.builder_image.ttl_hours)
+        )
+    except BuilderError as e:
+        logger.warning(f"unable to obtain builder image, using '{desc.distro}': {e}")
+        return desc.distro
 
 
 def _cleanup_components_dir(components_path: Path) -> None:
@@ -207,9 +279,13 @@ async def runner(
 
     desc_mount_loc = f"/runner/{desc_file_path.name}"
 
+    runner_image = await _get_runner_image(desc, config)
+    logger.info(f"running build on image '{runner_image}'")
+
     # propagate exception
-    components_path = _setup_components_dir(config.paths.components)
-    logger.debug(f"components contents: {list(components_path.walk())}")
+    components_volumes, components_tmp_path = _setup_components_dir(
+        config.paths.components, desc
+    )
 
     # create temp file holding the secrets
     #
@@ -234,6 +310,17 @@ async def runner(
     new_config.paths.components = [Path("/runner/components")]
     new_config.paths.ccache = Path("/runner/ccache") if config.paths.ccache else None
 
+    # a 'file:' ccache remote storage, e.g. for testing, must be in the container.
+    ccache_file_storage = (
+        split_file_storage(config.ccache.remote_storage)
+        if config.paths.ccache and config.ccache.remote_storage
+        else None
+    )
+    if ccache_file_storage:
+        new_config.ccache.remote_storage = (
+            f"file:/runner/ccache-remote{ccache_file_storage[1]}"
+        )
+
     if log_file_path:
         logger.debug(f"preparing log file at '{log_file_path}'")
         log_file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -262,17 +349,27 @@ async def runner(
         secrets_tmp_path.resolve().as_posix(): "/runner/cbs-build.secrets.yaml",
         config.paths.scratch.resolve().as_posix(): "/runner/scratch",
         config.paths.scratch_containers.resolve().as_posix(): "/var/lib/containers:Z",
-        components_path.resolve().as_posix(): "/runner/components",
+        **components_volumes,
     }
 
     if config.vault:
         vault_config_path_loc = config.vault.resolve().as_posix()
         podman_volumes[vault_config_path_loc] = "/runner/cbs-build.vault.yaml"
 
+    # persist dnf's package cache across builds, for the builder's deps cache.
+    dnf_cache_path = config.paths.scratch / "dnf-cache"
+    dnf_cache_path.mkdir(parents=True, exist_ok=True)
+    podman_volumes[dnf_cache_path.resolve().as_posix()] = "/var/cache/dnf"
+
     if config.paths.ccache:
         ccache_path_loc = config.paths.ccache.resolve().as_posix()
         podman_volumes[ccache_path_loc] = "/runner/ccache"
 
+    if ccache_file_storage:
+        ccache_file_storage[0].mkdir(parents=True, exist_ok=True)
+        ccache_storage_loc = ccache_file_storage[0].resolve().as_posix()
+        podman_volumes[ccache_storage_loc] = "/runner/ccache-remote"
+
     if skip_build:
         podman_args.append("--skip-build")
 
@@ -286,7 +383,7 @@ async def runner(
     try:
         async with _log_callback(log_file_path, log_out_cb) as log_cb:
             rc, _, stderr = await podman_run(
-                image=desc.distro,
+                image=runner_image,
                 env={
                     "CBS_DEBUG": "1"
                     if logger.getEffectiveLevel() == logging.DEBUG
@@ -313,7 +410,8 @@ async def runner(
         logger.error(msg)
         raise RunnerError(msg) from e
     finally:
-        _cleanup_components_dir(components_path)
+        if components_tmp_path:
+            _cleanup_components_dir(components_tmp_path)
 
     # Read the build artifact report BEFORE the rc check so that partial
     # reports are captured when RPMs uploaded but container push failed.
@@ -25,6 +25,7 @@ from typing import Any, override
 
 from cbscore.errors import CESError
 from cbscore.logger import logger as root_logger
+from cbscore.utils.timing import count_subprocess
 
 logger = root_logger.getChild("utils")
 
@@ -155,6 +156,7 @@ def get_unsecured_cmd(orig: CmdArgs) -> list[str]:
 
 def run_cmd(cmd: CmdArgs, env: dict[str, str] | None = None) -> tuple[int, str, str]:
     logger.debug(f"sync run '{_sanitize_cmd(cmd)}'")
+    count_subprocess()
     try:
         p = subprocess.run(get_unsecured_cmd(cmd), env=env, capture_output=True)  # noqa: S603
     except OSError as e:
@@ -222,6 +224,7 @@ async def async_run_cmd(
         env.update(extra_env)
 
     logger.debug(f"run async subprocess, cwd: {cwd}, cmd: {cmd}")
+    count_subprocess()
     p = await asyncio.create_subprocess_exec(
         *(get_unsecured_cmd(cmd)),
         stdout=asyncio.subprocess.PIPE,
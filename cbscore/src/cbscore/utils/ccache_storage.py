@@ -0,0 +1,117 @@
+# CES library - ccache HTTP remote storage stand-in
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""
+A stand-in for ccache's HTTP remote storage backend, for testing.
+
+ccache's HTTP backend stores each cache entry as an object at its key, under the
+storage's URL, with GET, HEAD, PUT, and DELETE requests. This serves said requests
+from a local directory, so builds can be tested against a remote storage without
+deploying one. It's not meant for production use.
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import override
+
+from cbscore.utils import logger as parent_logger
+
+logger = parent_logger.getChild("ccache-storage")
+
+
+class CcacheStorageServer(ThreadingHTTPServer):
+    """Serve ccache's HTTP remote storage requests from 'path'."""
+
+    path: Path
+
+    def __init__(self, path: Path, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.path = path.resolve()
+        self.path.mkdir(parents=True, exist_ok=True)
+        super().__init__((host, port), _CcacheStorageHandler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> threading.Thread:
+        """Serve requests from a background thread, until shut down."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class _CcacheStorageHandler(BaseHTTPRequestHandler):
+    server: CcacheStorageServer  # pyright: ignore[reportIncompatibleVariableOverride]
+
+    def _entry_path(self) -> Path | None:
+        """Obtain the path for the requested entry, if within the storage."""
+        rel_path = self.path.split("?")[0].lstrip("/")
+        entry_path = (self.server.path / rel_path).resolve()
+        if not rel_path or not entry_path.is_relative_to(self.server.path):
+            self._reply(400)
+            return None
+        return entry_path
+
+    def _reply(self, status: int, body: bytes = b"") -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            _ = self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        entry_path = self._entry_path()
+        if not entry_path:
+            return
+        try:
+            data = entry_path.read_bytes()
+        except (FileNotFoundError, IsADirectoryError):
+            self._reply(404)
+            return
+        self._reply(200, data)
+
+    def do_HEAD(self) -> None:
+        self.do_GET()
+
+    def do_PUT(self) -> None:
+        entry_path = self._entry_path()
+        if not entry_path:
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        data = self.rfile.read(length)
+
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry_path.with_name(
+            f".{entry_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        _ = tmp_path.write_bytes(data)
+        _ = tmp_path.replace(entry_path)
+        self._reply(201)
+
+    def do_DELETE(self) -> None:
+        entry_path = self._entry_path()
+        if not entry_path:
+            return
+        try:
+            entry_path.unlink()
+        except FileNotFoundError:
+            self._reply(404)
+            return
+        self._reply(204)
+
+    @override
+    def log_message(self, format: str, *args: object) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
@@ -0,0 +1,278 @@
+# CES library - git object cache
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""
+Persistent git object cache, shared by the builds running on a host.
+
+Each repository is cached as a bare, blobless partial clone. Only the refs builds
+ask for are fetched, with their history's commits and trees, and the tags pointing
+into it, so 'git describe' keeps working. Blobs are fetched lazily, in a single
+batch, when a ref is checked out.
+
+Builds check refs out into worktrees of the cached repository, sharing its object
+store, so blobs fetched for one build are available to later builds, and a warm
+checkout only fetches what changed upstream.
+
+Builds running concurrently on the same host share the cache through per-repository
+file locks: an exclusive lock serializes fetching and checking out, and a shared lock
+is held for as long as a build uses the repository, so it's not evicted under it.
+"""
+
+import asyncio
+import contextlib
+import errno
+import fcntl
+import os
+import shutil
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+from cbscore.utils import MaybeSecure, timing
+from cbscore.utils import logger as parent_logger
+from cbscore.utils.git import GitError, git_checkout, git_remove_worktree, run_git
+
+logger = parent_logger.getChild("git-cache")
+
+
+# how often we retry taking a busy lock.
+_LOCK_POLL_INTERVAL_SECS = 0.5
+
+
+@contextlib.asynccontextmanager
+async def _flock(path: Path, op: int) -> AsyncGenerator[None]:
+    """
+    Hold a file lock on 'path', waiting for it if busy.
+
+    Polls instead of blocking, so neither the event loop nor a thread are stuck on
+    the lock, and waiting on it can be cancelled.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        while True:
+            try:
+                fcntl.flock(fd, op | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                await asyncio.sleep(_LOCK_POLL_INTERVAL_SECS)
+        yield
+    finally:
+        # closing the file descriptor releases the lock.
+        os.close(fd)
+
+
+def _try_flock(path: Path) -> int | None:
+    """Take an exclusive lock on 'path' if not busy, returning its descriptor."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _get_dir_size(path: Path) -> int:
+    size = 0
+    for root, _, files in path.walk():
+        for f in files:
+            with contextlib.suppress(OSError):
+                size += root.joinpath(f).lstat().st_size
+    return size
+
+
+class GitCache:
+    """A cache of git repositories, at 'path', bounded to 'max_size' bytes."""
+
+    path: Path
+    max_size: int
+
+    def __init__(self, path: Path, *, max_size: int) -> None:
+        self.path = path
+        self.max_size = max_size
+
+    def _repo_path(self, name: str) -> Path:
+        return self.path / f"{name}.git"
+
+    def _lock_path(self, name: str) -> Path:
+        return self.path / f"{name}.lock"
+
+    def _use_path(self, name: str) -> Path:
+        return self.path / f"{name}.use"
+
+    def _ensure_path(self) -> None:
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            msg = f"unable to create git cache at '{self.path}': {e}"
+            logger.error(msg)
+            raise GitError(errno.ENOTRECOVERABLE, msg) from e
+
+    @contextlib.asynccontextmanager
+    async def use(self, name: str) -> AsyncGenerator[None]:
+        """Mark repository 'name' as in use, so it's not evicted while in use."""
+        self._ensure_path()
+        async with _flock(self._use_path(name), fcntl.LOCK_SH):
+            yield
+
+    async def _init_repo(self, repo_path: Path, url: MaybeSecure) -> None:
+        """Create an empty, blobless partial clone for 'url' at 'repo_path'."""
+        logger.info(f"init cached repository at '{repo_path}'")
+        try:
+            _ = await run_git(["init", "--bare", "--quiet", repo_path.as_posix()])
+            for args in [
+                ["remote", "add", "origin", url],
+                ["config", "core.repositoryformatversion", "1"],
+                ["config", "extensions.partialClone", "origin"],
+                ["config", "remote.origin.promisor", "true"],
+                ["config", "remote.origin.partialclonefilter", "blob:none"],
+            ]:
+                _ = await run_git(args, path=repo_path)
+        except GitError as e:
+            msg = f"unable to init cached repository at '{repo_path}': {e}"
+            logger.error(msg)
+            shutil.rmtree(repo_path, ignore_errors=True)
+            raise GitError(errno.ENOTRECOVERABLE, msg) from e
+
+    def _is_valid_repo(self, repo_path: Path) -> bool:
+        return repo_path.is_dir() and repo_path.joinpath("HEAD").exists()
+
+    async def checkout(
+        self, name: str, url: MaybeSecure, ref: str, worktrees_base_path: Path
+    ) -> tuple[Path, Path]:
+        """
+        Check out 'ref' from 'url' into a new worktree under 'worktrees_base_path'.
+
+        Only 'ref' is fetched into the cached repository 'name', which is created if
+        needed. Blobs missing from the cache are fetched from 'url' on checkout, so
+        'url' must remain valid until this returns.
+
+        Returns the paths to the cached repository and to the new worktree.
+        """
+        self._ensure_path()
+        repo_path = self._repo_path(name)
+
+        async with _flock(self._lock_path(name), fcntl.LOCK_EX):
+            if repo_path.exists() and not self._is_valid_repo(repo_path):
+                logger.warning(
+                    f"cached repository at '{repo_path}' is not valid -- nuke it!"
+                )
+                try:
+                    shutil.rmtree(repo_path)
+                except Exception as e:
+                    msg = f"unable to remove invalid repository at '{repo_path}': {e}"
+                    logger.error(msg)
+                    raise GitError(errno.ENOTRECOVERABLE, msg) from e
+
+            if not repo_path.exists():
+                await self._init_repo(repo_path, url)
+
+            # the ref may be an annotated tag, which can't be stored as a branch, so
+            # it's fetched into a namespace of its own, and the branch we check out
+            # from points to the commit it peels to. Keep the branch fully qualified,
+            # lest it's ambiguous with a tag of the same name.
+            fetched_ref = f"refs/cbs-cache/{ref}"
+            local_ref = f"refs/heads/{ref}"
+
+            logger.info(f"fetch ref '{ref}' into cached repository '{repo_path}'")
+            try:
+                with timing.span("fetch"):
+                    _ = await run_git(
+                        ["remote", "set-url", "origin", url], path=repo_path
+                    )
+                    _ = await run_git(
+                        [
+                            "fetch",
+                            "--quiet",
+                            "--update-head-ok",
+                            "origin",
+                            f"+{ref}:{fetched_ref}",
+                        ],
+                        path=repo_path,
+                    )
+                    _ = await run_git(
+                        ["update-ref", local_ref, f"{fetched_ref}^{{commit}}"],
+                        path=repo_path,
+                    )
+            except GitError as e:
+                msg = f"unable to fetch '{ref}' into '{repo_path}': {e}"
+                logger.error(msg)
+                raise GitError(errno.ENOTRECOVERABLE, msg) from e
+
+            # checking out fetches the blobs we're missing into the cache.
+            with timing.span("checkout"):
+                worktree_path = await git_checkout(
+                    repo_path, local_ref, worktrees_base_path
+                )
+
+            # keep track of when the repository was last used, for eviction.
+            self._lock_path(name).touch()
+
+        return repo_path, worktree_path
+
+    async def remove_worktree(self, name: str, worktree_path: Path) -> None:
+        """Remove a worktree checked out by 'checkout()', and its branch."""
+        repo_path = self._repo_path(name)
+        async with _flock(self._lock_path(name), fcntl.LOCK_EX):
+            await git_remove_worktree(repo_path, worktree_path)
+            try:
+                _ = await run_git(
+                    ["branch", "--quiet", "-D", worktree_path.name], path=repo_path
+                )
+            except GitError as e:
+                logger.warning(f"unable to remove branch for '{worktree_path}': {e}")
+
+    def _evict(self) -> None:
+        """Evict least recently used repositories not in use, until within bounds."""
+        repos: list[tuple[float, str, int]] = []
+        for repo_path in self.path.glob("*.git"):
+            name = repo_path.name.removesuffix(".git")
+            try:
+                last_used = self._lock_path(name).stat().st_mtime
+            except FileNotFoundError:
+                last_used = 0.0
+            repos.append((last_used, name, _get_dir_size(repo_path)))
+
+        total_size = sum(size for _, _, size in repos)
+        logger.debug(f"git cache at '{self.path}' size: {total_size} bytes")
+
+        for _, name, size in sorted(repos):
+            if total_size <= self.max_size:
+                break
+
+            fd = _try_flock(self._use_path(name))
+            if fd is None:
+                logger.debug(f"cached repository '{name}' in use, not evicting")
+                continue
+
+            try:
+                logger.info(f"evicting cached repository '{name}', size: {size} bytes")
+                shutil.rmtree(self._repo_path(name), ignore_errors=True)
+                total_size -= size
+            finally:
+                os.close(fd)
+
+        if total_size > self.max_size:
+            logger.warning(
+                f"git cache at '{self.path}' above its maximum size, "
+                + f"{total_size} > {self.max_size} bytes"
+            )
+
+    async def evict(self) -> None:
+        """Evict repositories until the cache is within its maximum size."""
+        if not self.path.exists():
+            return
+
+        try:
+            await asyncio.to_thread(self._evict)
+        except Exception as e:
+            logger.warning(f"error evicting from git cache at '{self.path}': {e}")
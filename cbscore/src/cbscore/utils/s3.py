@@ -11,18 +11,37 @@
 # MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
 # GNU General Public License for more details.
 
+"""
+S3 helpers.
+
+S3 resources are pooled per event loop, endpoint, and credentials, so consecutive
+operations on the same endpoint reuse the same connections instead of setting up a
+new session for each. Pooled resources are kept until `s3_close_clients()` is
+called, from the event loop they were created on.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import os
+import time
+import weakref
 from datetime import datetime as dt
 from pathlib import Path
 from typing import override
 
 import aioboto3
 import pydantic
+from aiobotocore.config import AioConfig
+from boto3.s3.transfer import TransferConfig
+from types_aiobotocore_s3.client import S3Client
 from types_aiobotocore_s3.service_resource import S3ServiceResource
 
 from cbscore.errors import CESError
 from cbscore.utils import logger as parent_logger
 from cbscore.utils.secrets import SecretsMgrError
 from cbscore.utils.secrets.mgr import SecretsMgr
+from cbscore.utils.timing import add_bytes_downloaded, add_bytes_uploaded
 
 
 class S3Error(CESError):
@@ -48,6 +67,8 @@ class S3ObjectEntry(pydantic.BaseModel):
     key: str
     size: int
     last_modified: dt
+    etag: str | None = None
+    """The object's ETag, sans quotes."""
 
     @property
     def name(self) -> str:
@@ -57,6 +78,16 @@ class S3ObjectEntry(pydantic.BaseModel):
         return self.key[idx + 1 :]
 
 
+class S3StrObject(pydantic.BaseModel):
+    """A string object obtained from S3."""
+
+    etag: str | None
+    """The object's ETag, sans quotes."""
+
+    contents: str | None
+    """The object's contents, `None` if it was not modified."""
+
+
 class S3ListResult(pydantic.BaseModel):
     """Result from listing objects in an S3 bucket."""
 
@@ -67,6 +98,108 @@ class S3ListResult(pydantic.BaseModel):
 logger = parent_logger.getChild("s3")
 
 
+_MiB = 1024 * 1024
+
+# how many files we upload concurrently, per endpoint.
+_UPLOAD_JOBS = 8
+# files larger than the threshold are uploaded in parts, several at a time.
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * _MiB,
+    multipart_chunksize=16 * _MiB,
+    max_concurrency=4,
+)
+# MD5 of no contents, the ETag of an empty object.
+_EMPTY_MD5 = hashlib.md5(b"", usedforsecurity=False).hexdigest()
+# enough connections for all concurrent uploads' parts, plus some slack for others.
+_MAX_POOL_CONNECTIONS = _UPLOAD_JOBS * _TRANSFER_CONFIG.max_concurrency + 8
+
+
+class _S3Client:
+    """A pooled S3 resource, and the bound on the files transferred through it."""
+
+    resource: S3ServiceResource
+    upload_jobs: asyncio.Semaphore
+
+    def __init__(self, resource: S3ServiceResource) -> None:
+        self.resource = resource
+        self.upload_jobs = asyncio.Semaphore(_UPLOAD_JOBS)
+
+
+class _S3ClientPool:
+    """S3 clients created on an event loop, per endpoint and credentials."""
+
+    _lock: asyncio.Lock
+    _stack: contextlib.AsyncExitStack
+    _clients: dict[tuple[str, str, str], _S3Client]
+
+    def __init__(self) -> None:
+        self._lock = asyncio.Lock()
+        self._stack = contextlib.AsyncExitStack()
+        self._clients = {}
+
+    async def get(self, hostname: str, access_id: str, secret_id: str) -> _S3Client:
+        key = (hostname, access_id, secret_id)
+        async with self._lock:
+            if client := self._clients.get(key):
+                return client
+
+            logger.debug(f"S3: new client, hostname = {hostname}")
+            s3_session = aioboto3.Session(
+                aws_access_key_id=access_id,
+                aws_secret_access_key=secret_id,
+            )
+            resource = await self._stack.enter_async_context(
+                s3_session.resource(
+                    "s3",
+                    endpoint_url=hostname,
+                    config=AioConfig(max_pool_connections=_MAX_POOL_CONNECTIONS),
+                )
+            )
+            client = _S3Client(resource)
+            self._clients[key] = client
+            return client
+
+    async def close(self) -> None:
+        async with self._lock:
+            self._clients.clear()
+            await self._stack.aclose()
+
+
+_pools: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _S3ClientPool] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def _get_client(secrets: SecretsMgr, url: str) -> _S3Client:
+    """Obtain the pooled S3 client for 'url', on the running event loop."""
+    try:
+        hostname, access_id, secret_id = secrets.s3_creds(url)
+    except SecretsMgrError as e:
+        msg = f"error obtaining S3 credentials: {e}"
+        logger.exception(msg)
+        raise S3Error(msg) from e
+
+    logger.debug(f"S3: hostname = {hostname}, access_id = {access_id}")
+
+    if not hostname.startswith("http"):
+        hostname = f"https://{hostname}"
+
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if not pool:
+        pool = _S3ClientPool()
+        _pools[loop] = pool
+
+    return await pool.get(hostname, access_id, secret_id)
+
+
+async def s3_close_clients() -> None:
+    """Close the S3 clients pooled on the running event loop."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool:
+        await pool.close()
+
+
 async def s3_upload_str_obj(
     secrets: SecretsMgr,
     url: str,
@@ -74,41 +207,28 @@ async def s3_upload_str_obj(
     location: str,
     contents: str,
     content_type: str = "application/json",
-) -> None:
+) -> str | None:
     """
-    Upload a string object to S3.
+    Upload a string object to S3, returning its ETag, if reported.
 
     If not specified, presumes the object's content is a JSON string.
     """
+    s3_client = (await _get_client(secrets, url)).resource.meta.client
     try:
-        hostname, access_id, secret_id = secrets.s3_creds(url)
-    except SecretsMgrError as e:
-        msg = f"error obtaining S3 credentials: {e}"
+        res = await s3_client.put_object(
+            Bucket=dst_bucket,
+            Key=location,
+            Body=contents.encode("utf-8"),
+            ContentType=content_type,
+        )
+        add_bytes_uploaded(len(contents.encode("utf-8")))
+    except Exception as e:
+        msg = f"error uploading object to '{location}': {e}"
         logger.exception(msg)
         raise S3Error(msg) from e
 
-    logger.debug(f"S3: hostname = {hostname}, access_id = {access_id}")
-
-    s3_session = aioboto3.Session(
-        aws_access_key_id=access_id,
-        aws_secret_access_key=secret_id,
-    )
-
-    if not hostname.startswith("http"):
-        hostname = f"https://{hostname}"
-
-    async with s3_session.resource("s3", None, None, True, True, hostname) as s3:
-        bucket = await s3.Bucket(dst_bucket)
-        try:
-            _ = await bucket.put_object(
-                Key=location,
-                Body=contents,
-                ContentType=content_type,
-            )
-        except Exception as e:
-            msg = f"error uploading object to '{location}': {e}"
-            logger.exception(msg)
-            raise S3Error(msg) from e
+    etag = res.get("ETag")
+    return etag.strip('"') if etag else None
 
 
 async def s3_download_str_obj(
@@ -121,82 +241,86 @@ async def s3_download_str_obj(
     """
     Download a string object from S3.
 
-    If not specified, presumes the object's content is JSON.
+    If `content_type` is specified, the object must be of said content type.
     """
-    try:
-        hostname, access_id, secret_id = secrets.s3_creds(url)
-    except SecretsMgrError as e:
-        msg = f"error obtaining S3 credentials: {e}"
-        logger.exception(msg)
-        raise S3Error(msg) from e
+    obj = await s3_get_str_obj(
+        secrets, url, src_bucket, location, content_type=content_type
+    )
+    return obj.contents if obj else None
 
-    logger.debug(f"S3: hostname = {hostname}, access_id = {access_id}")
 
-    s3_session = aioboto3.Session(
-        aws_access_key_id=access_id,
-        aws_secret_access_key=secret_id,
-    )
+async def s3_get_str_obj(
+    secrets: SecretsMgr,
+    url: str,
+    src_bucket: str,
+    location: str,
+    *,
+    content_type: str | None = None,
+    if_none_match: str | None = None,
+) -> S3StrObject | None:
+    """
+    Obtain a string object from S3, with a single request.
 
-    if not hostname.startswith("http"):
-        hostname = f"https://{hostname}"
+    If `content_type` is specified, the object must be of said content type.
+    If `if_none_match` is specified, the object's contents are only downloaded if its
+    ETag differs; otherwise, the returned object's `contents` are `None`.
 
-    async with s3_session.resource("s3", None, None, True, True, hostname) as s3:
-        bucket = await s3.Bucket(src_bucket)
-        try:
-            obj = await bucket.Object(location)
-        except s3.meta.client.exceptions.NoSuchKey:
+    Returns `None` if the object does not exist.
+    """
+    s3_client = (await _get_client(secrets, url)).resource.meta.client
+    try:
+        if if_none_match:
+            res = await s3_client.get_object(
+                Bucket=src_bucket, Key=location, IfNoneMatch=f'"{if_none_match}"'
+            )
+        else:
+            res = await s3_client.get_object(Bucket=src_bucket, Key=location)
+    except s3_client.exceptions.NoSuchKey:
+        logger.debug(f"object '{location}' not found")
+        return None
+    except s3_client.exceptions.ClientError as e:
+        status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        if status == 304:
+            logger.debug(f"object '{location}' not modified")
+            return S3StrObject(etag=if_none_match, contents=None)
+        if status == 404:
             logger.debug(f"object '{location}' not found")
             return None
-        except Exception as e:
-            msg = f"error downloading string object from '{location}': {e}"
-            logger.exception(msg)
-            raise S3Error(msg) from e
+        msg = f"error obtaining object '{location}': {e}"
+        logger.error(msg)
+        raise S3Error(msg) from e
+    except Exception as e:
+        msg = f"error obtaining object '{location}': {e}"
+        logger.exception(msg)
+        raise S3Error(msg) from e
 
-        try:
-            obj_content_type = await obj.content_type
-        except s3.meta.client.exceptions.ClientError as e:
-            if (
-                "ResponseMetadata" in e.response
-                and e.response["ResponseMetadata"]["HTTPStatusCode"] == 404
-            ):
-                logger.debug(f"object '{location}' not found")
-                return None
-
-            logger.error(
-                f"unable to obtain content type on object '{location}': {e.response}"
-            )
-            if "Error" in e.response and "Message" in e.response["Error"]:
-                err_msg = e.response["Error"]["Message"]
-                logger.error(f"error message: {err_msg}")
-                raise S3Error(
-                    f"unable to obtain content type on object '{location}': {err_msg}"
-                ) from e
-            raise S3Error(
-                f"unknown error obtaining content type for '{location}'"
-            ) from None
-
-        if content_type and obj_content_type != content_type:
-            msg = f"unexpected content type '{obj_content_type}' for string object"
-            logger.error(msg)
-            raise S3Error(msg)
-
-        contents = await obj.get()
-        body = contents["Body"]
+    obj_content_type = res.get("ContentType")
+    if content_type and obj_content_type != content_type:
+        res["Body"].close()
+        msg = f"unexpected content type '{obj_content_type}' for string object"
+        logger.error(msg)
+        raise S3Error(msg)
 
-        try:
+    try:
+        async with res["Body"] as body:
             data = await body.read()
-        except Exception as e:
-            msg = f"error reading object string from '{location}': {e}"
-            logger.exception(msg)
-            raise S3Error(msg) from e
+    except Exception as e:
+        msg = f"error reading object string from '{location}': {e}"
+        logger.exception(msg)
+        raise S3Error(msg) from e
 
-        return data.decode("utf-8")
+    add_bytes_downloaded(len(data))
+
+    etag = res.get("ETag")
+    return S3StrObject(
+        etag=etag.strip('"') if etag else None, contents=data.decode("utf-8")
+    )
 
 
 async def s3_upload_json(
     secrets: SecretsMgr, url: str, bucket: str, location: str, contents: str
-) -> None:
-    """Upload a JSON object."""
+) -> str | None:
+    """Upload a JSON object, returning its ETag, if reported."""
     return await s3_upload_str_obj(
         secrets, url, bucket, location, contents, content_type="application/json"
     )
@@ -216,13 +340,106 @@ async def s3_download_json(
         raise S3Error(msg) from e
 
 
+def _get_local_etag(path: Path) -> str:
+    """
+    Compute the ETag S3 reports for 'path', if uploaded with '_TRANSFER_CONFIG'.
+
+    For files uploaded in a single request, that's the MD5 of the file's contents.
+    For files uploaded in parts, that's the MD5 of the parts' MD5s, suffixed by the
+    number of parts.
+    """
+    part_size = _TRANSFER_CONFIG.multipart_chunksize
+    part_digests: list[bytes] = []
+    with path.open("rb") as f:
+        while chunk := f.read(part_size):
+            part_digests.append(hashlib.md5(chunk, usedforsecurity=False).digest())
+
+    if path.stat().st_size < _TRANSFER_CONFIG.multipart_threshold:
+        return part_digests[0].hex() if part_digests else _EMPTY_MD5
+
+    combined = hashlib.md5(b"".join(part_digests), usedforsecurity=False)
+    return f"{combined.hexdigest()}-{len(part_digests)}"
+
+
+async def _filter_unchanged(
+    s3_client: S3Client, dst_bucket: str, file_locs: list[S3FileLocator]
+) -> tuple[list[S3FileLocator], int]:
+    """
+    Filter out files whose destination object has the same contents.
+
+    Lists the objects under the destination keys' common prefix once, and compares
+    their sizes and ETags to those of the local files. Local files are only hashed
+    if their size matches the existing object's.
+
+    Returns the files to upload, and the number of bytes that won't be uploaded.
+    """
+    prefix = os.path.commonprefix([loc.dst for loc in file_locs])
+    prefix = prefix[: prefix.rfind("/") + 1]
+
+    existing: dict[str, S3ObjectEntry] = {
+        obj.key: obj
+        for obj in (
+            await _list_objects(s3_client, dst_bucket, prefix=prefix, delimiter="")
+        ).objects
+    }
+
+    async def _is_unchanged(loc: S3FileLocator) -> bool:
+        obj = existing.get(loc.dst)
+        if not obj or not obj.etag or obj.size != loc.src.stat().st_size:
+            return False
+        return await asyncio.to_thread(_get_local_etag, loc.src) == obj.etag
+
+    unchanged = await asyncio.gather(*[_is_unchanged(loc) for loc in file_locs])
+
+    to_upload: list[S3FileLocator] = []
+    saved = 0
+    for loc, is_unchanged in zip(file_locs, unchanged, strict=True):
+        if not is_unchanged:
+            to_upload.append(loc)
+            continue
+        logger.debug(f"skip uploading '{loc.name}', unchanged at '{loc.dst}'")
+        saved += existing[loc.dst].size
+
+    return to_upload, saved
+
+
+def _fmt_throughput(size: int, secs: float) -> str:
+    return f"{size / _MiB / max(secs, 1e-3):.1f} MiB/s"
+
+
+class _UploadProgress:
+    """Track a file's upload progress, logging it every 'step' percent."""
+
+    name: str
+    size: int
+    done: int
+    _step: int
+    _next_pct: int
+
+    def __init__(self, name: str, size: int, step: int = 25) -> None:
+        self.name = name
+        self.size = size
+        self.done = 0
+        self._step = step
+        self._next_pct = step
+
+    def __call__(self, n: int) -> None:
+        self.done += n
+        if not self.size:
+            return
+        pct = self.done * 100 // self.size
+        if pct >= self._next_pct and pct < 100:
+            logger.debug(f"uploading '{self.name}': {pct}% of {self.size} bytes")
+            self._next_pct = (pct // self._step + 1) * self._step
+
+
 async def _upload_file(
     s3: S3ServiceResource,
     dst_bucket: str,
     file_loc: S3FileLocator,
     public: bool = False,
-) -> None:
-    """Upload a file from the local filesystem to S3."""
+) -> int:
+    """Upload a file from the local filesystem to S3, returning its size."""
     bucket = await s3.Bucket(dst_bucket)
 
     extra_args = None if not public else {"ACL": "public-read"}
@@ -231,11 +448,17 @@ async def _upload_file(
         f"uploading file '{file_loc.name}' to '{file_loc.dst}' bucket '{dst_bucket}'"
     )
     try:
+        progress = _UploadProgress(file_loc.name, file_loc.src.stat().st_size)
+        start = time.monotonic()
         await bucket.upload_file(
             file_loc.src.as_posix(),
             Key=file_loc.dst,
             ExtraArgs=extra_args,
+            Callback=progress,
+            Config=_TRANSFER_CONFIG,
         )
+        secs = time.monotonic() - start
+        add_bytes_uploaded(progress.size)
     except Exception as e:
         msg = (
             f"error uploading file '{file_loc.name}' from '{file_loc.src}' "
@@ -244,6 +467,12 @@ async def _upload_file(
         logger.exception(msg)
         raise S3Error(msg) from e
 
+    logger.debug(
+        f"uploaded '{file_loc.name}', {progress.size} bytes in {secs:.1f}s "
+        + f"({_fmt_throughput(progress.size, secs)})"
+    )
+    return progress.size
+
 
 async def s3_upload_files(
     secrets: SecretsMgr,
@@ -252,37 +481,197 @@ async def s3_upload_files(
     file_locs: list[S3FileLocator],
     *,
     public: bool = False,
+    dedup: bool = False,
 ) -> None:
-    """Upload a list of files to S3."""
+    """
+    Upload a list of files to S3.
+
+    Files are uploaded concurrently, bounded by how many uploads are running against
+    the same endpoint.
+
+    If `dedup` is specified, files whose destination object already has the same
+    contents, as told by its ETag, are not uploaded.
+    """
+    client = await _get_client(secrets, url)
+
+    if dedup and file_locs:
+        try:
+            to_upload, saved = await _filter_unchanged(
+                client.resource.meta.client, dst_bucket, file_locs
+            )
+        except Exception as e:
+            # not fatal, we just upload everything.
+            logger.warning(f"unable to check for unchanged files, upload all: {e}")
+        else:
+            logger.info(
+                f"skip uploading {len(file_locs) - len(to_upload)} unchanged files "
+                + f"of {len(file_locs)} to bucket '{dst_bucket}', "
+                + f"{saved} bytes saved"
+            )
+            file_locs = to_upload
+
+    if not file_locs:
+        return
+
+    async def _upload(loc: S3FileLocator) -> int:
+        async with client.upload_jobs:
+            return await _upload_file(client.resource, dst_bucket, loc, public=public)
+
+    start = time.monotonic()
+    results = await asyncio.gather(
+        *[_upload(loc) for loc in file_locs], return_exceptions=True
+    )
+    secs = time.monotonic() - start
+
+    failed: list[tuple[S3FileLocator, BaseException]] = [
+        (loc, res)
+        for loc, res in zip(file_locs, results, strict=True)
+        if isinstance(res, BaseException)
+    ]
+    if failed:
+        for loc, exc in failed:
+            logger.error(f"error uploading file '{loc.src}': {exc}")
+        _, exc = failed[0]
+        if not isinstance(exc, Exception):
+            raise exc
+        msg = f"error uploading {len(failed)} of {len(file_locs)} files: {exc}"
+        logger.error(msg)
+        raise S3Error(msg) from exc
+
+    total_size = sum(res for res in results if isinstance(res, int))
+    logger.info(
+        f"uploaded {len(file_locs)} files to bucket '{dst_bucket}', "
+        + f"{total_size} bytes in {secs:.1f}s ({_fmt_throughput(total_size, secs)})"
+    )
+
+
+async def _download_file(
+    s3: S3ServiceResource, src_bucket: str, key: str, dst: Path
+) -> int:
+    """Download an object from S3 to the local filesystem, returning its size."""
+    bucket = await s3.Bucket(src_bucket)
+
+    logger.debug(f"downloading '{key}' bucket '{src_bucket}' to '{dst}'")
     try:
-        hostname, access_id, secret_id = secrets.s3_creds(url)
-    except SecretsMgrError as e:
-        msg = f"error obtaining S3 credentials: {e}"
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        await bucket.download_file(key, dst.as_posix(), Config=_TRANSFER_CONFIG)
+        size = dst.stat().st_size
+        add_bytes_downloaded(size)
+    except Exception as e:
+        msg = f"error downloading '{key}' bucket '{src_bucket}' to '{dst}': {e}"
         logger.exception(msg)
         raise S3Error(msg) from e
 
-    logger.debug(f"S3: hostname = {hostname}, access_id = {access_id}")
+    return size
+
 
-    s3_session = aioboto3.Session(
-        aws_access_key_id=access_id,
-        aws_secret_access_key=secret_id,
+async def s3_download_files(
+    secrets: SecretsMgr,
+    url: str,
+    src_bucket: str,
+    files: dict[str, Path],
+) -> None:
+    """
+    Download objects from S3, mapped by their keys to their local destination.
+
+    Files are downloaded concurrently, bounded alongside uploads to the same
+    endpoint.
+    """
+    if not files:
+        return
+
+    client = await _get_client(secrets, url)
+
+    async def _download(key: str, dst: Path) -> int:
+        async with client.upload_jobs:
+            return await _download_file(client.resource, src_bucket, key, dst)
+
+    start = time.monotonic()
+    results = await asyncio.gather(
+        *[_download(key, dst) for key, dst in files.items()], return_exceptions=True
     )
+    secs = time.monotonic() - start
+
+    failed = [
+        (key, res)
+        for key, res in zip(files, results, strict=True)
+        if isinstance(res, BaseException)
+    ]
+    if failed:
+        for key, exc in failed:
+            logger.error(f"error downloading '{key}': {exc}")
+        _, exc = failed[0]
+        if not isinstance(exc, Exception):
+            raise exc
+        msg = f"error downloading {len(failed)} of {len(files)} files: {exc}"
+        logger.error(msg)
+        raise S3Error(msg) from exc
 
-    if not hostname.startswith("http"):
-        hostname = f"https://{hostname}"
+    total_size = sum(res for res in results if isinstance(res, int))
+    logger.info(
+        f"downloaded {len(files)} files from bucket '{src_bucket}', "
+        + f"{total_size} bytes in {secs:.1f}s ({_fmt_throughput(total_size, secs)})"
+    )
 
-    async with s3_session.resource("s3", None, None, True, True, hostname) as s3:
-        for loc in file_locs:
-            try:
-                await _upload_file(s3, dst_bucket, loc, public=public)
-            except S3Error as e:
-                msg = f"error uploading file: {e}"
-                logger.exception(msg)
-                raise S3Error(msg) from e
-            except Exception as e:
-                msg = f"unknown error uploading file: {e}"
-                logger.exception(msg)
-                raise S3Error(msg) from e
+
+async def _list_objects(
+    s3_client: S3Client, target_bucket: str, *, prefix: str, delimiter: str
+) -> S3ListResult:
+    """List objects in S3 under 'prefix', using 'delimiter'."""
+    obj_lst: list[S3ObjectEntry] = []
+    common_prefixes: set[str] = set()
+
+    logger.debug(f"listing objects for bucket '{target_bucket}")
+
+    continuation_token = ""
+    while True:
+        logger.debug(f"listing objects, continuation_token: '{continuation_token}'")
+        res = await s3_client.list_objects_v2(
+            Bucket=target_bucket,
+            Prefix=prefix,
+            Delimiter=delimiter,
+            ContinuationToken=continuation_token,
+        )
+
+        common_prefixes_dict = res.get("CommonPrefixes")
+        if common_prefixes_dict:
+            for entry in common_prefixes_dict:
+                p = entry.get("Prefix")
+                if p:
+                    common_prefixes.add(p)
+
+        logger.debug(f"found common_prefixes: {common_prefixes}")
+
+        objs = res.get("Contents")
+        if not objs:
+            break
+
+        logger.debug(f"found objects: {len(objs)}")
+
+        for obj_entry in objs:
+            key = obj_entry.get("Key")
+            size = obj_entry.get("Size")
+            last_modified = obj_entry.get("LastModified")
+            etag = obj_entry.get("ETag")
+            assert key is not None
+            assert size is not None
+            assert last_modified is not None
+
+            obj_lst.append(
+                S3ObjectEntry(
+                    key=key,
+                    size=size,
+                    last_modified=last_modified,
+                    etag=etag.strip('"') if etag else None,
+                )
+            )
+
+        if res["IsTruncated"]:
+            continuation_token = res["NextContinuationToken"]
+        else:
+            break
+
+    return S3ListResult(objects=obj_lst, common_prefixes=list(common_prefixes))
 
 
 async def s3_list(
@@ -304,73 +693,13 @@ async def s3_list(
     Returns `S3ListResult`, containing the list of objects and `common_prefixes`
     representing those other (logical) sub-directories present in `prefix`.
     """
-    try:
-        hostname, access_id, secret_id = secrets.s3_creds(url)
-    except SecretsMgrError as e:
-        msg = f"error obtaining S3 credentials: {e}"
-        logger.exception(msg)
-        raise S3Error(msg) from e
-
-    s3_session = aioboto3.Session(
-        aws_access_key_id=access_id,
-        aws_secret_access_key=secret_id,
-    )
-    if not hostname.startswith("http"):
-        hostname = f"https://{hostname}"
-
-    obj_lst: list[S3ObjectEntry] = []
-    common_prefixes: set[str] = set()
+    s3_client = (await _get_client(secrets, url)).resource.meta.client
 
     if prefix_as_directory and not prefix:
         prefix_as_directory = False
 
     delimiter = "" if not prefix_as_directory else "/"
 
-    async with (
-        s3_session.client("s3", endpoint_url=hostname) as s3_client,
-    ):
-        logger.debug(f"listing objects for bucket '{target_bucket}")
-
-        continuation_token = ""
-        while True:
-            logger.debug(f"listing objects, continuation_token: '{continuation_token}'")
-            res = await s3_client.list_objects_v2(
-                Bucket=target_bucket,
-                Prefix=prefix if prefix else "",
-                Delimiter=delimiter,
-                ContinuationToken=continuation_token,
-            )
-
-            common_prefixes_dict = res.get("CommonPrefixes")
-            if common_prefixes_dict:
-                for entry in common_prefixes_dict:
-                    p = entry.get("Prefix")
-                    if p:
-                        common_prefixes.add(p)
-
-            logger.debug(f"found common_prefixes: {common_prefixes}")
-
-            objs = res.get("Contents")
-            if not objs:
-                break
-
-            logger.debug(f"found objects: {len(objs)}")
-
-            for obj_entry in objs:
-                key = obj_entry.get("Key")
-                size = obj_entry.get("Size")
-                last_modified = obj_entry.get("LastModified")
-                assert key is not None
-                assert size is not None
-                assert last_modified is not None
-
-                obj_lst.append(
-                    S3ObjectEntry(key=key, size=size, last_modified=last_modified)
-                )
-
-            if res["IsTruncated"]:
-                continuation_token = res["NextContinuationToken"]
-            else:
-                break
-
-    return S3ListResult(objects=obj_lst, common_prefixes=list(common_prefixes))
+    return await _list_objects(
+        s3_client, target_bucket, prefix=prefix if prefix else "", delimiter=delimiter
+    )
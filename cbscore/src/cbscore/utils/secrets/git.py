@@ -31,7 +31,7 @@ from cbscore.utils.secrets.models import (
     GitVaultHTTPSSecret,
     GitVaultSSHSecret,
 )
-from cbscore.utils.secrets.utils import find_best_secret_candidate
+from cbscore.utils.secrets.utils import SecretsMatcher
 from cbscore.utils.vault import Vault, VaultError
 
 logger = parent_logger.getChild("git")
@@ -232,16 +232,25 @@ def _token_git_url_for(url: str, entry: GitTokenSecret) -> MaybeSecure:
 
 @contextmanager
 def git_url_for(
-    url: str, secrets: dict[str, GitSecret], vault: Vault | None
+    url: str,
+    secrets: dict[str, GitSecret],
+    vault: Vault | None,
+    *,
+    matcher: SecretsMatcher | None = None,
 ) -> Generator[MaybeSecure]:
-    """Obtain URL for git access."""
+    """
+    Obtain URL for git access.
+
+    If `matcher` is provided, it must have been compiled from `secrets`.
+    """
     url_m = re.match(GIT_URL_PATTERN, url)
     if not url_m:
         msg = f"invalid git url '{url}'"
         logger.error(msg)
         raise SecretsMgrError(msg)
 
-    best_entry = find_best_secret_candidate(list(secrets.keys()), url)
+    matcher = matcher or SecretsMatcher(list(secrets.keys()))
+    best_entry = matcher.find(url)
     if not best_entry:
         m = re.match(GIT_URL_PATTERN, url)
         if not m:
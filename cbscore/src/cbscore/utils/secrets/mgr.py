@@ -33,7 +33,13 @@ from cbscore.utils.secrets.models import (
 from cbscore.utils.secrets.registry import registry_get_creds
 from cbscore.utils.secrets.signing import gpg_private_keyring, signing_transit
 from cbscore.utils.secrets.storage import storage_get_s3_creds
-from cbscore.utils.vault import Vault, VaultError, get_vault_from_config
+from cbscore.utils.secrets.utils import SecretsMatcher
+from cbscore.utils.vault import (
+    Vault,
+    VaultCacheStats,
+    VaultError,
+    get_vault_from_config,
+)
 
 logger = parent_logger.getChild("mgr")
 
@@ -43,6 +49,8 @@ class SecretsMgr:
 
     vault: Vault | None
     secrets: Secrets
+    _git_matcher: SecretsMatcher
+    _registry_matcher: SecretsMatcher
 
     def __init__(
         self, secrets: Secrets, *, vault_config: VaultConfig | None = None
@@ -56,6 +64,8 @@ class SecretsMgr:
 
         # propagate exceptions, if any.
         self.secrets = secrets
+        self._git_matcher = SecretsMatcher(list(secrets.git.keys()))
+        self._registry_matcher = SecretsMatcher(list(secrets.registry.keys()))
 
         if self.vault:
             try:
@@ -68,7 +78,9 @@ class SecretsMgr:
     @contextmanager
     def git_url_for(self, url: str) -> Generator[MaybeSecure]:
         """Obtain git url with credentials for specified URL, if any."""
-        with git_url_for(url, self.secrets.git, self.vault) as git_url:
+        with git_url_for(
+            url, self.secrets.git, self.vault, matcher=self._git_matcher
+        ) as git_url:
             yield git_url
 
     def s3_creds(self, url: str) -> tuple[str, str, str]:
@@ -92,12 +104,18 @@ class SecretsMgr:
 
     def registry_creds(self, uri: str) -> tuple[str, str, str]:
         """Obtain registry credentials for the specified registry ID, if any."""
-        return registry_get_creds(uri, self.secrets.registry, self.vault)
+        return registry_get_creds(
+            uri, self.secrets.registry, self.vault, matcher=self._registry_matcher
+        )
 
     def has_vault(self) -> bool:
         """Check whether a vault is configured."""
         return self.vault is not None
 
+    def vault_cache_stats(self) -> VaultCacheStats | None:
+        """Obtain the vault session's cache counters, if a vault is configured."""
+        return self.vault.cache_stats() if self.vault else None
+
     def has_s3_creds(self, url: str) -> bool:
         return self.secrets.storage.get(url) is not None
 
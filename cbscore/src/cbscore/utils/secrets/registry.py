@@ -18,7 +18,7 @@ from cbscore.utils.secrets.models import (
     RegistrySecret,
     RegistryVaultSecret,
 )
-from cbscore.utils.secrets.utils import find_best_secret_candidate
+from cbscore.utils.secrets.utils import SecretsMatcher
 from cbscore.utils.vault import Vault, VaultError
 
 logger = parent_logger.getChild("registry")
@@ -51,13 +51,18 @@ def registry_get_creds(
     uri: str,
     secrets: dict[str, RegistrySecret],
     vault: Vault | None,
+    *,
+    matcher: SecretsMatcher | None = None,
 ) -> tuple[str, str, str]:
     """
     Obtain registry credentials for a given id.
 
+    If `matcher` is provided, it must have been compiled from `secrets`.
+
     Returns a tuple with (address, username, password).
     """
-    best_entry = find_best_secret_candidate(list(secrets.keys()), uri)
+    matcher = matcher or SecretsMatcher(list(secrets.keys()))
+    best_entry = matcher.find(uri)
     if not best_entry:
         msg = f"secret for uri '{uri}' not found"
         logger.warning(msg)
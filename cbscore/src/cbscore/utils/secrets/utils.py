@@ -12,7 +12,7 @@
 # GNU General Public License for more details.
 
 from cbscore.utils.secrets import logger as parent_logger
-from cbscore.utils.uris import URIError, matches_uri
+from cbscore.utils.uris import URIError, matches_uri, split_uri
 
 logger = parent_logger.getChild("utils")
 
@@ -48,6 +48,122 @@ def find_best_secret_candidate(secrets: list[str], uri: str) -> str | None:
     return best_candidate[0] if best_candidate else None
 
 
+class _TrieNode:
+    """A path segment in the secrets trie, and the secrets ending at it."""
+
+    children: dict[str, "_TrieNode"]
+    # the secrets' order, and protocol, if any.
+    secrets: list[tuple[int, str | None]]
+
+    def __init__(self) -> None:
+        self.children = {}
+        self.secrets = []
+
+
+class SecretsMatcher:
+    """
+    Find the best candidate secret for a uri, as `find_best_secret_candidate()` does.
+
+    Secrets are compiled into a trie, keyed by host and then path segments, so
+    finding the candidates for a uri takes a walk down its path. Results are
+    memoized per uri.
+
+    The original matcher treats the dots in a secret's path as regex wildcards. For
+    the same results, secrets with dots in their path are matched the original way.
+    """
+
+    secrets: list[str]
+    _hosts: dict[str, _TrieNode]
+    # secrets matched the original way, and their order.
+    _fallback: list[tuple[int, str]]
+    _memo: dict[str, str | None]
+
+    def __init__(self, secrets: list[str]) -> None:
+        self.secrets = secrets
+        self._hosts = {}
+        self._fallback = []
+        self._memo = {}
+
+        for idx, target in enumerate(secrets):
+            split = split_uri(target)
+            if not split:
+                # never matches anything.
+                continue
+
+            protocol, host, segments = split
+            if any("." in seg for seg in segments):
+                self._fallback.append((idx, target))
+                continue
+
+            node = self._hosts.setdefault(host, _TrieNode())
+            for seg in segments:
+                node = node.children.setdefault(seg, _TrieNode())
+            node.secrets.append((idx, protocol))
+
+    def _candidates(self, uri: str) -> list[tuple[int, bool, int]]:
+        """
+        Find the secrets matching 'uri'.
+
+        Returns the matching secrets' order, whether they fully match, and how many
+        '/' are left in the remainder path if not.
+        """
+        split = split_uri(uri)
+        if not split:
+            return []
+
+        protocol, host, segments = split
+        candidates: list[tuple[int, bool, int]] = []
+
+        node = self._hosts.get(host)
+        depth = 0
+        while node:
+            for idx, target_protocol in node.secrets:
+                if target_protocol and protocol and target_protocol != protocol:
+                    continue
+                full_match = depth == len(segments)
+                remainder_slashes = 0 if full_match else len(segments) - depth - 1
+                candidates.append((idx, full_match, remainder_slashes))
+
+            if depth == len(segments):
+                break
+            node = node.children.get(segments[depth])
+            depth += 1
+
+        for idx, target in self._fallback:
+            try:
+                matches, full_match, remainder = matches_uri(target, uri)
+            except URIError as e:
+                logger.error(
+                    f"unexpected error matching uri '{uri}' against '{target}': {e}"
+                )
+                continue
+
+            if matches:
+                remainder_slashes = remainder.count("/") if remainder else 0
+                candidates.append((idx, full_match, remainder_slashes))
+
+        return sorted(candidates)
+
+    def find(self, uri: str) -> str | None:
+        """Find the best candidate secret for 'uri', if any."""
+        if uri in self._memo:
+            return self._memo[uri]
+
+        # the first full match wins; otherwise, the first match with the fewest
+        # path segments left over.
+        best: tuple[int, int] | None = None
+        for idx, full_match, remainder_slashes in self._candidates(uri):
+            if full_match:
+                best = (idx, -1)
+                break
+            if not best or remainder_slashes < best[1]:
+                best = (idx, remainder_slashes)
+
+        res = self.secrets[best[0]] if best else None
+        self._memo[uri] = res
+        return res
+
+
 #
 # kludge to test finding the best secret candidate from a list of secrets.
 #
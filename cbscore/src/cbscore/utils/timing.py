@@ -0,0 +1,171 @@
+# CES library - timing utils
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+"""
+Lightweight tracing of where a build's wall-clock time goes.
+
+A trace is started with `trace()`, and nested spans with `span()`. Spans nest
+following the current context, so spans started from concurrent tasks spawned
+within a span become its children. Besides their duration, spans account for bytes
+moved and subprocesses run while they were current, through `add_bytes_uploaded()`,
+`add_bytes_downloaded()`, and `count_subprocess()`. Counts are inclusive of nested
+spans.
+
+Outside of a trace, all of these are no-ops, so library code can be instrumented
+without caring whether someone is tracing it.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import time
+from collections.abc import Generator, Iterator
+from contextvars import ContextVar
+from datetime import datetime as dt
+
+import pydantic
+
+
+class TimingSpan(pydantic.BaseModel):
+    """A timed span of work, and the spans nested in it."""
+
+    name: str
+    start_secs: float = 0.0
+    """Seconds since the start of the trace."""
+
+    duration_secs: float | None = None
+    """Seconds the span took, `None` if it never finished."""
+
+    failed: bool = False
+    bytes_uploaded: int = 0
+    bytes_downloaded: int = 0
+    subprocesses: int = 0
+    spans: list[TimingSpan] = []
+
+    def walk(self, prefix: str = "") -> Iterator[tuple[str, TimingSpan]]:
+        """Iterate over this span and its descendants, with their '/'-joined path."""
+        path = f"{prefix}/{self.name}" if prefix else self.name
+        yield (path, self)
+        for child in self.spans:
+            yield from child.walk(path)
+
+
+class TimingReport(pydantic.BaseModel):
+    """A complete trace, rooted at a single span."""
+
+    started: dt
+    root: TimingSpan
+
+
+# the current trace's monotonic start time, and the current span.
+_current: ContextVar[tuple[float, TimingSpan] | None] = ContextVar(
+    "cbscore_timing_current", default=None
+)
+
+
+def _roll_up(parent: TimingSpan, child: TimingSpan) -> None:
+    parent.bytes_uploaded += child.bytes_uploaded
+    parent.bytes_downloaded += child.bytes_downloaded
+    parent.subprocesses += child.subprocesses
+
+
+@contextlib.contextmanager
+def trace(name: str) -> Generator[TimingReport]:
+    """Start a new trace, whose root span is named `name`."""
+    report = TimingReport(started=dt.now(tz=datetime.UTC), root=TimingSpan(name=name))
+    t0 = time.monotonic()
+    token = _current.set((t0, report.root))
+    try:
+        yield report
+    except BaseException:
+        report.root.failed = True
+        raise
+    finally:
+        report.root.duration_secs = time.monotonic() - t0
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str) -> Generator[TimingSpan | None]:
+    """Time a span of work, nested in the current span, if we are tracing."""
+    current = _current.get()
+    if not current:
+        yield None
+        return
+
+    t0, parent = current
+    start = time.monotonic()
+    s = TimingSpan(name=name, start_secs=start - t0)
+    parent.spans.append(s)
+    token = _current.set((t0, s))
+    try:
+        yield s
+    except BaseException:
+        s.failed = True
+        raise
+    finally:
+        s.duration_secs = time.monotonic() - start
+        _current.reset(token)
+        _roll_up(parent, s)
+
+
+def add_bytes_uploaded(n: int) -> None:
+    """Account for `n` bytes uploaded in the current span."""
+    if current := _current.get():
+        current[1].bytes_uploaded += n
+
+
+def add_bytes_downloaded(n: int) -> None:
+    """Account for `n` bytes downloaded in the current span."""
+    if current := _current.get():
+        current[1].bytes_downloaded += n
+
+
+def count_subprocess() -> None:
+    """Account for a subprocess run in the current span."""
+    if current := _current.get():
+        current[1].subprocesses += 1
+
+
+def _fmt_bytes(n: int) -> str:
+    size = float(n)
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def format_timings(report: TimingReport) -> list[str]:
+    """Format a trace as a human-readable tree, one line per span."""
+
+    def _fmt(s: TimingSpan, depth: int) -> Iterator[str]:
+        duration = (
+            f"{s.duration_secs:9.1f}s" if s.duration_secs is not None else "        ?"
+        )
+        extra: list[str] = []
+        if s.subprocesses:
+            extra.append(f"{s.subprocesses} procs")
+        if s.bytes_uploaded:
+            extra.append(f"up {_fmt_bytes(s.bytes_uploaded)}")
+        if s.bytes_downloaded:
+            extra.append(f"down {_fmt_bytes(s.bytes_downloaded)}")
+        if s.failed:
+            extra.append("FAILED")
+        name = f"{'  ' * depth}{s.name}"
+        yield f"{name:<48} {duration}  {', '.join(extra)}".rstrip()
+        for child in s.spans:
+            yield from _fmt(child, depth + 1)
+
+    return list(_fmt(report.root, 0))
@@ -24,6 +24,33 @@ class URIError(CESError):
     pass
 
 
+_URI_RE = re.compile(
+    r"""
+    ^
+    (?:(?P<protocol>git|https?|ssh)://)?
+    (?P<host>[\w\.\-]+)
+    (?P<path>(?:/[\w\.\-]+)*)?/?
+    $
+    """,
+    re.VERBOSE,
+)
+
+
+def split_uri(uri: str) -> tuple[str | None, str, list[str]] | None:
+    """
+    Split a URI into its protocol, if any, host, and path segments.
+
+    URIs are split as they are matched by `matches_uri()`, sans any '.git' suffix.
+    Returns `None` if the URI can't be matched.
+    """
+    uri_m = _URI_RE.match(re.sub(r"\.git$", "", uri))
+    if not uri_m:
+        return None
+
+    path = uri_m.group("path") or ""
+    return (uri_m.group("protocol"), uri_m.group("host"), path.split("/")[1:])
+
+
 def matches_uri(pattern: str, uri: str) -> tuple[bool, bool, str | None]:
     """
     Match a given pattern against the provided URI.
@@ -32,23 +59,12 @@ def matches_uri(pattern: str, uri: str) -> tuple[bool, bool, str | None]:
     it is a full match on the path. Additionally, if it's a partial match, return the
     remainder path.
     """
-    uri_re = re.compile(
-        r"""
-        ^
-        (?:(?P<protocol>git|https?|ssh)://)?
-        (?P<host>[\w\.\-]+)
-        (?P<path>(?:/[\w\.\-]+)*)?/?
-        $
-        """,
-        re.VERBOSE,
-    )
-
     # drop '.git' suffix from both pattern and url for matching purposes, if any.
     pattern = re.sub(r"\.git$", "", pattern)
     uri = re.sub(r"\.git$", "", uri)
 
-    pattern_m = uri_re.match(pattern)
-    uri_m = uri_re.match(uri)
+    pattern_m = _URI_RE.match(pattern)
+    uri_m = _URI_RE.match(uri)
     if not pattern_m or not uri_m:
         return (False, False, None)
 
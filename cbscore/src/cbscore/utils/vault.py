@@ -15,13 +15,26 @@
 # pyright: reportExplicitAny=false
 # pyright: reportUnknownVariableType=false
 
+"""
+Hashicorp Vault backends.
+
+Backends configured with the same address and credentials share a process-wide
+session: a logged-in client, whose token is reused, and renewed, until its lease
+expires, and only then logs in again. Secrets read through a session are cached in
+memory for their lease's duration, or a default TTL for secrets without a lease, as
+is the case for KV v2, bounded by the token's lease.
+"""
+
 import abc
+import threading
+import time
 from collections.abc import Generator
 from contextlib import contextmanager
-from typing import override
+from typing import Any, override
 
 import hvac
 import hvac.exceptions
+import pydantic
 
 from cbscore.config import VaultConfig
 from cbscore.errors import CESError
@@ -36,43 +49,216 @@ class VaultError(CESError):
         return f"Vault Error: {self.msg}"
 
 
-# FIXME: vault backends currently login to vault on each client request.
-# We should cache the token somehow.
+class _VaultTokenError(VaultError):
+    """The session's token was rejected by vault, e.g. because it was revoked."""
+
+
+# renew tokens this long before their lease expires.
+_TOKEN_RENEW_MARGIN_SECS = 60.0
+# how long we cache secrets without a lease of their own.
+_SECRET_DEFAULT_TTL_SECS = 300.0
+
+
+class VaultCacheStats(pydantic.BaseModel):
+    """Counters for a Vault session's token and secrets cache."""
+
+    hits: int = 0
+    misses: int = 0
+    logins: int = 0
+    renewals: int = 0
+
+
+class _VaultSession:
+    """A logged-in client, and the secrets read through it."""
+
+    lock: threading.Lock
+    client: hvac.Client | None
+    # monotonic time the token expires at, 'None' if it doesn't.
+    token_expires: float | None
+    token_renewable: bool
+    # secret paths to the monotonic time they expire at, and their entry.
+    secrets: dict[str, tuple[float, dict[str, str]]]
+    stats: VaultCacheStats
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.client = None
+        self.token_expires = None
+        self.token_renewable = False
+        self.secrets = {}
+        self.stats = VaultCacheStats()
+
+    def set_lease(self, auth: dict[str, Any] | None) -> None:
+        lease_secs = int(auth.get("lease_duration", 0)) if auth else 0
+        self.token_expires = time.monotonic() + lease_secs if lease_secs else None
+        self.token_renewable = bool(auth.get("renewable", False)) if auth else False
+
+    def reset(self) -> None:
+        self.client = None
+        self.token_expires = None
+        self.token_renewable = False
+        self.secrets.clear()
+
+
+_sessions: dict[tuple[str, ...], _VaultSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def _get_session(key: tuple[str, ...]) -> _VaultSession:
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if not session:
+            session = _VaultSession()
+            _sessions[key] = session
+        return session
 
 
 class Vault(abc.ABC):
     addr: str
+    _session: _VaultSession | None
 
     def __init__(self, addr: str) -> None:
         self.addr = addr
+        self._session = None
         if not self.addr:
             raise VaultError(msg="missing vault address")
 
     @abc.abstractmethod
+    def _session_key(self) -> tuple[str, ...]:
+        """Identify the backend's credentials, to share sessions by."""
+        pass
+
+    @abc.abstractmethod
+    def _login(self, client: hvac.Client) -> dict[str, Any] | None:
+        """Log 'client' in, returning the login's 'auth' response, if any."""
+        pass
+
+    @property
+    def session(self) -> _VaultSession:
+        if not self._session:
+            self._session = _get_session((self.addr, *self._session_key()))
+        return self._session
+
+    def _get_client(self) -> hvac.Client:
+        """Obtain the session's client, renewing its token or logging in if needed."""
+        session = self.session
+        with session.lock:
+            now = time.monotonic()
+            if session.client and (
+                session.token_expires is None
+                or now < session.token_expires - _TOKEN_RENEW_MARGIN_SECS
+            ):
+                return session.client
+
+            if (
+                session.client
+                and session.token_renewable
+                and session.token_expires
+                and now < session.token_expires
+            ):
+                try:
+                    res = session.client.auth.token.renew_self()
+                except Exception as e:
+                    logger.debug(f"unable to renew vault token, login again: {e}")
+                else:
+                    session.set_lease(res.get("auth"))
+                    session.stats.renewals += 1
+                    logger.debug("renewed vault token")
+                    return session.client
+
+            client = hvac.Client(url=self.addr)
+            auth = self._login(client)
+            session.reset()
+            session.client = client
+            session.set_lease(auth)
+            session.stats.logins += 1
+            return client
+
+    def _drop_client(self) -> None:
+        """Drop the session's client, e.g. if its token was revoked."""
+        session = self.session
+        with session.lock:
+            session.reset()
+
     @contextmanager
     def client(self) -> Generator[hvac.Client]:
-        pass
+        yield self._get_client()
 
-    def read_secret(self, path: str) -> dict[str, str]:
+    def _token_rejected(self, client: hvac.Client) -> bool:
+        """Check whether vault rejects the client's token, rather than a request."""
         try:
-            with self.client() as client:
+            _ = client.auth.token.lookup_self()
+        except (hvac.exceptions.Forbidden, hvac.exceptions.Unauthorized):
+            return True
+        except Exception as e:
+            logger.debug(f"unable to look up vault token: {e}")
+        return False
+
+    def _read_secret(self, path: str) -> tuple[dict[str, str], float]:
+        """Read a secret from vault, returning its entry and how long it's valid for."""
+        with self.client() as client:
+            try:
                 res = client.secrets.kv.v2.read_secret_version(
                     path=path,
                     mount_point="ces-kv",
                     raise_on_deleted_version=False,
                 )
                 logger.debug(f"obtained secret '{path}' from vault")
-        except hvac.exceptions.Forbidden:
-            raise VaultError(msg="permission denied obtaining secret") from None
-        except Exception as e:
-            raise VaultError(msg=f"error obtaining secret: {e}") from e
+            except hvac.exceptions.Unauthorized:
+                raise _VaultTokenError(msg="token rejected obtaining secret") from None
+            except hvac.exceptions.Forbidden:
+                # vault denies requests with invalid tokens, and requests for paths
+                # the token's policies don't allow, alike.
+                if self._token_rejected(client):
+                    raise _VaultTokenError(
+                        msg="token rejected obtaining secret"
+                    ) from None
+                raise VaultError(msg="permission denied obtaining secret") from None
+            except Exception as e:
+                raise VaultError(msg=f"error obtaining secret: {e}") from e
 
         try:
             entry = res["data"]["data"]
         except KeyError as e:
             raise VaultError(msg=f"error obtaining secret's entry: {e}") from None
 
-        return entry
+        lease_secs = float(res.get("lease_duration") or 0)
+        return entry, lease_secs if lease_secs > 0 else _SECRET_DEFAULT_TTL_SECS
+
+    def read_secret(self, path: str) -> dict[str, str]:
+        session = self.session
+        with session.lock:
+            cached = session.secrets.get(path)
+            if cached and time.monotonic() < cached[0]:
+                session.stats.hits += 1
+                return dict(cached[1])
+            session.stats.misses += 1
+
+        logins = self.cache_stats().logins
+        try:
+            entry, ttl = self._read_secret(path)
+        except _VaultTokenError:
+            if self.cache_stats().logins != logins:
+                raise
+            # we reused our token, and it's been revoked or expired. Retry once, with
+            # a new login.
+            logger.debug(f"error obtaining secret '{path}', retry with new login")
+            self._drop_client()
+            entry, ttl = self._read_secret(path)
+
+        with session.lock:
+            expires = time.monotonic() + ttl
+            if session.token_expires is not None:
+                expires = min(expires, session.token_expires)
+            session.secrets[path] = (expires, entry)
+
+        return dict(entry)
+
+    def cache_stats(self) -> VaultCacheStats:
+        """Obtain the session's cache counters."""
+        session = self.session
+        with session.lock:
+            return session.stats.model_copy()
 
     def check_vault_connection(self) -> None:
         try:
@@ -98,11 +284,13 @@ class VaultAppRoleBackend(Vault):
         self.secret_id = secret_id
 
     @override
-    @contextmanager
-    def client(self) -> Generator[hvac.Client]:
-        client = hvac.Client(url=self.addr)
+    def _session_key(self) -> tuple[str, ...]:
+        return ("approle", self.role_id, self.secret_id)
+
+    @override
+    def _login(self, client: hvac.Client) -> dict[str, Any] | None:
         try:
-            client.auth.approle.login(
+            res = client.auth.approle.login(
                 role_id=self.role_id,
                 secret_id=self.secret_id,
                 use_token=True,
@@ -113,7 +301,7 @@ class VaultAppRoleBackend(Vault):
         except Exception as e:
             raise VaultError(msg=f"error logging in to vault: {e}") from None
 
-        yield client
+        return res.get("auth")
 
 
 class VaultUserPassBackend(Vault):
@@ -130,11 +318,13 @@ class VaultUserPassBackend(Vault):
         self.password = password
 
     @override
-    @contextmanager
-    def client(self) -> Generator[hvac.Client]:
-        client = hvac.Client(url=self.addr)
+    def _session_key(self) -> tuple[str, ...]:
+        return ("userpass", self.username, self.password)
+
+    @override
+    def _login(self, client: hvac.Client) -> dict[str, Any] | None:
         try:
-            client.auth.userpass.login(
+            res = client.auth.userpass.login(
                 username=self.username, password=self.password, use_token=True
             )
             logger.debug("userpass logged in to vault")
@@ -143,7 +333,7 @@ class VaultUserPassBackend(Vault):
         except Exception as e:
             raise VaultError(msg=f"error logging in to vault: {e}") from e
 
-        yield client
+        return res.get("auth")
 
 
 class VaultTokenBackend(Vault):
@@ -156,10 +346,14 @@ class VaultTokenBackend(Vault):
         self.token = token
 
     @override
-    @contextmanager
-    def client(self) -> Generator[hvac.Client]:
-        client = hvac.Client(url=self.addr, token=self.token)
-        yield client
+    def _session_key(self) -> tuple[str, ...]:
+        return ("token", self.token)
+
+    @override
+    def _login(self, client: hvac.Client) -> dict[str, Any] | None:
+        # nothing to log in with, the token is used as is.
+        client.token = self.token
+        return None
 
 
 def get_vault_from_config(vault_config: VaultConfig) -> Vault:
@@ -38,7 +38,7 @@ from cbslib.logger import (
     setup_global_logging,
     uvicorn_logging_config,
 )
-from cbslib.routes import auth, builds, components, periodic
+from cbslib.routes import auth, builds, components, metrics, periodic
 from cbslib.worker.celery import celery_app
 from fastapi import FastAPI
 from starlette.middleware.sessions import SessionMiddleware
@@ -125,6 +125,7 @@ def factory() -> FastAPI:
     api.include_router(builds.router)
     api.include_router(components.router)
     api.include_router(periodic.router)
+    app.include_router(metrics.router)
     app.mount("/api", api)
 
     return app
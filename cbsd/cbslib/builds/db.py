@@ -16,19 +16,73 @@ from __future__ import annotations
 import asyncio
 import datetime
 import dbm
+import functools
+import sqlite3
+from collections.abc import Awaitable, Callable
 from datetime import datetime as dt
 from pathlib import Path
+from typing import Any
 
 import pydantic
 from cbscore.errors import CESError
+from cbscore.utils.timing import TimingReport
+from cbsdcore.api.responses import BuildPhaseTiming
 from cbsdcore.builds.types import BuildEntry, BuildID, EntryState
 
 from cbslib.builds import logger as parent_logger
+from cbslib.core import metrics
 
 logger = parent_logger.getChild("db")
 
 
-_BUILDS_DB_FILE = "builds.db"
+# legacy dbm-backed database file, migrated on first start.
+_LEGACY_BUILDS_DB_FILE = "builds.db"
+_BUILDS_DB_FILE = "builds.sqlite"
+
+_BUILDS_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    build_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    state TEXT NOT NULL,
+    submitted REAL NOT NULL,
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS builds_user_idx ON builds (user, build_id);
+CREATE INDEX IF NOT EXISTS builds_state_idx ON builds (state, build_id);
+CREATE INDEX IF NOT EXISTS builds_submitted_idx ON builds (submitted);
+CREATE INDEX IF NOT EXISTS builds_channel_idx ON builds (channel, build_id);
+CREATE TABLE IF NOT EXISTS active_builds (
+    build_id INTEGER PRIMARY KEY REFERENCES builds (build_id)
+);
+CREATE TABLE IF NOT EXISTS build_phases (
+    build_id INTEGER NOT NULL REFERENCES builds (build_id),
+    phase TEXT NOT NULL,
+    start REAL NOT NULL,
+    duration REAL,
+    failed INTEGER NOT NULL,
+    bytes_uploaded INTEGER NOT NULL,
+    bytes_downloaded INTEGER NOT NULL,
+    subprocesses INTEGER NOT NULL,
+    PRIMARY KEY (build_id, phase)
+);
+CREATE INDEX IF NOT EXISTS build_phases_phase_idx ON build_phases (phase, build_id);
+"""
+
+# bump whenever an existing database requires an upgrade step in '_upgrade_db()'.
+_BUILDS_DB_SCHEMA_VERSION = 1
+
+# builds in these states will never transition again.
+_TERMINAL_STATES = {
+    EntryState.success,
+    EntryState.failure,
+    EntryState.revoked,
+    EntryState.rejected,
+}
+
+# number of entries garbage collected per transaction.
+_GC_BATCH_SIZE = 100
 
 
 class BuildsDBError(CESError):
@@ -49,79 +103,191 @@ class MalformedBuildEntryError(BuildsDBError):
         super().__init__(f"malformed build entry for build ID {build_id} in database")
 
 
-class MalformedDBRootError(BuildsDBError):
-    """DB Root entry in database is malformed."""
+class DBBuildEntry(pydantic.BaseModel):
+    """Individual build entry in the builds database."""
 
-    def __init__(self) -> None:
-        super().__init__("malformed builds DB root entry in database")
+    build_id: BuildID
+    entry: BuildEntry
 
 
-class _DBRoot(pydantic.BaseModel):
-    """Builds database root entry."""
+class BuildsDBGCStats(pydantic.BaseModel):
+    """Statistics for a builds database garbage collection run."""
 
-    last_build_id: BuildID
+    visited: int = 0
+    collected: int = 0
+    malformed: int = 0
+    duration_secs: float = 0.0
 
-    @property
-    def next_build_id(self) -> int:
-        """Increment and return the next build ID."""
-        self.last_build_id += 1
-        return self.last_build_id
 
-    def save(self, path: Path) -> None:
-        """Store the builds DB root back to disk."""
-        try:
-            with dbm.open(path, flag="c") as db:
-                db["builds_root"] = self.model_dump_json()
-        except Exception as e:
-            msg = f"failed to save builds db root: {e}"
-            logger.error(msg)
-            raise BuildsDBError(msg) from e
+class BuildsQuery(pydantic.BaseModel):
+    """
+    Filters and pagination for listing build entries.
 
-    @classmethod
-    def load(cls, path: Path) -> _DBRoot:
-        """Load the builds DB root from disk."""
-        try:
-            with dbm.open(path, flag="c") as db:
-                if "builds_root" in db:
-                    data = db["builds_root"]
-                    return _DBRoot.model_validate_json(data)
-                else:
-                    logger.info("builds db root not found, creating new")
-                    return cls(last_build_id=0)
+    Pagination is keyset based: 'after_id' is the last build ID seen on the previous
+    page, and the next page holds the entries following it in the requested order.
+    If 'max_entries' is None, all matching entries are listed.
 
-        except pydantic.ValidationError as e:
-            logger.error(f"malformed builds db root in db:\n{e}")
-            raise MalformedDBRootError() from e
+    'version_glob' follows shell-like glob semantics (e.g., 'ces-v25.*').
+    """
 
-        except Exception as e:
-            msg = f"failed to load builds db root: {e}"
-            logger.error(msg)
-            raise BuildsDBError(msg) from e
+    owner: str | None = None
+    states: list[EntryState] | None = None
+    channel: str | None = None
+    version_glob: str | None = None
+    submitted_since: dt | None = None
+    submitted_until: dt | None = None
+    after_id: BuildID | None = None
+    max_entries: int | None = None
+    newest_first: bool = False
 
 
-class DBBuildEntry(pydantic.BaseModel):
-    """Individual build entry in the builds database."""
+def _timed[**P, R](
+    op: str,
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Account for the time taken by a database operation, waiting on locks included."""
 
-    build_id: BuildID
-    entry: BuildEntry
+    def decorator(fn: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with metrics.DB_OP_LATENCY.labels(op).time():
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _entry_row(entry: BuildEntry) -> dict[str, Any]:  # pyright: ignore[reportExplicitAny]
+    """Obtain the indexed columns, and serialized entry, for a given build entry."""
+    return {
+        "user": entry.user,
+        "state": entry.state.value,
+        "submitted": entry.submitted.timestamp(),
+        "channel": entry.desc.channel,
+        "version": entry.desc.version,
+        "entry": entry.model_dump_json(),
+    }
+
+
+def _update_active(
+    conn: sqlite3.Connection, build_id: BuildID, entry: BuildEntry
+) -> None:
+    """Keep the active builds set in sync with an entry's state."""
+    if entry.state in _TERMINAL_STATES:
+        _ = conn.execute("DELETE FROM active_builds WHERE build_id = ?", (build_id,))
+    else:
+        _ = conn.execute(
+            "INSERT OR IGNORE INTO active_builds (build_id) VALUES (?)", (build_id,)
+        )
+
+
+def _upgrade_db(conn: sqlite3.Connection) -> None:
+    """Upgrade an existing database to the current schema version."""
+    version = int(
+        conn.execute("PRAGMA user_version").fetchone()[0]  # pyright: ignore[reportAny]
+    )
+    if version >= _BUILDS_DB_SCHEMA_VERSION:
+        return
+
+    logger.info(
+        f"upgrading builds db schema from version {version} "
+        + f"to {_BUILDS_DB_SCHEMA_VERSION}"
+    )
+    with conn:
+        if version < 1:
+            # populate the active builds set, once, from existing entries.
+            _ = conn.execute(
+                """
+                INSERT OR IGNORE INTO active_builds (build_id)
+                SELECT build_id FROM builds
+                WHERE state NOT IN ('SUCCESS', 'FAILURE', 'REVOKED', 'REJECTED')
+                """
+            )
+        _ = conn.execute(f"PRAGMA user_version = {_BUILDS_DB_SCHEMA_VERSION}")
+
+
+def _migrate_legacy_db(legacy_path: Path, conn: sqlite3.Connection) -> int:
+    """
+    Migrate build entries from the legacy dbm-backed builds database.
+
+    Build IDs are kept as they were, and the sqlite sequence is bumped to the legacy
+    database's last build ID, so we never reuse IDs of entries that went missing.
+    Returns the number of migrated entries.
+    """
+    logger.info(f"migrating legacy builds db at '{legacy_path}'")
+
+    migrated = 0
+    with dbm.open(str(legacy_path), flag="r") as db:
+        if "builds_root" not in db:
+            logger.info("legacy builds db has no root entry, nothing to migrate")
+            return 0
 
-    def save(self, path: Path) -> None:
-        """Store the build entry back to disk."""
         try:
-            with dbm.open(path, flag="c") as db:
-                db[f"build_{self.build_id}"] = self.model_dump_json()
-        except Exception as e:
-            msg = f"failed to save build entry {self.build_id}: {e}"
+            root = pydantic.TypeAdapter(dict[str, int]).validate_json(db["builds_root"])
+            last_build_id = root["last_build_id"]
+        except (pydantic.ValidationError, KeyError) as e:
+            msg = f"malformed legacy builds db root: {e}"
             logger.error(msg)
             raise BuildsDBError(msg) from e
 
+        with conn:
+            for build_id in range(1, last_build_id + 1):
+                key = f"build_{build_id}"
+                if key not in db:
+                    logger.warning(f"legacy build entry {build_id} missing, skipping")
+                    continue
+
+                try:
+                    db_entry = DBBuildEntry.model_validate_json(db[key])
+                except pydantic.ValidationError as e:
+                    logger.warning(
+                        f"malformed legacy build entry {build_id}, skipping:\n{e}"
+                    )
+                    continue
+
+                _ = conn.execute(
+                    """
+                    INSERT OR REPLACE INTO builds
+                        (build_id, user, state, submitted, channel, version, entry)
+                    VALUES
+                        (:build_id, :user, :state, :submitted, :channel, :version,
+                         :entry)
+                    """,
+                    {"build_id": build_id, **_entry_row(db_entry.entry)},
+                )
+                _update_active(conn, build_id, db_entry.entry)
+                migrated += 1
+
+            # ensure new build IDs follow the legacy database's last build ID.
+            _ = conn.execute(
+                "DELETE FROM sqlite_sequence WHERE name = 'builds'",
+            )
+            _ = conn.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES ('builds', ?)",
+                (last_build_id,),
+            )
+
+    return migrated
+
 
 class BuildsDB:
-    """Interface to the builds database."""
+    """
+    Interface to the builds database.
+
+    Build entries are kept in a sqlite database, through a single long-lived
+    connection in WAL mode. Besides the serialized build entry, the entry's user,
+    state, submission time, channel, and version are kept as indexed columns, so
+    listing builds can be filtered and paginated by the database itself.
+
+    The IDs of builds yet to reach a terminal state are kept in a separate set,
+    updated on every state transition, so that garbage collection and recovery only
+    ever need to look at the builds that may still be running.
+    """
 
     _db_path: Path
-    _root: _DBRoot
+    _conn: sqlite3.Connection
     _lock: asyncio.Lock
+    _last_gc_stats: BuildsDBGCStats | None
 
     def __init__(self, db_path: Path) -> None:
         if not db_path.exists():
@@ -133,161 +299,468 @@ class BuildsDB:
             raise BuildsDBError(msg)
 
         self._db_path = db_path / _BUILDS_DB_FILE
-        # propagate exceptions
-        self._root = _DBRoot.load(self._db_path)
+
+        try:
+            # all accesses are serialized through our lock, we can safely share the
+            # connection between threads.
+            self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            _ = self._conn.execute("PRAGMA journal_mode=WAL")
+            _ = self._conn.execute("PRAGMA synchronous=NORMAL")
+            _ = self._conn.executescript(_BUILDS_DB_SCHEMA)
+            _upgrade_db(self._conn)
+        except sqlite3.Error as e:
+            msg = f"failed to open builds db at '{self._db_path}': {e}"
+            logger.error(msg)
+            raise BuildsDBError(msg) from e
+
+        # migration is idempotent, and the legacy database is moved out of the way
+        # once it succeeds. Should it fail, we'll retry on the next start.
+        legacy_path = db_path / _LEGACY_BUILDS_DB_FILE
+        if legacy_path.exists():
+            try:
+                n = _migrate_legacy_db(legacy_path, self._conn)
+            except BuildsDBError as e:
+                raise e from None
+            except Exception as e:
+                msg = f"failed to migrate legacy builds db at '{legacy_path}': {e}"
+                logger.error(msg)
+                raise BuildsDBError(msg) from e
+
+            migrated_path = legacy_path.with_name(f"{legacy_path.name}.migrated")
+            _ = legacy_path.rename(migrated_path)
+            logger.info(
+                f"migrated {n} build entries from legacy builds db, "
+                + f"moved to '{migrated_path}'"
+            )
+
         self._lock = asyncio.Lock()
+        self._last_gc_stats = None
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
 
+    @_timed("new")
     async def new(self, entry: BuildEntry) -> BuildID:
         """Create a new build entry in the database."""
         async with self._lock:
-            build_id = self._root.next_build_id
-            db_entry = DBBuildEntry(build_id=build_id, entry=entry)
-            db_entry.save(self._db_path)
-            self._root.save(self._db_path)
-            return build_id
+            try:
+                with self._conn:
+                    cur = self._conn.execute(
+                        """
+                        INSERT INTO builds
+                            (user, state, submitted, channel, version, entry)
+                        VALUES
+                            (:user, :state, :submitted, :channel, :version, :entry)
+                        """,
+                        _entry_row(entry),
+                    )
+                    assert cur.lastrowid is not None
+                    _update_active(self._conn, cur.lastrowid, entry)
+            except sqlite3.Error as e:
+                msg = f"failed to create new build entry: {e}"
+                logger.error(msg)
+                raise BuildsDBError(msg) from e
+
+            return cur.lastrowid
 
+    @_timed("update")
     async def update(self, build_id: BuildID, entry: BuildEntry) -> None:
         """Update an existing build entry in the database."""
         async with self._lock:
-            if build_id < 1 or build_id > self._root.last_build_id:
-                msg = f"no such build ID {build_id} in database"
+            try:
+                with self._conn:
+                    cur = self._conn.execute(
+                        """
+                        UPDATE builds SET
+                            user = :user,
+                            state = :state,
+                            submitted = :submitted,
+                            channel = :channel,
+                            version = :version,
+                            entry = :entry
+                        WHERE build_id = :build_id
+                        """,
+                        {"build_id": build_id, **_entry_row(entry)},
+                    )
+                    if cur.rowcount > 0:
+                        _update_active(self._conn, build_id, entry)
+            except sqlite3.Error as e:
+                msg = f"failed to update build entry {build_id}: {e}"
                 logger.error(msg)
-                raise BuildsDBError(msg)
+                raise BuildsDBError(msg) from e
 
-            db_key = f"build_{build_id}"
+            if cur.rowcount == 0:
+                logger.error(f"build entry {build_id} missing from db")
+                raise NoSuchBuildError(build_id)
 
-            try:
-                with dbm.open(self._db_path, flag="c") as db:
-                    db_entry = DBBuildEntry.model_validate_json(db[db_key])
-                    db_entry.entry = entry
-                    db_entry.save(self._db_path)
+    @_timed("gc")
+    async def gc(self, *, keep: set[BuildID] | None = None) -> BuildsDBGCStats:
+        """
+        Garbage collect unfinished build entries from the database, marking them failed.
 
-            except pydantic.ValidationError as e:
-                logger.error(f"malformed build entry {build_id} in db:\n{e}")
-                raise MalformedBuildEntryError(build_id) from None
+        Only builds in the active builds set are visited. These are collected in
+        batches, each in its own transaction, releasing the database lock in-between.
+        Should we be interrupted, the next run will resume from the entries that were
+        yet to be collected.
 
-            except ValueError:
-                logger.error(f"build entry {build_id} missing from db")
-                raise NoSuchBuildError(build_id) from None
+        Builds in 'keep' are visited, but left untouched (e.g., builds that have been
+        recovered and are still running).
+        """
+        keep = keep if keep else set()
+        logger.info("starting builds db garbage collection")
+        start = dt.now(datetime.UTC)
+        stats = BuildsDBGCStats()
+
+        after_id = 0
+        while True:
+            async with self._lock:
+                try:
+                    last_id = self._gc_batch(after_id, keep, stats)
+                except sqlite3.Error as e:
+                    msg = f"failed to garbage collect builds db: {e}"
+                    logger.error(msg)
+                    raise BuildsDBError(msg) from e
+
+            if not last_id:
+                break
+            after_id = last_id
+            # let other tasks make progress between batches.
+            await asyncio.sleep(0)
+
+        stats.duration_secs = (dt.now(datetime.UTC) - start).total_seconds()
+        self._last_gc_stats = stats
+        metrics.DB_GC_VISITED.inc(stats.visited)
+        metrics.DB_GC_COLLECTED.inc(stats.collected)
+        metrics.DB_GC_MALFORMED.inc(stats.malformed)
+        logger.info(
+            "completed builds db garbage collection in "
+            + f"{stats.duration_secs} seconds, visited {stats.visited}, "
+            + f"collected {stats.collected}, malformed {stats.malformed}"
+        )
+        return stats
 
-            except Exception as e:
-                msg = f"failed to update build entry {build_id}: {e}"
+    def _gc_batch(
+        self, after_id: BuildID, keep: set[BuildID], stats: BuildsDBGCStats
+    ) -> BuildID | None:
+        """
+        Garbage collect a batch of active build entries, following 'after_id'.
+
+        Returns the last visited build ID, or None if there was nothing to visit.
+        """
+        rows = self._conn.execute(
+            """
+            SELECT a.build_id AS build_id, b.entry AS entry
+            FROM active_builds AS a LEFT JOIN builds AS b USING (build_id)
+            WHERE a.build_id > ?
+            ORDER BY a.build_id ASC
+            LIMIT ?
+            """,
+            (after_id, _GC_BATCH_SIZE),
+        ).fetchall()
+
+        if not rows:
+            return None
+
+        last_id: BuildID = after_id
+        with self._conn:
+            for row in rows:
+                build_id = int(row["build_id"])  # pyright: ignore[reportAny]
+                last_id = build_id
+                stats.visited += 1
+                if build_id in keep:
+                    continue
+
+                raw_entry = row["entry"]  # pyright: ignore[reportAny]
+                if raw_entry is None:
+                    logger.warning(f"active build {build_id} missing from db, drop")
+                    _ = self._conn.execute(
+                        "DELETE FROM active_builds WHERE build_id = ?", (build_id,)
+                    )
+                    continue
+
+                try:
+                    entry = BuildEntry.model_validate_json(
+                        raw_entry  # pyright: ignore[reportAny]
+                    )
+                except pydantic.ValidationError as e:
+                    logger.warning(
+                        f"malformed build entry {build_id} in db, skipping:\n{e}"
+                    )
+                    stats.malformed += 1
+                    continue
+
+                logger.info(f"garbage collecting build {build_id}, marking as FAILURE")
+                entry.state = EntryState.failure
+                _ = self._conn.execute(
+                    """
+                    UPDATE builds SET state = :state, entry = :entry
+                    WHERE build_id = :build_id
+                    """,
+                    {
+                        "build_id": build_id,
+                        "state": entry.state.value,
+                        "entry": entry.model_dump_json(),
+                    },
+                )
+                _update_active(self._conn, build_id, entry)
+                stats.collected += 1
+
+        return last_id
+
+    @_timed("ls_active")
+    async def ls_active(self) -> list[DBBuildEntry]:
+        """List build entries that have yet to reach a terminal state."""
+        async with self._lock:
+            try:
+                rows = self._conn.execute(
+                    """
+                    SELECT b.build_id AS build_id, b.entry AS entry
+                    FROM active_builds AS a JOIN builds AS b USING (build_id)
+                    ORDER BY b.build_id ASC
+                    """
+                ).fetchall()
+            except sqlite3.Error as e:
+                msg = f"failed to list active builds from db: {e}"
                 logger.error(msg)
                 raise BuildsDBError(msg) from e
 
-    async def gc(self) -> None:
-        """Garbage collect old build entries from the database, marking them failed."""
-        logger.info("starting builds db garbage collection")
-        start = dt.now(datetime.UTC)
+        return self._entries_from_rows(rows)
 
-        _ = await self._lock.acquire()
-        try:
-            with dbm.open(self._db_path, flag="c") as db:
-                for id in range(1, self._root.last_build_id + 1):
-                    key = f"build_{id}"
-                    if key not in db:
-                        logger.warning(f"build entry {id} missing from db, skipping")
-                        continue
-
-                    try:
-                        db_entry = DBBuildEntry.model_validate_json(db[key])
-                    except pydantic.ValidationError as e:
-                        logger.warning(
-                            f"malformed build entry {id} in db, skipping:\n{e}"
-                        )
-                        continue
-
-                    if db_entry.entry.state in {
-                        "SUCCESS",
-                        "FAILURE",
-                        "REVOKED",
-                        "REJECTED",
-                    }:
-                        continue
-
-                    logger.info(f"garbage collecting build {id}, marking as FAILURE")
-                    db_entry.entry.state = EntryState.failure
-                    db[key] = db_entry.model_dump_json()
-
-        except Exception as e:
-            msg = f"failed to garbage collect builds db: {e}"
-            logger.error(msg)
-            raise BuildsDBError(msg) from e
-        finally:
-            self._lock.release()
+    @_timed("count_by_state")
+    async def count_by_state(self) -> dict[EntryState, int]:
+        """Count build entries in the database, by state."""
+        async with self._lock:
+            try:
+                rows = self._conn.execute(
+                    "SELECT state, COUNT(*) AS n FROM builds GROUP BY state"
+                ).fetchall()
+            except sqlite3.Error as e:
+                msg = f"failed to count builds by state in db: {e}"
+                logger.error(msg)
+                raise BuildsDBError(msg) from e
 
-        delta = dt.now(datetime.UTC) - start
-        logger.info(
-            f"completed builds db garbage collection in {delta.total_seconds()} seconds"
-        )
+        counts = dict.fromkeys(EntryState, 0)
+        for row in rows:
+            try:
+                state = EntryState(row["state"])  # pyright: ignore[reportAny]
+            except ValueError:
+                logger.warning(f"unknown build state '{row['state']}' in db")
+                continue
+            counts[state] = int(row["n"])  # pyright: ignore[reportAny]
+
+        return counts
+
+    @_timed("put_phases")
+    async def put_phases(self, build_id: BuildID, timings: TimingReport) -> None:
+        """Store the timings of a build's phases, replacing any existing ones."""
+        rows = [
+            {
+                "build_id": build_id,
+                "phase": path,
+                "start": span.start_secs,
+                "duration": span.duration_secs,
+                "failed": span.failed,
+                "bytes_uploaded": span.bytes_uploaded,
+                "bytes_downloaded": span.bytes_downloaded,
+                "subprocesses": span.subprocesses,
+            }
+            for path, span in timings.root.walk()
+        ]
 
-    async def ls(
+        async with self._lock:
+            try:
+                with self._conn:
+                    _ = self._conn.execute(
+                        "DELETE FROM build_phases WHERE build_id = ?", (build_id,)
+                    )
+                    _ = self._conn.executemany(
+                        """
+                        INSERT OR REPLACE INTO build_phases
+                            (build_id, phase, start, duration, failed,
+                             bytes_uploaded, bytes_downloaded, subprocesses)
+                        VALUES
+                            (:build_id, :phase, :start, :duration, :failed,
+                             :bytes_uploaded, :bytes_downloaded, :subprocesses)
+                        """,
+                        rows,
+                    )
+            except sqlite3.Error as e:
+                msg = f"failed to store phase timings for build {build_id}: {e}"
+                logger.error(msg)
+                raise BuildsDBError(msg) from e
+
+    @_timed("ls_phases")
+    async def ls_phases(
         self,
         *,
-        start_id: int = 1,
+        build_id: BuildID | None = None,
+        phase: str | None = None,
+        submitted_since: dt | None = None,
         max_entries: int | None = None,
-    ) -> list[DBBuildEntry]:
+    ) -> list[BuildPhaseTiming]:
         """
-        List build entries in the database.
+        List build phase timings, either for a given build, or for a given phase.
 
-        If 'max_entries' is None, list all entries from 'start_id' to the latest.
+        Listing a given phase across builds, ordered by build ID, allows charting how
+        that phase's timings evolve over time. If 'max_entries' is provided, only the
+        most recent entries are listed.
         """
+        clauses: list[str] = []
+        params: list[Any] = []  # pyright: ignore[reportExplicitAny]
+
+        if build_id is not None:
+            clauses.append("p.build_id = ?")
+            params.append(build_id)
+
+        if phase is not None:
+            clauses.append("p.phase = ?")
+            params.append(phase)
+
+        if submitted_since is not None:
+            clauses.append("b.submitted >= ?")
+            params.append(submitted_since.timestamp())
+
+        stmt = """
+            SELECT p.*, b.submitted AS submitted
+            FROM build_phases AS p JOIN builds AS b USING (build_id)
+        """
+        if clauses:
+            stmt += " WHERE " + " AND ".join(clauses)
+        stmt += " ORDER BY p.build_id DESC, p.start ASC"
+        if max_entries is not None:
+            stmt += " LIMIT ?"
+            params.append(max_entries)
+
         async with self._lock:
-            end_id = (
-                start_id + max_entries if max_entries else self._root.last_build_id + 1
+            try:
+                rows = self._conn.execute(stmt, params).fetchall()
+            except sqlite3.Error as e:
+                msg = f"failed to list build phase timings from db: {e}"
+                logger.error(msg)
+                raise BuildsDBError(msg) from e
+
+        return [
+            BuildPhaseTiming(
+                build_id=row["build_id"],
+                submitted=dt.fromtimestamp(row["submitted"], datetime.UTC),
+                phase=row["phase"],
+                start_secs=row["start"],
+                duration_secs=row["duration"],
+                failed=bool(row["failed"]),
+                bytes_uploaded=row["bytes_uploaded"],
+                bytes_downloaded=row["bytes_downloaded"],
+                subprocesses=row["subprocesses"],
             )
-            if end_id > self._root.last_build_id + 1:
-                end_id = self._root.last_build_id + 1
+            for row in reversed(rows)
+        ]
+
+    @property
+    def last_gc_stats(self) -> BuildsDBGCStats | None:
+        """Statistics for the last garbage collection run, if any."""
+        return self._last_gc_stats
+
+    @_timed("ls")
+    async def ls(self, query: BuildsQuery | None = None) -> list[DBBuildEntry]:
+        """
+        List build entries in the database.
+
+        Entries are filtered by the database, on its indexed columns, and returned
+        ordered by build ID. If no query is provided, list all entries.
+        """
+        query = query if query else BuildsQuery()
+
+        clauses: list[str] = []
+        params: list[Any] = []  # pyright: ignore[reportExplicitAny]
+
+        if query.owner is not None:
+            clauses.append("user = ?")
+            params.append(query.owner)
+
+        if query.states:
+            clauses.append(f"state IN ({', '.join('?' * len(query.states))})")
+            params.extend([s.value for s in query.states])
+
+        if query.channel is not None:
+            clauses.append("channel = ?")
+            params.append(query.channel)
+
+        if query.version_glob is not None:
+            clauses.append("version GLOB ?")
+            params.append(query.version_glob)
+
+        if query.submitted_since is not None:
+            clauses.append("submitted >= ?")
+            params.append(query.submitted_since.timestamp())
+
+        if query.submitted_until is not None:
+            clauses.append("submitted < ?")
+            params.append(query.submitted_until.timestamp())
+
+        if query.after_id is not None:
+            clauses.append("build_id < ?" if query.newest_first else "build_id > ?")
+            params.append(query.after_id)
 
+        stmt = "SELECT build_id, entry FROM builds"
+        if clauses:
+            stmt += " WHERE " + " AND ".join(clauses)
+        stmt += " ORDER BY build_id " + ("DESC" if query.newest_first else "ASC")
+        if query.max_entries is not None:
+            stmt += " LIMIT ?"
+            params.append(query.max_entries)
+
+        async with self._lock:
+            try:
+                rows = self._conn.execute(stmt, params).fetchall()
+            except sqlite3.Error as e:
+                msg = f"failed to list builds from db: {e}"
+                logger.error(msg)
+                raise BuildsDBError(msg) from e
+
+        return self._entries_from_rows(rows)
+
+    def _entries_from_rows(self, rows: list[sqlite3.Row]) -> list[DBBuildEntry]:
+        """Obtain build entries from database rows, skipping malformed entries."""
         entries: list[DBBuildEntry] = []
-        try:
-            with dbm.open(self._db_path, flag="c") as db:
-                for id in range(start_id, end_id):
-                    key = f"build_{id}"
-                    if key not in db:
-                        logger.warning(f"build entry {id} missing from db, skipping")
-                        continue
-
-                    try:
-                        db_entry = DBBuildEntry.model_validate_json(db[key])
-                    except pydantic.ValidationError as e:
-                        logger.warning(
-                            f"malformed build entry {id} in db, skipping:\n{e}"
-                        )
-                        continue
-
-                    entries.append(db_entry)
-
-        except Exception as e:
-            msg = f"failed to list builds from db: {e}"
-            logger.error(msg)
-            raise BuildsDBError(msg) from e
+        for row in rows:
+            build_id = int(row["build_id"])  # pyright: ignore[reportAny]
+            try:
+                entry = BuildEntry.model_validate_json(
+                    row["entry"]  # pyright: ignore[reportAny]
+                )
+            except pydantic.ValidationError as e:
+                logger.warning(
+                    f"malformed build entry {build_id} in db, skipping:\n{e}"
+                )
+                continue
+
+            entries.append(DBBuildEntry(build_id=build_id, entry=entry))
 
         return entries
 
+    @_timed("get")
     async def get(self, build_id: BuildID) -> DBBuildEntry:
         """Obtain a specific build entry from the database."""
         async with self._lock:
-            if build_id < 1 or build_id > self._root.last_build_id:
-                raise NoSuchBuildError(build_id)
-
-            db_entry_raw: bytes | None = None
             try:
-                with dbm.open(self._db_path, flag="c") as db:
-                    key = f"build_{build_id}"
-                    db_entry_raw = db.get(key)
-            except Exception as e:
+                row = self._conn.execute(
+                    "SELECT entry FROM builds WHERE build_id = ?", (build_id,)
+                ).fetchone()
+            except sqlite3.Error as e:
                 msg = f"failed to get build entry {build_id} from db: {e}"
                 logger.error(msg)
                 raise BuildsDBError(msg) from e
 
-        if not db_entry_raw:
+        if not row:
             raise NoSuchBuildError(build_id)
 
         try:
-            db_entry = DBBuildEntry.model_validate_json(db_entry_raw)
+            entry = BuildEntry.model_validate_json(
+                row["entry"]  # pyright: ignore[reportAny]
+            )
         except pydantic.ValidationError as e:
             logger.error(f"malformed build entry {build_id} in db:\n{e}")
             raise MalformedBuildEntryError(build_id) from e
 
-        return db_entry
+        return DBBuildEntry(build_id=build_id, entry=entry)
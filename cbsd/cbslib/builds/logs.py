@@ -15,12 +15,13 @@ import asyncio
 import datetime
 import logging
 import os
+import re
 import stat
-from asyncio.tasks import Task
+import time
 from collections.abc import AsyncGenerator, Callable
 from datetime import datetime as dt
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, Literal, NamedTuple, cast
 
 import aiofiles
 import aiorwlock
@@ -30,7 +31,7 @@ from cbsdcore.builds.types import BuildID
 
 from cbslib.builds import logger as parent_logger
 from cbslib.config.server import BuildLogsConfig
-from cbslib.core import utils
+from cbslib.core import logfile, logsearch, metrics, utils
 from cbslib.core.backend import Backend
 
 logger = parent_logger.getChild("logs")
@@ -41,6 +42,20 @@ logger.setLevel(logging.INFO)
 
 _LOG_READ_CHUNK_SIZE = 1024 * 1024  # 1 MB
 
+# maximum number of entries read per stream on each ingestion round.
+_INGEST_READ_COUNT = 1000
+# how long to block waiting for new log messages, in milliseconds. This also bounds
+# how long it takes for a newly tracked build to be picked up by the ingestion loop.
+_INGEST_BLOCK_MS = 1000
+
+# maximum number of messages queued for a log follower before we give up on it.
+_FOLLOWER_QUEUE_MAX_MSGS = 10000
+# how often to let log followers know we're still around, absent new messages.
+_FOLLOWER_KEEPALIVE_SECS = 10.0
+
+# how long a log search may run for, as user-provided regexes may be expensive.
+_SEARCH_TIMEOUT_SECS = 30.0
+
 
 class BuildLogsHandlerError(CESError):
     """Generic build logs handler error."""
@@ -48,16 +63,166 @@ class BuildLogsHandlerError(CESError):
     pass
 
 
+class BuildLogsSearchPatternError(BuildLogsHandlerError):
+    """Invalid build log search pattern."""
+
+    pass
+
+
+# format coming out of XREAD is something like:
+#   [['cbs:logs:builds:123', [('1768401181174-0', {'msg': '\n'})]]]
+_XReadResult = list[list[str | list[tuple[str, dict[str, Any]]]]]  # pyright: ignore[reportExplicitAny]
+
+
+class BuildLogEvent(NamedTuple):
+    """An event pushed to a build log's followers."""
+
+    kind: Literal["msg", "keepalive", "end"]
+    msg_id: str | None = None
+    msg: str | None = None
+
+
+def _stream_id_le(lhs: str, rhs: str) -> bool:
+    """Check whether redis stream ID 'lhs' is not after 'rhs'."""
+
+    def _parse(stream_id: str) -> tuple[int, int]:
+        ms, _, seq = stream_id.partition("-")
+        return (int(ms), int(seq or 0))
+
+    return _parse(lhs) <= _parse(rhs)
+
+
+class _LogFollower:
+    """A follower of a build's log, to which new log messages are pushed."""
+
+    queue: asyncio.Queue[tuple[str, str] | None]
+    overflowed: bool
+
+    def __init__(self) -> None:
+        self.queue = asyncio.Queue(maxsize=_FOLLOWER_QUEUE_MAX_MSGS)
+        self.overflowed = False
+
+    def push(self, item: tuple[str, str] | None) -> None:
+        """Push a log message, or the end of the log, to the follower."""
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # too slow, let it catch up on its own from the stream.
+            self.overflowed = True
+
+
+class _BuildLogStream:
+    """
+    Tracks a build's log stream, buffering its messages before writing them to disk.
+
+    Keeps the ID of the last message read from the stream, so that we can resume
+    reading from where we left off, without losing messages. Messages written to disk
+    are also fed to the log's search index, if any. Messages read from the stream are
+    pushed to the log's followers as they arrive.
+    """
+
+    build_id: BuildID
+    last_id: str
+    flushed_id: str | None
+    followers: set[_LogFollower]
+    _path: Path
+    _indexer: logsearch.SearchIndexWriter | None
+    _buffer: list[str]
+    _buffer_size: int
+    _last_flush: float
+
+    def __init__(
+        self,
+        build_id: BuildID,
+        path: Path,
+        last_id: str,
+        indexer: logsearch.SearchIndexWriter | None,
+    ) -> None:
+        self.build_id = build_id
+        self.last_id = last_id
+        self.flushed_id = None
+        self.followers = set()
+        self._path = path
+        self._indexer = indexer
+        self._buffer = []
+        self._buffer_size = 0
+        self._last_flush = time.monotonic()
+
+    def append(self, msg_id: str, msg: str) -> None:
+        """Buffer a log message, keeping track of its stream ID."""
+        line = f"{msg.strip()}\n"
+        self._buffer.append(line)
+        self._buffer_size += len(line)
+        self.last_id = msg_id
+
+    def publish(self, msg_id: str, msg: str) -> None:
+        """Push a log message read from the stream to the log's followers."""
+        for follower in self.followers:
+            follower.push((msg_id, msg))
+
+    def end(self) -> None:
+        """Let the log's followers know the log has ended."""
+        for follower in self.followers:
+            follower.push(None)
+        self.followers.clear()
+
+    def should_flush(self, max_bytes: int, max_interval_secs: float) -> bool:
+        """Check whether we have buffered enough, or for long enough, to flush."""
+        if not self._buffer:
+            return False
+        return (
+            self._buffer_size >= max_bytes
+            or time.monotonic() - self._last_flush >= max_interval_secs
+        )
+
+    async def flush(self) -> None:
+        """Write buffered messages to the build's log file."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+
+        data = "".join(self._buffer)
+        self._buffer = []
+        self._buffer_size = 0
+        async with aiofiles.open(self._path, "+a") as fd:
+            _ = await fd.write(data)
+        self.flushed_id = self.last_id
+
+        if self._indexer:
+            try:
+                await asyncio.to_thread(self._indexer.feed, data.encode("utf-8"))
+            except logsearch.LogSearchError as e:
+                logger.error(
+                    f"error indexing log for build '{self.build_id}', "
+                    + f"no longer indexing: {e}"
+                )
+                self._indexer = None
+
+    async def close(self) -> None:
+        """Flush remaining messages, and finish indexing the log."""
+        await self.flush()
+        if self._indexer:
+            try:
+                await asyncio.to_thread(self._indexer.close)
+            except logsearch.LogSearchError as e:
+                logger.error(f"error indexing log for build '{self.build_id}': {e}")
+
+
 class BuildLogsHandler:
     """Handle logs for all builds."""
 
     _logs_path: Path
     _logs_cache_ttl_secs: int
+    _flush_bytes: int
+    _flush_interval_secs: float
     _backend: Backend
-    _tasks: dict[BuildID, Task[None]]
+    _streams: dict[BuildID, _BuildLogStream]
+    _streams_event: asyncio.Event
     _finished_streams: dict[dt, list[BuildID]]
     _finished_streams_event: asyncio.Event
+    _ingest_task: asyncio.Task[None]
     _gc_task: asyncio.Task[None]
+    _compact_tasks: set[asyncio.Task[None]]
     _lock: aiorwlock.RWLock
 
     def __init__(self, logs_config: BuildLogsConfig, backend: Backend) -> None:
@@ -65,8 +230,13 @@ class BuildLogsHandler:
         Handle logs for all builds, capturing from redis.
 
         As the worker produces build logs and pushes them to the build's corresponding
-        redis stream, we will consume those using build-specific tasks. These will be
-        written to disk as they are produced.
+        redis stream, we will consume those from all tracked builds' streams at once,
+        through a single ingestion task. These are buffered per build, and written to
+        disk once enough has been buffered or enough time has elapsed.
+
+        Once a build finishes, its plain log file is compressed into an indexed log,
+        allowing random-access reads. Plain logs, including those from before this
+        format was introduced, remain readable.
 
         :param Path logs_path: the base path for log files (e.g., /cbs/logs)
         :param Backend backend: the backend to be used for redis connections
@@ -75,10 +245,15 @@ class BuildLogsHandler:
         """
         self._logs_path = logs_config.dir_path
         self._logs_cache_ttl_secs = logs_config.cache_ttl_secs
+        self._flush_bytes = logs_config.flush_bytes
+        self._flush_interval_secs = logs_config.flush_interval_secs
         self._backend = backend
-        self._tasks = {}
+        self._streams = {}
+        metrics.BUILD_LOG_STREAMS.set_function(lambda: len(self._streams))
+        self._streams_event = asyncio.Event()
         self._finished_streams = {}
         self._finished_streams_event = asyncio.Event()
+        self._compact_tasks = set()
         self._lock = aiorwlock.RWLock()
 
         if self._logs_path.exists() and not self._logs_path.is_dir():
@@ -99,11 +274,14 @@ class BuildLogsHandler:
             logger.setLevel(logging.DEBUG)
 
         try:
+            self._ingest_task = asyncio.create_task(
+                self._ingest_task_fn(), name="log-handler-ingest"
+            )
             self._gc_task = asyncio.create_task(
                 self._gc_task_fn(), name="log-handler-gc"
             )
         except Exception as e:
-            msg = f"error starting log handler gc task: {e}"
+            msg = f"error starting log handler tasks: {e}"
             logger.error(msg)
             raise BuildLogsHandlerError(msg) from e
 
@@ -111,59 +289,92 @@ class BuildLogsHandler:
         """
         Start log gathering for a new build.
 
-        Will create a background task to handle incoming log messages for a given build,
-        keeping track of said task. Will require a build to be marked as finished to
-        free up resources.
+        Adds the build's stream to those consumed by the ingestion task. If we have
+        previously been gathering logs for this build (e.g., before a restart), we
+        resume from the last message written to disk. Will require a build to be
+        marked as finished to free up resources.
 
         :param BuildID build_id: The ID for the build being started
         """
         logger.info(f"tracking logs for build '{build_id}'")
         async with self._lock.writer:
-            if build_id in self._tasks:
+            if build_id in self._streams:
                 logger.warning(
                     f"build '{build_id}' already being tracked by log handler"
                 )
                 return
 
-            self._tasks[build_id] = asyncio.create_task(
-                self._logger(build_id), name=f"log-handler-build:{build_id}"
+            try:
+                redis = await self._backend.redis()
+                last_id = cast(
+                    str | None, await redis.get(self._get_build_offset_key(build_id))
+                )
+            except Exception as e:
+                msg = f"error obtaining log offset for build '{build_id}': {e}"
+                logger.error(msg)
+                raise BuildLogsHandlerError(msg) from e
+
+            log_path = self.get_log_path_for(build_id)
+            try:
+                # pick up indexing where we left off, should we be resuming.
+                indexer = await asyncio.to_thread(
+                    logsearch.SearchIndexWriter.resume,
+                    logsearch.search_index_path_for(log_path),
+                    log_path,
+                )
+            except logsearch.LogSearchError as e:
+                logger.error(f"unable to index log for build '{build_id}': {e}")
+                indexer = None
+
+            self._streams[build_id] = _BuildLogStream(
+                build_id,
+                log_path,
+                last_id if last_id else "0-0",
+                indexer,
             )
+            self._streams_event.set()
 
     async def finish(self, build_id: BuildID) -> None:
         """
-        Finishes a log gathering task for a given build.
+        Finishes log gathering for a given build.
 
-        Will cancel the background task responsible for gathering the logs for the
-        specified build, cleaning up as necessary.
+        Will stop consuming the build's stream, writing whatever messages are left in
+        the stream to disk, and cleaning up as necessary.
 
         :param BuildID build_id: The ID for the build being finished
         """
         logger.info(f"finishing tracking logs for build '{build_id}'")
         async with self._lock.writer:
-            if build_id not in self._tasks:
+            stream = self._streams.pop(build_id, None)
+            if not stream:
                 logger.warning(f"build '{build_id}' not being tracked for logs")
                 return
 
-            logger.debug(f"cancelling logger task for build '{build_id}'")
             try:
-                _ = self._tasks[build_id].cancel()
-                await self._tasks[build_id]
-            except asyncio.CancelledError:
-                pass
-            except Exception as e:
-                logger.error(
-                    f"error canceling log tracking task for build '{build_id}': {e}"
+                redis = await self._backend.redis()
+                res = cast(
+                    list[tuple[str, dict[str, str]]],
+                    await redis.xrange(
+                        self._get_build_stream_key(build_id), f"({stream.last_id}", "+"
+                    ),
                 )
-                return
-            logger.debug(f"logger task for build '{build_id}' correctly cancelled")
+                for msg_id, entry in res:
+                    if msg := entry.get("msg"):
+                        stream.append(msg_id, msg)
+                        stream.publish(msg_id, msg)
+                        metrics.BUILD_LOG_LINES_INGESTED.inc()
+                _ = await redis.delete(self._get_build_offset_key(build_id))
+            except Exception as e:
+                logger.error(f"error draining log stream for build '{build_id}': {e}")
 
-            del self._tasks[build_id]
+            stream.end()
 
             # TODO: Maybe get reason from arguments, like 'revoked', 'finished', etc.
-            log_file_path = self.get_log_path_for(build_id)
-            async with aiofiles.open(log_file_path, "+a") as fd:
-                _ = await fd.write("--- build log end ---\n")
-                await fd.flush()
+            stream.append(stream.last_id, "--- build log end ---")
+            try:
+                await stream.close()
+            except Exception as e:
+                logger.error(f"error writing log file for build '{build_id}': {e}")
 
             finished_at = dt.now(datetime.UTC)
             if finished_at not in self._finished_streams:
@@ -173,48 +384,244 @@ class BuildLogsHandler:
             # signal the gc task that we now have at least one value to look out for.
             self._finished_streams_event.set()
 
-    async def shutdown(self) -> None:
-        """Shutdown the builds log handler instance."""
-        if not self._gc_task:
+        task = asyncio.create_task(
+            self._compact(build_id), name=f"log-handler-compact-{build_id}"
+        )
+        self._compact_tasks.add(task)
+        task.add_done_callback(self._compact_tasks.discard)
+
+    async def _compact(self, build_id: BuildID) -> None:
+        """Compress a finished build's plain log file into an indexed log."""
+        plain_path = self.get_log_path_for(build_id)
+        if not plain_path.exists():
+            logger.debug(f"no log file to compress for build '{build_id}'")
             return
 
-        _ = self._gc_task.cancel()
         try:
-            await self._gc_task
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            logger.error(f"error canceling build logs gc task: {e}")
+            await asyncio.to_thread(
+                logfile.compress_log,
+                plain_path,
+                self.get_compressed_log_path_for(build_id),
+            )
+        except logfile.LogFileError as e:
+            logger.error(f"error compressing log for build '{build_id}': {e}")
+            return
+
+        plain_path.unlink(missing_ok=True)
+        logger.debug(f"compressed log for build '{build_id}'")
+
+    async def shutdown(self) -> None:
+        """Shutdown the builds log handler instance."""
+        for task in (self._ingest_task, self._gc_task):
+            _ = task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.error(
+                    f"error canceling build logs task '{task.get_name()}': {e}"
+                )
+
+        # write out whatever we still have buffered.
+        async with self._lock.writer:
+            await self._flush_streams(force=True)
+
+        # on-going compressions run in threads, and can't be cancelled.
+        _ = await asyncio.gather(*self._compact_tasks, return_exceptions=True)
 
     async def get_log_file(
-        self, build_id: BuildID
-    ) -> Callable[[], AsyncGenerator[str]]:
+        self, build_id: BuildID, *, accept_gzip: bool = False
+    ) -> tuple[Callable[[], AsyncGenerator[bytes]], bool]:
         """
         Obtain log file for a given build.
 
-        This is a generator that will yield multiple chunks until the
-        entire file is read.
+        Returns a generator that will yield multiple chunks until the entire file is
+        read, and whether those chunks are gzip-compressed. Compressed logs are only
+        sent as-is if 'accept_gzip' is set, and decompressed otherwise.
         """
-        log_file_path = self.get_log_path_for(build_id)
-        if not log_file_path.exists():
-            raise utils.FileNotFoundError()
+        log_file_path = await asyncio.to_thread(self._resolve_log_path, build_id)
+
+        if log_file_path.suffix == ".gz":
+            try:
+                reader = await asyncio.to_thread(logfile.IndexedLogFile, log_file_path)
+            except logfile.LogFileError as e:
+                msg = f"error opening log file '{log_file_path}': {e}"
+                logger.error(msg)
+                raise BuildLogsHandlerError(msg) from e
 
-        if not log_file_path.is_file():
-            msg = f"path at '{log_file_path}' is not a file"
+            async def _get_decompressed_log() -> AsyncGenerator[bytes]:
+                try:
+                    for segment in reader.segments:
+                        yield await asyncio.to_thread(reader.read_segment, segment)
+                except logfile.LogFileError as e:
+                    msg = f"error reading log file '{log_file_path}': {e}"
+                    logger.error(msg)
+                    raise BuildLogsHandlerError(msg) from e
+
+            if not accept_gzip:
+                return (_get_decompressed_log, False)
+
+        try:
+            # open the file right away, should the plain log be removed once
+            # compressed before we get to read it.
+            fd = await aiofiles.open(log_file_path, "rb")
+        except FileNotFoundError:
+            raise utils.FileNotFoundError(
+                f"log file for build '{build_id}' not found"
+            ) from None
+        except Exception as e:
+            msg = f"error opening log file '{log_file_path}': {e}"
             logger.error(msg)
-            raise BuildLogsHandlerError(msg)
+            raise BuildLogsHandlerError(msg) from e
 
-        async def _get_log() -> AsyncGenerator[str]:
+        async def _get_log() -> AsyncGenerator[bytes]:
             try:
-                async with aiofiles.open(log_file_path, "rb") as fd:
-                    while chunk := await fd.read(_LOG_READ_CHUNK_SIZE):
-                        yield chunk.decode("utf-8")
+                while chunk := await fd.read(_LOG_READ_CHUNK_SIZE):
+                    yield chunk
             except Exception as e:
-                msg = f"error opening and reading log file '{log_file_path}': {e}"
+                msg = f"error reading log file '{log_file_path}': {e}"
                 logger.error(msg)
                 raise BuildLogsHandlerError(msg) from e
+            finally:
+                await fd.close()
+
+        return (_get_log, log_file_path.suffix == ".gz")
+
+    async def read_lines(
+        self, build_id: BuildID, start: int, n: int
+    ) -> tuple[bool, list[str]]:
+        """
+        Read up to 'n' lines from a given build's log, starting at line 'start'.
+
+        Returns whether the end of the log file has been reached, and the lines read.
+        For running builds, this is the end of what has been written to disk so far.
+        """
+
+        def _read(path: Path) -> list[bytes]:
+            # read one line past what has been asked for, to find whether there is
+            # anything after it.
+            if path.suffix == ".gz":
+                return logfile.IndexedLogFile(path).read_lines(start, start + n + 1)
+            return logfile.read_plain_lines(path, start, start + n + 1)
+
+        try:
+            lines = await asyncio.to_thread(self._read_log, build_id, _read)
+        except logfile.LogFileError as e:
+            msg = f"error reading lines from log for build '{build_id}': {e}"
+            logger.error(msg)
+            raise BuildLogsHandlerError(msg) from e
+
+        return (
+            len(lines) <= n,
+            [line.decode("utf-8", errors="replace") for line in lines[:n]],
+        )
+
+    async def read_bytes(
+        self, build_id: BuildID, offset: int, length: int
+    ) -> tuple[int, bytes]:
+        """
+        Read up to 'length' bytes from a given build's log, starting at 'offset'.
+
+        Returns the log's total size, in bytes, and the bytes read.
+        """
+
+        def _read(path: Path) -> tuple[int, bytes]:
+            if path.suffix == ".gz":
+                reader = logfile.IndexedLogFile(path)
+                return (reader.size, reader.read_bytes(offset, length))
+            return (
+                path.stat().st_size,
+                logfile.read_plain_bytes(path, offset, length),
+            )
+
+        try:
+            return await asyncio.to_thread(self._read_log, build_id, _read)
+        except logfile.LogFileError as e:
+            msg = f"error reading bytes from log for build '{build_id}': {e}"
+            logger.error(msg)
+            raise BuildLogsHandlerError(msg) from e
+
+    async def search(
+        self,
+        build_id: BuildID,
+        pattern: str,
+        *,
+        regex: bool = False,
+        ignore_case: bool = False,
+        context: int = 0,
+        max_matches: int = 100,
+    ) -> tuple[list[logsearch.LogSearchMatch], bool]:
+        """
+        Search a given build's log for lines matching 'pattern'.
 
-        return _get_log
+        Returns the matching lines, with 'context' lines around each, and whether there
+        were more than 'max_matches' matches.
+
+        :raises BuildLogsSearchPatternError: if 'pattern' is not a valid regex, or
+            takes too long to search for
+        """
+        try:
+            return await asyncio.to_thread(
+                self._read_log,
+                build_id,
+                lambda path: logsearch.search_log(
+                    path,
+                    pattern,
+                    regex=regex,
+                    ignore_case=ignore_case,
+                    context=context,
+                    max_matches=max_matches,
+                    timeout=_SEARCH_TIMEOUT_SECS,
+                ),
+            )
+        except re.error as e:
+            raise BuildLogsSearchPatternError(f"invalid pattern: {e}") from None
+        except logsearch.LogSearchTimeoutError:
+            raise BuildLogsSearchPatternError(
+                f"search timed out after {_SEARCH_TIMEOUT_SECS} seconds, "
+                + "try a narrower pattern"
+            ) from None
+        except (logfile.LogFileError, logsearch.LogSearchError) as e:
+            msg = f"error searching log for build '{build_id}': {e}"
+            logger.error(msg)
+            raise BuildLogsHandlerError(msg) from e
+
+    def _resolve_log_path(self, build_id: BuildID) -> Path:
+        """
+        Obtain the path to the log file to read from for a given build.
+
+        Prefers the build's compressed log, if available, falling back to its plain
+        log otherwise.
+
+        :raises utils.FileNotFoundError: if no log file exists for the build
+        """
+        compressed_path = self.get_compressed_log_path_for(build_id)
+        if logfile.is_indexed_log(compressed_path):
+            return compressed_path
+
+        plain_path = self.get_log_path_for(build_id)
+        if plain_path.is_file():
+            return plain_path
+
+        # it may just have been compressed.
+        if logfile.is_indexed_log(compressed_path):
+            return compressed_path
+
+        raise utils.FileNotFoundError(f"log file for build '{build_id}' not found")
+
+    def _read_log[T](self, build_id: BuildID, fn: Callable[[Path], T]) -> T:
+        """
+        Read from a given build's log file with 'fn'.
+
+        The plain log file may be removed, once compressed, between us finding it and
+        reading from it. Should that happen, we try once more, with the compressed log.
+        """
+        try:
+            return fn(self._resolve_log_path(build_id))
+        except (FileNotFoundError, utils.FileNotFoundError):
+            pass
+        return fn(self._resolve_log_path(build_id))
 
     async def _tail(
         self, build_id: BuildID, max_msgs: int = 100
@@ -233,21 +640,22 @@ class BuildLogsHandler:
 
         # We'll need to check two potential sources for messages, based on three
         # different criteria:
-        #   - if build_id is in self._tasks, this means the build is running and we can
-        #     get the logs from the current stream
-        #   - if build_id is not in self._tasks but there are available messages in the
-        #     stream, we'll get the messages from the stream
-        #   - if build_id is not in self._tasks and there are no messages in the stream,
+        #   - if build_id is in self._streams, this means the build is running and we
+        #     can get the logs from the current stream
+        #   - if build_id is not in self._streams but there are available messages in
+        #     the stream, we'll get the messages from the stream
+        #   - if build_id is not in self._streams and there are no messages in the
+        #     stream,
         #     we'll need to obtain log messages from file. If the log file does not
         #     exist, then the build must not exist.
         #
         # Easiest approach is to check if we have messages in the stream, and, if not,
-        # whether the build is running (by checking self._tasks). If neither are true,
+        # whether the build is running (by checking self._streams). If neither are true,
         # we will attempt to go to the log file, and bail out if the log file does not
         # exist. We'll read it otherwise.
         #
         async with self._lock.reader:
-            has_running_build = build_id in self._tasks
+            has_running_build = build_id in self._streams
 
         try:
             redis = await self._backend.redis()
@@ -289,9 +697,12 @@ class BuildLogsHandler:
 
         # we clearly didn't find anything in the stream, so lets get the messages from
         # a log file.
-        log_file_path = self.get_log_path_for(build_id)
         try:
-            msg_res_lst = utils.tail_file(log_file_path, max_msgs)
+            msg_res_lst = await asyncio.to_thread(
+                self._read_log,
+                build_id,
+                lambda path: utils.tail_file(path, max_msgs, errors="replace"),
+            )
         except utils.FileNotFoundError:
             raise utils.FileNotFoundError(
                 f"log file for build '{build_id}' not found"
@@ -332,8 +743,8 @@ class BuildLogsHandler:
         logger.debug(f"follow build log '{build_id}' from '{from_id}' max '{max_msgs}'")
 
         async with self._lock.reader:
-            if build_id not in self._tasks:
-                # if we don't have the build in the active logger tasks, attempt to
+            if build_id not in self._streams:
+                # if we don't have the build in the tracked streams, attempt to
                 # return the tail of an existing build log.
                 # propagate exceptions, especially on a non-existing build.
                 return await self._tail(build_id, max_msgs)
@@ -375,73 +786,265 @@ class BuildLogsHandler:
         # tuple includes the last stream id as first element.
         return (False, last_id, msg_res_lst)
 
+    async def stream(
+        self,
+        build_id: BuildID,
+        since: str | None = None,
+        *,
+        max_msgs: int = 30,
+    ) -> Callable[[], AsyncGenerator[BuildLogEvent]]:
+        """
+        Push a given build's log messages as they become available.
+
+        Returns a generator yielding log messages as they are read from the build's
+        stream, along with their stream IDs. If 'since' is provided, starts with the
+        messages after the stream ID 'since', otherwise with the last 'max_msgs'
+        messages. Messages are pushed from the log handler's single consumer of the
+        build's stream, regardless of how many followers there are.
+
+        The generator ends with an 'end' event once the build's log ends. Should it
+        end without one, the follower was not keeping up, and ought to resume from
+        the last stream ID it has seen.
+
+        :raises utils.FileNotFoundError: if the build does not exist
+        """
+        max_msgs = max_msgs if max_msgs <= 100 and max_msgs > 0 else 100
+        follower = _LogFollower()
+        async with self._lock.writer:
+            stream = self._streams.get(build_id)
+            if stream:
+                stream.followers.add(follower)
+
+        if not stream:
+            # not running, send whatever we can find, and be done.
+            return await self._stream_finished(build_id, since, max_msgs)
+
+        tracked_stream = stream
+
+        async def _unfollow() -> None:
+            async with self._lock.writer:
+                tracked_stream.followers.discard(follower)
+
+        # messages read from here on may also be pushed to the follower, and will be
+        # skipped then.
+        build_stream_key = self._get_build_stream_key(build_id)
+        try:
+            redis = await self._backend.redis()
+            if since:
+                res = cast(
+                    list[tuple[str, dict[str, str]]],
+                    await redis.xrange(build_stream_key, f"({since}", "+"),
+                )
+            else:
+                res = list(
+                    reversed(
+                        cast(
+                            list[tuple[str, dict[str, str]]],
+                            await redis.xrevrange(build_stream_key, count=max_msgs),
+                        )
+                    )
+                )
+        except Exception as e:
+            await _unfollow()
+            msg = f"error obtaining log messages from redis stream '{build_stream_key}'"
+            logger.error(f"{msg}: {e}")
+            raise BuildLogsHandlerError(msg) from e
+
+        async def _follow() -> AsyncGenerator[BuildLogEvent]:
+            last_id = since
+            try:
+                for msg_id, entry in res:
+                    if msg := entry.get("msg"):
+                        yield BuildLogEvent("msg", msg_id, msg)
+                    last_id = msg_id
+
+                while not follower.overflowed:
+                    try:
+                        item = await asyncio.wait_for(
+                            follower.queue.get(), _FOLLOWER_KEEPALIVE_SECS
+                        )
+                    except TimeoutError:
+                        yield BuildLogEvent("keepalive")
+                        continue
+
+                    if item is None:
+                        yield BuildLogEvent("end")
+                        return
+
+                    msg_id, msg = item
+                    if last_id and _stream_id_le(msg_id, last_id):
+                        continue
+                    yield BuildLogEvent("msg", msg_id, msg)
+                    last_id = msg_id
+
+                logger.info(f"log follower for build '{build_id}' fell behind")
+            finally:
+                await _unfollow()
+
+        return _follow
+
+    async def _stream_finished(
+        self, build_id: BuildID, since: str | None, max_msgs: int
+    ) -> Callable[[], AsyncGenerator[BuildLogEvent]]:
+        """Push a finished build's log messages, from 'since' or its tail."""
+        events: list[BuildLogEvent] = []
+        if not since:
+            _, _, msgs = await self._tail(build_id, max_msgs)
+            events = [BuildLogEvent("msg", msg=msg) for msg in msgs]
+        else:
+            # resuming, so only what the follower may have missed, if still around.
+            build_stream_key = self._get_build_stream_key(build_id)
+            try:
+                redis = await self._backend.redis()
+                res = cast(
+                    list[tuple[str, dict[str, str]]],
+                    await redis.xrange(build_stream_key, f"({since}", "+"),
+                )
+            except Exception as e:
+                msg = (
+                    "error obtaining log messages from "
+                    + f"redis stream '{build_stream_key}'"
+                )
+                logger.error(f"{msg}: {e}")
+                raise BuildLogsHandlerError(msg) from e
+
+            events = [
+                BuildLogEvent("msg", msg_id, entry["msg"])
+                for msg_id, entry in res
+                if "msg" in entry
+            ]
+            if not events:
+                # propagate exceptions, especially on a non-existing build.
+                _ = await asyncio.to_thread(self._resolve_log_path, build_id)
+
+        async def _finished() -> AsyncGenerator[BuildLogEvent]:
+            for event in events:
+                yield event
+            yield BuildLogEvent("end")
+
+        return _finished
+
     def get_log_path_for(self, build_id: BuildID) -> Path:
         """Obtain the log file path for a given build."""
         return self._logs_path / f"build-{build_id}.log"
 
+    def get_compressed_log_path_for(self, build_id: BuildID) -> Path:
+        """Obtain the compressed log file path for a given build."""
+        return self._logs_path / f"build-{build_id}.log.gz"
+
     def _get_build_stream_key(self, build_id: BuildID) -> str:
         """Obtain the stream key for a given build."""
         return f"cbs:logs:builds:{build_id}"
 
-    async def _logger(self, build_id: BuildID) -> None:
-        """
-        Handle log messages for a given build, writing them to disk.
+    def _get_build_offset_key(self, build_id: BuildID) -> str:
+        """Obtain the key for the last stream id written to disk for a given build."""
+        return f"cbs:logs:offsets:{build_id}"
 
-        Log messages will be consumed from a redis stream, as messages are added to the
-        stream by the worker.
+    async def _ingest_task_fn(self) -> None:
+        """
+        Consume log messages for all tracked builds, writing them to disk.
 
-        :param BuildID build_id: The ID for the build being handled.
+        Log messages are read from all tracked builds' redis streams with a single
+        XREAD, starting from the last message read from each stream, so no messages
+        are lost between reads. Messages are buffered per build, and flushed to disk
+        once enough has been buffered or enough time has elapsed.
         """
-        build_log_path = self.get_log_path_for(build_id)
-        build_stream = self._get_build_stream_key(build_id)
-        async with aiofiles.open(build_log_path, "+a") as fd:
-            redis = await self._backend.redis()
-            while True:
-                logger.debug(f"reading from redis stream '{build_stream}'")
-                res = await redis.xread(  # pyright: ignore[reportAny]
-                    streams={build_stream: "$"}, count=None, block=0
+        while True:
+            self._streams_event.clear()
+            async with self._lock.reader:
+                streams = {
+                    self._get_build_stream_key(build_id): stream.last_id
+                    for build_id, stream in self._streams.items()
+                }
+
+            if not streams:
+                _ = await self._streams_event.wait()
+                continue
+
+            try:
+                redis = await self._backend.redis()
+                res = cast(
+                    _XReadResult,
+                    await redis.xread(
+                        streams=streams,  # pyright: ignore[reportArgumentType]
+                        count=_INGEST_READ_COUNT,
+                        block=_INGEST_BLOCK_MS,
+                    ),
                 )
-                if not isinstance(res, list):
-                    logger.warning(f"got erroneous result from redis: {res} -- stop")
-                    return
+            except Exception as e:
+                logger.error(f"error reading build log streams: {e}")
+                await asyncio.sleep(1)
+                continue
 
-                # format coming out of res is something like:
-                # res = [['cbs:logs:builds:123', [('1768401181174-0', {'msg': '\n'})]]]
+            async with self._lock.writer:
+                self._ingest(res)
+                try:
+                    await self._flush_streams()
+                except Exception as e:
+                    logger.error(f"error flushing build log streams: {e}")
+
+    def _ingest(self, res: _XReadResult) -> None:
+        """Buffer messages read from the builds' log streams."""
+        streams_by_key = {
+            self._get_build_stream_key(build_id): stream
+            for build_id, stream in self._streams.items()
+        }
+
+        for stream_res in res:
+            if len(stream_res) != 2:
+                logger.warning(f"malformed stream result: {stream_res}")
+                continue
 
-                res = cast(
-                    list[list[str | list[tuple[str, dict[str, Any]]]]],  # pyright: ignore[reportExplicitAny]
-                    res,
+            stream_key, stream_entries_lst = stream_res
+            if not isinstance(stream_key, str) or not isinstance(
+                stream_entries_lst, list
+            ):
+                logger.warning(
+                    f"malformed stream entry: {stream_key}, {stream_entries_lst}"
                 )
-                logger.debug(f"from redis stream '{build_stream}': {res}")
-                for stream_lst in res:
-                    logger.debug(f"stream lst: {stream_lst}")
-                    while len(stream_lst) % 2 == 0 and len(stream_lst) > 0:
-                        stream_key, stream_entries_lst = stream_lst[:2]
-                        stream_lst = stream_lst[2:]
-
-                        if not isinstance(stream_key, str) or not isinstance(
-                            stream_entries_lst, list
-                        ):
-                            logger.warning(
-                                f"malformed stream entry: {stream_key}, "
-                                + f"{stream_entries_lst}"
-                            )
-                            continue
-
-                        if stream_key != build_stream:
-                            continue
-
-                        for _, stream_entry in stream_entries_lst:
-                            log_msg = cast(str | None, stream_entry.get("msg"))
-                            if not log_msg:
-                                logger.warning(
-                                    "unexpected missing 'msg' in stream log entry"
-                                )
-                                continue
-
-                            _ = await fd.write(f"{log_msg.strip()}\n")
-
-                await fd.flush()
+                continue
+
+            stream = streams_by_key.get(stream_key)
+            if not stream:
+                # build finished while we were reading.
+                continue
+
+            for msg_id, stream_entry in stream_entries_lst:
+                log_msg = cast(str | None, stream_entry.get("msg"))
+                if not log_msg:
+                    logger.warning("unexpected missing 'msg' in stream log entry")
+                    stream.last_id = msg_id
+                    continue
+                stream.append(msg_id, log_msg)
+                stream.publish(msg_id, log_msg)
+                metrics.BUILD_LOG_LINES_INGESTED.inc()
+
+    async def _flush_streams(self, *, force: bool = False) -> None:
+        """
+        Flush tracked streams' buffered messages to disk, as needed.
+
+        Flushed streams have their last written message ID kept in redis, so we can
+        resume from it should we be restarted.
+        """
+        offsets: dict[str, str] = {}
+        for build_id, stream in self._streams.items():
+            if not force and not stream.should_flush(
+                self._flush_bytes, self._flush_interval_secs
+            ):
+                continue
+
+            await stream.flush()
+            if stream.flushed_id:
+                offsets[self._get_build_offset_key(build_id)] = stream.flushed_id
+
+        if not offsets:
+            return
+
+        try:
+            redis = await self._backend.redis()
+            _ = await redis.mset(offsets)  # pyright: ignore[reportArgumentType]
+        except Exception as e:
+            logger.warning(f"error storing build log stream offsets: {e}")
 
     async def _gc_task_fn(self) -> None:
         """Garbage collect finished streams after a given TTL."""
@@ -541,7 +1144,10 @@ class BuildLogsHandler:
         logger.info(f"build logs gc took {total_secs} seconds")
 
     async def _gc_collect_redis(self, redis: aioredis.Redis) -> None:
-        """Collect log messages from all existing stream keys."""
+        """Collect log messages from all existing stream keys, but tracked builds'."""
+        tracked_keys = {
+            self._get_build_stream_key(build_id) for build_id in self._streams
+        }
         gc_start = dt.now(datetime.UTC)
         total_keys = 0
         cursor_id = 0
@@ -571,6 +1177,10 @@ class BuildLogsHandler:
                     logger.warning(f"malformed stream key in '{res}'")
                     continue
 
+                if key in tracked_keys:
+                    logger.debug(f"keep stream key '{key}' for tracked build")
+                    continue
+
                 await self._gc_stream_key(redis, key)
                 total_keys += 1
 
@@ -15,20 +15,23 @@
 import asyncio
 import errno
 import sys
+from datetime import datetime as dt
 from pathlib import Path
 from typing import Any, cast
 
 import pydantic
 from cbscore.errors import CESError
-from cbsdcore.api.responses import AvailableComponent
+from cbsdcore.api.responses import AvailableComponent, BuildPhaseTiming
 from cbsdcore.builds.types import BuildEntry, BuildID
 from cbsdcore.versions import BuildDescriptor
 
 from cbslib.builds import logger as parent_logger
-from cbslib.builds.db import BuildsDB
+from cbslib.builds.db import BuildsDB, BuildsQuery
 from cbslib.builds.logs import BuildLogsHandler
 from cbslib.builds.tracker import BuildsTracker
+from cbslib.builds.workers import WorkersInspector, WorkersSnapshot
 from cbslib.config.server import BuildLogsConfig
+from cbslib.core import metrics
 from cbslib.core.backend import Backend
 from cbslib.core.permissions import AuthorizationCaps, NotAuthorizedError, Permissions
 from cbslib.worker.celery import celery_app
@@ -90,6 +93,7 @@ class BuildsMgr:
     _logs: BuildLogsHandler
     _permissions: Permissions
     _tracker: BuildsTracker
+    _inspector: WorkersInspector
     _available_components: dict[str, AvailableComponent]
     _started: bool
     _init_task: asyncio.Task[None] | None
@@ -105,23 +109,28 @@ class BuildsMgr:
         self._db = BuildsDB(db_path)
         self._logs = BuildLogsHandler(logs_config, self._backend)
         self._permissions = permissions
-        self._tracker = BuildsTracker(self._db, self._logs)
+        self._tracker = BuildsTracker(self._db, self._logs, self._backend)
+        self._inspector = WorkersInspector()
         self._available_components = {}
         self._started = False
         self._init_task = None
 
     async def init(self) -> None:
         """Perform initialisation tasks."""
-        # garbage collect old unfinished builds that may have lingered if we were
-        # hard shutdown.
-        await self._db.gc()
+        # recover tracking of builds that survived a restart, garbage collecting old
+        # unfinished builds that may have lingered if we were hard shutdown.
+        await self._tracker.recover()
 
         # garbage collect old logs, especially from the redis in-memory store.
+        # streams for recovered builds are kept.
         await self._logs.gc(all=True)
 
         # update our known components.
         await self._update_components()
 
+        # keep an eye on what the workers are up to.
+        self._inspector.start()
+
     async def _update_components(self) -> None:
         """Update components list, before we can start servicing requests."""
         # this function could be run regularly in the background.
@@ -175,7 +184,9 @@ class BuildsMgr:
             raise UnknownComponentsError(unknown_components)
 
         # propagate exceptions
-        return await self._tracker.new(desc)
+        res = await self._tracker.new(desc)
+        self._inspector.refresh_soon()
+        return res
 
     async def revoke(self, build_id: BuildID, user: str, force: bool) -> None:
         """Revoke a given build."""
@@ -185,17 +196,49 @@ class BuildsMgr:
 
         # propagate exceptions
         await self._tracker.revoke(build_id, user, force)
+        self._inspector.refresh_soon()
+
+    async def update_metrics(self) -> None:
+        """Update metrics that are only computed when scraped."""
+        counts = await self._db.count_by_state()
+        for state, n in counts.items():
+            metrics.BUILDS.labels(state.value).set(n)
+
+    def inspect(self) -> WorkersSnapshot:
+        """Obtain the latest snapshot of the tasks known to the workers."""
+        return self._inspector.snapshot
 
     async def status(
-        self, *, owner: str | None = None
+        self, query: BuildsQuery | None = None
     ) -> list[tuple[BuildID, BuildEntry]]:
-        """List known builds."""
+        """List known builds, optionally filtered by 'query'."""
+        if not self._started:
+            logger.warning("service not started yet, try again later")
+            raise NotAvailableError()
+
+        # propagate exceptions
+        return await self._tracker.list(query)
+
+    async def timings(
+        self,
+        *,
+        build_id: BuildID | None = None,
+        phase: str | None = None,
+        since: dt | None = None,
+        max_entries: int | None = None,
+    ) -> list[BuildPhaseTiming]:
+        """List phase timings, either for a given build, or a given phase's trend."""
         if not self._started:
             logger.warning("service not started yet, try again later")
             raise NotAvailableError()
 
         # propagate exceptions
-        return await self._tracker.list(owner=owner)
+        return await self._db.ls_phases(
+            build_id=build_id,
+            phase=phase,
+            submitted_since=since,
+            max_entries=max_entries,
+        )
 
     @property
     def available(self) -> bool:
@@ -14,17 +14,22 @@
 import asyncio
 import datetime
 from datetime import datetime as dt
-from typing import override
+from typing import cast, override
 
+import pydantic
 from cbscore.errors import CESError
+from cbscore.utils.timing import TimingReport
 from cbsdcore.builds.types import BuildEntry, BuildID, EntryState
 from cbsdcore.versions import BuildDescriptor
 from celery.result import AsyncResult as CeleryTaskResult
 
 from cbslib.builds import logger as parent_logger
-from cbslib.builds.db import BuildsDB, BuildsDBError
+from cbslib.builds.db import BuildsDB, BuildsDBError, BuildsQuery
 from cbslib.builds.logs import BuildLogsHandler
+from cbslib.core import metrics
+from cbslib.core.backend import Backend
 from cbslib.worker import tasks
+from cbslib.worker.types import WorkerBuildState, WorkerBuildTask
 
 logger = parent_logger.getChild("tracker")
 
@@ -69,13 +74,15 @@ class BuildsTracker:
 
     _db: BuildsDB
     _logs: BuildLogsHandler
+    _backend: Backend
     _builds_by_task_id: dict[str, BuildID]
     _builds_by_build_id: dict[BuildID, str]
     _lock: asyncio.Lock
 
-    def __init__(self, db: BuildsDB, logs: BuildLogsHandler) -> None:
+    def __init__(self, db: BuildsDB, logs: BuildLogsHandler, backend: Backend) -> None:
         self._db = db
         self._logs = logs
+        self._backend = backend
         self._builds_by_task_id = {}
         self._builds_by_build_id = {}
         self._lock = asyncio.Lock()
@@ -141,8 +148,10 @@ class BuildsTracker:
                 raise TrackerError(msg) from e
 
             try:
-                # schedule version for building
-                task = tasks.build.apply_async(
+                # schedule version for building. Publishing to the broker may
+                # block, so keep it off the event loop.
+                task = await asyncio.to_thread(
+                    tasks.build.apply_async,
                     (
                         build_id,
                         desc,
@@ -155,8 +164,10 @@ class BuildsTracker:
                 await self._fail_entry(build_id, build_entry, do_logs=True)
                 raise TrackerError(msg) from e
 
+            # obtaining the task's state queries the result backend.
+            task_state = await asyncio.to_thread(lambda: task.state)
             build_entry.task_id = task.task_id
-            build_entry.state = EntryState(task.state.upper())
+            build_entry.state = EntryState(task_state.upper())
             try:
                 await self._db.update(build_id, build_entry)
             except Exception as e:
@@ -167,26 +178,181 @@ class BuildsTracker:
 
             self._builds_by_task_id[build_entry.task_id] = build_id
             self._builds_by_build_id[build_id] = build_entry.task_id
+            metrics.BUILDS_SUBMITTED.inc()
 
             return (build_id, build_entry.state)
 
+    async def recover(self) -> None:
+        """
+        Recover tracking of unfinished builds, on server start.
+
+        Looks only at builds yet to reach a terminal state in the database, matching
+        them against the state the workers keep in redis for their builds:
+
+           - builds still queued, or still running on a worker, are tracked again,
+             and their logs gathered once more;
+           - builds that finished while we were not around have their final state
+             persisted;
+           - every other unfinished build is garbage collected, marked as failed.
+
+        Must be called before the builds' log streams are garbage collected.
+        """
+        logger.info("recovering builds tracking")
+        try:
+            active = await self._db.ls_active()
+        except BuildsDBError as e:
+            msg = f"failed to list active builds from db: {e}"
+            logger.error(msg)
+            raise TrackerError(msg) from e
+
+        try:
+            redis = await self._backend.redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                for db_entry in active:
+                    _ = pipe.get(f"cbs:builds:{db_entry.build_id}")
+                    _ = pipe.exists(f"cbs:worker:tasks:{db_entry.entry.task_id}")
+                res = cast(list[str | int | None], await pipe.execute())
+        except Exception as e:
+            msg = f"error obtaining worker builds state from redis: {e}"
+            logger.error(msg)
+            raise TrackerError(msg) from e
+
+        async with self._lock:
+            for i, db_entry in enumerate(active):
+                build_id = db_entry.build_id
+                entry = db_entry.entry
+                worker_task_raw = cast(str | None, res[2 * i])
+                has_worker_task = bool(res[2 * i + 1])
+
+                if not entry.task_id:
+                    logger.info(f"build '{build_id}' was never scheduled")
+                    continue
+
+                worker_task: WorkerBuildTask | None = None
+                if worker_task_raw:
+                    try:
+                        worker_task = WorkerBuildTask.model_validate_json(
+                            worker_task_raw
+                        )
+                    except pydantic.ValidationError as e:
+                        logger.warning(
+                            f"malformed worker task for build '{build_id}':\n{e}"
+                        )
+
+                if worker_task and worker_task.task_id != entry.task_id:
+                    logger.warning(
+                        f"build '{build_id}' worker task '{worker_task.task_id}' "
+                        + f"does not match expected task '{entry.task_id}'"
+                    )
+                    worker_task = None
+
+                if not worker_task:
+                    if entry.state != EntryState.pending:
+                        logger.info(f"build '{build_id}' not found on any worker")
+                        continue
+                    # not yet picked up by a worker, still in the work queue.
+                    logger.info(f"recovering queued build '{build_id}'")
+
+                elif WorkerBuildState.FINISHED in worker_task.state:
+                    await self._recover_finished(build_id, entry, worker_task)
+                    continue
+
+                elif not has_worker_task:
+                    logger.info(f"build '{build_id}' no longer running on worker")
+                    continue
+
+                else:
+                    logger.info(
+                        f"recovering running build '{build_id}' on worker "
+                        + f"'{worker_task.worker_instance_name}'"
+                    )
+                    if entry.state != EntryState.started:
+                        # we missed the start event while we were gone.
+                        entry.state = EntryState.started
+                        await self._db.update(build_id, entry)
+
+                try:
+                    await self._logs.new(build_id)
+                except Exception as e:
+                    logger.error(
+                        f"error resuming log tracking for build '{build_id}': {e}"
+                    )
+                    continue
+
+                self._builds_by_task_id[entry.task_id] = build_id
+                self._builds_by_build_id[build_id] = entry.task_id
+
+            recovered = set(self._builds_by_build_id.keys())
+
+        logger.info(f"recovered tracking for {len(recovered)} builds")
+
+        # garbage collect whatever we have not been able to recover.
+        try:
+            _ = await self._db.gc(keep=recovered)
+        except BuildsDBError as e:
+            msg = f"error garbage collecting unrecovered builds: {e}"
+            logger.error(msg)
+            raise TrackerError(msg) from e
+
+    async def _recover_finished(
+        self, build_id: BuildID, entry: BuildEntry, worker_task: WorkerBuildTask
+    ) -> None:
+        """Persist the final state of a build that finished while we were gone."""
+        state = worker_task.state
+        if WorkerBuildState.REVOKED in state:
+            entry.state = EntryState.revoked
+        elif WorkerBuildState.ERROR in state:
+            entry.state = EntryState.failure
+        else:
+            entry.state = EntryState.success
+
+        logger.info(f"build '{build_id}' finished while away, state '{entry.state}'")
+        # we don't know when exactly the build finished, only that it has.
+        entry.finished = dt.now(tz=datetime.UTC)
+        try:
+            await self._db.update(build_id, entry)
+        except BuildsDBError as e:
+            logger.error(f"error persisting final state for build '{build_id}': {e}")
+
+        if worker_task.timings:
+            await self._persist_timings(build_id, worker_task.timings)
+
+    async def _persist_timings(self, build_id: BuildID, timings: TimingReport) -> None:
+        """Persist a finished build's phase timings. Failing to do so is not fatal."""
+        try:
+            await self._db.put_phases(build_id, timings)
+        except BuildsDBError as e:
+            logger.error(f"error persisting timings for build '{build_id}': {e}")
+
+    async def _get_worker_timings(self, build_id: BuildID) -> TimingReport | None:
+        """Obtain a finished build's phase timings, as reported by its worker."""
+        try:
+            redis = await self._backend.redis()
+            raw = cast(str | None, await redis.get(f"cbs:builds:{build_id}"))
+        except Exception as e:
+            logger.error(f"error obtaining worker task for build '{build_id}': {e}")
+            return None
+
+        if not raw:
+            return None
+
+        try:
+            return WorkerBuildTask.model_validate_json(raw).timings
+        except pydantic.ValidationError as e:
+            logger.warning(f"malformed worker task for build '{build_id}':\n{e}")
+            return None
+
     async def list(
-        self, *, owner: str | None = None
+        self, query: BuildsQuery | None = None
     ) -> list[tuple[BuildID, BuildEntry]]:
-        """List all known builds, from stable storage, optionally filtering by owner."""
+        """List known builds from stable storage, optionally filtered by 'query'."""
         try:
-            db_builds = await self._db.ls()
+            db_builds = await self._db.ls(query)
         except BuildsDBError as e:
             logger.warning(f"failed to list builds from db: {e}")
             raise TrackerError(f"failed to list builds: {e}") from e
 
-        builds: list[tuple[BuildID, BuildEntry]] = []
-        for db_entry in db_builds:
-            entry = db_entry.entry
-            if owner is None or entry.user == owner:
-                builds.append((db_entry.build_id, entry))
-
-        return builds
+        return [(db_entry.build_id, db_entry.entry) for db_entry in db_builds]
 
     async def revoke(self, build_id: BuildID, user: str, force: bool) -> None:
         """
@@ -235,7 +401,12 @@ class BuildsTracker:
                 task = CeleryTaskResult(  # pyright: ignore[reportUnknownVariableType]
                     entry.task_id,
                 )
-                task.revoke(terminate=True, signal="TERM", wait=False)
+                await asyncio.to_thread(
+                    task.revoke,  # pyright: ignore[reportUnknownMemberType, reportUnknownArgumentType]
+                    terminate=True,
+                    signal="TERM",
+                    wait=False,
+                )
             except Exception as e:
                 msg = f"failed to revoke build '{build_id}': {e}"
                 logger.error(msg)
@@ -272,12 +443,23 @@ class BuildsTracker:
 
             await self._db.update(build_id, entry)
 
+            if started:
+                metrics.BUILD_START_LATENCY.observe(
+                    max((started - entry.submitted).total_seconds(), 0)
+                )
+
             if entry.state in [
                 EntryState.success,
                 EntryState.failure,
                 EntryState.revoked,
                 EntryState.rejected,
             ]:
+                metrics.BUILDS_FINISHED.labels(entry.state.value).inc()
+                if entry.started and entry.finished:
+                    metrics.BUILD_RUNTIME.labels(entry.state.value).observe(
+                        max((entry.finished - entry.started).total_seconds(), 0)
+                    )
+
                 logger.debug(
                     f"removing completed build tracking for task {task_id}, "
                     + f"state '{entry.state}'"
@@ -288,6 +470,9 @@ class BuildsTracker:
                 # finish log gathering for this build
                 await self._logs.finish(build_id)
 
+                if timings := await self._get_worker_timings(build_id):
+                    await self._persist_timings(build_id, timings)
+
     async def mark_started(self, task_id: str, ts: dt) -> None:
         logger.info(f"task {task_id} started, ts = {ts}")
         await self._mark_task_state(task_id, EntryState.started, started=ts)
@@ -0,0 +1,124 @@
+# CBS service library - builds - workers inspection
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+import asyncio
+import contextlib
+import datetime
+from datetime import datetime as dt
+from typing import Any
+
+import pydantic
+
+from cbslib.builds import logger as parent_logger
+from cbslib.worker.celery import celery_app
+
+logger = parent_logger.getChild("workers")
+
+
+# how often we refresh our view of the workers' tasks.
+_INSPECT_INTERVAL_SECS = 10.0
+# how long we wait for workers to reply to each inspect broadcast.
+_INSPECT_TIMEOUT_SECS = 2.0
+
+
+class WorkersSnapshot(pydantic.BaseModel):
+    """The tasks known to the workers, as of 'updated'."""
+
+    active: list[tuple[str, str, Any]] = []  # pyright: ignore[reportExplicitAny]
+    scheduled: list[Any] = []  # pyright: ignore[reportExplicitAny]
+    reserved: list[Any] = []  # pyright: ignore[reportExplicitAny]
+    updated: dt | None = None
+
+
+def _inspect_workers() -> WorkersSnapshot:
+    """
+    Inspect the workers' active, scheduled, and reserved tasks.
+
+    Each call broadcasts to all workers and waits for their replies, blocking for up
+    to '_INSPECT_TIMEOUT_SECS'. Must not be run from the event loop.
+    """
+    inspct = celery_app.control.inspect(timeout=_INSPECT_TIMEOUT_SECS)
+
+    active = inspct.active()
+    scheduled = inspct.scheduled()
+    reserved = inspct.reserved()
+
+    snapshot = WorkersSnapshot(updated=dt.now(tz=datetime.UTC))
+
+    if active:
+        for tasks in active.values():
+            snapshot.active.extend(
+                [(task["name"], task["id"], task["args"]) for task in tasks]
+            )
+
+    if scheduled:
+        for tasks in scheduled.values():
+            snapshot.scheduled.extend(list(tasks))
+
+    if reserved:
+        for tasks in reserved.values():
+            snapshot.reserved.extend(list(tasks))
+
+    return snapshot
+
+
+class WorkersInspector:
+    """
+    Keeps a periodically refreshed snapshot of the tasks known to the workers.
+
+    Inspecting the workers is a broadcast that blocks until all workers reply, or
+    until a timeout. It is thus run in a thread, in the background, and callers are
+    served the latest snapshot instead of waiting on the workers.
+    """
+
+    _snapshot: WorkersSnapshot
+    _refresh_event: asyncio.Event
+    _task: asyncio.Task[None] | None
+
+    def __init__(self) -> None:
+        self._snapshot = WorkersSnapshot()
+        self._refresh_event = asyncio.Event()
+        self._task = None
+
+    @property
+    def snapshot(self) -> WorkersSnapshot:
+        """The latest snapshot. Empty, with no 'updated' time, until first refresh."""
+        return self._snapshot
+
+    def start(self) -> None:
+        """Start refreshing in the background. Must be called from an event loop."""
+        if self._task:
+            logger.warning("workers inspector already started")
+            return
+
+        self._task = asyncio.create_task(
+            self._refresh_task_fn(), name="workers-inspector"
+        )
+
+    def refresh_soon(self) -> None:
+        """Refresh the snapshot without waiting for the next interval."""
+        self._refresh_event.set()
+
+    async def _refresh_task_fn(self) -> None:
+        """Refresh the snapshot every '_INSPECT_INTERVAL_SECS', or when poked."""
+        while True:
+            self._refresh_event.clear()
+            try:
+                self._snapshot = await asyncio.to_thread(_inspect_workers)
+            except Exception as e:
+                logger.error(f"error inspecting workers: {e}")
+
+            with contextlib.suppress(TimeoutError):
+                _ = await asyncio.wait_for(
+                    self._refresh_event.wait(), _INSPECT_INTERVAL_SECS
+                )
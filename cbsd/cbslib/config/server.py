@@ -92,6 +92,12 @@ class BuildLogsConfig(pydantic.BaseModel):
     cache_ttl_secs: Annotated[int, pydantic.Field(alias="cache-ttl-secs")] = (
         3600 * 6
     )  # 6 hours
+    # write a build's buffered log messages to disk once this many bytes have been
+    # buffered, or this many seconds have elapsed since the last write.
+    flush_bytes: Annotated[int, pydantic.Field(alias="flush-bytes")] = 64 * 1024
+    flush_interval_secs: Annotated[
+        float, pydantic.Field(alias="flush-interval-secs")
+    ] = 1.0
 
 
 class ServerConfig(pydantic.BaseModel):
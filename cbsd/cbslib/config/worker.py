@@ -36,6 +36,9 @@ class WorkerConfig(pydantic.BaseModel):
     build_timeout_seconds: Annotated[
         int | None, pydantic.Field(alias="build-timeout-seconds", default=None)
     ] = None
+    metrics_port: Annotated[
+        int | None, pydantic.Field(alias="metrics-port", default=None)
+    ] = None
 
     def get_cbscore_config(self) -> CBSCoreConfig:
         try:
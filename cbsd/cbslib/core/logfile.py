@@ -0,0 +1,275 @@
+# CBS server library - core - compressed, indexed log files
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# A compressed log is a sequence of independently gzip-compressed segments, each
+# holding a whole number of lines. Concatenated gzip members are themselves a valid
+# gzip stream, so the log file can be decompressed as a whole with standard tools, or
+# sent as-is with a 'gzip' content encoding.
+#
+# Next to the log file lives a sparse index, with one entry per segment, recording
+# where the segment lives in the compressed file, and which lines and bytes of the
+# uncompressed log it holds. This allows reading arbitrary line and byte ranges, and
+# the log's tail, by decompressing only the segments involved.
+
+import bisect
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Final, NamedTuple
+
+from cbscore.errors import CESError
+
+# uncompressed size at which we start a new segment. Also used when building a
+# log's search index, whose segments must match the compressed log's.
+LOG_SEGMENT_MAX_BYTES: Final[int] = 1024 * 1024  # 1 MB
+
+_INDEX_MAGIC: Final[bytes] = b"CBSLIDX1"
+_INDEX_ENTRY: Final[struct.Struct] = struct.Struct("<QQQQQQ")
+
+# zlib window bits selecting a gzip container.
+_GZIP_WBITS: Final[int] = 16 + zlib.MAX_WBITS
+
+
+class LogFileError(CESError):
+    """Error handling a compressed log file."""
+
+    pass
+
+
+class LogSegment(NamedTuple):
+    """An entry in a compressed log's index, describing one of its segments."""
+
+    comp_offset: int
+    comp_length: int
+    first_line: int
+    num_lines: int
+    offset: int
+    length: int
+
+
+def index_path_for(path: Path) -> Path:
+    """Obtain the path to the index for the compressed log at 'path'."""
+    return path.with_name(f"{path.name}.idx")
+
+
+def is_indexed_log(path: Path) -> bool:
+    """Check whether 'path' is a compressed log with an index."""
+    return path.is_file() and index_path_for(path).is_file()
+
+
+def compress_log(src: Path, dst: Path) -> None:
+    """
+    Compress the plain log file at 'src' into an indexed, compressed log at 'dst'.
+
+    Both the compressed log and its index are written to temporary files first, and
+    only renamed into place once complete. The index is put in place before the log,
+    so that an existing compressed log always has its index.
+    """
+    dst_tmp = dst.with_name(f"{dst.name}.tmp")
+    idx = index_path_for(dst)
+    idx_tmp = idx.with_name(f"{idx.name}.tmp")
+
+    segments: list[LogSegment] = []
+    try:
+        with src.open("rb") as in_fd, dst_tmp.open("wb") as out_fd:
+            comp_offset = 0
+            offset = 0
+            line_no = 0
+            buf: list[bytes] = []
+            buf_size = 0
+
+            def _write_segment() -> None:
+                nonlocal comp_offset, offset, line_no, buf, buf_size
+                comp = zlib.compressobj(wbits=_GZIP_WBITS)
+                data = comp.compress(b"".join(buf)) + comp.flush()
+                _ = out_fd.write(data)
+                segments.append(
+                    LogSegment(
+                        comp_offset=comp_offset,
+                        comp_length=len(data),
+                        first_line=line_no,
+                        num_lines=len(buf),
+                        offset=offset,
+                        length=buf_size,
+                    )
+                )
+                comp_offset += len(data)
+                offset += buf_size
+                line_no += len(buf)
+                buf = []
+                buf_size = 0
+
+            for line in in_fd:
+                buf.append(line)
+                buf_size += len(line)
+                if buf_size >= LOG_SEGMENT_MAX_BYTES:
+                    _write_segment()
+
+            if buf:
+                _write_segment()
+
+        with idx_tmp.open("wb") as idx_fd:
+            _ = idx_fd.write(_INDEX_MAGIC)
+            for segment in segments:
+                _ = idx_fd.write(_INDEX_ENTRY.pack(*segment))
+
+        os.replace(idx_tmp, idx)
+        os.replace(dst_tmp, dst)
+    except OSError as e:
+        dst_tmp.unlink(missing_ok=True)
+        idx_tmp.unlink(missing_ok=True)
+        raise LogFileError(f"error compressing log '{src}' to '{dst}': {e}") from e
+
+
+def split_lines(data: bytes) -> list[bytes]:
+    """Split 'data' into lines, without their trailing newline."""
+    lines = data.split(b"\n")
+    if lines and lines[-1] == b"":
+        _ = lines.pop()
+    return lines
+
+
+class IndexedLogFile:
+    """Random-access reads over a compressed log, through its index."""
+
+    _path: Path
+    _segments: list[LogSegment]
+    _first_lines: list[int]
+    _offsets: list[int]
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        try:
+            raw = index_path_for(path).read_bytes()
+        except OSError as e:
+            raise LogFileError(f"error reading index for log '{path}': {e}") from e
+
+        entries = raw[len(_INDEX_MAGIC) :]
+        if not raw.startswith(_INDEX_MAGIC) or len(entries) % _INDEX_ENTRY.size != 0:
+            raise LogFileError(f"malformed index for log '{path}'")
+
+        self._segments = [
+            LogSegment(*entry) for entry in _INDEX_ENTRY.iter_unpack(entries)
+        ]
+        self._first_lines = [s.first_line for s in self._segments]
+        self._offsets = [s.offset for s in self._segments]
+
+    @property
+    def num_lines(self) -> int:
+        """Number of lines in the uncompressed log."""
+        if not self._segments:
+            return 0
+        last = self._segments[-1]
+        return last.first_line + last.num_lines
+
+    @property
+    def size(self) -> int:
+        """Size of the uncompressed log, in bytes."""
+        if not self._segments:
+            return 0
+        last = self._segments[-1]
+        return last.offset + last.length
+
+    @property
+    def segments(self) -> list[LogSegment]:
+        """The log's segments, in order."""
+        return self._segments
+
+    def read_segment(self, segment: LogSegment) -> bytes:
+        """Read and decompress a given segment."""
+        try:
+            with self._path.open("rb") as fd:
+                _ = fd.seek(segment.comp_offset)
+                data = fd.read(segment.comp_length)
+            return zlib.decompress(data, wbits=_GZIP_WBITS)
+        except (OSError, zlib.error) as e:
+            raise LogFileError(
+                f"error reading segment at '{segment.comp_offset}' "
+                + f"of log '{self._path}': {e}"
+            ) from e
+
+    def read_lines(self, start: int, end: int | None = None) -> list[bytes]:
+        """
+        Read lines '[start, end)' from the log, without their trailing newline.
+
+        If 'end' is not provided, read until the end of the log.
+        """
+        end = self.num_lines if end is None else min(end, self.num_lines)
+        if start < 0 or start >= end:
+            return []
+
+        lines: list[bytes] = []
+        idx = bisect.bisect_right(self._first_lines, start) - 1
+        for segment in self._segments[idx:]:
+            if segment.first_line >= end:
+                break
+            seg_lines = split_lines(self.read_segment(segment))
+            lines.extend(
+                seg_lines[max(start - segment.first_line, 0) : end - segment.first_line]
+            )
+        return lines
+
+    def read_bytes(self, offset: int, length: int) -> bytes:
+        """Read up to 'length' bytes from the uncompressed log, starting at 'offset'."""
+        end = min(offset + length, self.size)
+        if offset < 0 or offset >= end:
+            return b""
+
+        chunks: list[bytes] = []
+        idx = bisect.bisect_right(self._offsets, offset) - 1
+        for segment in self._segments[idx:]:
+            if segment.offset >= end:
+                break
+            data = self.read_segment(segment)
+            chunks.append(data[max(offset - segment.offset, 0) : end - segment.offset])
+        return b"".join(chunks)
+
+    def tail(self, n: int) -> list[bytes]:
+        """Read the last 'n' lines from the log, without their trailing newline."""
+        return self.read_lines(max(self.num_lines - n, 0))
+
+
+def read_plain_lines(path: Path, start: int, end: int | None = None) -> list[bytes]:
+    """Read lines '[start, end)' from a plain log, without their trailing newline."""
+    if start < 0 or (end is not None and start >= end):
+        return []
+
+    lines: list[bytes] = []
+    try:
+        with path.open("rb") as fd:
+            for line_no, line in enumerate(fd):
+                if end is not None and line_no >= end:
+                    break
+                if line_no >= start:
+                    lines.append(line.rstrip(b"\n"))
+    except FileNotFoundError:
+        raise
+    except OSError as e:
+        raise LogFileError(f"error reading log '{path}': {e}") from e
+    return lines
+
+
+def read_plain_bytes(path: Path, offset: int, length: int) -> bytes:
+    """Read up to 'length' bytes from a plain log, starting at 'offset'."""
+    if offset < 0 or length <= 0:
+        return b""
+
+    try:
+        with path.open("rb") as fd:
+            _ = fd.seek(offset)
+            return fd.read(length)
+    except FileNotFoundError:
+        raise
+    except OSError as e:
+        raise LogFileError(f"error reading log '{path}': {e}") from e
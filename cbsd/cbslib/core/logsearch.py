@@ -0,0 +1,539 @@
+# CBS server library - core - log search
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# A log's search index splits the log into the same segments as its compressed
+# counterpart (see 'logfile'), and keeps, for each segment, a bloom filter of the
+# (lower-cased) trigrams found in it. Searching for a pattern requires only reading
+# the segments whose filter contains all trigrams of the literals the pattern
+# requires, which for most searches on large logs is a tiny fraction of them.
+#
+# The index is built incrementally, as the log is written. Segments are only added to
+# the index once complete, so the log's tail past the last indexed segment is always
+# searched.
+
+import re
+import struct
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Final, NamedTuple
+
+from cbscore.errors import CESError
+
+from cbslib.core import logfile
+
+_SEARCH_INDEX_MAGIC: Final[bytes] = b"CBSLSRC1"
+# first line, number of lines, offset, and length of the segment in the plain log.
+_SEARCH_INDEX_ENTRY: Final[struct.Struct] = struct.Struct("<QQQQ")
+
+# 256 Kbit bloom filters keep false positives at a few percent per trigram for the
+# tens of thousands of distinct trigrams a 1 MB log segment usually has.
+_BLOOM_BITS: Final[int] = 1 << 18
+_BLOOM_BYTES: Final[int] = _BLOOM_BITS // 8
+_BLOOM_SHIFT: Final[int] = 32 - 18
+_BLOOM_MULTIPLIERS: Final[tuple[int, ...]] = (0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D)
+
+_SEARCH_INDEX_RECORD_SIZE: Final[int] = _SEARCH_INDEX_ENTRY.size + _BLOOM_BYTES
+
+# maximum number of decompressed segments kept around while searching.
+_MAX_CACHED_SEGMENTS: Final[int] = 4
+
+# longest pattern searched for, as regular expressions are run as provided.
+MAX_PATTERN_LENGTH: Final[int] = 256
+
+
+class LogSearchError(CESError):
+    """Error searching a log."""
+
+    pass
+
+
+class LogSearchTimeoutError(LogSearchError):
+    """A log search took longer than allowed."""
+
+    pass
+
+
+class LogSearchMatch(NamedTuple):
+    """A line matching a search, along with its context."""
+
+    line_no: int
+    line: str
+    before: list[str]
+    after: list[str]
+
+
+def search_index_path_for(path: Path) -> Path:
+    """Obtain the path to the search index for the plain log at 'path'."""
+    return path.with_name(f"{path.name}.sidx")
+
+
+def _trigrams(data: bytes) -> set[bytes]:
+    data = data.lower()
+    return {data[i : i + 3] for i in range(len(data) - 2)}
+
+
+def _bloom_positions(trigram: bytes) -> list[int]:
+    value = int.from_bytes(trigram, "little")
+    return [((value * m) & 0xFFFFFFFF) >> _BLOOM_SHIFT for m in _BLOOM_MULTIPLIERS]
+
+
+def _bloom_for(data: bytes) -> bytes:
+    bloom = bytearray(_BLOOM_BYTES)
+    for trigram in _trigrams(data):
+        for pos in _bloom_positions(trigram):
+            bloom[pos >> 3] |= 1 << (pos & 7)
+    return bytes(bloom)
+
+
+def _bloom_contains(bloom: bytes, positions: list[int]) -> bool:
+    return all(bloom[pos >> 3] & (1 << (pos & 7)) for pos in positions)
+
+
+class SearchIndexWriter:
+    """
+    Build a log's search index incrementally, as the log is written.
+
+    Segments are closed following the same rules as when compressing the log, so
+    that the search index's segments match the compressed log's.
+    """
+
+    _path: Path
+    _next_line: int
+    _next_offset: int
+    _buf: list[bytes]
+    _buf_size: int
+    _partial: bytes
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._next_line = 0
+        self._next_offset = 0
+        self._buf = []
+        self._buf_size = 0
+        self._partial = b""
+
+    @classmethod
+    def resume(cls, path: Path, log_path: Path) -> "SearchIndexWriter":
+        """
+        Resume building the search index at 'path' for the plain log at 'log_path'.
+
+        Keeps the segments already indexed, and feeds whatever has been written to the
+        log past the last of them.
+        """
+        writer = cls(path)
+        try:
+            if path.exists():
+                raw = path.read_bytes()
+                if not raw.startswith(_SEARCH_INDEX_MAGIC):
+                    raise LogSearchError(f"malformed search index at '{path}'")
+                num = (len(raw) - len(_SEARCH_INDEX_MAGIC)) // _SEARCH_INDEX_RECORD_SIZE
+                end = len(_SEARCH_INDEX_MAGIC) + num * _SEARCH_INDEX_RECORD_SIZE
+                if num > 0:
+                    first_line, num_lines, offset, length = (
+                        _SEARCH_INDEX_ENTRY.unpack_from(
+                            raw, end - _SEARCH_INDEX_RECORD_SIZE
+                        )
+                    )
+                    writer._next_line = first_line + num_lines
+                    writer._next_offset = offset + length
+                if end != len(raw):
+                    # drop a partially written record.
+                    with path.open("r+b") as fd:
+                        _ = fd.truncate(end)
+            else:
+                _ = path.write_bytes(_SEARCH_INDEX_MAGIC)
+
+            if log_path.exists():
+                with log_path.open("rb") as fd:
+                    _ = fd.seek(writer._next_offset)
+                    while chunk := fd.read(logfile.LOG_SEGMENT_MAX_BYTES):
+                        writer.feed(chunk)
+        except OSError as e:
+            raise LogSearchError(f"error resuming search index at '{path}': {e}") from e
+
+        return writer
+
+    def feed(self, data: bytes) -> None:
+        """Index data appended to the log."""
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self._buf.append(line + b"\n")
+            self._buf_size += len(line) + 1
+            if self._buf_size >= logfile.LOG_SEGMENT_MAX_BYTES:
+                self._write_segment()
+
+    def close(self) -> None:
+        """Index whatever remains, once the log has been completely written."""
+        if self._partial:
+            self._buf.append(self._partial)
+            self._buf_size += len(self._partial)
+            self._partial = b""
+        if self._buf:
+            self._write_segment()
+
+    def _write_segment(self) -> None:
+        data = b"".join(self._buf)
+        record = _SEARCH_INDEX_ENTRY.pack(
+            self._next_line, len(self._buf), self._next_offset, self._buf_size
+        ) + _bloom_for(data)
+        try:
+            with self._path.open("ab") as fd:
+                _ = fd.write(record)
+        except OSError as e:
+            raise LogSearchError(
+                f"error writing search index at '{self._path}': {e}"
+            ) from e
+
+        self._next_line += len(self._buf)
+        self._next_offset += self._buf_size
+        self._buf = []
+        self._buf_size = 0
+
+
+class _Segment(NamedTuple):
+    """A segment of the log to be searched."""
+
+    first_line: int
+    bloom: bytes | None
+    load: Callable[[], bytes]
+
+
+def _read_search_index(path: Path) -> list[tuple[logfile.LogSegment, bytes]]:
+    """Read the search index at 'path', ignoring any partially written record."""
+    if not path.exists():
+        return []
+
+    try:
+        raw = path.read_bytes()
+    except OSError as e:
+        raise LogSearchError(f"error reading search index at '{path}': {e}") from e
+
+    if not raw.startswith(_SEARCH_INDEX_MAGIC):
+        raise LogSearchError(f"malformed search index at '{path}'")
+
+    entries: list[tuple[logfile.LogSegment, bytes]] = []
+    pos = len(_SEARCH_INDEX_MAGIC)
+    while pos + _SEARCH_INDEX_RECORD_SIZE <= len(raw):
+        first_line, num_lines, offset, length = _SEARCH_INDEX_ENTRY.unpack_from(
+            raw, pos
+        )
+        bloom_pos = pos + _SEARCH_INDEX_ENTRY.size
+        entries.append(
+            (
+                logfile.LogSegment(
+                    comp_offset=0,
+                    comp_length=0,
+                    first_line=first_line,
+                    num_lines=num_lines,
+                    offset=offset,
+                    length=length,
+                ),
+                raw[bloom_pos : bloom_pos + _BLOOM_BYTES],
+            )
+        )
+        pos += _SEARCH_INDEX_RECORD_SIZE
+    return entries
+
+
+def _plain_segments(
+    path: Path, indexed: list[tuple[logfile.LogSegment, bytes]]
+) -> list[_Segment]:
+    """Obtain the segments to search in a plain log."""
+
+    def _loader(offset: int, length: int) -> Callable[[], bytes]:
+        return lambda: logfile.read_plain_bytes(path, offset, length)
+
+    segments = [
+        _Segment(entry.first_line, bloom, _loader(entry.offset, entry.length))
+        for entry, bloom in indexed
+    ]
+
+    # whatever lies past the last indexed segment has to be searched regardless,
+    # in segment-sized chunks of whole lines.
+    line_no = 0
+    offset = 0
+    if indexed:
+        last, _ = indexed[-1]
+        line_no = last.first_line + last.num_lines
+        offset = last.offset + last.length
+
+    try:
+        with path.open("rb") as fd:
+            _ = fd.seek(offset)
+            while chunk := fd.read(logfile.LOG_SEGMENT_MAX_BYTES):
+                if not chunk.endswith(b"\n"):
+                    chunk += fd.readline()
+                segments.append(_Segment(line_no, None, _loader(offset, len(chunk))))
+                line_no += chunk.count(b"\n")
+                offset += len(chunk)
+    except FileNotFoundError:
+        raise
+    except OSError as e:
+        raise LogSearchError(f"error reading log '{path}': {e}") from e
+
+    return segments
+
+
+def _compressed_segments(
+    path: Path, indexed: list[tuple[logfile.LogSegment, bytes]]
+) -> list[_Segment]:
+    """Obtain the segments to search in a compressed log."""
+    reader = logfile.IndexedLogFile(path)
+
+    def _loader(segment: logfile.LogSegment) -> Callable[[], bytes]:
+        return lambda: reader.read_segment(segment)
+
+    blooms: list[bytes | None] = [None] * len(reader.segments)
+    if len(indexed) == len(reader.segments) and all(
+        entry.first_line == segment.first_line and entry.length == segment.length
+        for (entry, _), segment in zip(indexed, reader.segments, strict=True)
+    ):
+        blooms = [bloom for _, bloom in indexed]
+
+    return [
+        _Segment(segment.first_line, bloom, _loader(segment))
+        for segment, bloom in zip(reader.segments, blooms, strict=True)
+    ]
+
+
+# escape sequences followed by a fixed number of operands, e.g. '\x41'.
+_ESCAPE_OPERANDS: Final[dict[str, int]] = {"x": 2, "u": 4, "U": 8, "c": 1}
+
+
+def _required_literals(pattern: str) -> list[str]:
+    """
+    Obtain literals that any line matching the regular expression must contain.
+
+    Errs on the side of caution: groups, character classes, escape sequences, and
+    optional characters are not considered, and alternations at the top level mean
+    no literals are required at all.
+    """
+    literals: list[str] = []
+    run: list[str] = []
+
+    def _end_run() -> None:
+        if run:
+            literals.append("".join(run))
+            run.clear()
+
+    def _skip_class(i: int) -> int:
+        # skip past the closing bracket; a leading ']' is part of the class.
+        i += 1
+        if pattern[i : i + 1] == "^":
+            i += 1
+        if pattern[i : i + 1] == "]":
+            i += 1
+        while i < len(pattern) and pattern[i] != "]":
+            i += 2 if pattern[i] == "\\" else 1
+        return i + 1
+
+    def _skip_repeat(i: int) -> int:
+        # skip past the closing brace of a '{m,n}' quantifier, if any.
+        end = pattern.find("}", i)
+        return end + 1 if end != -1 else i + 1
+
+    def _skip_escape_operands(escaped: str, i: int) -> int:
+        # skip past the operands of the escape sequence ending right before 'i'.
+        if escaped in _ESCAPE_OPERANDS:
+            return i + _ESCAPE_OPERANDS[escaped]
+        if escaped == "N" and pattern[i : i + 1] == "{":
+            return _skip_repeat(i)
+        if escaped.isdigit():
+            # octal escape, or back reference, of up to three digits.
+            end = i
+            while end < min(i + 2, len(pattern)) and pattern[end].isdigit():
+                end += 1
+            return end
+        return i
+
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if depth > 0:
+            if c == "\\":
+                i += 2
+                continue
+            if c == "[":
+                i = _skip_class(i)
+                continue
+            depth += 1 if c == "(" else -1 if c == ")" else 0
+            i += 1
+            continue
+
+        if c == "|":
+            return []
+        if c == "(":
+            _end_run()
+            depth = 1
+            i += 1
+            continue
+        if c == "[":
+            _end_run()
+            i = _skip_class(i)
+            continue
+        if c == "\\":
+            escaped = pattern[i + 1 : i + 2]
+            i += 2
+            if not escaped or escaped.isalnum():
+                # character class, anchor, back reference, or a character given by
+                # its code, whose operands are not literals.
+                _end_run()
+                i = _skip_escape_operands(escaped, i)
+                continue
+            c = escaped
+        elif c == "{":
+            _end_run()
+            i = _skip_repeat(i)
+            continue
+        elif c in ".^$*+?})":
+            _end_run()
+            i += 1
+            continue
+        else:
+            i += 1
+
+        quantifier = pattern[i : i + 1]
+        if quantifier in ("?", "*", "{"):
+            # the character may not be there at all.
+            _end_run()
+            if quantifier == "{":
+                i = _skip_repeat(i)
+            continue
+        run.append(c)
+        if quantifier == "+":
+            _end_run()
+
+    _end_run()
+    return literals
+
+
+def search_log(
+    path: Path,
+    pattern: str,
+    *,
+    regex: bool = False,
+    ignore_case: bool = False,
+    context: int = 0,
+    max_matches: int = 100,
+    timeout: float | None = None,
+) -> tuple[list[LogSearchMatch], bool]:
+    """
+    Search a log for lines matching 'pattern', through its search index if available.
+
+    'path' is either a plain log, or a compressed log, in which case its search index
+    is expected next to the plain log's would-be path. Returns the matching lines,
+    along with 'context' lines before and after each, and whether the search stopped
+    after 'max_matches' matches.
+
+    If 'timeout' is specified, the search is given up after as many seconds. It's
+    checked between lines, so a single line may take longer to match.
+
+    :raises re.error: if 'pattern' is not a valid regular expression, or is longer
+        than 'MAX_PATTERN_LENGTH'
+    :raises LogSearchTimeoutError: if the search took longer than 'timeout'
+    """
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise re.error(f"pattern longer than {MAX_PATTERN_LENGTH} characters")
+
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    flags = re.IGNORECASE if ignore_case else 0
+    rx = re.compile((pattern if regex else re.escape(pattern)).encode(), flags)
+
+    literals = [pattern] if not regex else _required_literals(pattern)
+    if rx.flags & re.VERBOSE:
+        literals = []
+    positions = [
+        _bloom_positions(trigram)
+        for literal in literals
+        for trigram in _trigrams(literal.encode())
+    ]
+
+    compressed = path.suffix == ".gz"
+    plain_path = path.with_suffix("") if compressed else path
+    indexed = _read_search_index(search_index_path_for(plain_path))
+    segments = (
+        _compressed_segments(path, indexed)
+        if compressed
+        else _plain_segments(path, indexed)
+    )
+
+    cache: dict[int, list[bytes]] = {}
+
+    def _lines(idx: int) -> list[bytes]:
+        if idx not in cache:
+            if len(cache) >= _MAX_CACHED_SEGMENTS:
+                del cache[next(iter(cache))]
+            cache[idx] = logfile.split_lines(segments[idx].load())
+        return cache[idx]
+
+    def _context(idx: int, line_idx: int) -> tuple[list[str], list[str]]:
+        before: list[bytes] = []
+        seg_idx, pos = idx, line_idx
+        while len(before) < context:
+            if pos == 0:
+                seg_idx -= 1
+                if seg_idx < 0:
+                    break
+                pos = len(_lines(seg_idx))
+                continue
+            pos -= 1
+            before.insert(0, _lines(seg_idx)[pos])
+
+        after: list[bytes] = []
+        seg_idx, pos = idx, line_idx
+        while len(after) < context:
+            pos += 1
+            if pos >= len(_lines(seg_idx)):
+                seg_idx += 1
+                if seg_idx >= len(segments):
+                    break
+                pos = -1
+                continue
+            after.append(_lines(seg_idx)[pos])
+
+        return (
+            [line.decode("utf-8", errors="replace") for line in before],
+            [line.decode("utf-8", errors="replace") for line in after],
+        )
+
+    matches: list[LogSearchMatch] = []
+    for idx, segment in enumerate(segments):
+        if segment.bloom is not None and not all(
+            _bloom_contains(segment.bloom, p) for p in positions
+        ):
+            continue
+
+        for line_idx, line in enumerate(_lines(idx)):
+            if deadline is not None and time.monotonic() > deadline:
+                raise LogSearchTimeoutError(
+                    f"search of log '{path}' timed out after {timeout} seconds"
+                )
+            if not rx.search(line):
+                continue
+            if len(matches) >= max_matches:
+                return (matches, True)
+
+            before, after = _context(idx, line_idx)
+            matches.append(
+                LogSearchMatch(
+                    line_no=segment.first_line + line_idx,
+                    line=line.decode("utf-8", errors="replace"),
+                    before=before,
+                    after=after,
+                )
+            )
+
+    return (matches, False)
@@ -0,0 +1,107 @@
+# CBS server library - core - metrics
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# Prometheus metrics exported by the server, on '/metrics'. Metrics are registered
+# with the default registry, and updated by the components they relate to. Gauges
+# that can't be kept up to date cheaply are refreshed right before being scraped.
+
+from typing import Final
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from cbslib.core.metrics_buckets import BUILD_DURATION_BUCKETS
+
+# buckets for database operations, from sub-millisecond to a few seconds.
+_DB_OP_BUCKETS: Final[tuple[float, ...]] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+)
+
+
+BUILDS: Final[Gauge] = Gauge(
+    "cbsd_builds",
+    "Builds known to the server, by state",
+    ["state"],
+)
+
+BUILDS_SUBMITTED: Final[Counter] = Counter(
+    "cbsd_builds_submitted",
+    "Builds submitted for scheduling",
+)
+
+BUILDS_FINISHED: Final[Counter] = Counter(
+    "cbsd_builds_finished",
+    "Builds having reached a terminal state, by state",
+    ["state"],
+)
+
+BUILD_START_LATENCY: Final[Histogram] = Histogram(
+    "cbsd_build_start_latency_seconds",
+    "Time between a build being submitted and starting on a worker",
+    buckets=BUILD_DURATION_BUCKETS,
+)
+
+BUILD_RUNTIME: Final[Histogram] = Histogram(
+    "cbsd_build_runtime_seconds",
+    "Time between a build starting and finishing, by terminal state",
+    ["state"],
+    buckets=BUILD_DURATION_BUCKETS,
+)
+
+BUILD_LOG_STREAMS: Final[Gauge] = Gauge(
+    "cbsd_build_log_streams",
+    "Build log streams being ingested",
+)
+
+BUILD_LOG_LINES_INGESTED: Final[Counter] = Counter(
+    "cbsd_build_log_lines_ingested",
+    "Build log lines ingested from redis",
+)
+
+DB_OP_LATENCY: Final[Histogram] = Histogram(
+    "cbsd_db_operation_seconds",
+    "Time taken by builds database operations, by operation",
+    ["op"],
+    buckets=_DB_OP_BUCKETS,
+)
+
+DB_GC_VISITED: Final[Counter] = Counter(
+    "cbsd_db_gc_visited",
+    "Build entries visited by builds database garbage collection runs",
+)
+
+DB_GC_COLLECTED: Final[Counter] = Counter(
+    "cbsd_db_gc_collected",
+    "Unfinished build entries marked failed by builds database garbage collection",
+)
+
+DB_GC_MALFORMED: Final[Counter] = Counter(
+    "cbsd_db_gc_malformed",
+    "Malformed build entries skipped by builds database garbage collection",
+)
+
+PERIODIC_TRIGGERS: Final[Counter] = Counter(
+    "cbsd_periodic_task_triggers",
+    "Periodic build task firings, by outcome",
+    ["outcome"],
+)
@@ -0,0 +1,35 @@
+# CBS server library - core - metrics histogram buckets
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# Histogram buckets shared by the server's and the worker's metrics, so histograms
+# of the same durations can be compared, or aggregated, across both.
+
+from typing import Final
+
+# buckets for build-scale durations, from seconds to several hours.
+BUILD_DURATION_BUCKETS: Final[tuple[float, ...]] = (
+    1,
+    5,
+    15,
+    30,
+    60,
+    2 * 60,
+    5 * 60,
+    10 * 60,
+    20 * 60,
+    30 * 60,
+    60 * 60,
+    2 * 60 * 60,
+    4 * 60 * 60,
+    8 * 60 * 60,
+)
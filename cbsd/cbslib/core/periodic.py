@@ -28,6 +28,7 @@ from cbsdcore.versions import BuildDescriptor
 
 from cbslib.builds.mgr import BuildsMgr, NotAvailableError
 from cbslib.core import logger as parent_logger
+from cbslib.core import metrics
 from cbslib.core.utils import format_to_str
 
 logger = parent_logger.getChild("periodic")
@@ -354,6 +355,7 @@ class PeriodicTracker:
                 await periodic_task.trigger(self._builds_mgr)
 
             except TryAgainError:
+                metrics.PERIODIC_TRIGGERS.labels("backoff").inc()
                 logger.warning(
                     f"must backoff executing '{cron_uuid}', backoff '{backoff}' seconds"
                 )
@@ -361,16 +363,19 @@ class PeriodicTracker:
                 continue
 
             except DisableTaskError:
+                metrics.PERIODIC_TRIGGERS.labels("disabled").inc()
                 logger.warning(f"task disable requested for '{cron_uuid}'")
                 await on_finished(cron_uuid, True)
                 return
 
             except Exception as e:
+                metrics.PERIODIC_TRIGGERS.labels("error").inc()
                 logger.error(f"unexpected error triggering '{cron_uuid}': {e}")
                 logger.warning(f"disabling '{cron_uuid}'")
                 await on_finished(cron_uuid, True)
                 return
 
+            metrics.PERIODIC_TRIGGERS.labels("triggered").inc()
             await on_finished(cron_uuid, False)
             # return here so we can handle the expired backoff when the while
             # condition fails.
@@ -17,6 +17,8 @@ from datetime import datetime as dt
 from pathlib import Path
 from typing import Any, Final
 
+from cbslib.core import logfile
+
 
 def format_to_str(format_str: str, vars: dict[str, Any]) -> str:  # pyright: ignore[reportExplicitAny]
     now = dt.now(datetime.UTC)
@@ -80,7 +82,8 @@ def tail_file(
     Read the last N lines from a text file efficiently.
 
     This function reads the file backwards in chunks, making it memory-efficient
-    for large files. Similar to the Unix 'tail -n' command.
+    for large files. Similar to the Unix 'tail -n' command. Should the file be a
+    compressed log with an index, the index is used to read only its last segments.
 
     Args:
         filepath: Path to the file to read (Path object or string)
@@ -134,6 +137,13 @@ def tail_file(
     if not path.is_file():
         raise FileTailError(f"Path is not a file: {path}")
 
+    if logfile.is_indexed_log(path):
+        try:
+            result_bytes = logfile.IndexedLogFile(path).tail(n)
+        except logfile.LogFileError as e:
+            raise FileTailError(str(e)) from e
+        return _decode_lines(path, result_bytes, encoding, errors)
+
     # Get file size first to handle edge cases
     file_size = path.stat().st_size
 
@@ -184,9 +194,16 @@ def tail_file(
     # Take only the last N lines
     result_bytes = lines_found[-n:] if len(lines_found) > n else lines_found
 
+    return _decode_lines(path, result_bytes, encoding, errors)
+
+
+def _decode_lines(
+    path: Path, lines: list[bytes], encoding: str, errors: str
+) -> list[str]:
+    """Decode lines read from the file at 'path'."""
     try:
         # Decode bytes to strings
-        return [line.decode(encoding, errors=errors) for line in result_bytes]
+        return [line.decode(encoding, errors=errors) for line in lines]
     except UnicodeDecodeError as e:
         raise UnicodeDecodeError(
             e.encoding,
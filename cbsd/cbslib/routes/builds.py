@@ -12,15 +12,23 @@
 # GNU Affero General Public License for more details.
 
 
-from typing import Any
-
-from cbsdcore.api.responses import BaseErrorModel, NewBuildResponse
-from cbsdcore.builds.types import BuildEntry, BuildID
+import asyncio
+from datetime import datetime as dt
+from typing import Annotated, Any
+
+import fastapi
+from cbsdcore.api.responses import (
+    BaseErrorModel,
+    BuildPhaseTiming,
+    NewBuildResponse,
+)
+from cbsdcore.builds.types import BuildEntry, BuildID, EntryState
 from cbsdcore.versions import BuildDescriptor
 from celery.result import AsyncResult
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import JSONResponse
 
+from cbslib.builds.db import BuildsQuery
 from cbslib.builds.mgr import NotAvailableError
 from cbslib.builds.tracker import (
     BuildExistsError,
@@ -37,7 +45,6 @@ from cbslib.routes._utils import (
     responses_builds,
     responses_caps,
 )
-from cbslib.worker.celery import celery_app
 
 logger = parent_logger.getChild("builds")
 
@@ -127,6 +134,31 @@ async def get_builds_status(
     user: CBSAuthUser,
     mgr: CBSBuildsMgr,
     all: bool = False,
+    state: Annotated[
+        list[EntryState] | None,
+        fastapi.Query(description="Only builds in the given state(s)"),
+    ] = None,
+    channel: Annotated[
+        str | None, fastapi.Query(description="Only builds for the given channel")
+    ] = None,
+    version: Annotated[
+        str | None,
+        fastapi.Query(description="Only builds whose version matches a glob pattern"),
+    ] = None,
+    since: Annotated[
+        dt | None, fastapi.Query(description="Only builds submitted from this time")
+    ] = None,
+    until: Annotated[
+        dt | None, fastapi.Query(description="Only builds submitted before this time")
+    ] = None,
+    after: Annotated[
+        BuildID | None,
+        fastapi.Query(description="Last build ID seen, to obtain the next page"),
+    ] = None,
+    limit: Annotated[
+        int | None, fastapi.Query(description="Maximum number of builds", gt=0)
+    ] = None,
+    newest_first: bool = False,
 ) -> list[tuple[BuildID, BuildEntry]]:
     """
     Obtain the status for all builds.
@@ -136,12 +168,81 @@ async def get_builds_status(
 
     Whether the `all` paramenter will be accepted will depend on the user's
     available capabilities.
+
+    Results can be filtered by state, channel, version glob, and submission time, and
+    paginated by passing the last seen build ID as `after`.
     """
     logger.debug("obtain builds status for " + (f"{user.email}" if not all else "all"))
 
-    owner = user.email if not all else None
+    query = BuildsQuery(
+        owner=user.email if not all else None,
+        states=state,
+        channel=channel,
+        version_glob=version,
+        submitted_since=since,
+        submitted_until=until,
+        after_id=after,
+        max_entries=limit,
+        newest_first=newest_first,
+    )
     try:
-        return await mgr.status(owner=owner)
+        return await mgr.status(query)
+    except Exception as e:
+        logger.error(f"unexpected error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="check logs for failure",
+        ) from e
+
+
+@router.get(
+    "/timings",
+    summary="Obtain build phase timings",
+    responses={
+        **responses_auth,
+        **responses_caps,
+        **responses_builds,
+        **_responses,
+    },
+    dependencies=[Depends(RequiredRouteCaps(RoutesCaps.ROUTES_BUILDS_STATUS))],
+)
+async def get_builds_timings(
+    mgr: CBSBuildsMgr,
+    build_id: Annotated[
+        BuildID | None, fastapi.Query(description="Only phases of the given build")
+    ] = None,
+    phase: Annotated[
+        str | None,
+        fastapi.Query(description="Only the given phase, e.g. 'build/build-rpms'"),
+    ] = None,
+    since: Annotated[
+        dt | None,
+        fastapi.Query(description="Only builds submitted from this time"),
+    ] = None,
+    limit: Annotated[
+        int | None, fastapi.Query(description="Maximum number of entries", gt=0)
+    ] = None,
+) -> list[BuildPhaseTiming]:
+    """
+    Obtain the phase timings of finished builds.
+
+    Either all phases of a given build, by `build_id`, or a given `phase` across
+    builds, oldest first, to chart how the phase evolves over time.
+    """
+    if build_id is None and phase is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="either 'build_id' or 'phase' must be provided",
+        )
+
+    try:
+        return await mgr.timings(
+            build_id=build_id, phase=phase, since=since, max_entries=limit
+        )
+    except NotAvailableError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="try again later"
+        ) from None
     except Exception as e:
         logger.error(f"unexpected error: {e}")
         raise HTTPException(
@@ -157,12 +258,17 @@ async def get_builds_status(
 )
 async def get_task_status(task_id: str) -> JSONResponse:
     """Obtain status for a given build, by **Task ID**."""
-    task_result = AsyncResult(task_id)  # pyright: ignore[reportUnknownVariableType]
-    result = {  # pyright: ignore[reportUnknownVariableType]
-        "task_id": task_id,
-        "task_status": task_result.status,
-        "task_result": task_result.result,  # pyright: ignore[reportUnknownMemberType]
-    }
+
+    def _get_result() -> dict[str, Any]:  # pyright: ignore[reportExplicitAny]
+        # both status and result are fetched from the result backend.
+        task_result = AsyncResult(task_id)  # pyright: ignore[reportUnknownVariableType]
+        return {
+            "task_id": task_id,
+            "task_status": task_result.status,
+            "task_result": task_result.result,  # pyright: ignore[reportUnknownMemberType]
+        }
+
+    result = await asyncio.to_thread(_get_result)
     return JSONResponse(result)
 
 
@@ -221,43 +327,16 @@ async def revoke_build_id(
     },
     dependencies=[Depends(RequiredRouteCaps(RoutesCaps.ROUTES_BUILDS_INSPECT))],
 )
-async def get_status() -> JSONResponse:
+async def get_status(mgr: CBSBuildsMgr) -> JSONResponse:
     """
     Inspect builds across workers.
 
+    Served from a periodically refreshed snapshot, with 'updated' being the time it
+    was taken, or 'null' if the workers have not been inspected yet.
+
     Requires enhanced capabilities.
     """
-    inspct = celery_app.control.inspect()
-
-    active = inspct.active()
-    scheduled = inspct.scheduled()
-    reserved = inspct.reserved()
-
-    active_info: list[tuple[str, str, Any]] = []  # pyright: ignore[reportExplicitAny]
-    scheduled_info: list[Any] = []  # pyright: ignore[reportExplicitAny]
-    reserved_info: list[Any] = []  # pyright: ignore[reportExplicitAny]
-
-    if active:
-        for tasks in active.values():
-            active_info.extend(
-                [(task["name"], task["id"], task["args"]) for task in tasks]
-            )
-
-    if scheduled:
-        for tasks in scheduled.values():
-            scheduled_info.extend(list(tasks))
-
-    if reserved:
-        for tasks in reserved.values():
-            reserved_info.extend(list(tasks))
-
-    return JSONResponse(
-        {
-            "active": active_info,
-            "scheduled": scheduled_info,
-            "reserved": reserved_info,
-        }
-    )
+    return JSONResponse(mgr.inspect().model_dump(mode="json"))
 
 
 router.include_router(logs.router)
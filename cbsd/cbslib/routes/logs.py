@@ -11,16 +11,24 @@
 # MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
 # GNU Affero General Public License for more details.
 
+import re
+from collections.abc import AsyncGenerator
 from typing import Annotated
 
 import fastapi
-from cbsdcore.api.responses import BaseErrorModel, BuildLogsFollowResponse
+from cbsdcore.api.responses import (
+    BaseErrorModel,
+    BuildLogLinesResponse,
+    BuildLogSearchMatch,
+    BuildLogSearchResponse,
+    BuildLogsFollowResponse,
+)
 from cbsdcore.builds.types import BuildID
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 
-from cbslib.builds.logs import BuildLogsHandlerError
-from cbslib.core import utils
+from cbslib.builds.logs import BuildLogsHandlerError, BuildLogsSearchPatternError
+from cbslib.core import logsearch, utils
 from cbslib.core.permissions import RoutesCaps
 from cbslib.routes import logger as parent_logger
 from cbslib.routes._utils import (
@@ -34,6 +42,12 @@ logger = parent_logger.getChild("logs")
 
 router = APIRouter(prefix="/logs")
 
+# redis stream IDs, as used for log event IDs.
+_STREAM_ID_RE = re.compile(r"^\d+-\d+$")
+
+# maximum number of bytes returned on a single bytes range request.
+_MAX_BYTES_RANGE = 4 * 1024 * 1024  # 4 MB
+
 
 @router.get(
     "/{build_id}/tail",
@@ -129,6 +143,84 @@ async def get_build_logs_follow(
     )
 
 
+@router.get(
+    "/{build_id}/stream",
+    summary="Streams a given build's log, as server-sent events",
+    responses={
+        **responses_auth,
+        **responses_caps,
+        500: {
+            "model": BaseErrorModel,
+            "description": "An internal error occurred, please check CBS service logs",
+        },
+        404: {
+            "model": BaseErrorModel,
+            "description": "Build not found",
+        },
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": (
+                "Stream of log messages, identified by their stream ID, ending with "
+                + "an 'end' event once the build's log ends"
+            ),
+        },
+    },
+    dependencies=[Depends(RequiredRouteCaps(RoutesCaps.ROUTES_BUILDS_STATUS))],
+)
+async def get_build_logs_stream(
+    mgr: CBSBuildsMgr,
+    build_id: Annotated[BuildID, fastapi.Path(description="Build's ID")],
+    n: Annotated[int, fastapi.Query(description="Number of lines to start with")] = 30,
+    last_event_id: Annotated[
+        str | None,
+        fastapi.Header(
+            alias="Last-Event-ID", description="Last message ID seen, to resume from"
+        ),
+    ] = None,
+) -> StreamingResponse:
+    logger.debug(f"stream build log '{build_id}', since '{last_event_id}', max '{n}'")
+    if last_event_id and not _STREAM_ID_RE.match(last_event_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"malformed last event id '{last_event_id}'",
+        )
+
+    try:
+        events = await mgr.logs.stream(build_id, last_event_id, max_msgs=n)
+    except BuildLogsHandlerError as e:
+        logger.error(f"error handling stream request: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="check service logs for failure",
+        ) from e
+    except utils.FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="build not found",
+        ) from None
+
+    async def _sse() -> AsyncGenerator[str]:
+        async for event in events():
+            match event.kind:
+                case "keepalive":
+                    yield ": keepalive\n\n"
+                case "end":
+                    yield "event: end\ndata:\n\n"
+                case "msg":
+                    assert event.msg is not None
+                    data = "".join(
+                        f"data: {line}\n" for line in event.msg.rstrip("\n").split("\n")
+                    )
+                    msg_id = f"id: {event.msg_id}\n" if event.msg_id else ""
+                    yield f"{msg_id}{data}\n"
+
+    return StreamingResponse(
+        _sse(),
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        media_type="text/event-stream",
+    )
+
+
 @router.get(
     "/{build_id}",
     summary="Obtains a given build's log file",
@@ -153,9 +245,13 @@ async def get_build_logs_follow(
 async def get_build_log(
     mgr: CBSBuildsMgr,
     build_id: Annotated[BuildID, fastapi.Path(description="Build's ID")],
+    accept_encoding: Annotated[str | None, fastapi.Header()] = None,
 ):
+    accept_gzip = accept_encoding is not None and "gzip" in accept_encoding
     try:
-        log_file_stream = await mgr.logs.get_log_file(build_id)
+        log_file_stream, is_gzip = await mgr.logs.get_log_file(
+            build_id, accept_gzip=accept_gzip
+        )
     except BuildLogsHandlerError as e:
         logger.error(f"error handling follow request: {e}")
         raise HTTPException(
@@ -168,10 +264,209 @@ async def get_build_log(
             detail="build not found",
         ) from None
 
+    headers = {
+        "Content-Disposition": f"attachment; filename='cbs-build-{build_id}.log",
+        "Vary": "Accept-Encoding",
+    }
+    if is_gzip:
+        headers["Content-Encoding"] = "gzip"
+
     return StreamingResponse(
         log_file_stream(),
-        headers={
-            "Content-Disposition": f"attachment; filename='cbs-build-{build_id}.log"
+        headers=headers,
+        media_type="text/plain",
+    )
+
+
+@router.get(
+    "/{build_id}/lines",
+    summary="Obtains a range of lines from a given build's log",
+    responses={
+        **responses_auth,
+        **responses_caps,
+        500: {
+            "model": BaseErrorModel,
+            "description": "An internal error occurred, please check CBS service logs",
         },
+        404: {
+            "model": BaseErrorModel,
+            "description": "Build not found",
+        },
+        200: {
+            "model": BuildLogLinesResponse,
+            "description": "Range of lines from the given build's log",
+        },
+    },
+    dependencies=[Depends(RequiredRouteCaps(RoutesCaps.ROUTES_BUILDS_STATUS))],
+)
+async def get_build_log_lines(
+    mgr: CBSBuildsMgr,
+    build_id: Annotated[BuildID, fastapi.Path(description="Build's ID")],
+    start: Annotated[
+        int, fastapi.Query(ge=0, description="First line to return, from zero")
+    ] = 0,
+    n: Annotated[
+        int, fastapi.Query(gt=0, le=10000, description="Number of lines to return")
+    ] = 1000,
+) -> BuildLogLinesResponse:
+    logger.debug(f"read build log '{build_id}' lines from '{start}' max '{n}'")
+    try:
+        end_of_log, res = await mgr.logs.read_lines(build_id, start, n)
+    except BuildLogsHandlerError as e:
+        logger.error(f"error handling lines request: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="check service logs for failure",
+        ) from e
+    except utils.FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="build not found",
+        ) from None
+
+    return BuildLogLinesResponse(start=start, msgs=res, end_of_log=end_of_log)
+
+
+@router.get(
+    "/{build_id}/bytes",
+    summary="Obtains a range of bytes from a given build's log",
+    responses={
+        **responses_auth,
+        **responses_caps,
+        500: {
+            "model": BaseErrorModel,
+            "description": "An internal error occurred, please check CBS service logs",
+        },
+        404: {
+            "model": BaseErrorModel,
+            "description": "Build not found",
+        },
+        200: {
+            "description": "Range of bytes from the given build's log",
+        },
+    },
+    dependencies=[Depends(RequiredRouteCaps(RoutesCaps.ROUTES_BUILDS_STATUS))],
+)
+async def get_build_log_bytes(
+    mgr: CBSBuildsMgr,
+    build_id: Annotated[BuildID, fastapi.Path(description="Build's ID")],
+    offset: Annotated[
+        int, fastapi.Query(ge=0, description="Offset of the first byte to return")
+    ] = 0,
+    length: Annotated[
+        int,
+        fastapi.Query(gt=0, le=_MAX_BYTES_RANGE, description="Bytes to return"),
+    ] = _MAX_BYTES_RANGE,
+) -> Response:
+    logger.debug(f"read build log '{build_id}' bytes from '{offset}' max '{length}'")
+    try:
+        size, res = await mgr.logs.read_bytes(build_id, offset, length)
+    except BuildLogsHandlerError as e:
+        logger.error(f"error handling bytes request: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="check service logs for failure",
+        ) from e
+    except utils.FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="build not found",
+        ) from None
+
+    content_range = (
+        f"bytes {offset}-{offset + len(res) - 1}/{size}" if res else f"bytes */{size}"
+    )
+    return Response(
+        content=res,
+        headers={"Content-Range": content_range},
         media_type="text/plain",
     )
+
+
+@router.get(
+    "/{build_id}/search",
+    summary="Searches a given build's log",
+    responses={
+        **responses_auth,
+        **responses_caps,
+        500: {
+            "model": BaseErrorModel,
+            "description": "An internal error occurred, please check CBS service logs",
+        },
+        400: {
+            "model": BaseErrorModel,
+            "description": "Invalid search pattern, or too expensive to search",
+        },
+        404: {
+            "model": BaseErrorModel,
+            "description": "Build not found",
+        },
+        200: {
+            "model": BuildLogSearchResponse,
+            "description": "Lines matching the search, with their context",
+        },
+    },
+    dependencies=[Depends(RequiredRouteCaps(RoutesCaps.ROUTES_BUILDS_STATUS))],
+)
+async def get_build_log_search(
+    mgr: CBSBuildsMgr,
+    build_id: Annotated[BuildID, fastapi.Path(description="Build's ID")],
+    q: Annotated[
+        str,
+        fastapi.Query(
+            min_length=1,
+            max_length=logsearch.MAX_PATTERN_LENGTH,
+            description="Pattern to search",
+        ),
+    ],
+    regex: Annotated[
+        bool, fastapi.Query(description="Treat pattern as a regular expression")
+    ] = False,
+    ignore_case: Annotated[
+        bool, fastapi.Query(description="Ignore case when matching")
+    ] = False,
+    context: Annotated[
+        int,
+        fastapi.Query(ge=0, le=50, description="Context lines around each match"),
+    ] = 0,
+    max_matches: Annotated[
+        int,
+        fastapi.Query(gt=0, le=1000, description="Maximum number of matches"),
+    ] = 100,
+) -> BuildLogSearchResponse:
+    logger.debug(f"search build log '{build_id}' for '{q}', regex '{regex}'")
+    try:
+        matches, truncated = await mgr.logs.search(
+            build_id,
+            q,
+            regex=regex,
+            ignore_case=ignore_case,
+            context=context,
+            max_matches=max_matches,
+        )
+    except BuildLogsSearchPatternError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from None
+    except BuildLogsHandlerError as e:
+        logger.error(f"error handling search request: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="check service logs for failure",
+        ) from e
+    except utils.FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="build not found",
+        ) from None
+
+    return BuildLogSearchResponse(
+        matches=[
+            BuildLogSearchMatch(
+                line_no=m.line_no, msg=m.line, before=m.before, after=m.after
+            )
+            for m in matches
+        ],
+        truncated=truncated,
+    )
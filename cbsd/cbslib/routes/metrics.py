@@ -0,0 +1,39 @@
+# CBS service library - routes - metrics
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from cbslib.core.mgr import CBSMgr
+from cbslib.routes import logger as parent_logger
+
+logger = parent_logger.getChild("metrics")
+
+router = APIRouter(prefix="/metrics")
+
+
+@router.get(
+    "",
+    summary="Obtain the server's metrics, in Prometheus' text format",
+    include_in_schema=False,
+)
+async def get_metrics(mgr: CBSMgr) -> Response:
+    """Export the server's metrics, for scraping by Prometheus."""
+    try:
+        await mgr.builds_mgr.update_metrics()
+    except Exception as e:
+        # still export what we have.
+        logger.error(f"error updating metrics: {e}")
+
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -15,9 +15,11 @@
 import asyncio
 import re
 import tempfile
+import time
 from pathlib import Path
 from typing import Any, override
 
+from cbscore.builder.report import BuildArtifactReport
 from cbscore.config import Config as CBSCoreConfig
 from cbscore.errors import MalformedVersionError
 from cbscore.runner import gen_run_name, runner
@@ -30,8 +32,9 @@ from celery import signals
 
 from cbslib.config.config import Config, get_config
 from cbslib.config.worker import WorkerConfig
-from cbslib.worker import WorkerError
+from cbslib.worker import WorkerError, metrics
 from cbslib.worker.celery import logger as parent_logger
+from cbslib.worker.logs import BuildLogShipper
 from cbslib.worker.types import WorkerBuildEntry
 from cbslib.worker.worker import Worker, get_worker
 
@@ -200,14 +203,20 @@ class WorkerBuilder:
             version_desc=version_desc,
         )
 
+        log_shipper = BuildLogShipper(self._worker, build_id)
+
         async def _log_cb(msg: str) -> None:
-            await self._worker.log_for_build(build_id, msg)
+            # never blocks, so we don't stall reading the build's output.
+            log_shipper.push(msg)
 
         await self._worker.start_build(task_id, build_entry)
+        log_shipper.start()
 
         has_error = False
+        report: BuildArtifactReport | None = None
+        start = time.monotonic()
         try:
-            await runner(
+            report = await runner(
                 desc_file_path,
                 self._worker_config.cbscore_path,
                 self._cbscore_config,
@@ -228,7 +237,16 @@ class WorkerBuilder:
         finally:
             logger.info("no longer building")
             desc_file_path.unlink()
-            await self._worker.finish_build(task_id, error=has_error)
+            # ship remaining log messages before the build is marked as finished.
+            await log_shipper.stop()
+            await self._worker.finish_build(
+                task_id,
+                error=has_error,
+                timings=report.timings if report else None,
+            )
+            metrics.observe_build(
+                report, duration_secs=time.monotonic() - start, error=has_error
+            )
 
     def shutdown(self) -> None:
         logger.info(f"shutting down worker '{self._name}'")
@@ -254,6 +272,10 @@ def handle_worker_process_init(**_kwargs: Any) -> None:  # pyright: ignore[repor
     if not _worker_builder:
         _worker_builder = WorkerBuilder(get_worker())
 
+    config = get_config()
+    if config.worker and config.worker.metrics_port:
+        metrics.start_metrics_server(config.worker.metrics_port)
+
 
 @signals.worker_process_shutdown.connect
 def handle_worker_process_shutdown(**_kwargs: Any) -> None:  # pyright: ignore[reportExplicitAny, reportAny]
@@ -0,0 +1,158 @@
+# CBS service library - worker - build logs
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+import asyncio
+
+from cbsdcore.builds.types import BuildID
+
+from cbslib.worker import metrics
+from cbslib.worker.celery import logger as parent_logger
+from cbslib.worker.worker import Worker
+
+logger = parent_logger.getChild("logs")
+
+
+# maximum number of log messages waiting to be shipped. Once reached, further
+# messages are dropped until there is room again, so that we never stall the build.
+_LOG_QUEUE_MAX_MSGS = 10000
+# a batch is shipped once it has this many messages, or this many bytes...
+_LOG_BATCH_MAX_MSGS = 500
+_LOG_BATCH_MAX_BYTES = 64 * 1024
+# ... or once this many seconds have passed since its first message was queued.
+_LOG_BATCH_INTERVAL_SECS = 0.25
+
+
+class BuildLogShipper:
+    """
+    Ships a build's log messages to redis, in batches.
+
+    Log messages are queued as they are produced, without ever blocking the caller,
+    and shipped by a background task in batches bounded by size and time. Should
+    redis not keep up and the queue fill up, messages are dropped and accounted for,
+    with a note being shipped in their place once there is room again.
+    """
+
+    _worker: Worker
+    _build_id: BuildID
+    _queue: asyncio.Queue[str | None]
+    _task: asyncio.Task[None] | None
+    _dropped: int
+
+    def __init__(self, worker: Worker, build_id: BuildID) -> None:
+        self._worker = worker
+        self._build_id = build_id
+        self._queue = asyncio.Queue(maxsize=_LOG_QUEUE_MAX_MSGS)
+        self._task = None
+        self._dropped = 0
+
+    @property
+    def dropped(self) -> int:
+        """Number of log messages dropped so far."""
+        return self._dropped
+
+    def start(self) -> None:
+        """Start shipping log messages. Must be called from within an event loop."""
+        assert not self._task, "build log shipper already started"
+        self._task = asyncio.create_task(
+            self._ship_task_fn(), name=f"log-shipper-{self._build_id}"
+        )
+
+    def push(self, msg: str) -> None:
+        """Queue a log message for shipping, dropping it if the queue is full."""
+        if self._dropped > 0 and self._queue.qsize() < _LOG_QUEUE_MAX_MSGS - 1:
+            self._queue.put_nowait(
+                f"--- dropped {self._dropped} log messages, redis too slow ---"
+            )
+            self._dropped = 0
+
+        try:
+            self._queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            if self._dropped == 0:
+                logger.warning(
+                    f"log queue full for build '{self._build_id}', dropping messages"
+                )
+            self._dropped += 1
+            metrics.LOG_MSGS_DROPPED.inc()
+
+    async def stop(self) -> None:
+        """Ship all queued log messages, and stop."""
+        if not self._task:
+            return
+
+        if self._dropped > 0:
+            logger.warning(
+                f"dropped {self._dropped} log messages for build '{self._build_id}'"
+            )
+
+        # blocks until there's room for the end-of-messages marker.
+        await self._queue.put(None)
+        try:
+            await self._task
+        except Exception as e:
+            logger.error(f"error stopping log shipper for '{self._build_id}': {e}")
+        finally:
+            self._task = None
+
+    async def _next_batch(self) -> tuple[list[str], bool]:
+        """
+        Obtain the next batch of log messages to be shipped.
+
+        Waits for at least one message, then gathers as many messages as are queued
+        within the batch bounds. Returns whether the end of messages has been reached.
+        """
+        first = await self._queue.get()
+        if first is None:
+            return ([], True)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + _LOG_BATCH_INTERVAL_SECS
+        batch = [first]
+        batch_size = len(first)
+
+        while len(batch) < _LOG_BATCH_MAX_MSGS and batch_size < _LOG_BATCH_MAX_BYTES:
+            try:
+                msg = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    msg = await asyncio.wait_for(self._queue.get(), remaining)
+                except TimeoutError:
+                    break
+
+            if msg is None:
+                return (batch, True)
+
+            batch.append(msg)
+            batch_size += len(msg)
+
+        return (batch, False)
+
+    async def _ship_task_fn(self) -> None:
+        """Ship batches of log messages to redis, until told to stop."""
+        done = False
+        while not done:
+            batch, done = await self._next_batch()
+            if not batch:
+                continue
+
+            try:
+                await self._worker.log_for_build(self._build_id, batch)
+                metrics.LOG_MSGS_SHIPPED.inc(len(batch))
+            except Exception as e:
+                logger.error(
+                    f"error shipping {len(batch)} log messages "
+                    + f"for build '{self._build_id}': {e}"
+                )
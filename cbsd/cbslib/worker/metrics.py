@@ -0,0 +1,127 @@
+# CBS service library - worker - metrics
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# Prometheus metrics exported by the worker. Builds run in the worker's pool process,
+# so that's where metrics are kept and served from, on a side HTTP listener, if a
+# port has been configured. This assumes a single pool process per worker, as we run
+# with a concurrency of 1; further pool processes won't be able to serve metrics.
+
+from typing import Final
+
+from cbscore.builder.report import BuildArtifactReport
+from prometheus_client import Counter, Histogram, start_http_server
+
+from cbslib.core.metrics_buckets import BUILD_DURATION_BUCKETS
+from cbslib.worker.celery import logger as parent_logger
+
+logger = parent_logger.getChild("metrics")
+
+
+BUILDS: Final[Counter] = Counter(
+    "cbsd_worker_builds",
+    "Builds run by the worker, by outcome",
+    ["outcome"],
+)
+
+BUILD_DURATION: Final[Histogram] = Histogram(
+    "cbsd_worker_build_duration_seconds",
+    "Time taken by builds run by the worker, by outcome",
+    ["outcome"],
+    buckets=BUILD_DURATION_BUCKETS,
+)
+
+BUILDS_SKIPPED: Final[Counter] = Counter(
+    "cbsd_worker_builds_skipped",
+    "Builds skipped because their image already existed",
+)
+
+IMAGES_PUSHED: Final[Counter] = Counter(
+    "cbsd_worker_images_pushed",
+    "Container images pushed to the registry",
+)
+
+BUILD_PHASE_DURATION: Final[Histogram] = Histogram(
+    "cbsd_worker_build_phase_seconds",
+    "Time taken by each top-level phase of successful builds, by phase",
+    ["phase"],
+    buckets=BUILD_DURATION_BUCKETS,
+)
+
+BYTES_UPLOADED: Final[Counter] = Counter(
+    "cbsd_worker_bytes_uploaded",
+    "Bytes uploaded to S3 by builds",
+)
+
+CCACHE_COMPILATIONS: Final[Counter] = Counter(
+    "cbsd_worker_ccache_compilations",
+    "Cacheable compilations by builds, by whether ccache had them cached",
+    ["result"],
+)
+
+CCACHE_REMOTE_LOOKUPS: Final[Counter] = Counter(
+    "cbsd_worker_ccache_remote_lookups",
+    "Lookups in ccache's remote storage by builds, by result",
+    ["result"],
+)
+
+LOG_MSGS_SHIPPED: Final[Counter] = Counter(
+    "cbsd_worker_log_messages_shipped",
+    "Build log messages shipped to redis",
+)
+
+LOG_MSGS_DROPPED: Final[Counter] = Counter(
+    "cbsd_worker_log_messages_dropped",
+    "Build log messages dropped because redis could not keep up",
+)
+
+
+def observe_build(
+    report: BuildArtifactReport | None, *, duration_secs: float, error: bool
+) -> None:
+    """Account for a finished build, and for what its report tells us."""
+    outcome = "error" if error else "success"
+    BUILDS.labels(outcome).inc()
+    BUILD_DURATION.labels(outcome).observe(duration_secs)
+
+    if not report:
+        return
+
+    if report.skipped:
+        BUILDS_SKIPPED.inc()
+    if report.container_image and report.container_image.pushed:
+        IMAGES_PUSHED.inc()
+
+    if report.timings:
+        root = report.timings.root
+        BYTES_UPLOADED.inc(root.bytes_uploaded)
+        # only top-level phases, keeping the label's cardinality bounded.
+        for phase in root.spans:
+            if phase.duration_secs is not None:
+                BUILD_PHASE_DURATION.labels(phase.name).observe(phase.duration_secs)
+
+    if report.ccache:
+        CCACHE_COMPILATIONS.labels("hit").inc(report.ccache.hits)
+        CCACHE_COMPILATIONS.labels("miss").inc(report.ccache.misses)
+        CCACHE_REMOTE_LOOKUPS.labels("hit").inc(report.ccache.remote_hits)
+        CCACHE_REMOTE_LOOKUPS.labels("miss").inc(report.ccache.remote_misses)
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve the worker's metrics on 'port', from a background thread."""
+    try:
+        _ = start_http_server(port)
+    except OSError as e:
+        logger.error(f"unable to serve metrics on port {port}: {e}")
+        return
+
+    logger.info(f"serving metrics on port {port}")
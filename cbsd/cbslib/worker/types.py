@@ -14,6 +14,7 @@
 import enum
 
 import pydantic
+from cbscore.utils.timing import TimingReport
 from cbscore.versions.desc import VersionDescriptor
 from cbsdcore.builds.types import BuildID
 
@@ -40,3 +41,4 @@ class WorkerBuildTask(pydantic.BaseModel):
     task_id: str
     state: WorkerBuildState
     build: WorkerBuildEntry
+    timings: TimingReport | None = None
@@ -17,6 +17,7 @@ from typing import Any, Literal, cast
 
 import pydantic
 from cbscore.runner import stop
+from cbscore.utils.timing import TimingReport
 from cbsdcore.builds.types import BuildID
 from celery import signals
 
@@ -29,6 +30,9 @@ from cbslib.worker.types import WorkerBuildEntry, WorkerBuildState, WorkerBuildT
 
 logger = parent_logger.getChild("worker")
 
+# approximate maximum number of messages kept in a build's log stream.
+_LOG_STREAM_MAX_LEN = 10000
+
 
 class Worker:
     _backend: Backend
@@ -89,8 +93,14 @@ class Worker:
         *,
         revoke: bool = False,
         error: bool = False,
+        timings: TimingReport | None = None,
     ) -> None:
-        """Finish a build on the worker, cleaning up as necessary."""
+        """
+        Finish a build on the worker, cleaning up as necessary.
+
+        The build's phase timings, if any, are kept with the build's final state, for
+        the server to persist.
+        """
         logger.info(f"finish build on worker '{self._instance_name}', task '{task_id}'")
 
         redis = await self._backend.redis()
@@ -137,6 +147,7 @@ class Worker:
             task.state |= WorkerBuildState.REVOKED
         elif error:
             task.state |= WorkerBuildState.ERROR
+        task.timings = timings
 
         if revoke:
             await self._kill_build(task.build.run_name)
@@ -181,12 +192,18 @@ class Worker:
             logger.error(f"failed to terminate task '{task_id}': {e}")
             _ = task.cancel()
 
-    async def log_for_build(self, build_id: BuildID, msg: str) -> None:
-        """Store to redis a new log message for a given build."""
+    async def log_for_build(self, build_id: BuildID, msgs: list[str]) -> None:
+        """Store to redis a batch of new log messages for a given build."""
         redis = await self._backend.redis()
-        # limit the stream to 100 entries, we'll likely not need more than that for
-        # immediate, in-memory context.
-        await redis.xadd(f"cbs:logs:builds:{build_id}", {"msg": msg}, maxlen=100)
+        stream_key = f"cbs:logs:builds:{build_id}"
+        async with redis.pipeline(transaction=False) as pipe:
+            for msg in msgs:
+                # limit the stream's length, we'll likely not need more than that for
+                # immediate, in-memory context. It must however be able to hold a few
+                # batches' worth of messages, lest they be trimmed before the server
+                # gets to read them.
+                _ = pipe.xadd(stream_key, {"msg": msg}, maxlen=_LOG_STREAM_MAX_LEN)
+            _ = await pipe.execute()
 
     async def _with_redis[R, T](self, op: Awaitable[R] | Literal[0, 1]) -> R:
         """
@@ -13,14 +13,25 @@
 
 from __future__ import annotations
 
+import datetime
 import secrets
+from datetime import datetime as dt
 from pathlib import Path
 from typing import cast
 
 import pytest
 import yaml
+from cbscore.versions.utils import VersionType
+from cbsdcore.builds.types import BuildEntry, EntryState
+from cbsdcore.versions import (
+    BuildComponent,
+    BuildDescriptor,
+    BuildDestImage,
+    BuildSignedOffBy,
+    BuildTarget,
+)
 from cbslib.config.config import Config
-from cbslib.config.server import ServerConfig, ServerSecretsConfig
+from cbslib.config.server import BuildLogsConfig, ServerConfig, ServerSecretsConfig
 from cbslib.core.permissions import Permissions
 
 
@@ -30,6 +41,35 @@ def permissions_from_yaml(yaml_str: str) -> Permissions:
     return Permissions.model_validate(data)
 
 
+def build_entry(
+    *,
+    version: str = "ces-v25.03.1",
+    channel: str = "ces",
+    user: str = "user@example.com",
+    state: EntryState = EntryState.new,
+    submitted: dt | None = None,
+) -> BuildEntry:
+    """Build a BuildEntry for a minimal build descriptor."""
+    desc = BuildDescriptor(
+        version=version,
+        channel=channel,
+        signed_off_by=BuildSignedOffBy(user="User", email=user),
+        version_type=VersionType.DEV,
+        dst_image=BuildDestImage(name="ces/ceph", tag=version),
+        components=[BuildComponent(name="ceph", ref="v19.2.3")],
+        build=BuildTarget(distro="rockylinux:9", os_version="el9"),
+    )
+    return BuildEntry(
+        task_id=None,
+        desc=desc,
+        user=user,
+        submitted=submitted or dt.now(datetime.UTC),
+        state=state,
+        started=None,
+        finished=None,
+    )
+
+
 @pytest.fixture
 def mock_config(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Config:
     """
@@ -52,7 +92,7 @@ def mock_config(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Config:
                 token_secret_key=secrets.token_hex(32),
                 token_secret_ttl_minutes=60,
             ),
-            logs=tmp_path / "logs",
+            build_logs=BuildLogsConfig(dir_path=tmp_path / "logs"),
         ),
         broker_url="redis://localhost:6379/0",
         results_backend_url="redis://localhost:6379/1",
@@ -0,0 +1,164 @@
+# CBS service daemon - tests - components build cache
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+from cbscore.builder.build_cache import BuildCache
+from cbscore.builder.prepare import BuildComponentInfo
+from cbscore.core.component import CoreComponent, CoreComponentLoc
+
+
+@pytest.fixture
+def comp_loc(tmp_path: Path) -> CoreComponentLoc:
+    path = tmp_path / "components" / "foo"
+    (path / "scripts").mkdir(parents=True)
+    _ = (path / "scripts" / "build_rpms.sh").write_text("#!/bin/bash\n")
+    (path / "patches" / "25.03").mkdir(parents=True)
+    _ = (path / "patches" / "0001-fix.patch").write_text("fix\n")
+    _ = (path / "patches" / "25.03" / "0001-backport.patch").write_text("backport\n")
+
+    comp = CoreComponent.model_validate(
+        {
+            "name": "foo",
+            "repo": "https://github.com/foo/foo",
+            "build": {
+                "rpm": {
+                    "build": "scripts/build_rpms.sh",
+                    "release-rpm": "scripts/get_release_rpm.sh",
+                },
+                "get-version": "scripts/get_version.sh",
+                "deps": "scripts/install_deps.sh",
+            },
+            "containers": {"path": "containers"},
+        }
+    )
+    return CoreComponentLoc(path=path, comp=comp)
+
+
+def _info(tmp_path: Path, sha1: str = "abc") -> BuildComponentInfo:
+    return BuildComponentInfo(
+        name="foo",
+        repo_path=tmp_path,
+        worktree_path=tmp_path,
+        repo_url="https://github.com/foo/foo",
+        base_ref="v1.0.0",
+        sha1=sha1,
+        long_version="1.0.0-1.gabc",
+    )
+
+
+def _key(
+    cache: BuildCache,
+    comp_loc: CoreComponentLoc,
+    info: BuildComponentInfo,
+    *,
+    version: str = "25.03.1",
+    el_version: int = 9,
+) -> str:
+    key = cache.key(
+        comp_loc,
+        info,
+        version=version,
+        distro="rockylinux:9",
+        el_version=el_version,
+        arch="x86_64",
+    )
+    assert key
+    return key
+
+
+def _topdir(path: Path) -> Path:
+    (path / "RPMS" / "x86_64").mkdir(parents=True)
+    (path / "SRPMS").mkdir()
+    (path / "BUILD").mkdir()
+    _ = (path / "RPMS" / "x86_64" / "foo-1.0.0.rpm").write_bytes(b"rpm" * 64)
+    _ = (path / "SRPMS" / "foo-1.0.0.src.rpm").write_bytes(b"srpm")
+    _ = (path / "BUILD" / "leftover.rpm").write_bytes(b"build")
+    return path
+
+
+class TestBuildCacheKey:
+    """Keys change with any of the build's inputs."""
+
+    def test_stable(self, tmp_path: Path, comp_loc: CoreComponentLoc) -> None:
+        cache = BuildCache(tmp_path / "cache", max_size=1024)
+        info = _info(tmp_path)
+        assert _key(cache, comp_loc, info) == _key(cache, comp_loc, info)
+        # same patches apply to another release of the same minor version.
+        assert _key(cache, comp_loc, info) == _key(
+            cache, comp_loc, info, version="25.03.2"
+        )
+
+    def test_inputs(self, tmp_path: Path, comp_loc: CoreComponentLoc) -> None:
+        cache = BuildCache(tmp_path / "cache", max_size=1024)
+        info = _info(tmp_path)
+        key = _key(cache, comp_loc, info)
+
+        assert key != _key(cache, comp_loc, _info(tmp_path, sha1="def"))
+        assert key != _key(cache, comp_loc, info, el_version=10)
+        # different patches apply to another minor version.
+        assert key != _key(cache, comp_loc, info, version="25.07.1")
+
+        _ = (comp_loc.path / "patches" / "0001-fix.patch").write_text("fixed\n")
+        patched_key = _key(cache, comp_loc, info)
+        assert key != patched_key
+
+        _ = (comp_loc.path / "scripts" / "build_rpms.sh").write_text("#!/bin/sh\n")
+        assert patched_key != _key(cache, comp_loc, info)
+
+
+class TestBuildCache:
+    """Builds are cached and restored by key, unsigned RPMs only."""
+
+    async def test_restore(self, tmp_path: Path, comp_loc: CoreComponentLoc) -> None:
+        cache = BuildCache(tmp_path / "cache", max_size=1024**2)
+        info = _info(tmp_path)
+        key = _key(cache, comp_loc, info)
+
+        new_topdir = tmp_path / "rpms" / "new"
+        new_topdir.mkdir(parents=True)
+        assert not await cache.restore("foo", key, new_topdir)
+
+        await cache.store(info, key, _topdir(tmp_path / "rpms" / "old"))
+        assert await cache.restore("foo", key, new_topdir)
+        assert sorted(
+            p.relative_to(new_topdir).as_posix() for p in new_topdir.rglob("*.rpm")
+        ) == ["RPMS/x86_64/foo-1.0.0.rpm", "SRPMS/foo-1.0.0.src.rpm"]
+
+        # restored RPMs are copies, so signing them leaves the cache untouched.
+        _ = (new_topdir / "SRPMS" / "foo-1.0.0.src.rpm").write_bytes(b"signed")
+        other_topdir = tmp_path / "rpms" / "other"
+        other_topdir.mkdir()
+        assert await cache.restore("foo", key, other_topdir)
+        assert (other_topdir / "SRPMS" / "foo-1.0.0.src.rpm").read_bytes() == b"srpm"
+
+    async def test_evict(self, tmp_path: Path, comp_loc: CoreComponentLoc) -> None:
+        # room for a single build.
+        cache = BuildCache(tmp_path / "cache", max_size=512)
+        info = _info(tmp_path)
+        old_key = _key(cache, comp_loc, info)
+        new_key = _key(cache, comp_loc, info, el_version=10)
+
+        topdir = _topdir(tmp_path / "rpms" / "foo")
+        await cache.store(info, old_key, topdir)
+        await cache.store(info, new_key, topdir)
+        # least recently used first.
+        os.utime(tmp_path / "cache" / "foo" / old_key / "entry.json", (0, 0))
+        await cache.evict()
+
+        assert not await cache.restore("foo", old_key, topdir)
+        assert await cache.restore("foo", new_key, topdir)
@@ -0,0 +1,290 @@
+# CBS service daemon - tests - builds database
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+from __future__ import annotations
+
+import datetime
+import dbm.sqlite3
+from datetime import datetime as dt
+from datetime import timedelta as td
+from pathlib import Path
+
+import pytest
+from cbsdcore.builds.types import EntryState
+from cbslib.builds.db import BuildsDB, BuildsQuery, DBBuildEntry, NoSuchBuildError
+from prometheus_client import REGISTRY
+
+from tests.conftest import build_entry
+
+
+def _sample(name: str) -> float:
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+# ===========================================================================
+# Basic operations
+# ===========================================================================
+
+
+class TestBuildsDBBasic:
+    """Create, update, and obtain build entries."""
+
+    async def test_new_assigns_sequential_ids(self, tmp_path: Path) -> None:
+        db = BuildsDB(tmp_path)
+        assert await db.new(build_entry()) == 1
+        assert await db.new(build_entry()) == 2
+
+    async def test_update_then_get(self, tmp_path: Path) -> None:
+        db = BuildsDB(tmp_path)
+        entry = build_entry()
+        build_id = await db.new(entry)
+
+        entry.state = EntryState.started
+        entry.task_id = "some-task"
+        await db.update(build_id, entry)
+
+        db_entry = await db.get(build_id)
+        assert db_entry.build_id == build_id
+        assert db_entry.entry.state == EntryState.started
+        assert db_entry.entry.task_id == "some-task"
+
+    async def test_get_missing_raises(self, tmp_path: Path) -> None:
+        db = BuildsDB(tmp_path)
+        with pytest.raises(NoSuchBuildError):
+            _ = await db.get(1)
+
+    async def test_update_missing_raises(self, tmp_path: Path) -> None:
+        db = BuildsDB(tmp_path)
+        with pytest.raises(NoSuchBuildError):
+            await db.update(42, build_entry())
+
+    async def test_entries_persist_across_instances(self, tmp_path: Path) -> None:
+        db = BuildsDB(tmp_path)
+        build_id = await db.new(build_entry(version="ces-v1"))
+        db.close()
+
+        db = BuildsDB(tmp_path)
+        assert (await db.get(build_id)).entry.desc.version == "ces-v1"
+        assert await db.new(build_entry()) == build_id + 1
+
+
+# ===========================================================================
+# Filtered and paginated listing
+# ===========================================================================
+
+
+class TestBuildsDBList:
+    """Listing entries with server-side filters and keyset pagination."""
+
+    @pytest.fixture
+    async def db(self, tmp_path: Path) -> BuildsDB:
+        db = BuildsDB(tmp_path)
+        now = dt.now(datetime.UTC)
+        for i in range(10):
+            _ = await db.new(
+                build_entry(
+                    version=f"ces-v25.0{i % 3}.{i}",
+                    channel="ces" if i % 2 == 0 else "ccs",
+                    user="a@example.com" if i < 5 else "b@example.com",
+                    state=EntryState.success if i % 2 == 0 else EntryState.failure,
+                    submitted=now - td(hours=10 - i),
+                )
+            )
+        return db
+
+    @staticmethod
+    def _ids(entries: list[DBBuildEntry]) -> list[int]:
+        return [e.build_id for e in entries]
+
+    async def test_ls_all(self, db: BuildsDB) -> None:
+        assert self._ids(await db.ls()) == list(range(1, 11))
+
+    async def test_ls_by_owner(self, db: BuildsDB) -> None:
+        res = await db.ls(BuildsQuery(owner="b@example.com"))
+        assert self._ids(res) == [6, 7, 8, 9, 10]
+
+    async def test_ls_by_state(self, db: BuildsDB) -> None:
+        res = await db.ls(BuildsQuery(states=[EntryState.failure]))
+        assert self._ids(res) == [2, 4, 6, 8, 10]
+
+    async def test_ls_by_channel(self, db: BuildsDB) -> None:
+        res = await db.ls(BuildsQuery(channel="ces"))
+        assert self._ids(res) == [1, 3, 5, 7, 9]
+
+    async def test_ls_by_version_glob(self, db: BuildsDB) -> None:
+        res = await db.ls(BuildsQuery(version_glob="ces-v25.01.*"))
+        assert self._ids(res) == [2, 5, 8]
+
+    async def test_ls_by_time_range(self, db: BuildsDB) -> None:
+        now = dt.now(datetime.UTC)
+        res = await db.ls(
+            BuildsQuery(
+                submitted_since=now - td(hours=5, minutes=30),
+                submitted_until=now - td(hours=2, minutes=30),
+            )
+        )
+        assert self._ids(res) == [6, 7, 8]
+
+    async def test_ls_keyset_pagination(self, db: BuildsDB) -> None:
+        pages: list[list[int]] = []
+        after: int | None = None
+        while page := await db.ls(BuildsQuery(after_id=after, max_entries=4)):
+            pages.append(self._ids(page))
+            after = page[-1].build_id
+        assert pages == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+
+    async def test_ls_keyset_pagination_newest_first(self, db: BuildsDB) -> None:
+        first = await db.ls(BuildsQuery(max_entries=3, newest_first=True))
+        assert self._ids(first) == [10, 9, 8]
+        second = await db.ls(BuildsQuery(after_id=8, max_entries=3, newest_first=True))
+        assert self._ids(second) == [7, 6, 5]
+
+    async def test_ls_combined_filters(self, db: BuildsDB) -> None:
+        res = await db.ls(
+            BuildsQuery(
+                owner="a@example.com",
+                states=[EntryState.success],
+                max_entries=2,
+            )
+        )
+        assert self._ids(res) == [1, 3]
+
+    async def test_count_by_state(self, db: BuildsDB) -> None:
+        counts = await db.count_by_state()
+        assert counts[EntryState.success] == 5
+        assert counts[EntryState.failure] == 5
+        assert counts[EntryState.started] == 0
+        assert set(counts) == set(EntryState)
+
+
+# ===========================================================================
+# Garbage collection
+# ===========================================================================
+
+
+class TestBuildsDBGC:
+    """Unfinished builds, and only those, are marked failed on gc."""
+
+    async def test_gc_fails_unfinished_builds(self, tmp_path: Path) -> None:
+        db = BuildsDB(tmp_path)
+        _ = await db.new(build_entry(state=EntryState.success))
+        _ = await db.new(build_entry(state=EntryState.started))
+        _ = await db.new(build_entry(state=EntryState.pending))
+        _ = await db.new(build_entry(state=EntryState.revoked))
+
+        await db.gc()
+
+        states = [e.entry.state for e in await db.ls()]
+        assert states == [
+            EntryState.success,
+            EntryState.failure,
+            EntryState.failure,
+            EntryState.revoked,
+        ]
+        failed = await db.ls(BuildsQuery(states=[EntryState.failure]))
+        assert [e.build_id for e in failed] == [2, 3]
+
+    async def test_gc_only_visits_active_builds(self, tmp_path: Path) -> None:
+        db = BuildsDB(tmp_path)
+        for _ in range(50):
+            _ = await db.new(build_entry(state=EntryState.success))
+        _ = await db.new(build_entry(state=EntryState.started))
+
+        visited = _sample("cbsd_db_gc_visited_total")
+        collected = _sample("cbsd_db_gc_collected_total")
+        stats = await db.gc()
+        assert stats.visited == 1
+        assert stats.collected == 1
+        assert db.last_gc_stats == stats
+        # and exported, for the server's metrics.
+        assert _sample("cbsd_db_gc_visited_total") == visited + 1
+        assert _sample("cbsd_db_gc_collected_total") == collected + 1
+
+        stats = await db.gc()
+        assert stats.visited == 0
+
+    async def test_gc_in_batches(self, tmp_path: Path) -> None:
+        db = BuildsDB(tmp_path)
+        for _ in range(250):
+            _ = await db.new(build_entry(state=EntryState.pending))
+
+        stats = await db.gc()
+        assert stats.visited == 250
+        assert stats.collected == 250
+        assert await db.ls_active() == []
+
+    async def test_active_set_follows_state_transitions(self, tmp_path: Path) -> None:
+        db = BuildsDB(tmp_path)
+        entry = build_entry()
+        build_id = await db.new(entry)
+        _ = await db.new(build_entry(state=EntryState.success))
+        assert [e.build_id for e in await db.ls_active()] == [build_id]
+
+        entry.state = EntryState.started
+        await db.update(build_id, entry)
+        assert [e.build_id for e in await db.ls_active()] == [build_id]
+
+        entry.state = EntryState.success
+        await db.update(build_id, entry)
+        assert await db.ls_active() == []
+
+    async def test_upgrade_populates_active_set(self, tmp_path: Path) -> None:
+        db = BuildsDB(tmp_path)
+        _ = await db.new(build_entry(state=EntryState.started))
+        _ = await db.new(build_entry(state=EntryState.success))
+        # mimic a database created before the active builds set existed.
+        with db._conn:  # pyright: ignore[reportPrivateUsage]
+            _ = db._conn.execute("DELETE FROM active_builds")  # pyright: ignore[reportPrivateUsage]
+            _ = db._conn.execute("PRAGMA user_version = 0")  # pyright: ignore[reportPrivateUsage]
+        db.close()
+
+        db = BuildsDB(tmp_path)
+        assert [e.build_id for e in await db.ls_active()] == [1]
+
+
+# ===========================================================================
+# Legacy database migration
+# ===========================================================================
+
+
+class TestBuildsDBMigration:
+    """Entries from the legacy dbm database are migrated on first start."""
+
+    def _write_legacy_db(self, path: Path) -> None:
+        with dbm.sqlite3.open(path / "builds.db", "c") as legacy:
+            legacy["builds_root"] = '{"last_build_id": 4}'
+            for build_id in (1, 2, 4):
+                entry = build_entry(version=f"ces-v{build_id}")
+                legacy[f"build_{build_id}"] = DBBuildEntry(
+                    build_id=build_id, entry=entry
+                ).model_dump_json()
+            legacy["build_3"] = "not json"
+
+    async def test_migrates_entries(self, tmp_path: Path) -> None:
+        self._write_legacy_db(tmp_path)
+        db = BuildsDB(tmp_path)
+
+        entries = await db.ls()
+        assert [e.build_id for e in entries] == [1, 2, 4]
+        assert entries[-1].entry.desc.version == "ces-v4"
+
+        assert not (tmp_path / "builds.db").exists()
+        assert (tmp_path / "builds.db.migrated").exists()
+
+        # all migrated entries are new, and thus active.
+        assert [e.build_id for e in await db.ls_active()] == [1, 2, 4]
+
+    async def test_new_ids_follow_legacy_ids(self, tmp_path: Path) -> None:
+        self._write_legacy_db(tmp_path)
+        db = BuildsDB(tmp_path)
+        assert await db.new(build_entry()) == 5
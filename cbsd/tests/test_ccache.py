@@ -0,0 +1,160 @@
+# CBS service daemon - tests - ccache for RPM builds
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+from __future__ import annotations
+
+import urllib.error
+import urllib.request
+from collections.abc import Generator
+from pathlib import Path
+from typing import override
+
+import pytest
+from cbscore.builder.ccache import Ccache, split_file_storage
+from cbscore.config import CcacheConfig
+from cbscore.utils import CmdArgs
+from cbscore.utils.ccache_storage import CcacheStorageServer
+
+
+def _print_stats(**counters: int) -> str:
+    return "".join(f"{name}\t{value}\n" for name, value in counters.items())
+
+
+class _StatsCcache(Ccache):
+    """A ccache whose statistics are provided, rather than obtained from ccache."""
+
+    outputs: list[str]
+
+    def __init__(self, path: Path, outputs: list[str]) -> None:
+        super().__init__(path, "rockylinux:9", 9, CcacheConfig())
+        self.outputs = outputs
+
+    @override
+    async def _run(self, args: CmdArgs) -> str | None:
+        if args == ["--version"]:
+            return "ccache version 4.10.2\n"
+        return self.outputs.pop(0) if self.outputs else None
+
+    @override
+    async def _get_toolchain(self) -> str:
+        return "gcc-11.5.0"
+
+
+class TestCcacheReport:
+    """Builds are reported the difference in statistics since the cache's setup."""
+
+    async def test_delta(self, tmp_path: Path) -> None:
+        ccache = _StatsCcache(
+            tmp_path,
+            [
+                _print_stats(direct_cache_hit=10, cache_miss=5, remote_storage_hit=1),
+                _print_stats(
+                    stats_updated_timestamp=1700000000,
+                    direct_cache_hit=40,
+                    preprocessed_cache_hit=10,
+                    cache_miss=15,
+                    remote_storage_hit=21,
+                    remote_storage_miss=4,
+                    cache_size_kibibyte=2048,
+                ),
+            ],
+        )
+        await ccache.setup()
+        assert ccache.path == tmp_path / "rockylinux-9-el9-gcc-11.5.0"
+
+        report = await ccache.report()
+        assert report
+        assert (report.hits, report.misses) == (40, 10)
+        assert report.hit_rate == pytest.approx(0.8)
+        assert (report.remote_hits, report.remote_misses) == (20, 4)
+        assert report.cache_size == 2048 * 1024
+
+    async def test_nothing_compiled(self, tmp_path: Path) -> None:
+        stats = _print_stats(direct_cache_hit=10, cache_miss=5)
+        ccache = _StatsCcache(tmp_path, [stats, stats])
+        await ccache.setup()
+
+        report = await ccache.report()
+        assert report
+        assert (report.hits, report.misses, report.hit_rate) == (0, 0, None)
+
+    async def test_unavailable(self, tmp_path: Path) -> None:
+        ccache = _StatsCcache(tmp_path, [])
+        assert await ccache.report() is None
+        await ccache.setup()
+        assert await ccache.report() is None
+
+
+class TestCcacheConf:
+    """The cache's config bounds its size, and points at the remote storage."""
+
+    async def test_conf(self, tmp_path: Path) -> None:
+        ccache = _StatsCcache(tmp_path, [])
+        ccache.config = CcacheConfig.model_validate(
+            {
+                "max-size-gb": 1.5,
+                "remote-storage": "http://ccache.foo.tld/cache",
+                "remote-only": True,
+            }
+        )
+        await ccache.setup()
+        assert (ccache.path / "ccache.conf").read_text().splitlines() == [
+            "max_size = 1536Mi",
+            "remote_storage = http://ccache.foo.tld/cache",
+            "remote_only = true",
+        ]
+
+    @pytest.mark.parametrize(
+        ("remote_storage", "expected"),
+        [
+            ("file:/foo/bar", (Path("/foo/bar"), "")),
+            ("file:///foo/bar|umask=002", (Path("/foo/bar"), "|umask=002")),
+            ("http://ccache.foo.tld/cache", None),
+            ("file:/foo http://ccache.foo.tld", None),
+        ],
+    )
+    def test_split_file_storage(
+        self, remote_storage: str, expected: tuple[Path, str] | None
+    ) -> None:
+        assert split_file_storage(remote_storage) == expected
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> Generator[CcacheStorageServer]:
+    server = CcacheStorageServer(tmp_path / "storage")
+    _ = server.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _request(url: str, method: str, data: bytes | None = None) -> tuple[int, bytes]:
+    req = urllib.request.Request(url, data=data, method=method)  # noqa: S310
+    try:
+        with urllib.request.urlopen(req) as res:  # noqa: S310
+            return res.status, res.read()
+    except urllib.error.HTTPError as e:
+        return e.code, b""
+
+
+def test_storage_stand_in(storage: CcacheStorageServer) -> None:
+    url = f"{storage.url}/ab/cdef0123"
+    assert _request(url, "GET")[0] == 404
+    assert _request(url, "PUT", b"entry")[0] == 201
+    assert _request(url, "GET") == (200, b"entry")
+    assert _request(url, "HEAD") == (200, b"")
+    assert (storage.path / "ab" / "cdef0123").read_bytes() == b"entry"
+    assert _request(url, "DELETE")[0] == 204
+    assert _request(url, "HEAD")[0] == 404
@@ -0,0 +1,94 @@
+# CBS service daemon - tests - git object cache
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+from cbscore.utils.git import run_git
+from cbscore.utils.git_cache import GitCache
+
+pytestmark = pytest.mark.skipif(not shutil.which("git"), reason="git not available")
+
+
+async def _git(path: Path, *args: str) -> str:
+    return (await run_git(list(args), path=path)).strip()
+
+
+@pytest.fixture
+async def upstream(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Create an upstream repository, with a branch, and annotated and light tags."""
+    for var in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{var}_NAME", "CBS")
+        monkeypatch.setenv(f"GIT_{var}_EMAIL", "cbs@foo.tld")
+
+    path = tmp_path / "upstream"
+    path.mkdir()
+    _ = await _git(path, "init", "--quiet", "--initial-branch", "main")
+    for i in range(1, 4):
+        _ = (path / "VERSION").write_text(f"{i}\n")
+        _ = await _git(path, "add", "VERSION")
+        _ = await _git(path, "commit", "--quiet", "-m", f"release {i}")
+        if i == 1:
+            _ = await _git(path, "tag", "v1")
+        elif i == 2:
+            _ = await _git(path, "tag", "--annotate", "-m", "v19.2.3", "v19.2.3")
+    return path
+
+
+async def _checkout(cache: GitCache, upstream: Path, ref: str, tmp_path: Path) -> str:
+    """Check 'ref' out, returning the worktree's 'VERSION'."""
+    _, worktree_path = await cache.checkout(
+        "foo", f"file://{upstream}", ref, tmp_path / "worktrees"
+    )
+    try:
+        return (worktree_path / "VERSION").read_text().strip()
+    finally:
+        await cache.remove_worktree("foo", worktree_path)
+
+
+class TestGitCache:
+    """Refs of any kind are checked out from the cache."""
+
+    @pytest.mark.parametrize(
+        ("ref", "version"),
+        [("main", "3"), ("v1", "1"), ("v19.2.3", "2"), ("sha1", "2")],
+    )
+    async def test_checkout(
+        self, tmp_path: Path, upstream: Path, ref: str, version: str
+    ) -> None:
+        if ref == "sha1":
+            ref = await _git(upstream, "rev-parse", "HEAD~1")
+        cache = GitCache(tmp_path / "cache", max_size=1024**3)
+        assert await _checkout(cache, upstream, ref, tmp_path) == version
+
+    async def test_describe_annotated_tag(self, tmp_path: Path, upstream: Path) -> None:
+        cache = GitCache(tmp_path / "cache", max_size=1024**3)
+        _, worktree_path = await cache.checkout(
+            "foo", f"file://{upstream}", "main", tmp_path / "worktrees"
+        )
+        # tags pointing into the fetched history are fetched along with it.
+        assert await _git(worktree_path, "describe", "--abbrev=0") == "v19.2.3"
+
+    async def test_checkout_updated_ref(self, tmp_path: Path, upstream: Path) -> None:
+        cache = GitCache(tmp_path / "cache", max_size=1024**3)
+        assert await _checkout(cache, upstream, "v19.2.3", tmp_path) == "2"
+
+        # the tag moved upstream, warm checkouts follow it.
+        _ = await _git(
+            upstream, "tag", "--force", "--annotate", "-m", "moved", "v19.2.3"
+        )
+        assert await _checkout(cache, upstream, "v19.2.3", tmp_path) == "3"
+        assert await _checkout(cache, upstream, "main", tmp_path) == "3"
@@ -0,0 +1,101 @@
+# CBS service daemon - tests - compressed, indexed log files
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+
+import pytest
+from cbslib.core import logfile, utils
+
+
+@pytest.fixture
+def small_segments(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Force many segments, even for small logs."""
+    monkeypatch.setattr(logfile, "LOG_SEGMENT_MAX_BYTES", 64)
+
+
+def _write_plain_log(path: Path, num_lines: int) -> bytes:
+    contents = "".join(f"line {i:04d} of the build log\n" for i in range(num_lines))
+    _ = path.write_text(contents)
+    return contents.encode()
+
+
+@pytest.mark.usefixtures("small_segments")
+class TestIndexedLogFile:
+    """Compressed logs read through their index match their plain counterparts."""
+
+    @pytest.fixture
+    def logs(self, tmp_path: Path) -> tuple[Path, Path, bytes]:
+        plain = tmp_path / "build-1.log"
+        compressed = tmp_path / "build-1.log.gz"
+        contents = _write_plain_log(plain, 100)
+        logfile.compress_log(plain, compressed)
+        return (plain, compressed, contents)
+
+    def test_compress_writes_index(self, logs: tuple[Path, Path, bytes]) -> None:
+        _, compressed, contents = logs
+        assert logfile.is_indexed_log(compressed)
+        reader = logfile.IndexedLogFile(compressed)
+        assert len(reader.segments) > 1
+        assert reader.num_lines == 100
+        assert reader.size == len(contents)
+
+    def test_whole_file_is_valid_gzip(self, logs: tuple[Path, Path, bytes]) -> None:
+        _, compressed, contents = logs
+        assert gzip.decompress(compressed.read_bytes()) == contents
+
+    @pytest.mark.parametrize(
+        ("start", "end"), [(0, 1), (0, 100), (1, 2), (17, 63), (95, 200), (100, 101)]
+    )
+    def test_read_lines(
+        self, logs: tuple[Path, Path, bytes], start: int, end: int
+    ) -> None:
+        plain, compressed, contents = logs
+        expected = contents.split(b"\n")[:-1][start:end]
+        assert logfile.IndexedLogFile(compressed).read_lines(start, end) == expected
+        assert logfile.read_plain_lines(plain, start, end) == expected
+
+    @pytest.mark.parametrize(
+        ("offset", "length"), [(0, 10), (0, 10000), (30, 1), (60, 200), (3000, 5000)]
+    )
+    def test_read_bytes(
+        self, logs: tuple[Path, Path, bytes], offset: int, length: int
+    ) -> None:
+        plain, compressed, contents = logs
+        expected = contents[offset : offset + length]
+        assert logfile.IndexedLogFile(compressed).read_bytes(offset, length) == expected
+        assert logfile.read_plain_bytes(plain, offset, length) == expected
+
+    def test_tail_file_uses_index(self, logs: tuple[Path, Path, bytes]) -> None:
+        plain, compressed, _ = logs
+        assert utils.tail_file(compressed, 7) == utils.tail_file(plain, 7)
+        assert utils.tail_file(compressed, 1000) == utils.tail_file(plain, 1000)
+
+    def test_empty_log(self, tmp_path: Path) -> None:
+        plain = tmp_path / "build-2.log"
+        compressed = tmp_path / "build-2.log.gz"
+        _ = plain.write_text("")
+        logfile.compress_log(plain, compressed)
+
+        reader = logfile.IndexedLogFile(compressed)
+        assert reader.num_lines == 0
+        assert reader.read_lines(0) == []
+        assert utils.tail_file(compressed, 10) == []
+
+    def test_malformed_index(self, logs: tuple[Path, Path, bytes]) -> None:
+        _, compressed, _ = logs
+        _ = logfile.index_path_for(compressed).write_bytes(b"garbage")
+        with pytest.raises(logfile.LogFileError):
+            _ = logfile.IndexedLogFile(compressed)
@@ -0,0 +1,230 @@
+# CBS service daemon - tests - log search
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import pytest
+from cbslib.core import logfile, logsearch
+
+
+@pytest.fixture(autouse=True)
+def small_segments(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Force many segments, even for small logs."""
+    monkeypatch.setattr(logfile, "LOG_SEGMENT_MAX_BYTES", 256)
+
+
+def _log_lines() -> list[str]:
+    lines = [f"[{i:04d}] compiling src/module_{i % 17}.cc" for i in range(400)]
+    lines[123] = "[0123] error: undefined reference to 'ceph::foo()'"
+    lines[124] = "[0124] collect2: ERROR: ld returned 1 exit status"
+    lines[350] = "[0350] warning: unused variable 'bar'"
+    return lines
+
+
+def _write_indexed_log(path: Path, lines: list[str]) -> None:
+    """Write a log in a few appends, indexing it as we go."""
+    writer = logsearch.SearchIndexWriter.resume(
+        logsearch.search_index_path_for(path), path
+    )
+    for i in range(0, len(lines), 37):
+        data = "".join(f"{line}\n" for line in lines[i : i + 37]).encode()
+        with path.open("ab") as fd:
+            _ = fd.write(data)
+        writer.feed(data)
+    writer.close()
+
+
+def _grep(
+    lines: list[str], pattern: str, *, regex: bool, ignore_case: bool
+) -> list[int]:
+    rx = re.compile(
+        pattern if regex else re.escape(pattern), re.IGNORECASE if ignore_case else 0
+    )
+    return [i for i, line in enumerate(lines) if rx.search(line)]
+
+
+_SEARCHES = [
+    ("undefined reference", False, False),
+    ("ERROR", False, False),
+    ("error", False, True),
+    ("module_3.cc", False, False),
+    (r"exit status|unused", True, False),
+    (r"undefined\s+ref(erence)?", True, False),
+    (r"^\[03\d\d\] warn", True, False),
+    ("no such thing", False, False),
+]
+
+
+class TestLogSearch:
+    """Searches find the same lines as a naive scan, regardless of the log format."""
+
+    @pytest.fixture
+    def plain(self, tmp_path: Path) -> Path:
+        path = tmp_path / "build-1.log"
+        _write_indexed_log(path, _log_lines())
+        return path
+
+    @pytest.fixture
+    def compressed(self, plain: Path) -> Path:
+        path = plain.with_name(f"{plain.name}.gz")
+        logfile.compress_log(plain, path)
+        return path
+
+    @pytest.mark.parametrize(("pattern", "regex", "ignore_case"), _SEARCHES)
+    def test_search_plain(
+        self, plain: Path, pattern: str, regex: bool, ignore_case: bool
+    ) -> None:
+        matches, truncated = logsearch.search_log(
+            plain, pattern, regex=regex, ignore_case=ignore_case
+        )
+        expected = _grep(_log_lines(), pattern, regex=regex, ignore_case=ignore_case)
+        assert [m.line_no for m in matches] == expected
+        assert not truncated
+
+    @pytest.mark.parametrize(("pattern", "regex", "ignore_case"), _SEARCHES)
+    def test_search_compressed(
+        self, compressed: Path, pattern: str, regex: bool, ignore_case: bool
+    ) -> None:
+        matches, _ = logsearch.search_log(
+            compressed, pattern, regex=regex, ignore_case=ignore_case
+        )
+        expected = _grep(_log_lines(), pattern, regex=regex, ignore_case=ignore_case)
+        assert [m.line_no for m in matches] == expected
+
+    def test_search_unindexed(self, plain: Path) -> None:
+        logsearch.search_index_path_for(plain).unlink()
+        matches, _ = logsearch.search_log(plain, "undefined reference")
+        assert [m.line_no for m in matches] == [123]
+
+    def test_search_reads_few_segments(
+        self, compressed: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        reads: list[int] = []
+        read_segment = logfile.IndexedLogFile.read_segment
+
+        def _read_segment(
+            self: logfile.IndexedLogFile, segment: logfile.LogSegment
+        ) -> bytes:
+            reads.append(segment.first_line)
+            return read_segment(self, segment)
+
+        monkeypatch.setattr(logfile.IndexedLogFile, "read_segment", _read_segment)
+        num_segments = len(logfile.IndexedLogFile(compressed).segments)
+
+        matches, _ = logsearch.search_log(compressed, "undefined reference")
+        assert [m.line_no for m in matches] == [123]
+        assert 0 < len(reads) < num_segments // 4
+
+    def test_context_across_segments(self, compressed: Path) -> None:
+        lines = _log_lines()
+        matches, _ = logsearch.search_log(compressed, "undefined", context=10)
+        assert len(matches) == 1
+        assert matches[0].before == lines[113:123]
+        assert matches[0].after == lines[124:134]
+
+    def test_context_at_log_edges(self, plain: Path) -> None:
+        lines = _log_lines()
+        first, _ = logsearch.search_log(plain, "[0000]", context=3)
+        assert first[0].before == []
+        assert first[0].after == lines[1:4]
+        last, _ = logsearch.search_log(plain, "[0399]", context=3)
+        assert last[0].before == lines[396:399]
+        assert last[0].after == []
+
+    def test_max_matches(self, plain: Path) -> None:
+        matches, truncated = logsearch.search_log(plain, "compiling", max_matches=5)
+        assert [m.line_no for m in matches] == [0, 1, 2, 3, 4]
+        assert truncated
+
+    def test_resume_indexing(self, tmp_path: Path) -> None:
+        lines = _log_lines()
+        path = tmp_path / "build-2.log"
+        _write_indexed_log(path, lines[:200])
+        # pretend we went away without closing the index, and wrote some more.
+        with path.open("a") as fd:
+            _ = fd.write("".join(f"{line}\n" for line in lines[200:]))
+        writer = logsearch.SearchIndexWriter.resume(
+            logsearch.search_index_path_for(path), path
+        )
+        writer.close()
+
+        compressed = path.with_name(f"{path.name}.gz")
+        logfile.compress_log(path, compressed)
+        matches, _ = logsearch.search_log(compressed, "unused variable")
+        assert [m.line_no for m in matches] == [350]
+
+    @pytest.mark.parametrize(
+        "pattern", [r"compiling x{3}\.cc", r"compiling x{2,4}\.cc", r" x{5,}\.cc"]
+    )
+    def test_search_quantifiers(self, tmp_path: Path, pattern: str) -> None:
+        # a log without digits nor commas, so the quantifiers' bounds are nowhere.
+        lines = [f"compiling {'x' * (1 + i % 6)}.cc" for i in range(400)]
+        path = tmp_path / "build-3.log"
+        _write_indexed_log(path, lines)
+        matches, _ = logsearch.search_log(
+            path, pattern, regex=True, max_matches=len(lines)
+        )
+        expected = _grep(lines, pattern, regex=True, ignore_case=False)
+        assert expected
+        assert [m.line_no for m in matches] == expected
+
+    @pytest.mark.parametrize("pattern", [r"\x41BC error", r"\101BC error"])
+    def test_search_escapes(self, tmp_path: Path, pattern: str) -> None:
+        # characters given by their code are matched, not their code.
+        lines = [f"[{i:04d}] compiling src/module_{i % 17}.cc" for i in range(400)]
+        lines[321] = "[0321] ABC error: foo"
+        path = tmp_path / "build-4.log"
+        _write_indexed_log(path, lines)
+        matches, _ = logsearch.search_log(path, pattern, regex=True)
+        assert [m.line_no for m in matches] == [321]
+
+    def test_invalid_regex(self, plain: Path) -> None:
+        with pytest.raises(re.error):
+            _ = logsearch.search_log(plain, "foo(", regex=True)
+
+    def test_pattern_too_long(self, plain: Path) -> None:
+        with pytest.raises(re.error):
+            _ = logsearch.search_log(plain, "a" * (logsearch.MAX_PATTERN_LENGTH + 1))
+
+    def test_timeout(self, plain: Path) -> None:
+        with pytest.raises(logsearch.LogSearchTimeoutError):
+            _ = logsearch.search_log(plain, "compiling", timeout=0.0)
+
+
+@pytest.mark.parametrize(
+    ("pattern", "literals"),
+    [
+        ("undefined reference", ["undefined reference"]),
+        (r"undefined\s+reference", ["undefined", "reference"]),
+        (r"colou?r", ["colo", "r"]),
+        (r"ab+c", ["ab", "c"]),
+        (r"foo(bar|baz)qux", ["foo", "qux"]),
+        (r"foo|bar", []),
+        (r"[abc]def\.o", ["def.o"]),
+        (r"^error: .*$", ["error: "]),
+        (r"\d{2,4}", []),
+        (r"error x{100}", ["error "]),
+        (r"ab{1,3}c", ["a", "c"]),
+        (r"ab{2,}c", ["a", "c"]),
+        (r"\x41BC error", ["BC error"]),
+        (r"\101xyz", ["xyz"]),
+        (r"\cXabc", ["abc"]),
+        (r"\N{LATIN SMALL LETTER A}bc", ["bc"]),
+        (r"(a)\1xyz", ["xyz"]),
+    ],
+)
+def test_required_literals(pattern: str, literals: list[str]) -> None:
+    assert logsearch._required_literals(pattern) == literals  # pyright: ignore[reportPrivateUsage]
@@ -0,0 +1,212 @@
+# CBS service daemon - tests - releases index
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+from datetime import datetime as dt
+from typing import cast
+
+import pytest
+from cbscore.releases import index as releases_index
+from cbscore.releases.desc import (
+    ArchType,
+    BuildType,
+    ReleaseBuildEntry,
+    ReleaseComponent,
+    ReleaseComponentVersion,
+    ReleaseDesc,
+    ReleaseRPMArtifacts,
+)
+from cbscore.releases.index import ReleasesIndex
+from cbscore.releases.s3 import (
+    check_released_components,
+    release_desc_upload,
+    release_upload_components,
+)
+from cbscore.utils.s3 import S3ListResult, S3ObjectEntry, S3StrObject
+from cbscore.utils.secrets.mgr import SecretsMgr
+
+_SECRETS = cast(SecretsMgr, object())
+
+
+class _FakeS3:
+    """An in-memory S3 bucket, honoring conditional GETs."""
+
+    objects: dict[str, str]
+    requests: list[tuple[str, str]]
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.objects = {}
+        self.requests = []
+        monkeypatch.setattr(releases_index, "s3_list", self.list)
+        monkeypatch.setattr(releases_index, "s3_get_str_obj", self.get)
+        monkeypatch.setattr(releases_index, "s3_upload_json", self.put)
+
+    @staticmethod
+    def etag(contents: str) -> str:
+        return hashlib.md5(contents.encode()).hexdigest()  # noqa: S324
+
+    async def list(self, *_: object, prefix: str | None = None) -> S3ListResult:
+        self.requests.append(("LIST", prefix or ""))
+        return S3ListResult(
+            objects=[
+                S3ObjectEntry(
+                    key=key,
+                    size=len(contents),
+                    last_modified=dt.now(datetime.UTC),
+                    etag=self.etag(contents),
+                )
+                for key, contents in self.objects.items()
+                if key.startswith(prefix or "")
+            ],
+            common_prefixes=[],
+        )
+
+    async def get(
+        self, *args: object, if_none_match: str | None = None, **_: object
+    ) -> S3StrObject | None:
+        key = cast(str, args[-1])
+        if key not in self.objects:
+            self.requests.append(("GET", key))
+            return None
+        etag = self.etag(self.objects[key])
+        if etag == if_none_match:
+            self.requests.append(("GET 304", key))
+            return S3StrObject(etag=etag, contents=None)
+        self.requests.append(("GET", key))
+        return S3StrObject(etag=etag, contents=self.objects[key])
+
+    async def put(self, *args: object) -> str | None:
+        key, contents = cast(tuple[str, str], args[-2:])
+        self.requests.append(("PUT", key))
+        self.objects[key] = contents
+        return self.etag(contents)
+
+
+def _comp_version(os_version: str) -> ReleaseComponentVersion:
+    return ReleaseComponentVersion(
+        name="ceph",
+        version="19.2.3-1.gabc",
+        sha1="abc",
+        arch=ArchType.x86_64,
+        build_type=BuildType.rpm,
+        os_version=os_version,
+        repo_url="https://github.com/ceph/ceph",
+        artifacts=ReleaseRPMArtifacts(
+            loc=f"ceph/{os_version}", release_rpm_loc=f"ceph/{os_version}/release.rpm"
+        ),
+    )
+
+
+def _release_build(os_version: str) -> ReleaseBuildEntry:
+    return ReleaseBuildEntry(
+        arch=ArchType.x86_64,
+        build_type=BuildType.rpm,
+        os_version=os_version,
+        components={"ceph": _comp_version(os_version)},
+    )
+
+
+async def _update_component(index: ReleasesIndex, os_version: str) -> None:
+    """Add a build to the component's descriptor, as the builder does at the end."""
+    existing = await check_released_components(
+        _SECRETS,
+        "https://s3.foo.tld",
+        "releases",
+        "ces",
+        {"ceph": "19.2.3-1.gabc"},
+        index=index,
+        fresh=True,
+    )
+    comp = existing.get("ceph") or ReleaseComponent(
+        name="ceph", version="19.2.3-1.gabc", sha1="abc", versions=[]
+    )
+    comp.versions.append(_comp_version(os_version))
+    await release_upload_components(
+        _SECRETS, "https://s3.foo.tld", "releases", "ces", {"ceph": comp}, index=index
+    )
+
+
+class TestReleasesIndex:
+    """Descriptors updated through the index keep other builders' updates."""
+
+    @pytest.fixture
+    def s3(self, monkeypatch: pytest.MonkeyPatch) -> _FakeS3:
+        return _FakeS3(monkeypatch)
+
+    def _index(self) -> ReleasesIndex:
+        return ReleasesIndex(_SECRETS, "https://s3.foo.tld", "releases", "ces")
+
+    async def test_lookups_after_load(self, s3: _FakeS3) -> None:
+        index = self._index()
+        _ = await index.put_release(
+            ReleaseDesc(
+                version="25.03.1", builds={ArchType.x86_64: _release_build("el9")}
+            )
+        )
+        await index.load()
+        s3.requests.clear()
+
+        assert await index.get_release("25.03.1")
+        assert await index.get_release("25.03.2") is None
+        assert s3.requests == [("GET", "ces/25.03.1.json")]
+
+        # descriptors known to be current cost no requests.
+        assert await index.get_release("25.03.1")
+        assert len(s3.requests) == 1
+
+    async def test_component_updated_after_load(self, s3: _FakeS3) -> None:
+        index = self._index()
+        await index.load()
+        assert not await check_released_components(
+            _SECRETS, "https://s3.foo.tld", "releases", "ces", {"ceph": "19.2.3-1.gabc"}
+        )
+
+        # another builder, for another el version, released the component meanwhile.
+        await _update_component(self._index(), "el10")
+        await _update_component(index, "el9")
+
+        comp = ReleaseComponent.model_validate_json(
+            s3.objects["ces/ceph/19.2.3-1.gabc.json"]
+        )
+        assert [v.os_version for v in comp.versions] == ["el10", "el9"]
+
+    async def test_release_updated_after_load(self, s3: _FakeS3) -> None:
+        index = self._index()
+        _ = await index.put_release(ReleaseDesc(version="25.03.1", builds={}))
+        await index.load()
+        assert await index.get_release("25.03.1")
+
+        other = self._index()
+        _ = await release_desc_upload(
+            _SECRETS,
+            "https://s3.foo.tld",
+            "releases",
+            "ces",
+            "25.03.1",
+            _release_build("el10"),
+            index=other,
+        )
+
+        s3.requests.clear()
+        fresh = await index.get_release("25.03.1", fresh=True)
+        assert fresh
+        assert fresh.builds[ArchType.x86_64].os_version == "el10"
+        assert s3.requests == [("GET", "ces/25.03.1.json")]
+
+        # and, unchanged since, it's not downloaded again.
+        s3.requests.clear()
+        assert await index.get_release("25.03.1", fresh=True) == fresh
+        assert s3.requests == [("GET 304", "ces/25.03.1.json")]
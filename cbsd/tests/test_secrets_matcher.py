@@ -0,0 +1,90 @@
+# CBS service daemon - tests - compiled secrets uri matching
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+from __future__ import annotations
+
+import random
+
+import pytest
+from cbscore.utils.secrets.utils import SecretsMatcher, find_best_secret_candidate
+
+_PROTOCOLS = ["", "https://", "http://", "ssh://", "git://", "ftp://"]
+_HOSTS = ["github.com", "gitlab.foo.tld", "harbor.foo.tld", "foo-bar.tld"]
+_SEGMENTS = ["ceph", "foo", "bar", "foo.bar", "f.o", "a-b", "ceph.git", "x_y"]
+_SUFFIXES = ["", "/", ".git", "/.git", ":22", "@"]
+
+
+def _gen_uri(rng: random.Random) -> str:
+    protocol = rng.choice(_PROTOCOLS)
+    host = rng.choice(_HOSTS)
+    path = "".join(f"/{rng.choice(_SEGMENTS)}" for _ in range(rng.randint(0, 4)))
+    return f"{protocol}{host}{path}{rng.choice(_SUFFIXES)}"
+
+
+_CASES: list[tuple[list[str], str, str | None]] = [
+    ([], "foo.bar.tld", None),
+    (["foo.bar.tld"], "foo.bar.baz", None),
+    (["foo.bar.tld", "foo.baz.tld"], "foo.bar.tld/foobar", "foo.bar.tld"),
+    (["foo.bar.tld/foobar", "foo.baz.tld"], "foo.bar.tld", None),
+    (
+        ["foo.bar.tld/foo", "foo.bar.tld/foo/bar", "foo.bar.tld/baz"],
+        "foo.bar.tld/foo/bar",
+        "foo.bar.tld/foo/bar",
+    ),
+    (["foo.bar.tld/foo", "foo.bar.tld/bar"], "foo.bar.tld/foo/bar", "foo.bar.tld/foo"),
+    (["https://github.com/ceph"], "ssh://github.com/ceph/ceph", None),
+    (
+        ["github.com", "https://github.com/ceph"],
+        "github.com/ceph/ceph.git",
+        "https://github.com/ceph",
+    ),
+]
+
+
+@pytest.mark.parametrize(("secrets", "uri", "expected"), _CASES)
+def test_known_cases(secrets: list[str], uri: str, expected: str | None) -> None:
+    assert SecretsMatcher(secrets).find(uri) == expected
+
+
+def test_longest_match_wins() -> None:
+    matcher = SecretsMatcher(["github.com", "github.com/ceph", "https://github.com"])
+    assert matcher.find("https://github.com/ceph/ceph") == "github.com/ceph"
+    assert matcher.find("https://github.com") == "github.com"
+    assert matcher.find("https://github.com/clyso") == "github.com"
+
+
+def test_memoized() -> None:
+    matcher = SecretsMatcher(["github.com/ceph"])
+    assert matcher.find("https://github.com/ceph/ceph") == "github.com/ceph"
+    matcher.secrets[0] = "changed"
+    assert matcher.find("https://github.com/ceph/ceph") == "github.com/ceph"
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_equivalent_to_original(seed: int) -> None:
+    """The compiled matcher finds the same secret as the original, for any uri."""
+    rng = random.Random(seed)  # noqa: S311
+    for _ in range(50):
+        num_secrets = rng.randint(0, 8)
+        secrets = list(dict.fromkeys(_gen_uri(rng) for _ in range(num_secrets)))
+        matcher = SecretsMatcher(secrets)
+        for _ in range(40):
+            # mostly uris under the secrets, so there's something to match.
+            uri = (
+                rng.choice(secrets) + "".join(f"/{rng.choice(_SEGMENTS)}" for _ in "ab")
+                if secrets and rng.random() < 0.5
+                else _gen_uri(rng)
+            )
+            assert matcher.find(uri) == find_best_secret_candidate(secrets, uri), (
+                f"secrets: {secrets}, uri: {uri}"
+            )
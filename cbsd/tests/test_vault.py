@@ -0,0 +1,259 @@
+# CBS service daemon - tests - vault sessions and secrets cache
+# Copyright (C) 2026  Clyso GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import override
+
+import pytest
+from cbscore.utils import vault
+from cbscore.utils.vault import VaultAppRoleBackend, VaultTokenBackend
+
+
+class _FakeVault:
+    """A stand-in vault, serving AppRole logins, token renewals, and KV v2 reads."""
+
+    lease_duration: int
+    renewable: bool
+    secrets: dict[str, dict[str, str]]
+    # secret paths no token's policies allow.
+    denied: set[str]
+    valid_tokens: set[str]
+    logins: int
+    renewals: int
+    reads: int
+
+    def __init__(self) -> None:
+        self.lease_duration = 3600
+        self.renewable = True
+        self.secrets = {"git/github": {"username": "foo", "password": "bar"}}
+        self.denied = {"git/denied"}
+        self.valid_tokens = set()
+        self.logins = 0
+        self.renewals = 0
+        self.reads = 0
+
+    def handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, body: object) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                _ = self.wfile.write(data)
+
+            def _auth(self) -> dict[str, object]:
+                return {
+                    "client_token": f"token-{fake.logins}",
+                    "lease_duration": fake.lease_duration,
+                    "renewable": fake.renewable,
+                }
+
+            def _authorized(self) -> bool:
+                return self.headers.get("X-Vault-Token") in fake.valid_tokens
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                _ = self.rfile.read(length)
+
+                if self.path == "/v1/auth/approle/login":
+                    fake.logins += 1
+                    fake.valid_tokens.add(f"token-{fake.logins}")
+                    self._reply(200, {"auth": self._auth()})
+                elif self.path == "/v1/auth/token/renew-self":
+                    if not self._authorized():
+                        self._reply(403, {"errors": ["permission denied"]})
+                        return
+                    fake.renewals += 1
+                    self._reply(200, {"auth": self._auth()})
+                else:
+                    self._reply(404, {"errors": []})
+
+            def do_GET(self) -> None:
+                prefix = "/v1/ces-kv/data/"
+                path = self.path.split("?")[0]
+                if path == "/v1/auth/token/lookup-self":
+                    if not self._authorized():
+                        self._reply(403, {"errors": ["permission denied"]})
+                        return
+                    self._reply(200, {"data": {"id": self.headers["X-Vault-Token"]}})
+                    return
+                if not path.startswith(prefix):
+                    self._reply(404, {"errors": []})
+                    return
+                if not self._authorized() or path.removeprefix(prefix) in fake.denied:
+                    self._reply(403, {"errors": ["permission denied"]})
+                    return
+
+                fake.reads += 1
+                secret = fake.secrets.get(path.removeprefix(prefix))
+                if secret is None:
+                    self._reply(404, {"errors": []})
+                    return
+                self._reply(
+                    200,
+                    {
+                        "lease_duration": 0,
+                        "data": {"data": secret, "metadata": {"version": 1}},
+                    },
+                )
+
+            @override
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        return _Handler
+
+
+@pytest.fixture(autouse=True)
+def _isolated_sessions(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Don't share vault sessions across tests."""
+    monkeypatch.setattr(vault, "_sessions", {})
+
+
+@pytest.fixture
+def fake_vault() -> Generator[tuple[_FakeVault, str]]:
+    fake = _FakeVault()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), fake.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield fake, f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _approle(addr: str) -> VaultAppRoleBackend:
+    return VaultAppRoleBackend(addr, role_id="role", secret_id="secret")  # noqa: S106
+
+
+class TestVaultSession:
+    """Tokens are reused across requests and backends, until their lease expires."""
+
+    def test_token_reused(self, fake_vault: tuple[_FakeVault, str]) -> None:
+        fake, addr = fake_vault
+        v = _approle(addr)
+        v.check_vault_connection()
+        for _ in range(5):
+            with v.client() as client:
+                assert client.token == "token-1"  # noqa: S105
+        assert fake.logins == 1
+
+    def test_session_shared_by_backends(
+        self, fake_vault: tuple[_FakeVault, str]
+    ) -> None:
+        fake, addr = fake_vault
+        _approle(addr).check_vault_connection()
+        _approle(addr).check_vault_connection()
+        assert fake.logins == 1
+
+    def test_token_renewed_before_expiry(
+        self, fake_vault: tuple[_FakeVault, str]
+    ) -> None:
+        fake, addr = fake_vault
+        # within the renewal margin, but not yet expired.
+        fake.lease_duration = 30
+        v = _approle(addr)
+        v.check_vault_connection()
+        v.check_vault_connection()
+        assert fake.logins == 1
+        assert fake.renewals == 1
+        assert v.cache_stats().renewals == 1
+
+    def test_login_again_if_not_renewable(
+        self, fake_vault: tuple[_FakeVault, str]
+    ) -> None:
+        fake, addr = fake_vault
+        fake.lease_duration = 30
+        fake.renewable = False
+        v = _approle(addr)
+        v.check_vault_connection()
+        v.check_vault_connection()
+        assert fake.logins == 2
+        assert fake.renewals == 0
+
+    def test_token_backend_never_logs_in(
+        self, fake_vault: tuple[_FakeVault, str]
+    ) -> None:
+        fake, addr = fake_vault
+        fake.valid_tokens.add("static")
+        v = VaultTokenBackend(addr, token="static")  # noqa: S106
+        assert v.read_secret("git/github")["username"] == "foo"
+        assert fake.logins == 0
+
+
+class TestSecretsCache:
+    """Secrets are read once, and cached for their TTL."""
+
+    def test_cached(self, fake_vault: tuple[_FakeVault, str]) -> None:
+        fake, addr = fake_vault
+        v = _approle(addr)
+        for _ in range(5):
+            assert v.read_secret("git/github") == {"username": "foo", "password": "bar"}
+        assert fake.reads == 1
+
+        stats = v.cache_stats()
+        assert (stats.hits, stats.misses, stats.logins) == (4, 1, 1)
+
+    def test_cached_entries_not_shared(
+        self, fake_vault: tuple[_FakeVault, str]
+    ) -> None:
+        _, addr = fake_vault
+        v = _approle(addr)
+        v.read_secret("git/github")["username"] = "mutated"
+        assert v.read_secret("git/github")["username"] == "foo"
+
+    def test_expired(
+        self, fake_vault: tuple[_FakeVault, str], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        fake, addr = fake_vault
+        monkeypatch.setattr(vault, "_SECRET_DEFAULT_TTL_SECS", 0.0)
+        v = _approle(addr)
+        _ = v.read_secret("git/github")
+        _ = v.read_secret("git/github")
+        assert fake.reads == 2
+        assert v.cache_stats().misses == 2
+
+    def test_revoked_token(self, fake_vault: tuple[_FakeVault, str]) -> None:
+        fake, addr = fake_vault
+        v = _approle(addr)
+        v.check_vault_connection()
+        fake.valid_tokens.clear()
+
+        assert v.read_secret("git/github")["password"] == "bar"  # noqa: S105
+        assert fake.logins == 2
+
+    @pytest.mark.parametrize("path", ["git/missing", "git/denied"])
+    def test_missing_secret(
+        self, fake_vault: tuple[_FakeVault, str], path: str
+    ) -> None:
+        fake, addr = fake_vault
+        v = _approle(addr)
+        _ = v.read_secret("git/github")
+        for _ in range(3):
+            with pytest.raises(vault.VaultError):
+                _ = v.read_secret(path)
+
+        # neither logged in again, nor dropped the cached secrets.
+        _ = v.read_secret("git/github")
+        stats = v.cache_stats()
+        assert (stats.hits, stats.logins) == (1, 1)
+        assert fake.logins == 1
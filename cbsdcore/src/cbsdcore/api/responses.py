@@ -57,3 +57,46 @@ class BuildLogsFollowResponse(pydantic.BaseModel):
     last_id: str | None
     msgs: list[str]
     end_of_stream: bool
+
+
+class BuildLogLinesResponse(pydantic.BaseModel):
+    """Represents a response to a build log lines range request."""
+
+    start: int
+    msgs: list[str]
+    end_of_log: bool
+
+
+class BuildLogSearchMatch(pydantic.BaseModel):
+    """Represents a build log line matching a search, along with its context."""
+
+    line_no: int
+    msg: str
+    before: list[str]
+    after: list[str]
+
+
+class BuildLogSearchResponse(pydantic.BaseModel):
+    """Represents a response to a build log search request."""
+
+    matches: list[BuildLogSearchMatch]
+    truncated: bool
+
+
+class BuildPhaseTiming(pydantic.BaseModel):
+    """
+    Represents the timing of a phase of a given build.
+
+    Phases are named by their '/'-separated path in the build's timing trace, with
+    byte and subprocess counts being inclusive of nested phases.
+    """
+
+    build_id: int
+    submitted: dt
+    phase: str
+    start_secs: float
+    duration_secs: float | None
+    failed: bool
+    bytes_uploaded: int
+    bytes_downloaded: int
+    subprocesses: int